@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: loading a device configuration for many kernels — uncached vs. cached.
+
+Simulates a build that compiles ``--kernels`` programs, each of which loads
+its target device (``npm_lite`` by default, which includes the baseline type
+family catalog). Reports the per-kernel cost with no caching (parse and
+resolve every time), with the on-disk cache only (a fresh process per kernel)
+and with the in-process cache.
+
+Usage:
+    python libs/nemlib-py/benchmarks/bench_device_cache.py [--kernels N] [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from nemlib.device import load_device, loader
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def time_kernels(path: Path, kernels: int, mode: str) -> float:
+    loader.clear_caches(disk=mode == "uncached")
+    t = time.perf_counter()
+    for _ in range(kernels):
+        if mode != "memory":
+            loader.clear_caches(disk=mode == "uncached")
+        load_device(path)
+    return (time.perf_counter() - t) / kernels
+
+
+def report(label: str, samples: list[float]) -> None:
+    med = statistics.median(samples) * 1e6
+    best = min(samples) * 1e6
+    print(f"  {label:32s} median {med:10.1f} us/kernel   best {best:10.1f} us/kernel")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--device", type=Path, default=EXAMPLES_DIR / "npm_lite_.nem")
+    parser.add_argument("--kernels", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ["NEMLIB_CACHE_DIR"] = cache_dir
+        print(f"{args.device.name}, {args.kernels} kernels:")
+        for label, mode in (
+            ("uncached (parse + resolve)", "uncached"),
+            ("disk cache (fresh process)", "disk"),
+            ("in-process cache", "memory"),
+        ):
+            report(label, [time_kernels(args.device, args.kernels, mode) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tree-walking evaluation vs compiled expressions.
+
+Uses the const preamble program of
+``tests/conformance/const/test_const_full_program.py``. Times the constant
+declarations, then the offsets, extents and shapes of every region in the
+loop body over ``--iterations`` values of ``i``, both with ``evaluate_int``
+on an environment and with functions from ``compile_int`` (constants folded,
+``i`` the only parameter). Compilation time is reported separately.
+
+Usage:
+    python libs/nemlib-py/benchmarks/bench_expressions.py [--iterations N] [--runs N]
+"""
+
+import argparse
+import importlib.util
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from nemlib.core.expressions import ExprNode, compile_int, evaluate_int, fold
+from nemlib.parser import parse
+from nemlib.validation import index_program
+
+CONFORMANCE_DIR = Path(__file__).resolve().parents[3] / "tests" / "conformance"
+
+
+def load_program() -> str:
+    path = CONFORMANCE_DIR / "const" / "test_const_full_program.py"
+    spec = importlib.util.spec_from_file_location("test_const_full_program", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    source: str = module.NEM_PROGRAM
+    return source
+
+
+def report(label: str, samples: list[float], per: int) -> None:
+    med = statistics.median(samples)
+    best = min(samples)
+    print(
+        f"  {label:28s} median {med * 1e3:9.2f} ms   best {best * 1e3:9.2f} ms"
+        f"   ({med / per * 1e9:7.1f} ns/eval)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    program, diagnostics = parse(load_program())
+    assert not diagnostics, [str(d) for d in diagnostics]
+    index = index_program(program)
+    consts = [const for _, const in index.consts]
+    exprs: list[ExprNode] = []
+    for info in index.regions:
+        if info.scope:
+            region = info.region
+            exprs.extend((region.offset, region.extent, *(region.shape or ())))
+
+    print(f"const preamble: {len(consts)} declarations")
+    walk, folded = [], []
+    for _ in range(args.runs):
+        t = time.perf_counter()
+        for _ in range(1000):
+            values: dict[str, int] = {}
+            for const in consts:
+                values[const.name] = evaluate_int(const.value, values)
+        walk.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        for _ in range(1000):
+            values = {}
+            for const in consts:
+                node = fold(const.value, values)
+                values[const.name] = evaluate_int(node)
+        folded.append(time.perf_counter() - t)
+    report("tree walk (x1000)", walk, 1000 * len(consts))
+    report("fold (x1000)", folded, 1000 * len(consts))
+    constants = values
+
+    evals = len(exprs) * args.iterations
+    print(f"loop body: {len(exprs)} expressions x {args.iterations} iterations")
+    t = time.perf_counter()
+    compiled: list[Callable[[int], int]] = [compile_int(e, ("i",), constants) for e in exprs]
+    print(f"  compile once                 {(time.perf_counter() - t) * 1e3:9.2f} ms")
+    walk, fast = [], []
+    for _ in range(args.runs):
+        t = time.perf_counter()
+        env = dict(constants)
+        for i in range(args.iterations):
+            env["i"] = i
+            for e in exprs:
+                evaluate_int(e, env)
+        walk.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        for i in range(args.iterations):
+            for f in compiled:
+                f(i)
+        fast.append(time.perf_counter() - t)
+    for i in (0, 1, args.iterations - 1):
+        env = {**constants, "i": i}
+        assert [f(i) for f in compiled] == [evaluate_int(e, env) for e in exprs]
+    report("tree walk", walk, evals)
+    report("compiled", fast, evals)
+    speedup = statistics.median(walk) / statistics.median(fast)
+    print(f"  speedup                      {speedup:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
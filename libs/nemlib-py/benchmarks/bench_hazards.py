@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hazard analysis of fully unrolled tile loops.
+
+Sets ``T`` of ``examples/conv2d_relu.nem`` to each ``--trips`` value and times
+pass 7 (hazards) on the unrolled program. Compares the interval-map sweep of
+``check_hazards`` with a pairwise reference (every pair of conflicting task
+instances, each ordered by a graph search), which is run only up to
+``--reference-max`` trips because it is quadratic.
+
+Usage:
+    python libs/nemlib-py/benchmarks/bench_hazards.py [--trips N ...] [--runs N]
+"""
+
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser import parse
+from nemlib.parser.ast_nodes import TaskNode
+from nemlib.validation import index_program
+from nemlib.validation.dep_validator import check_dependencies
+from nemlib.validation.expr_evaluator import evaluate_constants
+from nemlib.validation.hazard_checker import (
+    _blocks,
+    _conflict,
+    _Expansion,
+    _invariant_transfers,
+    check_hazards,
+)
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def pairwise(
+    buffers: Any, regions: Any, tasks: Any, loops: Any, constants: Any, bindings: Any
+) -> set[tuple[int | None, int | None]]:
+    """Reference: test every pair of instances, ordering each by a graph search."""
+    expansion = _Expansion(
+        buffers,
+        regions,
+        tasks,
+        loops,
+        bindings,
+        _invariant_transfers(buffers, regions, tasks, loops),
+    )
+    expansion.block(_blocks(tasks), dict(constants), [], ())
+    instances = expansion.instances
+    races = set()
+    for b, second in enumerate(instances):
+        for a in range(b):
+            first = instances[a]
+            if not (first.accesses and second.accesses):
+                continue
+            if _conflict(first.accesses, second.accesses) is None:
+                continue
+            stack, seen, ordered = [b], {b}, False
+            while stack and not ordered:
+                for p in instances[stack.pop()].preds:
+                    if p == a:
+                        ordered = True
+                    elif p > a and p not in seen:
+                        seen.add(p)
+                        stack.append(p)
+            if not ordered:
+                races.add((first.task, second.task))
+    return races
+
+
+def report(label: str, samples: list[float]) -> None:
+    med = statistics.median(samples)
+    best = min(samples)
+    print(f"  {label:28s} median {med * 1e3:9.1f} ms   best {best * 1e3:9.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, nargs="+", default=[64, 256, 1024, 4096, 16384])
+    parser.add_argument("--reference-max", type=int, default=128)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    source = (EXAMPLES_DIR / "conv2d_relu.nem").read_text()
+    for trips in args.trips:
+        program, _ = parse(re.sub(r"const T = \d+", f"const T = {trips}", source))
+        index = index_program(program)
+        diag = DiagnosticCollector()
+        constants = evaluate_constants(
+            diag, index.consts, index.buffers, index.regions, index.loops
+        )
+        bindings = check_dependencies(diag, index.tasks)
+        inputs = (index.buffers, index.regions, index.tasks, index.loops, constants, bindings)
+        uses = sum(
+            len(task.inputs) + len(task.outputs)
+            for _, task in index.tasks
+            if isinstance(task, TaskNode)
+        )
+        print(f"conv2d_relu, T = {trips} ({uses * trips} region uses):")
+
+        samples = []
+        for _ in range(args.runs):
+            t = time.perf_counter()
+            check_hazards(DiagnosticCollector(), *inputs)
+            samples.append(time.perf_counter() - t)
+        report("interval sweep", samples)
+        if trips <= args.reference_max:
+            t = time.perf_counter()
+            pairwise(*inputs)
+            report("pairwise reference", [time.perf_counter() - t])
+
+
+if __name__ == "__main__":
+    main()
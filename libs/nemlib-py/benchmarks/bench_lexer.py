@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NEM lexer throughput (MB/s and tokens/s).
+
+Lexes every ``examples/*.nem`` file and a synthetic generated kernel of
+``--lines`` lines (default 100k) built from repeated tiled-loop bodies.
+
+Usage:
+    python libs/nemlib-py/benchmarks/bench_lexer.py [--runs N] [--lines N]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from nemlib.parser import tokenize
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+_BODY = """\
+  # tile {n}
+  let A_{n} = region(A_L2, ({n} mod 4) * tile_bytes, tile_bytes)
+              elem=f16, shape=[TiM, K], layout=MK @readonly
+  let Y_{n} = region(Y_L1, ({n} mod 2) * tile_bytes, tile_bytes)
+              elem=f16, shape=[TiM, N], layout=MN @materialized
+  t{n} = transfer.async(dst=Y_{n}, src=A_{n}, deps=[t{p}])
+  g{n} = gemm.async in A_{n}, B_l1 out Y_{n} deps=[t{n}] accum_type=f32 alpha=1.0e-3
+"""
+
+
+def synthetic_program(lines: int) -> str:
+    """A generated kernel of roughly ``lines`` lines."""
+    parts = [
+        'device "npm_lite.cfg"\n',
+        "program synthetic:\n",
+        "const TiM = 64\nconst K = 256\nconst N = 128\nconst tile_bytes = TiM * K * 2\n",
+        "buffer A_L2 : L2 (size=4 * tile_bytes, align=64)\n",
+        "buffer Y_L1 : L1 (size=2 * tile_bytes, align=64)\n",
+        "loop i in [0..1023] @max_in_flight(2):\n",
+    ]
+    body_lines = _BODY.count("\n")
+    for n in range(max(1, lines // body_lines)):
+        parts.append(_BODY.format(n=n, p=max(n - 1, 0)))
+    parts.append("endloop\n")
+    return "".join(parts)
+
+
+def measure(label: str, sources: list[str], runs: int) -> None:
+    size = sum(len(s.encode()) for s in sources)
+    ntokens = sum(1 for s in sources for _ in tokenize(s))
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        for s in sources:
+            for _ in tokenize(s):
+                pass
+        samples.append(time.perf_counter() - t)
+    med = statistics.median(samples)
+    print(
+        f"  {label:28s} {size / 1e6:7.2f} MB {ntokens:9d} tokens   "
+        f"median {med * 1e3:9.2f} ms   {size / med / 1e6:7.1f} MB/s   "
+        f"{ntokens / med / 1e6:6.2f} Mtok/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--lines", type=int, default=100_000)
+    args = parser.parse_args()
+
+    examples = [p.read_text() for p in sorted(EXAMPLES_DIR.glob("*.nem"))]
+    print("Lexer throughput:")
+    measure(f"examples/*.nem ({len(examples)} files)", examples, args.runs * 20)
+    measure(f"synthetic ({args.lines} lines)", [synthetic_program(args.lines)], args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: opcode registry load — YAML parse vs. compiled snapshot.
+
+Measures both the in-process load time and the cold start of a fresh
+interpreter process that imports nemlib and loads the registry. The plain
+``yaml.safe_load`` line is the baseline the event-driven loader (which also
+checks duplicates and records positions) is compared against.
+
+Usage:
+    python libs/nemlib-py/benchmarks/bench_registry_load.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from nemlib.core.opcodes import REGISTRY_PATH, load_registry_data
+
+COLD_START = (
+    "import time; t = time.perf_counter();"
+    "from nemlib.core.opcodes import load_registry_data;"
+    "load_registry_data(cache={cache});"
+    "print(time.perf_counter() - t)"
+)
+
+
+def time_in_process(runs: int, cache: bool, cache_dir: str) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        load_registry_data(cache=cache, cache_dir=cache_dir)
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def time_safe_load(runs: int) -> list[float]:
+    import yaml  # type: ignore[import-untyped]
+
+    loader = getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        yaml.load(REGISTRY_PATH.read_bytes(), Loader=loader)
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def time_cold_start(runs: int, cache: bool, cache_dir: str) -> list[float]:
+    env = dict(os.environ, NEMLIB_CACHE_DIR=cache_dir)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", COLD_START.format(cache=cache)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        samples.append(float(out.stdout))
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    med = statistics.median(samples) * 1e3
+    best = min(samples) * 1e3
+    print(f"  {label:32s} median {med:9.3f} ms   best {best:9.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        load_registry_data(cache_dir=cache_dir)  # warm the snapshot
+
+        print("In-process load:")
+        report("baseline (yaml.safe_load)", time_safe_load(args.runs))
+        report("YAML (event loader)", time_in_process(args.runs, False, cache_dir))
+        report("snapshot (marshal)", time_in_process(args.runs, True, cache_dir))
+
+        print("Cold start (new process, import + load):")
+        report("YAML (event loader)", time_cold_start(args.runs, False, cache_dir))
+        report("snapshot (marshal)", time_cold_start(args.runs, True, cache_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: type family matching of compute-task instances.
+
+Builds the operand signatures of a program with ``--instances`` compute-task
+instances (as after loop unrolling: a mix of gemm, conv2d, elementwise,
+normalization and conversion tasks) and matches every one of them against
+``npm_lite``. Compares a per-variant linear search (check each applicable
+variant's operand bindings in turn) with the compiled signature tables used
+by ``match_opcode_instance``.
+
+Usage:
+    python libs/nemlib-py/benchmarks/bench_type_matching.py [--instances N] [--runs N]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+from nemlib.device import load_device
+from nemlib.types import MatchResult, TypeFamilyRegistry, match_opcode_instance
+from nemlib.types.registry import _allowed_types
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+# One loop body's compute tasks; unrolled until --instances is reached
+KERNEL: list[tuple[str, dict[str, str], dict[str, Any]]] = [
+    ("conv2d", {"X": "i8", "W": "i8", "B": "i32", "Y": "i8"}, {"accum_type": "i32"}),
+    ("relu", {"X": "i8", "Y": "i8"}, {}),
+    ("gemm", {"A": "f16", "B": "f16", "Y": "f16"}, {"accum_type": "f32"}),
+    ("add", {"A": "f16", "B": "f16", "Y": "f16"}, {}),
+    ("layernorm", {"X": "f16", "scale": "f16", "bias": "f16", "Y": "f16"}, {}),
+    ("gemm", {"A": "i8", "B": "i8", "C": "i32", "Y": "i8"}, {"accum_type": "i32"}),
+    ("dequantize", {"X": "i8", "Y": "f32"}, {}),
+    ("softmax", {"X": "f16", "Y": "f16"}, {}),
+    ("transpose", {"X": "i8", "Y": "i8"}, {}),
+    ("cast", {"X": "f16", "Y": "f32"}, {}),
+]
+
+
+def linear_match(
+    opcode: str,
+    operand_types: dict[str, str],
+    attributes: dict[str, Any],
+    device: Any,
+    registry: TypeFamilyRegistry,
+) -> MatchResult:
+    """Reference matcher: check each applicable variant's bindings in turn."""
+    info = registry.opcodes[opcode]
+    effective = device.effective_set(opcode)
+    accum = attributes.get("accum_type")
+    operands = tuple(op.name for op in info.operands if op.name != "indices")
+    key = tuple(operand_types.get(name) for name in operands)
+    for family in registry.families_for(opcode):
+        for inst in family.instances():
+            if accum is not None and inst.accum is not None and inst.accum != accum:
+                continue
+            if inst.ref not in effective:
+                continue
+            allowed = _allowed_types(info, operands, inst)
+            if allowed is not None and all(t in a for t, a in zip(key, allowed)):
+                return MatchResult(True, inst.ref, inst.conformance)
+    return MatchResult(False, None, None, "no match")
+
+
+def run(matcher: Any, tasks: list[Any], device: Any, registry: TypeFamilyRegistry) -> float:
+    t = time.perf_counter()
+    for opcode, operands, attributes in tasks:
+        result = matcher(opcode, operands, attributes, device, registry)
+        if not result.matched:
+            raise AssertionError(f"{opcode} {operands}: {result.error_detail}")
+    return time.perf_counter() - t
+
+
+def report(label: str, samples: list[float], count: int) -> None:
+    med = statistics.median(samples)
+    best = min(samples)
+    print(
+        f"  {label:28s} median {med * 1e3:9.1f} ms ({med / count * 1e9:6.0f} ns/instance)"
+        f"   best {best * 1e3:9.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--instances", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    device = load_device(EXAMPLES_DIR / "npm_lite_.nem")
+    registry = TypeFamilyRegistry.baseline()
+    tasks = (KERNEL * (args.instances // len(KERNEL) + 1))[: args.instances]
+    for opcode, _, _ in KERNEL:
+        registry.table(opcode)  # compile outside the timed loop
+
+    print(f"{len(tasks)} compute-task instances on {device.name}:")
+    for label, matcher in (
+        ("linear search per variant", linear_match),
+        ("signature table", match_opcode_instance),
+    ):
+        report(label, [run(matcher, tasks, device, registry) for _ in range(args.runs)], len(tasks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: validating a large generated program.
+
+Generates a program of ``--layers`` independent tiled layers (each a loop of
+``--iterations`` iterations with elementwise tasks over its own L2 buffers of
+256 bytes per iteration, so up to 256 layers of 8 iterations fit npm_lite's L2)
+and validates it against ``npm_lite`` with the serial, thread-pool and
+process-pool pipelines (the pools only run the hazard pass), then re-validates
+with pass-level caching: the same source parsed again, and after editing one
+buffer (only the passes reading buffers rerun).
+
+Usage:
+    python libs/nemlib-py/benchmarks/bench_validation.py [--layers N] [--iterations N] [--runs N]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from nemlib.device import DeviceConfig, load_device
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser import parse
+from nemlib.parser.ast_nodes import ProgramNode
+from nemlib.validation import ValidationPipeline, ValidationReport, clear_validation_cache
+from nemlib.validation.pipeline import ExecutorKind
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+LAYER = """
+buffer A{k} : L2 (size=T * 256, align=64)
+buffer Y{k} : L2 (size=T * 256, align=64)
+loop i in [0..T-1] @max_in_flight(2):
+  let a{k} = region(A{k}, i * 256, 256) elem=f16, shape=[8, 16], layout=MN
+  let y{k} = region(Y{k}, i * 256, 256) elem=f16, shape=[8, 16], layout=MN
+  r{k} = relu.async in a{k} out y{k}
+  s{k} = add.async in y{k}, a{k} out y{k} deps=[r{k}]
+endloop
+"""
+
+
+def generate(layers: int, iterations: int) -> str:
+    body = "".join(LAYER.format(k=k) for k in range(layers))
+    return f"program generated:\nconst T = {iterations}\n{body}"
+
+
+def validate(
+    pipeline: ValidationPipeline, program: ProgramNode, device: DeviceConfig
+) -> tuple[float, ValidationReport]:
+    diag = DiagnosticCollector()
+    t = time.perf_counter()
+    report = pipeline.run(program, device, diag)
+    elapsed = time.perf_counter() - t
+    if diag.has_errors():
+        raise AssertionError(diag.format_all())
+    return elapsed, report
+
+
+def report(label: str, samples: list[float]) -> None:
+    med = statistics.median(samples)
+    best = min(samples)
+    print(f"  {label:28s} median {med * 1e3:9.1f} ms   best {best * 1e3:9.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--layers", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    device = load_device(EXAMPLES_DIR / "npm_lite_.nem")
+    source = generate(args.layers, args.iterations)
+    program, diagnostics = parse(source, "generated.nem")
+    assert not diagnostics
+    edited, _ = parse(source.replace("align=64)\nloop", "align=128)\nloop", 1), "generated.nem")
+
+    print(
+        f"{args.layers} layers x {args.iterations} iterations "
+        f"({2 * args.layers} tasks, {2 * args.layers * args.iterations} instances) "
+        f"on {device.name}:"
+    )
+    last: ValidationReport | None = None
+    executors: tuple[ExecutorKind, ...] = ("serial", "thread", "process")
+    for executor in executors:
+        with ValidationPipeline(executor=executor, cache=False) as pipeline:
+            validate(pipeline, program, device)  # warm up the pool
+            samples = []
+            for _ in range(args.runs):
+                elapsed, last = validate(pipeline, program, device)
+                samples.append(elapsed)
+            report(f"{executor} (uncached)", samples)
+
+    pipeline = ValidationPipeline(executor="serial")
+    unchanged, edit = [], []
+    for _ in range(args.runs):
+        clear_validation_cache()
+        validate(pipeline, program, device)
+        reparsed, _ = parse(source, "generated.nem")
+        unchanged.append(validate(pipeline, reparsed, device)[0])
+        edit.append(validate(pipeline, edited, device)[0])
+    report("cached, unchanged (reparsed)", unchanged)
+    report("cached, one buffer edited", edit)
+    if last is not None:
+        print("\nper-pass time (last uncached run):")
+        print(last.format_timings())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""nemlib — shared NEM library: parser, type system, device model, validation."""
+
+__version__ = "0.1.0"
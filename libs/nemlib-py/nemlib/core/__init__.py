@@ -0,0 +1,25 @@
+"""Core data model (Layer 1): element types, memory levels, opcodes, expressions."""
+
+from nemlib.core.elements import ElementType
+from nemlib.core.opcodes import (
+    AttributeInfo,
+    DuplicateKeyError,
+    OpcodeInfo,
+    OpcodeRegistry,
+    OperandInfo,
+    RegistryError,
+    get_registry,
+    load_registry,
+)
+
+__all__ = [
+    "AttributeInfo",
+    "DuplicateKeyError",
+    "ElementType",
+    "OpcodeInfo",
+    "OpcodeRegistry",
+    "OperandInfo",
+    "RegistryError",
+    "get_registry",
+    "load_registry",
+]
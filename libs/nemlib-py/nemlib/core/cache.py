@@ -0,0 +1,206 @@
+"""
+Content-addressed caches shared by nemlib loaders.
+
+:class:`ContentCache` keeps values in two tiers, both keyed by a content digest
+(see :func:`content_key`), so an entry can never be stale — changing any input
+changes the key:
+
+* an in-process LRU (``max_entries``);
+* an on-disk store of pickles under ``<cache dir>/<namespace>/``, capped at
+  ``max_bytes``. Hits refresh the file's mtime and the least recently used
+  files are evicted when a write pushes the directory over the cap.
+
+Disk failures (read-only or full cache directory, corrupt or truncated files)
+only cost a miss. Cached values must be immutable: the same object is handed
+to every caller.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Generic, TypeVar
+
+import nemlib
+
+# Bump whenever the pickled payload layout of any namespace changes.
+CACHE_FORMAT = 1
+
+T = TypeVar("T")
+
+
+def default_cache_dir() -> Path:
+    """Cache directory: ``NEMLIB_CACHE_DIR``, else ``$XDG_CACHE_HOME/nemlib``."""
+    override = os.environ.get("NEMLIB_CACHE_DIR")
+    if override:
+        return Path(override)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "nemlib"
+
+
+def content_key(*parts: bytes | str) -> str:
+    """Digest of ``parts`` plus the nemlib version, cache format and Python version."""
+    h = hashlib.sha256(
+        f"nemlib/{nemlib.__version__}/{CACHE_FORMAT}/"
+        f"{sys.version_info[0]}.{sys.version_info[1]}".encode()
+    )
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class ContentCache(Generic[T]):
+    """Two-tier (memory LRU + disk) cache of immutable values by content key."""
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        max_entries: int = 128,
+        max_bytes: int = 64 * 1024 * 1024,
+        cache_dir: Path | str | None = None,
+        disk: bool = True,
+    ) -> None:
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._memory: OrderedDict[str, T] = OrderedDict()
+        self.stats = CacheStats()
+
+    @property
+    def directory(self) -> Path:
+        """Disk location (resolved lazily so ``NEMLIB_CACHE_DIR`` can change)."""
+        base = self._cache_dir if self._cache_dir is not None else default_cache_dir()
+        return base / self.namespace
+
+    def get(self, key: str) -> T | None:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return value
+        if self.disk:
+            value = self._read(key)
+            if value is not None:
+                self.stats.disk_hits += 1
+                self._remember(key, value)
+                return value
+        self.stats.misses += 1
+        return None
+
+    def put(self, key: str, value: T) -> None:
+        self._remember(key, value)
+        if self.disk:
+            self._write(key, value)
+
+    def get_or_create(self, key: str, factory: Callable[[], T]) -> T:
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear_memory(self) -> None:
+        """Drop the in-process tier (the disk tier is kept)."""
+        self._memory.clear()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    # -- memory tier ------------------------------------------------------
+
+    def _remember(self, key: str, value: T) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    # -- disk tier --------------------------------------------------------
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key[:40]}.pickle"
+
+    def _read(self, key: str) -> T | None:
+        path = self._path(key)
+        try:
+            payload = pickle.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated, corrupt or written by an incompatible version
+            _unlink(path)
+            return None
+        if not isinstance(payload, tuple) or len(payload) != 2 or payload[0] != key:
+            return None
+        try:
+            os.utime(path)  # LRU order for disk eviction
+        except OSError:
+            pass
+        value: T = payload[1]
+        return value
+
+    def _write(self, key: str, value: T) -> None:
+        try:
+            blob = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        if len(blob) > self.max_bytes:
+            return
+        directory = self.directory
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                _unlink(Path(tmp))
+                raise
+        except OSError:
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries: list[tuple[float, int, Path]] = []
+        try:
+            for path in self.directory.glob("*.pickle"):
+                st = path.stat()
+                entries.append((st.st_mtime, st.st_size, path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _unlink(path)
+            total -= size
+            self.stats.evictions += 1
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
@@ -0,0 +1,47 @@
+"""
+Decorator catalogue (spec: Decorators).
+
+Each :class:`DecoratorSpec` records where a decorator may appear and what
+arguments it takes. Unknown decorators are errors; ``@debug`` and ``@profile``
+are informational and accepted anywhere.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# Objects a decorator can be attached to
+BUFFER = "buffer"
+REGION = "region"  # region declarations and task operands
+TASK = "task"
+LOOP = "loop"
+
+ANYWHERE = frozenset({BUFFER, REGION, TASK, LOOP})
+
+# Units @resource may target; SEQ, sDMA and WDM are resource-invalid
+RESOURCE_UNITS = ("NMU", "CSTL", "DMA", "VPU")
+
+
+@dataclass(frozen=True, slots=True)
+class DecoratorSpec:
+    name: str
+    targets: frozenset[str]
+    args: str  # "none" | "int" | "unit" | "name"
+    informational: bool = False
+
+
+DECORATORS: dict[str, DecoratorSpec] = {
+    spec.name: spec
+    for spec in (
+        DecoratorSpec("materialized", frozenset({REGION}), "none"),
+        DecoratorSpec("deterministic", frozenset({TASK}), "none"),
+        DecoratorSpec("memmove", frozenset({TASK}), "none"),
+        DecoratorSpec("readonly", frozenset({REGION}), "none"),
+        DecoratorSpec("writeonly", frozenset({REGION}), "none"),
+        DecoratorSpec("max_in_flight", frozenset({LOOP}), "int"),
+        DecoratorSpec("resource", frozenset({TASK}), "unit"),
+        DecoratorSpec("seq_engine", frozenset({TASK}), "int"),
+        DecoratorSpec("debug", ANYWHERE, "name", informational=True),
+        DecoratorSpec("profile", ANYWHERE, "name", informational=True),
+    )
+}
@@ -0,0 +1,57 @@
+"""
+Element types (spec: Element Types).
+
+:class:`ElementType` is a ``str`` enum, so members compare and hash equal to
+their spelling (``ElementType.I8 == "i8"``) and either form can be used as a
+dictionary key.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+
+
+class ElementType(str, Enum):
+    I4 = "i4"
+    I8 = "i8"
+    I16 = "i16"
+    I32 = "i32"
+    U8 = "u8"
+    U16 = "u16"
+    U32 = "u32"
+    F16 = "f16"
+    BF16 = "bf16"
+    F32 = "f32"
+
+    def __str__(self) -> str:
+        return self.value
+
+    def bitwidth(self) -> int:
+        return _BITWIDTH[self]
+
+    def sizeof(self) -> float:
+        """Size in bytes (``0.5`` for ``i4``, which is packed two per byte)."""
+        return _BITWIDTH[self] / 8
+
+    def is_integer(self) -> bool:
+        return self.value[0] in "iu"
+
+    def is_signed(self) -> bool:
+        return self.value[0] != "u"
+
+    def is_float(self) -> bool:
+        return not self.is_integer()
+
+
+_BITWIDTH = {
+    ElementType.I4: 4,
+    ElementType.I8: 8,
+    ElementType.I16: 16,
+    ElementType.I32: 32,
+    ElementType.U8: 8,
+    ElementType.U16: 16,
+    ElementType.U32: 32,
+    ElementType.F16: 16,
+    ElementType.BF16: 16,
+    ElementType.F32: 32,
+}
@@ -0,0 +1,235 @@
+"""
+Expression AST and evaluator.
+
+NEM expressions (``expr`` in the grammar) are integer arithmetic over literals
+and names: ``+ - * /`` and ``mod``, unary minus, parentheses. ``/`` is integer
+division truncating toward zero and ``mod`` is the matching remainder (sign of
+the dividend), so ``a == (a / b) * b + a mod b`` always holds. FLOAT literals
+are only legal in compute attribute values; evaluating one yields a ``float``.
+
+The evaluator takes an environment ``dict[str, int]`` so the same code serves
+constant declarations and loop variables.
+
+Code that evaluates one expression many times (every iteration of a loop)
+compiles it instead: :func:`fold` substitutes the constants and reduces every
+subtree that no longer mentions a name to a literal, and :func:`compile_expr`
+turns what is left into a Python function of the loop variables, so
+``i * tileX_bytes`` becomes ``lambda i: i * 16384``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+
+from nemlib.diagnostics import SourceLocation
+
+
+class ExpressionError(Exception):
+    """Raised when an expression cannot be evaluated."""
+
+    def __init__(self, message: str, location: SourceLocation | None = None) -> None:
+        super().__init__(f"{location}: {message}" if location else message)
+        self.message = message
+        self.location = location
+
+
+@dataclass(frozen=True, slots=True)
+class IntLiteral:
+    value: int
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class FloatLiteral:
+    value: float
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Identifier:
+    name: str
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class UnaryOp:
+    op: str  # "-"
+    operand: ExprNode
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BinaryOp:
+    op: str  # "+" | "-" | "*" | "/" | "mod"
+    left: ExprNode
+    right: ExprNode
+    location: SourceLocation | None = None
+
+
+ExprNode = IntLiteral | FloatLiteral | Identifier | UnaryOp | BinaryOp
+
+BINARY_OPS = ("+", "-", "*", "/", "mod")
+
+
+def trunc_div(a: int, b: int) -> int:
+    """Integer division truncating toward zero."""
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def trunc_mod(a: int, b: int) -> int:
+    """Remainder matching :func:`trunc_div` (takes the sign of ``a``)."""
+    return a - b * trunc_div(a, b)
+
+
+def evaluate(expr: ExprNode, env: Mapping[str, int] | None = None) -> int | float:
+    """Evaluate ``expr`` with identifiers bound by ``env``.
+
+    Raises :class:`ExpressionError` for unbound names and division by zero.
+    """
+    if isinstance(expr, IntLiteral | FloatLiteral):
+        return expr.value
+    if isinstance(expr, Identifier):
+        if env is None or expr.name not in env:
+            raise ExpressionError(f"undefined name '{expr.name}'", expr.location)
+        return env[expr.name]
+    if isinstance(expr, UnaryOp):
+        return -evaluate(expr.operand, env)
+    left = evaluate(expr.left, env)
+    right = evaluate(expr.right, env)
+    return _apply(expr.op, left, right, expr.location)
+
+
+def evaluate_int(expr: ExprNode, env: Mapping[str, int] | None = None) -> int:
+    """Evaluate ``expr`` and require an integer result."""
+    value = evaluate(expr, env)
+    if not isinstance(value, int):
+        raise ExpressionError("expected an integer expression", expr.location)
+    return value
+
+
+def fold(expr: ExprNode, constants: Mapping[str, int] | None = None) -> ExprNode:
+    """``expr`` with the names bound by ``constants`` folded into literals.
+
+    Constant subtrees are evaluated; one that fails (division by zero) is kept
+    so the error is raised, at its location, when the expression is evaluated.
+    Unchanged subtrees are shared with ``expr``.
+    """
+    if isinstance(expr, Identifier):
+        if constants is not None and expr.name in constants:
+            return _literal(constants[expr.name], expr.location)
+        return expr
+    if isinstance(expr, UnaryOp):
+        operand = fold(expr.operand, constants)
+        if isinstance(operand, IntLiteral | FloatLiteral):
+            return _literal(-operand.value, expr.location)
+        return expr if operand is expr.operand else UnaryOp(expr.op, operand, expr.location)
+    if isinstance(expr, BinaryOp):
+        left = fold(expr.left, constants)
+        right = fold(expr.right, constants)
+        if isinstance(left, IntLiteral | FloatLiteral) and isinstance(
+            right, IntLiteral | FloatLiteral
+        ):
+            try:
+                return _literal(_apply(expr.op, left.value, right.value, None), expr.location)
+            except ExpressionError:
+                pass
+        if left is expr.left and right is expr.right:
+            return expr
+        return BinaryOp(expr.op, left, right, expr.location)
+    return expr
+
+
+def compile_expr(
+    expr: ExprNode, params: Sequence[str] = (), constants: Mapping[str, int] | None = None
+) -> Callable[..., int | float]:
+    """Compile ``expr`` into a function taking the values of ``params`` in order.
+
+    Equivalent to ``evaluate(expr, {**constants, **dict(zip(params, args))})``,
+    but constants are folded once and the rest runs as Python bytecode. A name
+    bound by neither raises :class:`ExpressionError` here rather than per call.
+    """
+    if constants is not None and not constants.keys().isdisjoint(params):
+        constants = {k: v for k, v in constants.items() if k not in params}
+    folded = fold(expr, constants)
+    args = {name: f"_{k}" for k, name in enumerate(params)}
+    namespace: dict[str, object] = {
+        "_apply": _apply,
+        "_div": trunc_div,
+        "_mod": trunc_mod,
+    }
+
+    def emit(node: ExprNode) -> str:
+        if isinstance(node, IntLiteral):
+            return repr(node.value)
+        if isinstance(node, FloatLiteral):
+            name = f"_const{len(namespace)}"
+            namespace[name] = node.value
+            return name
+        if isinstance(node, Identifier):
+            if node.name not in args:
+                raise ExpressionError(f"undefined name '{node.name}'", node.location)
+            return args[node.name]
+        if isinstance(node, UnaryOp):
+            return f"(-{emit(node.operand)})"
+        left, right = emit(node.left), emit(node.right)
+        if node.op in ("+", "-", "*"):
+            return f"({left} {node.op} {right})"
+        if isinstance(node.right, IntLiteral) and node.right.value and _is_int(node.left):
+            return f"{'_div' if node.op == '/' else '_mod'}({left}, {right})"
+        location = f"_const{len(namespace)}"
+        namespace[location] = node.location
+        return f"_apply({node.op!r}, {left}, {right}, {location})"
+
+    source = f"def _compiled({', '.join(args.values())}):\n    return {emit(folded)}\n"
+    exec(compile(source, "<nem expression>", "exec"), namespace)
+    function: Callable[..., int | float] = namespace["_compiled"]  # type: ignore[assignment]
+    return function
+
+
+def compile_int(
+    expr: ExprNode, params: Sequence[str] = (), constants: Mapping[str, int] | None = None
+) -> Callable[..., int]:
+    """:func:`compile_expr` for expressions that must be integers (see :func:`evaluate_int`).
+
+    Integer parameters cannot produce a float without a FLOAT literal, so the
+    check is made once, at compile time.
+    """
+    if not _is_int(expr):
+        raise ExpressionError("expected an integer expression", expr.location)
+    return compile_expr(expr, params, constants)  # type: ignore[return-value]
+
+
+def _is_int(expr: ExprNode) -> bool:
+    if isinstance(expr, FloatLiteral):
+        return False
+    if isinstance(expr, UnaryOp):
+        return _is_int(expr.operand)
+    if isinstance(expr, BinaryOp):
+        return _is_int(expr.left) and _is_int(expr.right)
+    return True
+
+
+def _literal(value: int | float, location: SourceLocation | None) -> IntLiteral | FloatLiteral:
+    if isinstance(value, int):
+        return IntLiteral(value, location)
+    return FloatLiteral(value, location)
+
+
+def _apply(op: str, a: int | float, b: int | float, loc: SourceLocation | None) -> int | float:
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if op in ("/", "mod"):
+        if b == 0:
+            raise ExpressionError("division by zero", loc)
+        if isinstance(a, int) and isinstance(b, int):
+            return trunc_div(a, b) if op == "/" else trunc_mod(a, b)
+        if op == "/":
+            return a / b
+        raise ExpressionError("'mod' requires integer operands", loc)
+    raise ExpressionError(f"unknown operator '{op}'", loc)
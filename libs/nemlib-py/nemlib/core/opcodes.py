@@ -0,0 +1,509 @@
+"""
+Opcode registry: loader and query API.
+
+Loads the normative opcode registry (``spec/registry/opcodes.yaml``). Parsing the
+YAML costs tens of milliseconds, which dominates start-up of short tool
+invocations, so the parsed registry is cached as a compiled snapshot (``marshal``)
+keyed by the content hash of ``opcodes.yaml`` and ``schema.json``. Editing either
+file changes the key, so a stale snapshot is never used; the next load re-parses
+the YAML and writes a fresh snapshot.
+
+PyYAML is only needed when no valid snapshot exists. The YAML is parsed by the
+event-driven loader in :mod:`nemlib.core.registry_yaml`, which detects duplicate
+opcode, operand and attribute names (and records source positions) during the
+single parse; both are stored in the snapshot alongside the data.
+
+The raw mapping is turned into an immutable :class:`OpcodeRegistry` of
+:class:`OpcodeInfo` entries, built once with precomputed indexes (by category,
+execution unit, type family, status, hardware status) and per-opcode operand and
+attribute tables, so all queries are dictionary lookups.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+import nemlib
+from nemlib.core.cache import default_cache_dir
+from nemlib.core.registry_yaml import DuplicateKey, parse_registry_yaml
+
+# Repository layout: libs/nemlib-py/nemlib/core/opcodes.py -> repo root is parents[4]
+_REPO_ROOT = Path(__file__).resolve().parents[4]
+
+REGISTRY_PATH = _REPO_ROOT / "spec" / "registry" / "opcodes.yaml"
+SCHEMA_PATH = _REPO_ROOT / "spec" / "registry" / "schema.json"
+
+# Bump whenever the snapshot payload layout changes.
+SNAPSHOT_FORMAT = 2
+
+
+class RegistryError(Exception):
+    """Raised when the opcode registry cannot be loaded."""
+
+
+class DuplicateKeyError(RegistryError):
+    """Raised when the registry defines an opcode, operand or attribute twice."""
+
+    def __init__(self, path: str, duplicates: Iterable[DuplicateKey]) -> None:
+        self.duplicates = tuple(duplicates)
+        lines = "\n".join(f"  {path}:{d.line}:{d.column}: {d.describe()}" for d in self.duplicates)
+        super().__init__(f"Duplicate names in opcode registry {path}:\n{lines}")
+
+
+@dataclass(frozen=True)
+class RegistryDocument:
+    """Raw registry mapping plus 1-based source positions and duplicate names.
+
+    ``positions`` maps ``"opcodes.<op>"`` and
+    ``"opcodes.<op>.operands|attributes.<name>"`` to ``(line, column)``.
+    """
+
+    path: str
+    data: dict[str, Any]
+    positions: Mapping[str, tuple[int, int]]
+    duplicates: tuple[DuplicateKey, ...] = ()
+
+
+def default_registry_path() -> Path:
+    """Registry path, overridable with ``NEMLIB_REGISTRY``."""
+    override = os.environ.get("NEMLIB_REGISTRY")
+    return Path(override) if override else REGISTRY_PATH
+
+
+def registry_digest(registry_path: Path, schema_path: Path | None = None) -> str:
+    """Content hash identifying a registry snapshot.
+
+    Covers the registry and schema bytes plus everything that affects the
+    snapshot encoding (snapshot format, nemlib version, marshal version).
+    """
+    return _digest(_read_bytes(registry_path), schema_path)
+
+
+def _digest(registry_bytes: bytes, schema_path: Path | None) -> str:
+    h = hashlib.sha256()
+    h.update(
+        f"nemlib-registry/{SNAPSHOT_FORMAT}/{nemlib.__version__}/"
+        f"{marshal.version}/{sys.version_info[0]}.{sys.version_info[1]}".encode()
+    )
+    h.update(registry_bytes)
+    h.update(b"\0")
+    if schema_path is not None and schema_path.is_file():
+        h.update(schema_path.read_bytes())
+    return h.hexdigest()
+
+
+def snapshot_path(digest: str, cache_dir: Path | None = None) -> Path:
+    """Location of the snapshot for a given registry digest."""
+    directory = cache_dir if cache_dir is not None else default_cache_dir()
+    return directory / f"opcodes-{digest[:32]}.marshal"
+
+
+def load_registry_data(
+    path: Path | str | None = None,
+    *,
+    schema_path: Path | str | None = None,
+    cache: bool = True,
+    cache_dir: Path | str | None = None,
+) -> dict[str, Any]:
+    """Load the raw registry mapping (``{"version": ..., "opcodes": {...}}``).
+
+    With ``cache=True`` a valid snapshot is loaded directly; otherwise (or if the
+    snapshot is missing or unreadable) the YAML is parsed and a new snapshot is
+    written. Snapshot write failures (read-only cache directory, etc.) are
+    ignored — the YAML path is always a correct fallback.
+
+    Raises :class:`DuplicateKeyError` if an opcode, operand or attribute name is
+    defined twice (duplicates are kept in the snapshot, so this holds for cached
+    loads too).
+    """
+    doc = load_registry_document(path, schema_path=schema_path, cache=cache, cache_dir=cache_dir)
+    if doc.duplicates:
+        raise DuplicateKeyError(doc.path, doc.duplicates)
+    return doc.data
+
+
+def load_registry_document(
+    path: Path | str | None = None,
+    *,
+    schema_path: Path | str | None = None,
+    cache: bool = True,
+    cache_dir: Path | str | None = None,
+) -> RegistryDocument:
+    """Like :func:`load_registry_data`, but returns the data together with
+    source positions and duplicate names instead of raising on duplicates.
+
+    The registry file is read exactly once; the same bytes are hashed for the
+    snapshot key and, on a miss, parsed.
+    """
+    registry_path = Path(path) if path is not None else default_registry_path()
+    if schema_path is not None:
+        schema = Path(schema_path)
+    else:
+        schema = registry_path.with_name(SCHEMA_PATH.name)
+
+    raw = _read_bytes(registry_path)
+    if not cache:
+        return _parse_yaml(raw, registry_path)
+
+    directory = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    snap = snapshot_path(_digest(raw, schema), directory)
+
+    doc = _read_snapshot(snap, registry_path)
+    if doc is not None:
+        return doc
+
+    doc = _parse_yaml(raw, registry_path)
+    _write_snapshot(snap, doc)
+    return doc
+
+
+def _read_bytes(path: Path) -> bytes:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError as e:
+        raise RegistryError(f"Opcode registry not found: {path}") from e
+
+
+def _parse_yaml(raw: bytes, path: Path) -> RegistryDocument:
+    try:
+        import yaml  # type: ignore[import-untyped]
+    except ImportError as e:
+        raise RegistryError(
+            "PyYAML is required to parse the opcode registry when no compiled "
+            "snapshot is available. Install with: pip install pyyaml"
+        ) from e
+
+    try:
+        parsed = parse_registry_yaml(raw)
+    except yaml.YAMLError as e:
+        raise RegistryError(f"Invalid YAML in {path}: {e}") from e
+
+    if not isinstance(parsed.data.get("opcodes"), dict):
+        raise RegistryError(f"{path}: expected a mapping with an 'opcodes' mapping")
+    return RegistryDocument(str(path), parsed.data, parsed.positions, parsed.duplicates)
+
+
+def _read_snapshot(path: Path, registry_path: Path) -> RegistryDocument | None:
+    try:
+        # marshal.loads on the whole buffer; marshal.load on a file object
+        # issues many small reads and is an order of magnitude slower.
+        payload = marshal.loads(path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(payload, tuple) or len(payload) != 4 or payload[0] != SNAPSHOT_FORMAT:
+        return None
+    _, data, positions, duplicates = payload
+    if not isinstance(data, dict) or not isinstance(positions, dict):
+        return None
+    try:
+        dups = tuple(DuplicateKey(*d) for d in duplicates)
+    except TypeError:
+        return None
+    return RegistryDocument(str(registry_path), data, positions, dups)
+
+
+def _write_snapshot(path: Path, doc: RegistryDocument) -> None:
+    try:
+        blob = marshal.dumps(
+            (
+                SNAPSHOT_FORMAT,
+                doc.data,
+                dict(doc.positions),
+                tuple(d.to_tuple() for d in doc.duplicates),
+            )
+        )
+    except ValueError:
+        # Registry contains a value marshal cannot encode; stay on the YAML path.
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".opcodes-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Query API
+# ---------------------------------------------------------------------------
+
+_EMPTY: tuple[Any, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class OperandInfo:
+    """One operand of an opcode signature."""
+
+    name: str
+    direction: str  # "in" | "out"
+    required: bool
+    role: str = ""
+    constraints: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class AttributeInfo:
+    """One static attribute of an opcode signature."""
+
+    name: str
+    type: str  # int, float, bool, elem_type, int_list, string, id
+    required: bool
+    default: Any = None
+    has_default: bool = False
+    description: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class OpcodeInfo:
+    """Immutable registry entry for one opcode."""
+
+    name: str
+    category: str
+    status: str
+    forms: tuple[str, ...]
+    operands: tuple[OperandInfo, ...]
+    attributes: tuple[AttributeInfo, ...] = ()
+    type_families: tuple[str, ...] = ()
+    execution_unit: str | None = None
+    hardware_status: str | None = None
+    notes: str | None = None
+    variadic_inputs: bool = False
+    variadic_outputs: bool = False
+    # Derived tables (built by from_dict)
+    operand_by_name: Mapping[str, OperandInfo] = field(
+        default_factory=lambda: MappingProxyType({}), repr=False, compare=False
+    )
+    attribute_by_name: Mapping[str, AttributeInfo] = field(
+        default_factory=lambda: MappingProxyType({}), repr=False, compare=False
+    )
+    inputs: tuple[OperandInfo, ...] = field(default=(), repr=False, compare=False)
+    outputs: tuple[OperandInfo, ...] = field(default=(), repr=False, compare=False)
+    required_attributes: frozenset[str] = field(default=frozenset(), repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, name: str, defn: Mapping[str, Any]) -> OpcodeInfo:
+        """Build an entry from one ``opcodes.yaml`` definition."""
+        operands = tuple(
+            OperandInfo(
+                name=op["name"],
+                direction=op["direction"],
+                required=bool(op["required"]),
+                role=op.get("role", ""),
+                constraints=op.get("constraints"),
+            )
+            for op in defn.get("operands", _EMPTY)
+        )
+        attributes = tuple(
+            AttributeInfo(
+                name=a["name"],
+                type=a["type"],
+                required=bool(a["required"]),
+                default=a.get("default"),
+                has_default="default" in a,
+                description=a.get("description"),
+            )
+            for a in defn.get("attributes", _EMPTY)
+        )
+        return cls(
+            name=name,
+            category=defn["category"],
+            status=defn["status"],
+            forms=tuple(defn.get("forms", _EMPTY)),
+            operands=operands,
+            attributes=attributes,
+            type_families=tuple(defn.get("type_families", _EMPTY)),
+            execution_unit=defn.get("execution_unit"),
+            hardware_status=defn.get("hardware_status"),
+            notes=defn.get("notes"),
+            variadic_inputs=bool(defn.get("variadic_inputs", False)),
+            variadic_outputs=bool(defn.get("variadic_outputs", False)),
+            operand_by_name=MappingProxyType({op.name: op for op in operands}),
+            attribute_by_name=MappingProxyType({a.name: a for a in attributes}),
+            inputs=tuple(op for op in operands if op.direction == "in"),
+            outputs=tuple(op for op in operands if op.direction == "out"),
+            required_attributes=frozenset(a.name for a in attributes if a.required),
+        )
+
+    def operand(self, name: str) -> OperandInfo | None:
+        return self.operand_by_name.get(name)
+
+    def attribute(self, name: str) -> AttributeInfo | None:
+        return self.attribute_by_name.get(name)
+
+    @property
+    def is_hardware_supported(self) -> bool:
+        return self.hardware_status == "supported"
+
+
+class OpcodeRegistry:
+    """Immutable, indexed view of the opcode registry.
+
+    Index values are tuples in registry (file) order. Lookups for unknown keys
+    return an empty tuple rather than raising.
+    """
+
+    __slots__ = (
+        "version",
+        "_opcodes",
+        "_by_category",
+        "_by_unit",
+        "_by_family",
+        "_by_status",
+        "_by_hw_status",
+    )
+
+    version: str
+    _opcodes: Mapping[str, OpcodeInfo]
+    _by_category: Mapping[str, tuple[OpcodeInfo, ...]]
+    _by_unit: Mapping[str, tuple[OpcodeInfo, ...]]
+    _by_family: Mapping[str, tuple[OpcodeInfo, ...]]
+    _by_status: Mapping[str, tuple[OpcodeInfo, ...]]
+    _by_hw_status: Mapping[str, tuple[OpcodeInfo, ...]]
+
+    def __init__(self, version: str, opcodes: Iterable[OpcodeInfo]) -> None:
+        table = {info.name: info for info in opcodes}
+        by_category: dict[str, list[OpcodeInfo]] = {}
+        by_unit: dict[str, list[OpcodeInfo]] = {}
+        by_family: dict[str, list[OpcodeInfo]] = {}
+        by_status: dict[str, list[OpcodeInfo]] = {}
+        by_hw_status: dict[str, list[OpcodeInfo]] = {}
+        for info in table.values():
+            by_category.setdefault(info.category, []).append(info)
+            by_status.setdefault(info.status, []).append(info)
+            if info.execution_unit is not None:
+                by_unit.setdefault(info.execution_unit, []).append(info)
+            if info.hardware_status is not None:
+                by_hw_status.setdefault(info.hardware_status, []).append(info)
+            for family in info.type_families:
+                by_family.setdefault(family, []).append(info)
+
+        def freeze(index: dict[str, list[OpcodeInfo]]) -> Mapping[str, tuple[OpcodeInfo, ...]]:
+            return MappingProxyType({k: tuple(v) for k, v in index.items()})
+
+        setattr_ = object.__setattr__
+        setattr_(self, "version", version)
+        setattr_(self, "_opcodes", MappingProxyType(table))
+        setattr_(self, "_by_category", freeze(by_category))
+        setattr_(self, "_by_unit", freeze(by_unit))
+        setattr_(self, "_by_family", freeze(by_family))
+        setattr_(self, "_by_status", freeze(by_status))
+        setattr_(self, "_by_hw_status", freeze(by_hw_status))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @classmethod
+    def from_data(cls, data: Mapping[str, Any]) -> OpcodeRegistry:
+        """Build from the raw mapping returned by :func:`load_registry_data`."""
+        return cls(
+            str(data.get("version", "")),
+            tuple(OpcodeInfo.from_dict(n, d) for n, d in data["opcodes"].items()),
+        )
+
+    # -- Mapping-like access ----------------------------------------------
+
+    def __getitem__(self, name: str) -> OpcodeInfo:
+        return self._opcodes[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._opcodes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._opcodes)
+
+    def __len__(self) -> int:
+        return len(self._opcodes)
+
+    def __repr__(self) -> str:
+        return f"OpcodeRegistry(version={self.version!r}, opcodes={len(self._opcodes)})"
+
+    def get(self, name: str) -> OpcodeInfo | None:
+        return self._opcodes.get(name)
+
+    @property
+    def opcodes(self) -> Mapping[str, OpcodeInfo]:
+        return self._opcodes
+
+    # -- Indexes ----------------------------------------------------------
+
+    def by_category(self, category: str) -> tuple[OpcodeInfo, ...]:
+        return self._by_category.get(category, _EMPTY)
+
+    def by_execution_unit(self, unit: str) -> tuple[OpcodeInfo, ...]:
+        return self._by_unit.get(unit, _EMPTY)
+
+    def by_type_family(self, family: str) -> tuple[OpcodeInfo, ...]:
+        return self._by_family.get(family, _EMPTY)
+
+    def by_status(self, status: str) -> tuple[OpcodeInfo, ...]:
+        return self._by_status.get(status, _EMPTY)
+
+    def by_hardware_status(self, hardware_status: str) -> tuple[OpcodeInfo, ...]:
+        return self._by_hw_status.get(hardware_status, _EMPTY)
+
+    def categories(self) -> frozenset[str]:
+        return frozenset(self._by_category)
+
+    def execution_units(self) -> frozenset[str]:
+        return frozenset(self._by_unit)
+
+    def type_families(self) -> frozenset[str]:
+        return frozenset(self._by_family)
+
+
+def load_registry(
+    path: Path | str | None = None,
+    *,
+    cache: bool = True,
+    cache_dir: Path | str | None = None,
+) -> OpcodeRegistry:
+    """Load and index a registry file (see :func:`load_registry_data`)."""
+    return OpcodeRegistry.from_data(load_registry_data(path, cache=cache, cache_dir=cache_dir))
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> OpcodeRegistry:
+    """The default registry, loaded and indexed once per process."""
+    return load_registry()
+
+
+def get_opcode(name: str) -> OpcodeInfo | None:
+    """Look up an opcode in the default registry."""
+    return get_registry().get(name)
+
+
+def get_operands(name: str) -> tuple[OperandInfo, ...]:
+    """Operands of ``name`` in signature order (empty if unknown)."""
+    info = get_registry().get(name)
+    return info.operands if info is not None else _EMPTY
+
+
+def get_attributes(name: str) -> tuple[AttributeInfo, ...]:
+    """Attributes of ``name`` in signature order (empty if unknown)."""
+    info = get_registry().get(name)
+    return info.attributes if info is not None else _EMPTY
+
+
+def is_supported(name: str) -> bool:
+    """True if ``name`` is a registry opcode with ``hardware_status: supported``."""
+    info = get_registry().get(name)
+    return info is not None and info.is_hardware_supported
@@ -0,0 +1,480 @@
+"""
+Opcode registry validator.
+
+``validate_registry()`` checks ``spec/registry/opcodes.yaml`` and returns a
+:class:`RegistryReport` of structured diagnostics (renderable as JSON or SARIF)
+instead of printing. All per-opcode checks — schema, operand directions,
+attribute defaults, type_family references — run in a single traversal of the
+opcode table. Duplicate opcode, operand and attribute names are detected by the
+registry loader itself during the YAML parse and reported at their exact
+line and column.
+
+Cross-references come from the ``examples/*.nem`` files, which are scanned
+concurrently for ``type_family`` declarations and ``<opcode>.async|sync`` uses.
+
+With ``incremental=True`` the per-opcode results of the previous run are cached
+(next to the registry snapshots) and only opcodes whose definition changed are
+re-checked. The cache is discarded whenever the validation context — schema,
+known type families, validator version — changes.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import nemlib
+from nemlib.core.cache import default_cache_dir
+from nemlib.core.opcodes import (
+    SCHEMA_PATH,
+    RegistryError,
+    default_registry_path,
+    load_registry_document,
+)
+from nemlib.diagnostics import Diagnostic, DiagnosticSeverity, SourceLocation, to_sarif
+
+# Bump when check logic changes so incremental caches are invalidated.
+VALIDATOR_VERSION = 2
+
+RULES: dict[str, str] = {
+    "REG000": "Registry or schema could not be loaded",
+    "REG001": "Registry does not conform to schema.json",
+    "REG002": "Opcode has no 'in' direction operand",
+    "REG003": "Opcode has no 'out' direction operand",
+    "REG004": "Duplicate operand or attribute name within an opcode",
+    "REG005": "Optional attribute has no default value",
+    "REG006": "type_family reference not declared in any scanned .nem file",
+    "REG007": "Opcode used in a .nem file is missing from the registry",
+    "REG008": "Schema validation skipped (jsonschema not installed)",
+    "REG009": "Duplicate opcode name or mapping key in the registry",
+}
+
+_TYPE_FAMILY_RE = re.compile(r"^\s*type_family\s+([\w.]+)")
+_OPCODE_USE_RE = re.compile(r"\b([A-Za-z_]\w*)\.(async|sync)\b")
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class RegistryReport:
+    """Result of :func:`validate_registry`."""
+
+    registry_path: str
+    diagnostics: tuple[Diagnostic, ...]
+    summary: Mapping[str, Any]
+    rechecked: tuple[str, ...] = ()
+    reused: int = 0
+    type_families: frozenset[str] = field(default_factory=frozenset)
+
+    def has_errors(self) -> bool:
+        return any(d.severity is DiagnosticSeverity.ERROR for d in self.diagnostics)
+
+    def errors(self) -> list[Diagnostic]:
+        return [d for d in self.diagnostics if d.severity is DiagnosticSeverity.ERROR]
+
+    def warnings(self) -> list[Diagnostic]:
+        return [d for d in self.diagnostics if d.severity is DiagnosticSeverity.WARNING]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "registry": self.registry_path,
+            "status": "failed" if self.has_errors() else "passed",
+            "diagnostics": [d.to_dict() for d in self.diagnostics],
+            "summary": self.summary,
+            "incremental": {"rechecked": list(self.rechecked), "reused": self.reused},
+        }
+
+    def to_sarif(self) -> dict[str, Any]:
+        return to_sarif(
+            self.diagnostics,
+            tool_name="nem-registry-validator",
+            tool_version=nemlib.__version__,
+            rules=RULES,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Example scanning
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class NemScan:
+    """Cross-reference facts extracted from one ``.nem`` file."""
+
+    path: str
+    type_families: tuple[tuple[str, int, int], ...]  # (name, line, column)
+    opcode_uses: tuple[tuple[str, int, int], ...]
+
+
+def scan_nem_file(path: Path | str) -> NemScan:
+    """Extract ``type_family`` declarations and opcode uses from a ``.nem`` file."""
+    families: list[tuple[str, int, int]] = []
+    uses: list[tuple[str, int, int]] = []
+    with open(path) as f:
+        for lineno, line in enumerate(f, start=1):
+            code = line.split("#", 1)[0]
+            if not code.strip():
+                continue
+            m = _TYPE_FAMILY_RE.match(code)
+            if m:
+                families.append((m.group(1), lineno, m.start(1) + 1))
+                continue
+            for m in _OPCODE_USE_RE.finditer(code):
+                uses.append((m.group(1), lineno, m.start(1) + 1))
+    return NemScan(str(path), tuple(families), tuple(uses))
+
+
+def scan_nem_files(paths: Sequence[Path], max_workers: int | None = None) -> list[NemScan]:
+    """Scan files concurrently; results are returned in input order."""
+    if len(paths) <= 1:
+        return [scan_nem_file(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(scan_nem_file, paths))
+
+
+# ---------------------------------------------------------------------------
+# Per-opcode checks
+# ---------------------------------------------------------------------------
+
+
+class _Context:
+    """Everything a per-opcode check needs besides the opcode itself."""
+
+    def __init__(
+        self,
+        registry_file: str,
+        schema: Mapping[str, Any] | None,
+        type_families: frozenset[str],
+    ) -> None:
+        self.registry_file = registry_file
+        self.type_families = type_families
+        self.opcode_validator: Any = None
+        self.top_validator: Any = None
+        if schema is not None:
+            self._build_validators(schema)
+
+    def _build_validators(self, schema: Mapping[str, Any]) -> None:
+        try:
+            import jsonschema  # type: ignore[import-untyped]
+        except ImportError:
+            return
+        cls = jsonschema.validators.validator_for(schema)
+        defs = schema.get("$defs", {})
+        self.opcode_validator = cls({"$ref": "#/$defs/opcode", "$defs": defs})
+        # Top-level shape only; opcode bodies are checked one by one.
+        top = json.loads(json.dumps(schema))
+        top.get("properties", {})["opcodes"] = {"type": "object", "minProperties": 1}
+        self.top_validator = cls(top)
+
+    @property
+    def has_schema_validation(self) -> bool:
+        return self.opcode_validator is not None
+
+    def fingerprint(self, schema_bytes: bytes) -> str:
+        h = hashlib.sha256()
+        h.update(f"{VALIDATOR_VERSION}/{self.has_schema_validation}".encode())
+        h.update(schema_bytes)
+        h.update("\n".join(sorted(self.type_families)).encode())
+        return h.hexdigest()
+
+
+def _check_opcode(name: str, defn: Any, loc: SourceLocation, ctx: _Context) -> list[Diagnostic]:
+    diags: list[Diagnostic] = []
+
+    def report(severity: DiagnosticSeverity, code: str, message: str) -> None:
+        diags.append(Diagnostic(severity, message, loc, code=code))
+
+    if not isinstance(defn, dict):
+        report(DiagnosticSeverity.ERROR, "REG001", f"Opcode '{name}' definition is not a mapping")
+        return diags
+
+    if ctx.opcode_validator is not None:
+        for err in ctx.opcode_validator.iter_errors(defn):
+            where = " -> ".join(str(p) for p in err.absolute_path)
+            suffix = f" (at {where})" if where else ""
+            report(DiagnosticSeverity.ERROR, "REG001", f"Opcode '{name}': {err.message}{suffix}")
+
+    operands = [op for op in defn.get("operands") or [] if isinstance(op, dict)]
+    directions = {op.get("direction") for op in operands}
+    if "in" not in directions:
+        report(
+            DiagnosticSeverity.ERROR, "REG002", f"Opcode '{name}' has no 'in' direction operands"
+        )
+    if "out" not in directions:
+        report(
+            DiagnosticSeverity.ERROR, "REG003", f"Opcode '{name}' has no 'out' direction operands"
+        )
+
+    attributes = [a for a in defn.get("attributes") or [] if isinstance(a, dict)]
+    for attr in attributes:
+        if attr.get("required") is False and "default" not in attr:
+            report(
+                DiagnosticSeverity.WARNING,
+                "REG005",
+                f"Opcode '{name}': optional attribute '{attr.get('name')}' has no default",
+            )
+
+    for family in defn.get("type_families") or []:
+        if family not in ctx.type_families:
+            report(
+                DiagnosticSeverity.WARNING,
+                "REG006",
+                f"Opcode '{name}' references unknown type_family '{family}'",
+            )
+
+    return diags
+
+
+def _opcode_fingerprint(defn: Any) -> str:
+    blob = json.dumps(defn, sort_keys=True, default=repr).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Incremental cache
+# ---------------------------------------------------------------------------
+
+_CACHE_FORMAT = 1
+
+
+def _cache_file(registry_path: Path, cache_dir: Path) -> Path:
+    key = hashlib.sha256(str(registry_path.resolve()).encode()).hexdigest()[:16]
+    return cache_dir / f"registry-validation-{key}.json"
+
+
+def _load_cache(path: Path, context_fp: str) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if data.get("format") != _CACHE_FORMAT or data.get("context") != context_fp:
+        return {}
+    opcodes = data.get("opcodes")
+    return opcodes if isinstance(opcodes, dict) else {}
+
+
+def _store_cache(path: Path, context_fp: str, opcodes: dict[str, Any]) -> None:
+    payload = json.dumps({"format": _CACHE_FORMAT, "context": context_fp, "opcodes": opcodes})
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".validation-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+    except OSError:
+        pass
+
+
+def _encode(diags: Iterable[Diagnostic], anchor_line: int) -> list[dict[str, Any]]:
+    """Serialize diagnostics with lines relative to the opcode key line."""
+    out = []
+    for d in diags:
+        entry = d.to_dict()
+        if entry["location"] is not None:
+            entry["location"]["line"] -= anchor_line
+            if entry["location"]["end_line"] is not None:
+                entry["location"]["end_line"] -= anchor_line
+        out.append(entry)
+    return out
+
+
+def _decode(entries: Iterable[dict[str, Any]], anchor_line: int, file: str) -> list[Diagnostic]:
+    out = []
+    for entry in entries:
+        loc = entry.get("location")
+        if loc is not None:
+            loc = dict(loc, file=file, line=loc["line"] + anchor_line)
+            if loc.get("end_line") is not None:
+                loc["end_line"] += anchor_line
+        out.append(Diagnostic.from_dict(dict(entry, location=loc)))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+
+def validate_registry(
+    registry_path: Path | str | None = None,
+    *,
+    schema_path: Path | str | None = None,
+    examples: Sequence[Path | str] | None = None,
+    examples_dir: Path | str | None = None,
+    incremental: bool = False,
+    cache_dir: Path | str | None = None,
+    max_workers: int | None = None,
+) -> RegistryReport:
+    """Validate the opcode registry and cross-reference it with ``.nem`` files.
+
+    ``examples`` lists the ``.nem`` files to scan; by default every
+    ``*.nem`` in ``examples_dir`` (the repository ``examples/`` directory).
+    Load failures are reported as ``REG000`` diagnostics rather than raised.
+    """
+    reg_path = Path(registry_path) if registry_path is not None else default_registry_path()
+    schema_file = (
+        Path(schema_path) if schema_path is not None else reg_path.with_name(SCHEMA_PATH.name)
+    )
+    reg_file = str(reg_path)
+    diags: list[Diagnostic] = []
+
+    def fatal(message: str, file: str) -> RegistryReport:
+        diags.append(
+            Diagnostic(DiagnosticSeverity.ERROR, message, SourceLocation(file, 1), code="REG000")
+        )
+        return RegistryReport(reg_file, tuple(diags), _empty_summary())
+
+    try:
+        schema_bytes = schema_file.read_bytes()
+        schema = json.loads(schema_bytes)
+    except FileNotFoundError:
+        return fatal(f"File not found: {schema_file}", str(schema_file))
+    except ValueError as e:
+        return fatal(f"Invalid JSON in {schema_file}: {e}", str(schema_file))
+
+    try:
+        doc = load_registry_document(reg_path, schema_path=schema_file, cache_dir=cache_dir)
+    except RegistryError as e:
+        return fatal(str(e), reg_file)
+    data = doc.data
+
+    # Duplicates found by the loader during the parse
+    for dup in doc.duplicates:
+        if dup.kind in ("operand", "attribute"):
+            opcode = dup.context.split(".")[1]
+            message = f"Opcode '{opcode}' declares {dup.kind} '{dup.name}' more than once"
+            code = "REG004"
+        elif dup.kind == "opcode":
+            message = f"Opcode '{dup.name}' is defined more than once; the last definition wins"
+            code = "REG009"
+        else:
+            where = f" in '{dup.context}'" if dup.context else ""
+            message = f"Duplicate key '{dup.name}'{where}"
+            code = "REG009"
+        diags.append(
+            Diagnostic(
+                DiagnosticSeverity.ERROR,
+                message,
+                SourceLocation(reg_file, dup.line, dup.column),
+                notes=[f"first defined at line {dup.first_line}, column {dup.first_column}"],
+                code=code,
+            )
+        )
+
+    # Cross-reference facts from .nem files (concurrent scan)
+    if examples is None:
+        ex_dir = Path(examples_dir) if examples_dir is not None else _default_examples_dir()
+        example_paths = sorted(ex_dir.glob("*.nem")) if ex_dir.is_dir() else []
+    else:
+        example_paths = [Path(p) for p in examples]
+    scans = scan_nem_files(example_paths, max_workers=max_workers)
+    families = frozenset(name for scan in scans for name, _, _ in scan.type_families)
+
+    ctx = _Context(reg_file, schema, families)
+    if not ctx.has_schema_validation:
+        diags.append(
+            Diagnostic(
+                DiagnosticSeverity.INFO,
+                "jsonschema not installed; schema validation skipped "
+                "(install with: pip install jsonschema)",
+                code="REG008",
+            )
+        )
+    elif ctx.top_validator is not None:
+        for err in ctx.top_validator.iter_errors(data):
+            diags.append(
+                Diagnostic(
+                    DiagnosticSeverity.ERROR,
+                    f"Schema validation error: {err.message}",
+                    SourceLocation(reg_file, 1),
+                    code="REG001",
+                )
+            )
+
+    opcodes: Mapping[str, Any] = data.get("opcodes") or {}
+    context_fp = ctx.fingerprint(schema_bytes)
+    cache_file = _cache_file(reg_path, Path(cache_dir) if cache_dir else default_cache_dir())
+    previous = _load_cache(cache_file, context_fp) if incremental else {}
+
+    summary = _empty_summary()
+    next_cache: dict[str, Any] = {}
+    rechecked: list[str] = []
+    reused = 0
+
+    # Single traversal: checks + summary per opcode
+    for name, defn in opcodes.items():
+        line = doc.positions.get(f"opcodes.{name}", (1, 1))[0]
+        fp = _opcode_fingerprint(defn)
+        cached = previous.get(name)
+        if cached is not None and cached.get("fingerprint") == fp:
+            op_diags = _decode(cached["diagnostics"], line, reg_file)
+            reused += 1
+        else:
+            op_diags = _check_opcode(name, defn, SourceLocation(reg_file, line), ctx)
+            rechecked.append(name)
+        diags.extend(op_diags)
+        if incremental:
+            next_cache[name] = {"fingerprint": fp, "diagnostics": _encode(op_diags, line)}
+
+        if isinstance(defn, dict):
+            summary["total"] += 1
+            for key, field_name in (
+                ("by_category", "category"),
+                ("by_status", "status"),
+                ("by_hardware_status", "hardware_status"),
+            ):
+                value = str(defn.get(field_name, "unknown"))
+                summary[key][value] = summary[key].get(value, 0) + 1
+
+    # Opcodes used in .nem files must exist in the registry
+    for scan in scans:
+        for opcode, line, column in scan.opcode_uses:
+            if opcode not in opcodes:
+                diags.append(
+                    Diagnostic(
+                        DiagnosticSeverity.ERROR,
+                        f"Opcode '{opcode}' used in {Path(scan.path).name} "
+                        "but missing from registry",
+                        SourceLocation(scan.path, line, column),
+                        code="REG007",
+                    )
+                )
+
+    if incremental:
+        _store_cache(cache_file, context_fp, next_cache)
+
+    summary["type_families"] = len(families)
+    return RegistryReport(
+        reg_file,
+        tuple(diags),
+        summary,
+        rechecked=tuple(rechecked),
+        reused=reused,
+        type_families=families,
+    )
+
+
+def _empty_summary() -> dict[str, Any]:
+    return {"total": 0, "by_category": {}, "by_status": {}, "by_hardware_status": {}}
+
+
+def _default_examples_dir() -> Path:
+    return SCHEMA_PATH.parents[2] / "examples"
@@ -0,0 +1,251 @@
+"""
+Event-driven YAML loader for the opcode registry.
+
+``yaml.safe_load`` silently keeps the last of two identical mapping keys, so a
+duplicated opcode definition disappears without a trace. This loader builds the
+Python objects directly from the parser's event stream (SAX-style — no node
+graph, libyaml's C parser when available) and, in the same pass:
+
+* records every duplicate mapping key, classifying duplicate opcode names;
+* records duplicate operand and attribute names within an opcode;
+* records the source position of every opcode, operand and attribute.
+
+Positions are 1-based ``(line, column)`` pairs keyed by dotted paths such as
+``"opcodes.gemm"`` or ``"opcodes.gemm.attributes.accum_type"``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+_NO_KEY = object()
+_MERGE = object()  # the "<<" merge key
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+
+Position = tuple[int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class DuplicateKey:
+    """A name that occurs more than once where it must be unique."""
+
+    kind: str  # "opcode" | "operand" | "attribute" | "key"
+    name: str
+    context: str  # dotted path of the enclosing mapping/sequence
+    line: int
+    column: int
+    first_line: int
+    first_column: int
+
+    def describe(self) -> str:
+        where = f" in '{self.context}'" if self.context else ""
+        return (
+            f"duplicate {self.kind} '{self.name}'{where} at line {self.line}, "
+            f"column {self.column} (first defined at line {self.first_line}, "
+            f"column {self.first_column})"
+        )
+
+    def to_tuple(self) -> tuple[str, str, str, int, int, int, int]:
+        return (
+            self.kind,
+            self.name,
+            self.context,
+            self.line,
+            self.column,
+            self.first_line,
+            self.first_column,
+        )
+
+
+@dataclass(frozen=True)
+class ParsedRegistry:
+    """Parsed registry plus source positions and duplicate names."""
+
+    data: dict[str, Any]
+    positions: dict[str, Position]
+    duplicates: tuple[DuplicateKey, ...] = ()
+
+
+class _Frame:
+    __slots__ = ("obj", "path", "start", "key", "key_pos", "seen", "merges")
+
+    def __init__(self, obj: Any, path: tuple[Any, ...], start: Position) -> None:
+        self.obj = obj
+        self.path = path
+        self.start = start
+        self.key: Any = _NO_KEY
+        self.key_pos: Position = (0, 0)
+        # mapping: key -> position; sequence of named entries: name -> position
+        self.seen: dict[Any, Position] = {}
+        self.merges: list[Any] = []
+
+
+def _dotted(path: tuple[Any, ...]) -> str:
+    return ".".join(str(p) for p in path)
+
+
+class _Builder:
+    """Consumes parser events and builds plain dict/list/scalar objects."""
+
+    def __init__(self, yaml: Any) -> None:
+        self._yaml = yaml
+        self._resolver = yaml.resolver.Resolver()
+        self._constructor = yaml.constructor.SafeConstructor()
+        self._constructors = yaml.constructor.SafeConstructor.yaml_constructors
+        self._stack: list[_Frame] = []
+        self._anchors: dict[str, Any] = {}
+        self.root: Any = None
+        self.positions: dict[str, Position] = {}
+        self.duplicates: list[DuplicateKey] = []
+
+    # -- event dispatch ---------------------------------------------------
+
+    def feed(self, event: Any) -> None:
+        y = self._yaml
+        if isinstance(event, y.ScalarEvent):
+            tag = self._tag(event)
+            if tag == _MERGE_TAG and self._awaiting_key():
+                self._stack[-1].key = _MERGE
+                return
+            value = self._scalar(event, tag)
+            if event.anchor:
+                self._anchors[event.anchor] = value
+            self._attach(value, event.start_mark)
+        elif isinstance(event, y.MappingStartEvent):
+            self._open({}, event)
+        elif isinstance(event, y.SequenceStartEvent):
+            self._open([], event)
+        elif isinstance(event, (y.MappingEndEvent, y.SequenceEndEvent)):
+            frame = self._stack.pop()
+            if frame.merges:
+                self._apply_merges(frame)
+            self._closed(frame)
+        elif isinstance(event, y.AliasEvent):
+            if event.anchor not in self._anchors:
+                raise y.composer.ComposerError(
+                    None, None, f"found undefined alias {event.anchor!r}", event.start_mark
+                )
+            self._attach(self._anchors[event.anchor], event.start_mark)
+
+    def _open(self, obj: Any, event: Any) -> None:
+        if event.anchor:
+            self._anchors[event.anchor] = obj
+        path = self._child_path()
+        self._attach(obj, event.start_mark)
+        start = (event.start_mark.line + 1, event.start_mark.column + 1)
+        self._stack.append(_Frame(obj, path, start))
+
+    def _child_path(self) -> tuple[Any, ...]:
+        if not self._stack:
+            return ()
+        parent = self._stack[-1]
+        if isinstance(parent.obj, dict):
+            return (*parent.path, parent.key)
+        return (*parent.path, len(parent.obj))
+
+    def _awaiting_key(self) -> bool:
+        return bool(self._stack) and (
+            isinstance(self._stack[-1].obj, dict) and self._stack[-1].key is _NO_KEY
+        )
+
+    def _tag(self, event: Any) -> str:
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = self._resolver.resolve(self._yaml.ScalarNode, event.value, event.implicit)
+        return str(tag)
+
+    def _scalar(self, event: Any, tag: str) -> Any:
+        construct = self._constructors.get(tag) or self._constructors[None]
+        node = self._yaml.ScalarNode(
+            tag, event.value, event.start_mark, event.end_mark, event.style
+        )
+        return construct(self._constructor, node)
+
+    # -- object assembly --------------------------------------------------
+
+    def _attach(self, value: Any, mark: Any) -> None:
+        pos = (mark.line + 1, mark.column + 1)
+        if not self._stack:
+            self.root = value
+            return
+        frame = self._stack[-1]
+        if isinstance(frame.obj, list):
+            frame.obj.append(value)
+            return
+        if frame.key is _NO_KEY:
+            if isinstance(value, (dict, list)):
+                raise self._yaml.constructor.ConstructorError(
+                    None, None, "found unhashable mapping key", mark
+                )
+            frame.key, frame.key_pos = value, pos
+            first = frame.seen.get(value)
+            if first is not None:
+                kind = "opcode" if frame.path == ("opcodes",) else "key"
+                self.duplicates.append(
+                    DuplicateKey(kind, str(value), _dotted(frame.path), *pos, *first)
+                )
+            else:
+                frame.seen[value] = pos
+            if frame.path == ("opcodes",) and first is None:
+                self.positions[f"opcodes.{value}"] = pos
+            return
+        if frame.key is _MERGE:
+            frame.merges.append(value)
+        else:
+            frame.obj[frame.key] = value
+        frame.key = _NO_KEY
+
+    def _apply_merges(self, frame: _Frame) -> None:
+        # Same semantics as SafeConstructor.flatten_mapping: explicit keys win,
+        # and earlier merged mappings win over later ones.
+        merged: dict[Any, Any] = {}
+        for source in frame.merges:
+            for mapping in reversed(source) if isinstance(source, list) else (source,):
+                if not isinstance(mapping, dict):
+                    raise self._yaml.constructor.ConstructorError(
+                        None, None, "expected a mapping for merging", None
+                    )
+                merged.update(mapping)
+        merged.update(frame.obj)
+        frame.obj.clear()
+        frame.obj.update(merged)
+
+    def _closed(self, frame: _Frame) -> None:
+        # Named entries of opcodes.<op>.operands / opcodes.<op>.attributes
+        path = frame.path
+        if (
+            len(path) == 4
+            and path[0] == "opcodes"
+            and path[2] in ("operands", "attributes")
+            and isinstance(frame.obj, dict)
+            and self._stack
+        ):
+            name = frame.obj.get("name")
+            if not isinstance(name, str):
+                return
+            parent = self._stack[-1]
+            pos = frame.start
+            first = parent.seen.get(name)
+            if first is not None:
+                kind = "operand" if path[2] == "operands" else "attribute"
+                self.duplicates.append(DuplicateKey(kind, name, _dotted(path[:3]), *pos, *first))
+            else:
+                parent.seen[name] = pos
+                self.positions[f"{_dotted(path[:3])}.{name}"] = pos
+
+
+def parse_registry_yaml(text: str | bytes) -> ParsedRegistry:
+    """Parse registry YAML in one pass, collecting positions and duplicates.
+
+    Raises ``yaml.YAMLError`` on malformed input and ``ImportError`` if PyYAML
+    is not installed.
+    """
+    import yaml  # type: ignore[import-untyped]
+
+    loader = getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader
+    builder = _Builder(yaml)
+    for event in yaml.parse(text, Loader=loader):
+        builder.feed(event)
+    root = builder.root if isinstance(builder.root, dict) else {}
+    return ParsedRegistry(root, builder.positions, tuple(builder.duplicates))
@@ -0,0 +1,20 @@
+"""Device configuration (Layer 3): resolved device model, inheritance and loading."""
+
+from nemlib.device.loader import (
+    DeviceConfigError,
+    DeviceLibrary,
+    load_device,
+    load_device_library,
+)
+from nemlib.device.model import DeviceConfig, FrozenDict
+from nemlib.device.resolver import resolve_device
+
+__all__ = [
+    "DeviceConfig",
+    "DeviceConfigError",
+    "DeviceLibrary",
+    "FrozenDict",
+    "load_device",
+    "load_device_library",
+    "resolve_device",
+]
@@ -0,0 +1,235 @@
+"""
+Loading device configuration files.
+
+``load_device_library`` parses a configuration file and everything it
+includes, then resolves every device declared along the way. Both stages are
+cached by content (see :mod:`nemlib.core.cache`):
+
+* ``config-ast`` — the frozen :class:`ConfigDocumentNode` of one file, keyed by
+  its path and bytes;
+* ``devices`` — the resolved :class:`DeviceLibrary`, keyed by the path and
+  digest of every file in the include closure plus the opcode registry digest
+  (effective type family sets depend on the registry).
+
+Compiling many kernels against the same device therefore parses and resolves
+it once per process (and once per machine while the files are unchanged). An
+in-process stat table (mtime, size) also spares re-reading unchanged files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from nemlib.core.cache import ContentCache, content_key
+from nemlib.core.opcodes import default_registry_path, registry_digest
+from nemlib.device.model import DeviceConfig, FrozenDict
+from nemlib.device.resolver import clear_resolver_cache, resolve_device
+from nemlib.diagnostics import Diagnostic, DiagnosticCollector, SourceLocation
+from nemlib.parser.ast_nodes import ConfigDocumentNode, TypeFamilyDeclNode
+from nemlib.parser.parser import parse_config
+
+_AST_CACHE: ContentCache[ConfigDocumentNode] = ContentCache("config-ast", max_entries=256)
+_LIBRARY_CACHE: ContentCache[DeviceLibrary] = ContentCache("devices", max_entries=32)
+
+# path -> (st_mtime_ns, st_size, content digest)
+_STAT_TABLE: dict[Path, tuple[int, int, str]] = {}
+
+
+class DeviceConfigError(Exception):
+    """A device configuration could not be loaded; ``diagnostics`` has the details."""
+
+    def __init__(self, message: str, diagnostics: list[Diagnostic] | None = None) -> None:
+        super().__init__(message)
+        self.diagnostics = diagnostics or []
+
+
+@dataclass(frozen=True)
+class DeviceLibrary:
+    """All devices and type families reachable from one configuration file."""
+
+    root: str
+    files: tuple[str, ...]  # include closure, dependencies first
+    devices: FrozenDict[str, DeviceConfig]  # in declaration order
+    type_families: FrozenDict[str, TypeFamilyDeclNode]
+    diagnostics: tuple[Diagnostic, ...] = ()  # warnings
+
+    @property
+    def default_device(self) -> DeviceConfig | None:
+        """The last device declared in the root file, if any."""
+        for device in reversed(tuple(self.devices.values())):
+            if device.location is None or device.location.file == self.root:
+                return device
+        return None
+
+
+def cache_stats() -> dict[str, object]:
+    """Hit/miss counters of the AST and device caches."""
+    return {"config-ast": _AST_CACHE.stats, "devices": _LIBRARY_CACHE.stats}
+
+
+def clear_caches(*, disk: bool = False) -> None:
+    """Drop the in-process caches (and, with ``disk=True``, the on-disk ones)."""
+    _STAT_TABLE.clear()
+    clear_resolver_cache()
+    for cache in (_AST_CACHE, _LIBRARY_CACHE):
+        cache.clear_memory()
+        if disk:
+            for path in cache.directory.glob("*.pickle"):
+                path.unlink(missing_ok=True)
+
+
+def parse_config_file(path: str | Path, diag: DiagnosticCollector) -> ConfigDocumentNode:
+    """Parse one configuration file (without following includes), cached."""
+    return _parse_file(Path(path).resolve(), diag)
+
+
+def _parse_file(path: Path, diag: DiagnosticCollector) -> ConfigDocumentNode:
+    digest, source = _read(path)
+    key = content_key("config-ast", str(path), digest)
+    doc = _AST_CACHE.get(key)
+    if doc is not None:
+        return doc
+    if source is None:
+        source = path.read_bytes()
+    local = DiagnosticCollector()
+    doc, _ = parse_config(source.decode("utf-8"), str(path), local)
+    diag.extend(local.get_all())
+    if not len(local):
+        _AST_CACHE.put(key, doc)
+    return doc
+
+
+def load_device_library(path: str | Path) -> DeviceLibrary:
+    """Load a configuration file with its includes and resolve all devices.
+
+    Raises :class:`DeviceConfigError` if any file fails to read, parse or
+    resolve. Warnings are kept in :attr:`DeviceLibrary.diagnostics`.
+    """
+    root = Path(path).resolve()
+    diag = DiagnosticCollector()
+    docs: list[ConfigDocumentNode] = []
+    _collect(root, diag, docs, stack=[], done=set(), loc=None)
+    if diag.has_errors():
+        raise DeviceConfigError(f"failed to load device configuration {root}", diag.get_all())
+
+    key = content_key(
+        "devices",
+        _registry_digest(),
+        *(f"{doc.file}\0{_STAT_TABLE[Path(doc.file)][2]}" for doc in docs),
+    )
+    library = _LIBRARY_CACHE.get(key)
+    if library is None:
+        library = _resolve(root, docs, diag)
+        if diag.has_errors():
+            raise DeviceConfigError(
+                f"failed to resolve device configuration {root}", diag.get_all()
+            )
+        _LIBRARY_CACHE.put(key, library)
+    return library
+
+
+def load_device(path: str | Path, name: str | None = None) -> DeviceConfig:
+    """Load a concrete device; ``name`` defaults to the root file's last device."""
+    library = load_device_library(path)
+    device = library.devices.get(name) if name is not None else library.default_device
+    if device is None:
+        what = f"device '{name}'" if name is not None else "a device"
+        raise DeviceConfigError(f"{library.root} does not declare {what}")
+    if device.is_abstract:
+        raise DeviceConfigError(
+            f"device '{device.name}' is abstract (no topology) and cannot be targeted"
+        )
+    return device
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=1)
+def _registry_digest() -> str:
+    # Matches get_registry(), which is also loaded once per process
+    return registry_digest(default_registry_path())
+
+
+def _read(path: Path) -> tuple[str, bytes | None]:
+    """Digest of ``path``; the bytes are returned only if the file was read."""
+    st = os.stat(path)
+    known = _STAT_TABLE.get(path)
+    if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+        return known[2], None
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    _STAT_TABLE[path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest, data
+
+
+def _collect(
+    path: Path,
+    diag: DiagnosticCollector,
+    docs: list[ConfigDocumentNode],
+    stack: list[Path],
+    done: set[Path],
+    loc: SourceLocation | None,
+) -> None:
+    """Depth-first walk of the include graph; ``docs`` ends up dependencies-first."""
+    if path in stack:
+        cycle = " -> ".join(str(p) for p in [*stack[stack.index(path) :], path])
+        diag.error(f"circular include: {cycle}", loc)
+        return
+    if path in done:
+        return
+    try:
+        doc = _parse_file(path, diag)
+    except OSError as e:
+        diag.error(f"cannot read {path}: {e.strerror or e}", loc)
+        return
+    stack.append(path)
+    for inc in doc.includes:
+        _collect((path.parent / inc.path).resolve(), diag, docs, stack, done, inc.location)
+    stack.pop()
+    done.add(path)
+    docs.append(doc)
+
+
+def _resolve(
+    root: Path, docs: list[ConfigDocumentNode], diag: DiagnosticCollector
+) -> DeviceLibrary:
+    start = len(diag)
+    devices: dict[str, DeviceConfig] = {}
+    families: dict[str, TypeFamilyDeclNode] = {}
+    for doc in docs:
+        for family in doc.type_families:
+            if family.family_id in families:
+                first = families[family.family_id].location
+                diag.error(
+                    f"duplicate type family '{family.family_id}'"
+                    + (f" (first declared at {first})" if first else ""),
+                    family.location,
+                )
+                continue
+            families[family.family_id] = family
+        for node in doc.devices:
+            if node.name in devices:
+                first = devices[node.name].location
+                diag.error(
+                    f"duplicate device '{node.name}'"
+                    + (f" (first declared at {first})" if first else ""),
+                    node.location,
+                )
+                continue
+            device = resolve_device(node, devices, diag)
+            if device is not None:
+                devices[node.name] = device
+    return DeviceLibrary(
+        root=str(root),
+        files=tuple(doc.file for doc in docs),
+        devices=FrozenDict(devices),
+        type_families=FrozenDict(families),
+        diagnostics=tuple(diag.get_all()[start:]),
+    )
@@ -0,0 +1,109 @@
+"""
+Resolved device configuration.
+
+A :class:`DeviceConfig` is the result of resolving a ``device`` declaration
+(including its ``extends`` chain). It is immutable and hashable: mapping-valued
+fields are :class:`FrozenDict` instances, so resolved devices can be cached,
+shared and used as cache keys themselves.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any, TypeVar, overload
+
+from nemlib.diagnostics import SourceLocation
+
+K = TypeVar("K")
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class FrozenDict(Mapping[K, V]):
+    """An immutable, hashable, picklable mapping."""
+
+    __slots__ = ("_data", "_hash")
+
+    def __init__(self, items: Mapping[K, V] | Iterable[tuple[K, V]] = ()) -> None:
+        self._data: dict[K, V] = dict(items)
+        self._hash: int | None = None
+
+    def __getitem__(self, key: K) -> V:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # Direct dict lookups (the Mapping defaults go through __getitem__ and KeyError)
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    @overload
+    def get(self, key: K) -> V | None: ...
+    @overload
+    def get(self, key: K, default: V | T) -> V | T: ...
+    def get(self, key: K, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._data.items()))
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenDict):
+            return self._data == other._data
+        return self._data == other
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({self._data!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (FrozenDict, (self._data,))
+
+
+def split_variant_ref(ref: str) -> tuple[str, tuple[str, ...], str]:
+    """``"gemm.float<f16, f32>.no_bias"`` -> ``("gemm.float", ("f16", "f32"), "no_bias")``."""
+    head, _, variant = ref.rpartition(".")
+    if "<" in head:
+        family, _, inst = head.partition("<")
+        return family, tuple(t.strip() for t in inst.rstrip(">").split(",")), variant
+    return head, (), variant
+
+
+@dataclass(frozen=True)
+class DeviceConfig:
+    name: str
+    spec_version: str | None
+    parent: str | None  # parent device name (from extends), or None
+    num_engines: int | None  # None for an abstract device (no topology)
+    per_engine: FrozenDict[str, int]  # {"NMU": 1, "CSTL": 2, "DMA": 2}
+    device_units: FrozenDict[str, int]  # {"sDMA": 1, "WDM": 0}
+    unit_characteristics: FrozenDict[str, FrozenDict[str, int]]
+    l1_size_bytes: int | None
+    l2_size_bytes: int | None
+    mandatory_variants: frozenset[str]  # {"gemm.float<f16>.no_bias", ...}
+    extended_variants: frozenset[str]
+    # opcode -> legal variants (mandatory | extended) of the opcode's type families
+    effective_types: FrozenDict[str, frozenset[str]] = FrozenDict()
+    location: SourceLocation | None = None
+
+    @property
+    def is_abstract(self) -> bool:
+        """True if the device has no topology (only usable as a parent)."""
+        return self.num_engines is None
+
+    def effective_set(self, opcode: str) -> frozenset[str]:
+        """The effective type family set of ``opcode`` (empty if it has none)."""
+        return self.effective_types.get(opcode, _NONE)
+
+    def supports(self, opcode: str, variant: str) -> bool:
+        """True if ``variant`` (e.g. ``"gemm.float<f16>.no_bias"``) is legal for ``opcode``."""
+        return variant in self.effective_types.get(opcode, _NONE)
+
+
+_NONE: frozenset[str] = frozenset()
@@ -0,0 +1,186 @@
+"""
+Device inheritance resolution (spec: Device Inheritance).
+
+``resolve_device`` turns a :class:`DeviceConfigNode` into a :class:`DeviceConfig`
+given the already resolved devices it may extend:
+
+* every parent field is inherited; a derived device must not set ``spec_version``;
+* ``topology`` replaces the parent's topology as a whole;
+* ``unit_characteristics`` are merged per unit type, child keys win;
+* ``opcode.mandatory`` and ``opcode.extended`` are unions with the parent's.
+
+Resolution is memoized on ``(node, resolved parent, registry)``: all three are
+immutable and hashable, so a parent shared by several devices (or by several
+libraries that include the same catalog) is resolved once per process. The
+effective type family sets (spec: Effective Type Family Set) are computed
+here, once, into :attr:`DeviceConfig.effective_types`; a child extends its
+parent's index with its own variants only.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+
+from nemlib.core.expressions import ExpressionError, evaluate_int
+from nemlib.core.opcodes import OpcodeRegistry, get_registry
+from nemlib.device.model import DeviceConfig, FrozenDict, split_variant_ref
+from nemlib.diagnostics import Diagnostic, DiagnosticCollector
+from nemlib.parser.ast_nodes import DeviceConfigNode, TopologyNode
+
+
+def resolve_device(
+    node: DeviceConfigNode,
+    parent_devices: Mapping[str, DeviceConfig],
+    diag: DiagnosticCollector,
+    registry: OpcodeRegistry | None = None,
+) -> DeviceConfig | None:
+    """Resolve ``node`` against its parent; returns ``None`` on errors."""
+    parent: DeviceConfig | None = None
+    if node.parent is not None:
+        parent = parent_devices.get(node.parent)
+        if parent is None:
+            diag.error(
+                f"device '{node.name}' extends unknown device '{node.parent}' "
+                "(parents must be defined earlier or included)",
+                node.location,
+            )
+            return None
+    device, diagnostics = _resolve(node, parent, registry or get_registry())
+    diag.extend(diagnostics)
+    return device
+
+
+def clear_resolver_cache() -> None:
+    _resolve.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def _resolve(
+    node: DeviceConfigNode, parent: DeviceConfig | None, registry: OpcodeRegistry
+) -> tuple[DeviceConfig | None, tuple[Diagnostic, ...]]:
+    diag = DiagnosticCollector()
+    loc = node.location
+    if parent is not None:
+        if node.spec_version is not None:
+            diag.error(
+                f"derived device '{node.name}' must not specify spec_version "
+                f"(inherited from '{parent.name}')",
+                loc,
+            )
+    elif node.spec_version is None:
+        diag.error(f"device '{node.name}' is missing spec_version", loc)
+
+    spec_version = parent.spec_version if parent is not None else node.spec_version
+
+    # Topology: replaced as a whole
+    num_engines: int | None
+    l1: int | None
+    l2: int | None
+    if node.topology is not None:
+        topology = _topology(node.name, node.topology, diag)
+        if topology is None:
+            return None, tuple(diag.get_all())
+        num_engines, per_engine, device_units, l1, l2 = topology
+    elif parent is not None:
+        num_engines = parent.num_engines
+        per_engine, device_units = parent.per_engine, parent.device_units
+        l1, l2 = parent.l1_size_bytes, parent.l2_size_bytes
+    else:
+        num_engines, l1, l2 = None, None, None
+        per_engine, device_units = FrozenDict(), FrozenDict()
+
+    # unit_characteristics: merged per unit type
+    chars: dict[str, dict[str, int]] = {}
+    if parent is not None:
+        chars = {unit: dict(entries) for unit, entries in parent.unit_characteristics.items()}
+    for group in node.unit_characteristics or ():
+        merged = chars.setdefault(group.unit, {})
+        for entry in group.entries:
+            merged[entry.key] = entry.value
+
+    # Opcode variant sets: additive
+    own = {str(ref) for ref in (*(node.mandatory or ()), *(node.extended or ()))}
+    mandatory = {str(ref) for ref in node.mandatory or ()}
+    extended = {str(ref) for ref in node.extended or ()}
+    if parent is not None:
+        mandatory |= parent.mandatory_variants
+        extended |= parent.extended_variants
+        own -= parent.mandatory_variants | parent.extended_variants
+    for ref in sorted(mandatory & extended):
+        diag.warning(
+            f"device '{node.name}': variant '{ref}' is listed in both opcode.mandatory and "
+            "opcode.extended; the opcode.extended entry is ignored",
+            loc,
+        )
+    extended -= mandatory
+
+    if diag.has_errors():
+        return None, tuple(diag.get_all())
+
+    base = parent.effective_types if parent is not None else FrozenDict()
+    device = DeviceConfig(
+        name=node.name,
+        spec_version=spec_version,
+        parent=node.parent,
+        num_engines=num_engines,
+        per_engine=per_engine,
+        device_units=device_units,
+        unit_characteristics=FrozenDict(
+            (unit, FrozenDict(entries)) for unit, entries in chars.items()
+        ),
+        l1_size_bytes=l1,
+        l2_size_bytes=l2,
+        mandatory_variants=frozenset(mandatory),
+        extended_variants=frozenset(extended),
+        effective_types=_effective_types(base, own, registry),
+        location=loc,
+    )
+    return device, tuple(diag.get_all())
+
+
+def _effective_types(
+    base: Mapping[str, frozenset[str]], variants: Iterable[str], registry: OpcodeRegistry
+) -> FrozenDict[str, frozenset[str]]:
+    """``base`` extended with ``variants``, each filed under every opcode that
+    lists the variant's type family in the registry."""
+    added: dict[str, set[str]] = {}
+    for ref in variants:
+        for info in registry.by_type_family(split_variant_ref(ref)[0]):
+            added.setdefault(info.name, set()).add(ref)
+    if not added and isinstance(base, FrozenDict):
+        return base
+    index = dict(base)
+    for opcode, refs in added.items():
+        index[opcode] = index.get(opcode, frozenset()) | refs
+    return FrozenDict(index)
+
+
+def _topology(
+    name: str, topo: TopologyNode, diag: DiagnosticCollector
+) -> tuple[int, FrozenDict[str, int], FrozenDict[str, int], int, int] | None:
+    ok = True
+    try:
+        l1 = evaluate_int(topo.l1_size_bytes)
+        l2 = evaluate_int(topo.l2_size_bytes)
+    except ExpressionError as e:
+        diag.error(f"device '{name}': {e.message}", e.location or topo.location)
+        return None
+    if topo.num_engines < 1:
+        diag.error(f"device '{name}': num_engines must be >= 1", topo.location)
+        ok = False
+    for size_name, size in (("l1_size_bytes", l1), ("l2_size_bytes", l2)):
+        if size <= 0:
+            diag.error(f"device '{name}': {size_name} must be > 0", topo.location)
+            ok = False
+    for unit in topo.per_engine:
+        if unit.count < 1:
+            diag.error(
+                f"device '{name}': per_engine count for {unit.unit} must be >= 1", unit.location
+            )
+            ok = False
+    if not ok:
+        return None
+    per_engine = FrozenDict((u.unit, u.count) for u in topo.per_engine)
+    device_units = FrozenDict((u.unit, u.count) for u in topo.device_units)
+    return topo.num_engines, per_engine, device_units, l1, l2
@@ -0,0 +1,15 @@
+"""Diagnostics (Layer 0): source locations, severities, diagnostics, collection."""
+
+from nemlib.diagnostics.collector import DiagnosticCollector
+from nemlib.diagnostics.diagnostic import Diagnostic
+from nemlib.diagnostics.location import SourceLocation
+from nemlib.diagnostics.sarif import to_sarif
+from nemlib.diagnostics.severity import DiagnosticSeverity
+
+__all__ = [
+    "Diagnostic",
+    "DiagnosticCollector",
+    "DiagnosticSeverity",
+    "SourceLocation",
+    "to_sarif",
+]
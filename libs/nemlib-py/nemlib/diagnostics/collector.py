@@ -0,0 +1,47 @@
+"""DiagnosticCollector — accumulates diagnostics during parsing/validation."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from nemlib.diagnostics.diagnostic import Diagnostic
+from nemlib.diagnostics.location import SourceLocation
+from nemlib.diagnostics.severity import DiagnosticSeverity
+
+
+class DiagnosticCollector:
+    """Accumulates diagnostics in the order they are reported."""
+
+    def __init__(self) -> None:
+        self._diagnostics: list[Diagnostic] = []
+
+    def add(self, diagnostic: Diagnostic) -> None:
+        self._diagnostics.append(diagnostic)
+
+    def extend(self, diagnostics: Iterable[Diagnostic]) -> None:
+        self._diagnostics.extend(diagnostics)
+
+    def error(
+        self, msg: str, loc: SourceLocation | None = None, *, code: str | None = None
+    ) -> None:
+        self.add(Diagnostic(DiagnosticSeverity.ERROR, msg, loc, code=code))
+
+    def warning(
+        self, msg: str, loc: SourceLocation | None = None, *, code: str | None = None
+    ) -> None:
+        self.add(Diagnostic(DiagnosticSeverity.WARNING, msg, loc, code=code))
+
+    def info(self, msg: str, loc: SourceLocation | None = None, *, code: str | None = None) -> None:
+        self.add(Diagnostic(DiagnosticSeverity.INFO, msg, loc, code=code))
+
+    def has_errors(self) -> bool:
+        return any(d.severity is DiagnosticSeverity.ERROR for d in self._diagnostics)
+
+    def get_all(self) -> list[Diagnostic]:
+        return list(self._diagnostics)
+
+    def format_all(self) -> str:
+        return "\n".join(d.format() for d in self._diagnostics)
+
+    def __len__(self) -> int:
+        return len(self._diagnostics)
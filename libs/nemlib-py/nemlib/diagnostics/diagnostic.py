@@ -0,0 +1,62 @@
+"""The Diagnostic record shared by all nemlib layers."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from nemlib.diagnostics.location import SourceLocation
+from nemlib.diagnostics.severity import DiagnosticSeverity
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """A single error, warning or informational message.
+
+    ``code`` is an optional stable rule identifier (e.g. ``"REG002"``) used by
+    machine-readable outputs such as SARIF.
+    """
+
+    severity: DiagnosticSeverity
+    message: str
+    location: SourceLocation | None = None
+    notes: list[str] = field(default_factory=list)
+    code: str | None = None
+
+    def format(self) -> str:
+        prefix = f"{self.location}: " if self.location is not None else ""
+        code = f" [{self.code}]" if self.code else ""
+        lines = [f"{prefix}{self.severity.value}{code}: {self.message}"]
+        lines.extend(f"  note: {note}" for note in self.notes)
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable representation."""
+        loc = self.location
+        return {
+            "severity": self.severity.value,
+            "code": self.code,
+            "message": self.message,
+            "location": None
+            if loc is None
+            else {
+                "file": loc.file,
+                "line": loc.line,
+                "column": loc.column,
+                "end_line": loc.end_line,
+                "end_column": loc.end_column,
+            },
+            "notes": list(self.notes),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Diagnostic:
+        """Inverse of :meth:`to_dict`."""
+        loc = data.get("location")
+        return cls(
+            severity=DiagnosticSeverity(data["severity"]),
+            message=data["message"],
+            location=None if loc is None else SourceLocation(**loc),
+            notes=list(data.get("notes", [])),
+            code=data.get("code"),
+        )
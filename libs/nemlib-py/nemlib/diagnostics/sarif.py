@@ -0,0 +1,79 @@
+"""SARIF 2.1.0 export for diagnostics (consumed by editors and CI annotators)."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from nemlib.diagnostics.diagnostic import Diagnostic
+from nemlib.diagnostics.severity import DiagnosticSeverity
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+_LEVELS = {
+    DiagnosticSeverity.ERROR: "error",
+    DiagnosticSeverity.WARNING: "warning",
+    DiagnosticSeverity.INFO: "note",
+}
+
+
+def to_sarif(
+    diagnostics: Iterable[Diagnostic],
+    *,
+    tool_name: str,
+    tool_version: str | None = None,
+    rules: Mapping[str, str] | None = None,
+) -> dict[str, Any]:
+    """Render diagnostics as a single-run SARIF log.
+
+    ``rules`` maps rule codes to short descriptions; codes used by diagnostics
+    but missing from ``rules`` are still listed.
+    """
+    results = []
+    used_codes: list[str] = []
+    for d in diagnostics:
+        result: dict[str, Any] = {
+            "level": _LEVELS[d.severity],
+            "message": {"text": d.message},
+        }
+        if d.code:
+            result["ruleId"] = d.code
+            if d.code not in used_codes:
+                used_codes.append(d.code)
+        if d.location is not None:
+            region: dict[str, int] = {
+                "startLine": d.location.line,
+                "startColumn": d.location.column,
+            }
+            if d.location.end_line is not None:
+                region["endLine"] = d.location.end_line
+            if d.location.end_column is not None:
+                region["endColumn"] = d.location.end_column
+            result["locations"] = [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": Path(d.location.file).as_posix()},
+                        "region": region,
+                    }
+                }
+            ]
+        results.append(result)
+
+    descriptions = dict(rules or {})
+    codes = list(descriptions) + [c for c in used_codes if c not in descriptions]
+    driver: dict[str, Any] = {
+        "name": tool_name,
+        "rules": [
+            {"id": code, "shortDescription": {"text": descriptions.get(code, code)}}
+            for code in codes
+        ],
+    }
+    if tool_version is not None:
+        driver["version"] = tool_version
+
+    return {
+        "$schema": SARIF_SCHEMA,
+        "version": "2.1.0",
+        "runs": [{"tool": {"driver": driver}, "results": results}],
+    }
@@ -0,0 +1,11 @@
+"""Diagnostic severity levels."""
+
+from __future__ import annotations
+
+from enum import Enum
+
+
+class DiagnosticSeverity(Enum):
+    ERROR = "error"
+    WARNING = "warning"
+    INFO = "info"
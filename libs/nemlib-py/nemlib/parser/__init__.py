@@ -0,0 +1,26 @@
+"""Parser (Layer 2): tokens, lexer, AST and the program and configuration parsers."""
+
+from nemlib.parser.errors import LexError, NemSyntaxError
+from nemlib.parser.lexer import lex, tokenize
+from nemlib.parser.parser import (
+    parse,
+    parse_config,
+    parse_config_document,
+    parse_expr,
+    parse_program,
+)
+from nemlib.parser.tokens import Token, TokenKind
+
+__all__ = [
+    "LexError",
+    "NemSyntaxError",
+    "Token",
+    "TokenKind",
+    "lex",
+    "parse",
+    "parse_config",
+    "parse_config_document",
+    "parse_expr",
+    "parse_program",
+    "tokenize",
+]
@@ -0,0 +1,338 @@
+"""
+AST node definitions.
+
+All nodes are frozen dataclasses whose collections are tuples, so an AST is
+immutable, hashable and safe to share between tool stages and caches. Tools
+that need to annotate the AST keep a side table instead of mutating nodes.
+
+Two document kinds share the grammar: configuration documents (includes,
+device configurations, type family declarations) and programs (declarations,
+tasks and loops). Expressions are the ``nemlib.core.expressions`` nodes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from nemlib.core.expressions import ExprNode
+from nemlib.diagnostics import SourceLocation
+
+# ---------------------------------------------------------------------------
+# Documents
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class IncludeDeclNode:
+    path: str  # as written; resolved relative to the including file
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigDocumentNode:
+    """A configuration document: includes, type families and devices, in order."""
+
+    includes: tuple[IncludeDeclNode, ...]
+    type_families: tuple[TypeFamilyDeclNode, ...]
+    devices: tuple[DeviceConfigNode, ...]
+    file: str = "<string>"
+
+
+# ---------------------------------------------------------------------------
+# Device configuration
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class UnitDeclNode:
+    unit: str  # "NMU", "CSTL", "DMA", "VPU", "SEQ", "sDMA", "WDM"
+    count: int
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class TopologyNode:
+    num_engines: int
+    l2_size_bytes: ExprNode
+    per_engine: tuple[UnitDeclNode, ...]
+    l1_size_bytes: ExprNode
+    device_units: tuple[UnitDeclNode, ...] = ()
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CharDeclNode:
+    key: str
+    value: int
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class UnitCharacteristicsNode:
+    """One ``<unit> { key = INT ... }`` group of ``unit_characteristics``."""
+
+    unit: str
+    entries: tuple[CharDeclNode, ...]
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class VariantRefNode:
+    """``family_id type_instantiation? "." variant`` — e.g. ``gemm.float<f16>.no_bias``."""
+
+    family: str
+    instantiation: tuple[str, ...]
+    variant: str
+    location: SourceLocation | None = None
+
+    def __str__(self) -> str:
+        inst = f"<{', '.join(self.instantiation)}>" if self.instantiation else ""
+        return f"{self.family}{inst}.{self.variant}"
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceConfigNode:
+    """``device ID (extends ID)? { ... }``. Absent blocks are ``None``."""
+
+    name: str
+    parent: str | None
+    spec_version: str | None
+    topology: TopologyNode | None
+    unit_characteristics: tuple[UnitCharacteristicsNode, ...] | None
+    mandatory: tuple[VariantRefNode, ...] | None
+    extended: tuple[VariantRefNode, ...] | None
+    location: SourceLocation | None = None
+
+
+# ---------------------------------------------------------------------------
+# Type families
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class TypeParamNode:
+    """``T: {f16, bf16, f32}``."""
+
+    name: str
+    allowed: tuple[str, ...]
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class OperandBindingNode:
+    """``X: T`` / ``B: absent`` / ``A: i8``."""
+
+    operand: str
+    type_expr: str
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class AttributeBindingNode:
+    """``accum = f32`` / ``quant = required`` / ``quant = required on dst``."""
+
+    name: str
+    value: str
+    target: str | None = None  # operand named by an ``on`` qualifier
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ConformanceEntryNode:
+    """``MUST <f16>`` / ``MAY <i8, f32>`` / ``MUST`` (non-parameterized family)."""
+
+    conformance: str  # "MUST" | "MAY"
+    instantiation: tuple[str, ...]
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class VariantDeclNode:
+    name: str
+    operands: tuple[OperandBindingNode, ...]
+    conformance: tuple[ConformanceEntryNode, ...]
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class TypeFamilyDeclNode:
+    family_id: str  # "gemm.float", "eltwise"
+    type_params: tuple[TypeParamNode, ...]
+    operands: tuple[OperandBindingNode, ...]
+    attributes: tuple[AttributeBindingNode, ...]
+    variants: tuple[VariantDeclNode, ...]
+    location: SourceLocation | None = None
+
+
+# ---------------------------------------------------------------------------
+# Programs
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class StringNode:
+    value: str
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ListNode:
+    """``[value, ...]``."""
+
+    items: tuple[ValueNode, ...]
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class UnitRefNode:
+    """``NMU[0]`` — the argument of ``@resource``."""
+
+    unit: str
+    index: ExprNode
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class DecoratorNode:
+    name: str  # without the "@"
+    args: tuple[ValueNode | UnitRefNode, ...] = ()
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class QuantDescNode:
+    """``per_tensor(scale=..., zero_point=...)`` and the per-channel/per-group forms."""
+
+    kind: str  # "per_tensor" | "per_channel" | "per_group"
+    params: tuple[tuple[str, ValueNode], ...]
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class RegionExprNode:
+    """``region(buffer, offset, extent)`` with optional type attributes."""
+
+    buffer: str
+    offset: ExprNode
+    extent: ExprNode
+    elem: str | None = None
+    shape: tuple[ExprNode, ...] | None = None
+    layout: str | None = None
+    strides: tuple[ExprNode, ...] | None = None
+    quant: QuantDescNode | None = None
+    location: SourceLocation | None = None
+
+
+ValueNode = ExprNode | StringNode | ListNode | RegionExprNode
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceDeclNode:
+    """``device "file.cfg"``, ``device name`` or an inline device configuration."""
+
+    path: str | None = None
+    name: str | None = None
+    config: DeviceConfigNode | None = None
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ConstDeclNode:
+    name: str
+    value: ExprNode
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BufferDeclNode:
+    name: str
+    mem_level: str  # "DDR" | "L2" | "L1"
+    l1_index: ExprNode | None  # ``L1[expr]``; None for DDR/L2 and bare ``L1``
+    size: ExprNode | None
+    align: int | None
+    decorators: tuple[DecoratorNode, ...] = ()
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class RegionDeclNode:
+    """``X = region(...)`` or ``let X = region(...)``."""
+
+    name: str
+    region: RegionExprNode
+    decorators: tuple[DecoratorNode, ...] = ()
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class LetDeclNode:
+    """``let X = value`` for values other than regions."""
+
+    name: str
+    value: ValueNode
+    decorators: tuple[DecoratorNode, ...] = ()
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class OperandNode:
+    """A task operand: a region name or an inline region expression."""
+
+    name: str | None
+    region: RegionExprNode | None = None
+    decorators: tuple[DecoratorNode, ...] = ()
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class TaskNode:
+    """A transfer, store or compute task.
+
+    Transfers and stores have ``inputs == (src,)`` and ``outputs == (dst,)``.
+    """
+
+    token: str | None
+    kind: str  # "transfer" | "store" | "compute"
+    opcode: str  # "transfer", "store" or the compute opcode
+    mode: str  # "async" | "sync"
+    inputs: tuple[OperandNode, ...]
+    outputs: tuple[OperandNode, ...]
+    deps: tuple[str, ...] = ()
+    attributes: tuple[tuple[str, ValueNode], ...] = ()
+    decorators: tuple[DecoratorNode, ...] = ()
+    location: SourceLocation | None = None
+
+    @property
+    def task_type(self) -> str:
+        return f"{self.opcode}.{self.mode}"
+
+
+@dataclass(frozen=True, slots=True)
+class WaitNode:
+    tokens: tuple[str, ...]
+    decorators: tuple[DecoratorNode, ...] = ()
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class LoopNode:
+    var: str
+    start: ExprNode
+    end: ExprNode
+    decorators: tuple[DecoratorNode, ...]
+    body: tuple[StmtNode, ...]
+    location: SourceLocation | None = None
+
+
+StmtNode = (
+    ConstDeclNode | BufferDeclNode | RegionDeclNode | LetDeclNode | TaskNode | WaitNode | LoopNode
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ProgramNode:
+    name: str | None
+    device: DeviceDeclNode | None
+    statements: tuple[StmtNode, ...]
+    includes: tuple[IncludeDeclNode, ...] = ()
+    file: str = "<string>"
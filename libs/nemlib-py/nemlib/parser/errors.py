@@ -0,0 +1,21 @@
+"""Syntax errors raised by the lexer and parser."""
+
+from __future__ import annotations
+
+from nemlib.diagnostics import Diagnostic, DiagnosticSeverity, SourceLocation
+
+
+class NemSyntaxError(Exception):
+    """A syntax error at a source location."""
+
+    def __init__(self, message: str, location: SourceLocation) -> None:
+        super().__init__(f"{location}: {message}")
+        self.message = message
+        self.location = location
+
+    def to_diagnostic(self) -> Diagnostic:
+        return Diagnostic(DiagnosticSeverity.ERROR, self.message, self.location)
+
+
+class LexError(NemSyntaxError):
+    """Invalid character or malformed literal in NEM source."""
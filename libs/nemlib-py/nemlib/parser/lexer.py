@@ -0,0 +1,104 @@
+"""
+NEM lexer: source text -> token stream.
+
+Tokenizes programs, device configurations and type family catalogs (they share
+one document grammar). The whole lexical grammar is a single compiled master
+regex whose alternatives are numbered groups; ``finditer`` walks the source
+once and each match is classified by ``Match.lastindex`` through a small table,
+so no per-token regex dispatch or substring copies are needed. Blanks before a
+token are absorbed into that token's match; line breaks and ``#`` comments
+(including runs spanning many lines) are consumed as one match, and so are
+blanks at the end of the source.
+
+:func:`tokenize` yields tokens lazily; :func:`lex` returns them as a list.
+Every stream ends with an ``EOF`` token.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+
+from nemlib.diagnostics import SourceLocation
+from nemlib.parser.errors import LexError
+from nemlib.parser.tokens import KEYWORDS, PUNCTUATION, Token, TokenKind
+
+# Group numbers of the master pattern (order matters: first match wins)
+_SKIP, _COMPOUND, _WORD, _FLOAT, _INT, _STRING, _DOTDOT, _PUNCT, _ERROR = range(1, 10)
+
+_MASTER = re.compile(
+    r"""
+    [ \t]*                                                        # leading blanks
+  (?:
+    ((?:[\r\f\n]|\#[^\n]*)(?:[ \t\r\f\n]|\#[^\n]*)*|\Z)          # 1 line breaks, comments, end
+  | ((?:transfer|store)\.(?:async|sync)\b|opcode\.(?:mandatory|extended)\b)  # 2
+  | ([A-Za-z_][A-Za-z0-9_]*)                                      # 3 identifier / keyword
+  | ([0-9]+\.[0-9]+(?:[eE][+-]?[0-9]+)?)                          # 4 float
+  | ([0-9]+)                                                      # 5 integer
+  | ("(?:[^"\\\n]|\\.)*")                                         # 6 string
+  | (\.\.)                                                        # 7
+  | ([-+*/=.@()\[\]{}<>,:;])                                      # 8 punctuation
+  | (.)                                                           # 9 anything else
+  )
+    """,
+    re.VERBOSE,
+)
+
+_FIXED_KIND: dict[int, TokenKind] = {
+    _FLOAT: TokenKind.FLOAT,
+    _INT: TokenKind.INT,
+    _STRING: TokenKind.STRING,
+    _DOTDOT: TokenKind.DOTDOT,
+}
+
+
+def tokenize(source: str, filename: str = "<string>") -> Iterator[Token]:
+    """Yield the tokens of ``source`` lazily, ending with ``EOF``.
+
+    Raises :class:`~nemlib.parser.errors.LexError` at the first invalid
+    character or unterminated string.
+    """
+    line = 1
+    line_start = 0
+    ident = TokenKind.ID
+    keywords = KEYWORDS
+    punctuation = PUNCTUATION
+    fixed = _FIXED_KIND
+
+    for m in _MASTER.finditer(source):
+        group = m.lastindex
+        start = m.start(group)  # type: ignore[arg-type]
+        end = m.end()
+        if group == _SKIP:
+            newlines = source.count("\n", start, end)
+            if newlines:
+                line += newlines
+                line_start = source.rindex("\n", start, end) + 1
+            continue
+        if group == _WORD:
+            kind = keywords.get(m[group], ident)
+        elif group == _PUNCT:
+            kind = punctuation[source[start]]
+        elif group == _COMPOUND:
+            kind = keywords[m[group]]
+        elif group == _ERROR:
+            raise _error(source, start, line, start - line_start + 1, filename)
+        else:
+            kind = fixed[group]  # type: ignore[index]
+        yield Token(kind, start, end, line, start - line_start + 1, source, filename)
+
+    end = len(source)
+    yield Token(TokenKind.EOF, end, end, line, end - line_start + 1, source, filename)
+
+
+def lex(source: str, filename: str = "<string>") -> list[Token]:
+    """Tokenize ``source`` into a list (see :func:`tokenize`)."""
+    return list(tokenize(source, filename))
+
+
+def _error(source: str, offset: int, line: int, column: int, filename: str) -> LexError:
+    loc = SourceLocation(filename, line, column)
+    ch = source[offset]
+    if ch == '"':
+        return LexError("unterminated string literal", loc)
+    return LexError(f"unexpected character {ch!r}", loc)
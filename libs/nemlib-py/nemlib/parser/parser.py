@@ -0,0 +1,844 @@
+"""
+Recursive descent parser: tokens -> AST.
+
+Covers configuration documents (``include``, ``device``, ``type_family``),
+programs and expressions. Syntax errors are reported to a
+:class:`DiagnosticCollector`; the parser then skips to the next top-level
+declaration (configuration documents) or to the next statement (programs) and
+continues, so one run reports every broken declaration.
+
+The program grammar has one ambiguity: a compute task ends with any number of
+``ID = value`` attributes, and the next statement may be ``ID = <call>``. An
+``ID =`` followed by a task call or by ``region`` starts a new statement;
+anything else is an attribute.
+"""
+
+from __future__ import annotations
+
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExprNode,
+    FloatLiteral,
+    Identifier,
+    IntLiteral,
+    UnaryOp,
+)
+from nemlib.diagnostics import Diagnostic, DiagnosticCollector, SourceLocation
+from nemlib.parser.ast_nodes import (
+    AttributeBindingNode,
+    BufferDeclNode,
+    CharDeclNode,
+    ConfigDocumentNode,
+    ConformanceEntryNode,
+    ConstDeclNode,
+    DecoratorNode,
+    DeviceConfigNode,
+    DeviceDeclNode,
+    IncludeDeclNode,
+    LetDeclNode,
+    ListNode,
+    LoopNode,
+    OperandBindingNode,
+    OperandNode,
+    ProgramNode,
+    QuantDescNode,
+    RegionDeclNode,
+    RegionExprNode,
+    StmtNode,
+    StringNode,
+    TaskNode,
+    TopologyNode,
+    TypeFamilyDeclNode,
+    TypeParamNode,
+    UnitCharacteristicsNode,
+    UnitDeclNode,
+    UnitRefNode,
+    ValueNode,
+    VariantDeclNode,
+    VariantRefNode,
+    WaitNode,
+)
+from nemlib.parser.errors import LexError, NemSyntaxError
+from nemlib.parser.lexer import lex
+from nemlib.parser.tokens import Token, TokenKind
+
+K = TokenKind
+
+_ADDITIVE = {K.PLUS: "+", K.MINUS: "-"}
+_MULTIPLICATIVE = {K.STAR: "*", K.SLASH: "/", K.MOD: "mod"}
+_TOP_LEVEL = (K.INCLUDE, K.DEVICE, K.TYPE_FAMILY, K.EOF)
+_CONFORMANCE_CLASSES = ("MUST", "MAY")
+
+_MEM_LEVELS = ("DDR", "L2", "L1")
+_UNIT_TYPES = ("NMU", "CSTL", "DMA", "VPU", "SEQ", "sDMA", "WDM")
+_QUANT_KINDS = ("per_tensor", "per_channel", "per_group")
+_DATA_MOVES = {
+    K.TRANSFER_ASYNC: ("transfer", "async"),
+    K.TRANSFER_SYNC: ("transfer", "sync"),
+    K.STORE_ASYNC: ("store", "async"),
+    K.STORE_SYNC: ("store", "sync"),
+}
+_STMT_STARTS = (K.CONST, K.LET, K.BUFFER, K.LOOP, K.ENDLOOP, K.WAIT, K.SEMICOLON, *_DATA_MOVES)
+
+
+class _Parser:
+    def __init__(self, tokens: list[Token]) -> None:
+        if not tokens or tokens[-1].kind is not K.EOF:
+            raise ValueError("token stream must end with EOF")
+        self.tokens = tokens
+        self.pos = 0
+
+    # -- token helpers ----------------------------------------------------
+
+    @property
+    def tok(self) -> Token:
+        return self.tokens[self.pos]
+
+    def peek(self, offset: int = 1) -> Token:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def at(self, kind: TokenKind) -> bool:
+        return self.tokens[self.pos].kind is kind
+
+    def at_word(self, word: str) -> bool:
+        tok = self.tokens[self.pos]
+        return tok.kind is K.ID and tok.lexeme == word
+
+    def advance(self) -> Token:
+        tok = self.tokens[self.pos]
+        if tok.kind is not K.EOF:
+            self.pos += 1
+        return tok
+
+    def accept(self, kind: TokenKind) -> Token | None:
+        return self.advance() if self.at(kind) else None
+
+    def expect(self, kind: TokenKind, what: str | None = None) -> Token:
+        if self.at(kind):
+            return self.advance()
+        raise self.error(f"expected {what or _describe(kind)}")
+
+    def error(self, message: str, tok: Token | None = None) -> NemSyntaxError:
+        tok = tok or self.tok
+        found = "end of file" if tok.kind is K.EOF else f"'{tok.lexeme}'"
+        return NemSyntaxError(f"{message}, found {found}", tok.location)
+
+    def synchronize(self) -> None:
+        """Skip to the next top-level declaration (outside any braces)."""
+        depth = 0
+        while not self.at(K.EOF):
+            if depth == 0 and self.tok.kind in _TOP_LEVEL and self.tok.column == 1:
+                return
+            kind = self.advance().kind
+            if kind is K.LBRACE:
+                depth += 1
+            elif kind is K.RBRACE:
+                depth = max(depth - 1, 0)
+
+    # -- documents --------------------------------------------------------
+
+    def config_document(self, diag: DiagnosticCollector, file: str) -> ConfigDocumentNode:
+        includes: list[IncludeDeclNode] = []
+        families: list[TypeFamilyDeclNode] = []
+        devices: list[DeviceConfigNode] = []
+        while not self.at(K.EOF):
+            start = self.pos
+            try:
+                if self.at(K.INCLUDE):
+                    includes.append(self.include_decl())
+                elif self.at(K.TYPE_FAMILY):
+                    families.append(self.type_family_decl())
+                elif self.at(K.DEVICE):
+                    devices.append(self.device_config())
+                else:
+                    raise self.error("expected 'include', 'device' or 'type_family'")
+            except NemSyntaxError as e:
+                diag.add(e.to_diagnostic())
+                if self.pos == start:
+                    self.advance()
+                self.synchronize()
+        return ConfigDocumentNode(tuple(includes), tuple(families), tuple(devices), file)
+
+    def include_decl(self) -> IncludeDeclNode:
+        loc = self.expect(K.INCLUDE).location
+        path = self.expect(K.STRING, "include path string")
+        return IncludeDeclNode(str(path.value), loc)
+
+    # -- device configuration ---------------------------------------------
+
+    def device_config(self) -> DeviceConfigNode:
+        loc = self.expect(K.DEVICE).location
+        name = self.expect(K.ID, "device name").lexeme
+        parent = self.expect(K.ID, "parent device name").lexeme if self.accept(K.EXTENDS) else None
+        self.expect(K.LBRACE, "'{'")
+
+        spec_version: str | None = None
+        topology: TopologyNode | None = None
+        unit_chars: tuple[UnitCharacteristicsNode, ...] | None = None
+        mandatory: tuple[VariantRefNode, ...] | None = None
+        extended: tuple[VariantRefNode, ...] | None = None
+        seen: set[str] = set()
+
+        while not self.accept(K.RBRACE):
+            tok = self.tok
+            key = tok.lexeme
+            if key in seen:
+                raise self.error(f"duplicate '{key}' in device '{name}'")
+            seen.add(key)
+            if self.at_word("spec_version"):
+                self.advance()
+                self.expect(K.EQUALS, "'='")
+                spec_version = str(self.expect(K.STRING, "spec version string").value)
+            elif self.at_word("topology"):
+                topology = self.topology()
+            elif self.at_word("unit_characteristics"):
+                unit_chars = self.unit_characteristics()
+            elif self.accept(K.OPCODE_MANDATORY):
+                mandatory = self.variant_ref_block()
+            elif self.accept(K.OPCODE_EXTENDED):
+                extended = self.variant_ref_block()
+            else:
+                raise self.error(f"unexpected item in device '{name}'")
+
+        return DeviceConfigNode(
+            name, parent, spec_version, topology, unit_chars, mandatory, extended, loc
+        )
+
+    def topology(self) -> TopologyNode:
+        loc = self.advance().location
+        self.expect(K.LBRACE, "'{'")
+        num_engines: int | None = None
+        l2: ExprNode | None = None
+        l1: ExprNode | None = None
+        device_units: tuple[UnitDeclNode, ...] = ()
+        per_engine: tuple[UnitDeclNode, ...] | None = None
+        while not self.accept(K.RBRACE):
+            if self.at_word("num_engines"):
+                self.advance()
+                self.expect(K.EQUALS, "'='")
+                num_engines = int(self.expect(K.INT, "integer").value)
+            elif self.at_word("l2_size_bytes"):
+                self.advance()
+                self.expect(K.EQUALS, "'='")
+                l2 = self.expr()
+            elif self.at_word("device_units"):
+                self.advance()
+                device_units, _ = self.unit_block(allow_l1=False)
+            elif self.at_word("per_engine"):
+                self.advance()
+                per_engine, l1 = self.unit_block(allow_l1=True)
+            else:
+                raise self.error("unexpected item in topology")
+        if num_engines is None:
+            raise NemSyntaxError("topology is missing 'num_engines'", loc)
+        if l2 is None:
+            raise NemSyntaxError("topology is missing 'l2_size_bytes'", loc)
+        if per_engine is None:
+            raise NemSyntaxError("topology is missing 'per_engine'", loc)
+        if l1 is None:
+            raise NemSyntaxError("per_engine is missing 'l1_size_bytes'", loc)
+        return TopologyNode(num_engines, l2, per_engine, l1, device_units, loc)
+
+    def unit_block(self, allow_l1: bool) -> tuple[tuple[UnitDeclNode, ...], ExprNode | None]:
+        self.expect(K.LBRACE, "'{'")
+        units: list[UnitDeclNode] = []
+        l1: ExprNode | None = None
+        while not self.accept(K.RBRACE):
+            if allow_l1 and self.at_word("l1_size_bytes"):
+                self.advance()
+                self.expect(K.EQUALS, "'='")
+                l1 = self.expr()
+                continue
+            tok = self.expect(K.ID, "unit type")
+            self.expect(K.EQUALS, "'='")
+            count = int(self.expect(K.INT, "integer").value)
+            units.append(UnitDeclNode(tok.lexeme, count, tok.location))
+        return tuple(units), l1
+
+    def unit_characteristics(self) -> tuple[UnitCharacteristicsNode, ...]:
+        self.advance()
+        self.expect(K.LBRACE, "'{'")
+        groups: list[UnitCharacteristicsNode] = []
+        while not self.accept(K.RBRACE):
+            unit = self.expect(K.ID, "unit type")
+            self.expect(K.LBRACE, "'{'")
+            entries: list[CharDeclNode] = []
+            while not self.accept(K.RBRACE):
+                key = self.expect(K.ID, "characteristic name")
+                self.expect(K.EQUALS, "'='")
+                value = int(self.expect(K.INT, "integer").value)
+                entries.append(CharDeclNode(key.lexeme, value, key.location))
+            groups.append(UnitCharacteristicsNode(unit.lexeme, tuple(entries), unit.location))
+        return tuple(groups)
+
+    def variant_ref_block(self) -> tuple[VariantRefNode, ...]:
+        self.expect(K.LBRACE, "'{'")
+        refs: list[VariantRefNode] = []
+        while not self.accept(K.RBRACE):
+            refs.append(self.variant_ref())
+        return tuple(refs)
+
+    def variant_ref(self) -> VariantRefNode:
+        first = self.expect(K.ID, "variant reference")
+        parts = [first.lexeme]
+        while self.at(K.DOT) and self.peek().kind is K.ID:
+            self.advance()
+            parts.append(self.advance().lexeme)
+        if self.at(K.LANGLE):
+            inst = self.instantiation()
+            self.expect(K.DOT, "'.'")
+            variant = self.expect(K.ID, "variant name").lexeme
+            return VariantRefNode(".".join(parts), inst, variant, first.location)
+        if len(parts) < 2:
+            raise self.error("expected '.<variant>' in variant reference")
+        return VariantRefNode(".".join(parts[:-1]), (), parts[-1], first.location)
+
+    def instantiation(self) -> tuple[str, ...]:
+        self.expect(K.LANGLE, "'<'")
+        types = [self.expect(K.ID, "element type").lexeme]
+        while self.accept(K.COMMA):
+            types.append(self.expect(K.ID, "element type").lexeme)
+        self.expect(K.RANGLE, "'>'")
+        return tuple(types)
+
+    # -- type families ----------------------------------------------------
+
+    def type_family_decl(self) -> TypeFamilyDeclNode:
+        loc = self.expect(K.TYPE_FAMILY).location
+        family_id = self.expect(K.ID, "type family name").lexeme
+        if self.accept(K.DOT):
+            family_id += "." + self.expect(K.ID, "type family name").lexeme
+
+        params: list[TypeParamNode] = []
+        if self.accept(K.LANGLE):
+            while True:
+                name = self.expect(K.ID, "type parameter")
+                self.expect(K.COLON, "':'")
+                self.expect(K.LBRACE, "'{'")
+                allowed = [self.expect(K.ID, "element type").lexeme]
+                while self.accept(K.COMMA):
+                    allowed.append(self.expect(K.ID, "element type").lexeme)
+                self.expect(K.RBRACE, "'}'")
+                params.append(TypeParamNode(name.lexeme, tuple(allowed), name.location))
+                if not self.accept(K.COMMA):
+                    break
+            self.expect(K.RANGLE, "'>'")
+
+        self.expect(K.LBRACE, "'{'")
+        operands: list[OperandBindingNode] = []
+        attributes: list[AttributeBindingNode] = []
+        while not self.at(K.VARIANTS):
+            name = self.expect(K.ID, "operand or attribute binding")
+            if self.accept(K.COLON):
+                type_expr = self.expect(K.ID, "type").lexeme
+                operands.append(OperandBindingNode(name.lexeme, type_expr, name.location))
+            elif self.accept(K.EQUALS):
+                value = self.expect(K.ID, "attribute value").lexeme
+                target = None
+                if self.at_word("on"):
+                    self.advance()
+                    target = self.expect(K.ID, "operand name").lexeme
+                attributes.append(AttributeBindingNode(name.lexeme, value, target, name.location))
+            else:
+                raise self.error("expected ':' or '='")
+
+        self.expect(K.VARIANTS)
+        self.expect(K.COLON, "':'")
+        variants: list[VariantDeclNode] = []
+        while not self.accept(K.RBRACE):
+            variants.append(self.variant_decl())
+        return TypeFamilyDeclNode(
+            family_id, tuple(params), tuple(operands), tuple(attributes), tuple(variants), loc
+        )
+
+    def variant_decl(self) -> VariantDeclNode:
+        name = self.expect(K.ID, "variant name")
+        self.expect(K.COLON, "':'")
+        self.expect(K.LBRACE, "'{'")
+        bindings: list[OperandBindingNode] = []
+        while not self.accept(K.RBRACE):
+            operand = self.expect(K.ID, "operand name")
+            self.expect(K.COLON, "':'")
+            bindings.append(
+                OperandBindingNode(operand.lexeme, self.expect(K.ID).lexeme, operand.location)
+            )
+            self.accept(K.COMMA)
+        self.expect(K.CONFORMANCE)
+        self.expect(K.COLON, "':'")
+        self.expect(K.LBRACE, "'{'")
+        entries: list[ConformanceEntryNode] = []
+        while not self.accept(K.RBRACE):
+            cls = self.tok
+            if cls.kind is not K.ID or cls.lexeme not in _CONFORMANCE_CLASSES:
+                raise self.error("expected 'MUST' or 'MAY'")
+            self.advance()
+            inst = self.instantiation() if self.at(K.LANGLE) else ()
+            entries.append(ConformanceEntryNode(cls.lexeme, inst, cls.location))
+        return VariantDeclNode(name.lexeme, tuple(bindings), tuple(entries), name.location)
+
+    # -- programs ---------------------------------------------------------
+
+    def program(self, diag: DiagnosticCollector, file: str) -> ProgramNode:
+        includes: list[IncludeDeclNode] = []
+        device: DeviceDeclNode | None = None
+        name: str | None = None
+        try:
+            while self.at(K.INCLUDE):
+                includes.append(self.include_decl())
+            if self.at(K.DEVICE):
+                device = self.device_decl()
+            if self.accept(K.PROGRAM):
+                name = self.expect(K.ID, "program name").lexeme
+                self.expect(K.COLON, "':'")
+        except NemSyntaxError as e:
+            diag.add(e.to_diagnostic())
+            self.skip_statement()
+        statements = self.statements(diag, nested=False)
+        return ProgramNode(name, device, tuple(statements), tuple(includes), file)
+
+    def device_decl(self) -> DeviceDeclNode:
+        loc = self.tok.location
+        if self.peek().kind is K.STRING:
+            self.advance()
+            return DeviceDeclNode(path=str(self.advance().value), location=loc)
+        if self.peek().kind is K.ID and self.peek(2).kind in (K.LBRACE, K.EXTENDS):
+            return DeviceDeclNode(config=self.device_config(), location=loc)
+        self.advance()
+        return DeviceDeclNode(name=self.expect(K.ID, "device name").lexeme, location=loc)
+
+    def skip_statement(self) -> None:
+        """Skip to the next token that starts a statement on a new line."""
+        line = self.tok.line
+        self.advance()
+        while not self.at(K.EOF):
+            tok = self.tok
+            if tok.line != line and (
+                tok.kind in _STMT_STARTS or (tok.kind is K.ID and self.peek().kind is K.EQUALS)
+            ):
+                return
+            line = tok.line
+            self.advance()
+
+    def statements(self, diag: DiagnosticCollector, nested: bool) -> list[StmtNode]:
+        stmts: list[StmtNode] = []
+        while not self.at(K.EOF):
+            if self.at(K.ENDLOOP):
+                if nested:
+                    break
+                diag.add(self.error("'endloop' without 'loop'").to_diagnostic())
+                self.advance()
+                continue
+            try:
+                if self.accept(K.SEMICOLON):
+                    continue
+                if self.at(K.LOOP):
+                    stmts.append(self.loop(diag))
+                else:
+                    stmts.append(self.statement())
+            except NemSyntaxError as e:
+                diag.add(e.to_diagnostic())
+                self.skip_statement()
+        return stmts
+
+    def statement(self) -> StmtNode:
+        tok = self.tok
+        if tok.kind is K.CONST:
+            self.advance()
+            name = self.expect(K.ID, "constant name").lexeme
+            self.expect(K.EQUALS, "'='")
+            return ConstDeclNode(name, self.expr(), tok.location)
+        if tok.kind is K.LET:
+            self.advance()
+            name = self.expect(K.ID, "name").lexeme
+            self.expect(K.EQUALS, "'='")
+            value = self.value()
+            decos = self.decorators()
+            if isinstance(value, RegionExprNode):
+                return RegionDeclNode(name, value, decos, tok.location)
+            return LetDeclNode(name, value, decos, tok.location)
+        if tok.kind is K.BUFFER:
+            return self.buffer_decl()
+        if tok.kind is K.ID and self.peek().kind is K.EQUALS:
+            if self.peek(2).kind is K.REGION:
+                self.advance()
+                self.advance()
+                region = self.region_expr()
+                return RegionDeclNode(tok.lexeme, region, self.decorators(), tok.location)
+            self.advance()
+            self.advance()
+            return self.call(tok.lexeme, tok)
+        return self.call(None, tok)
+
+    def buffer_decl(self) -> BufferDeclNode:
+        loc = self.expect(K.BUFFER).location
+        name = self.expect(K.ID, "buffer name").lexeme
+        self.expect(K.COLON, "':'")
+        level = self.expect(K.ID, "memory level")
+        if level.lexeme not in _MEM_LEVELS:
+            raise self.error("expected memory level 'DDR', 'L2' or 'L1'", level)
+        index = None
+        if level.lexeme == "L1" and self.accept(K.LBRACKET):
+            index = self.expr()
+            self.expect(K.RBRACKET, "']'")
+        self.expect(K.LPAREN, "'('")
+        size: ExprNode | None = None
+        align: int | None = None
+        while True:
+            prop = self.expect(K.ID, "'size' or 'align'")
+            self.expect(K.EQUALS, "'='")
+            if prop.lexeme == "size" and size is None:
+                size = self.expr()
+            elif prop.lexeme == "align" and align is None:
+                align = int(self.expect(K.INT, "integer").value)
+            else:
+                raise self.error("expected 'size' or 'align'", prop)
+            if not self.accept(K.COMMA):
+                break
+        self.expect(K.RPAREN, "')'")
+        return BufferDeclNode(name, level.lexeme, index, size, align, self.decorators(), loc)
+
+    def loop(self, diag: DiagnosticCollector) -> LoopNode:
+        loc = self.expect(K.LOOP).location
+        var = self.expect(K.ID, "loop variable").lexeme
+        self.expect(K.IN, "'in'")
+        self.expect(K.LBRACKET, "'['")
+        start = self.expr()
+        self.expect(K.DOTDOT, "'..'")
+        end = self.expr()
+        self.expect(K.RBRACKET, "']'")
+        decos = self.decorators()
+        self.expect(K.COLON, "':'")
+        body = self.statements(diag, nested=True)
+        self.expect(K.ENDLOOP, "'endloop'")
+        return LoopNode(var, start, end, decos, tuple(body), loc)
+
+    def call(self, token: str | None, start: Token) -> TaskNode | WaitNode:
+        tok = self.tok
+        loc = start.location
+        if tok.kind is K.WAIT:
+            if token is not None:
+                raise self.error("'wait' does not produce a token", start)
+            self.advance()
+            self.expect(K.LPAREN, "'('")
+            tokens = self.id_list()
+            self.expect(K.RPAREN, "')'")
+            return WaitNode(tokens, self.decorators(), loc)
+        if tok.kind in _DATA_MOVES:
+            self.advance()
+            kind, mode = _DATA_MOVES[tok.kind]
+            return self.data_move(token, kind, mode, loc)
+        if (
+            tok.kind is K.ID
+            and self.peek().kind is K.DOT
+            and self.peek(2).kind in (K.ASYNC, K.SYNC)
+        ):
+            self.advance()
+            self.advance()
+            mode = self.advance().lexeme
+            return self.compute(token, tok.lexeme, mode, loc)
+        raise self.error("expected a declaration or task")
+
+    def data_move(self, token: str | None, kind: str, mode: str, loc: SourceLocation) -> TaskNode:
+        self.expect(K.LPAREN, "'('")
+        args: dict[str, OperandNode | tuple[str, ...]] = {}
+        while True:
+            name = self.expect(K.ID, "'dst', 'src' or 'deps'")
+            if name.lexeme not in ("dst", "src", "deps") or name.lexeme in args:
+                raise self.error("expected 'dst', 'src' or 'deps'", name)
+            self.expect(K.EQUALS, "'='")
+            if name.lexeme == "deps":
+                args["deps"] = self.token_list()
+            else:
+                args[name.lexeme] = self.operand()
+            if not self.accept(K.COMMA):
+                break
+        self.expect(K.RPAREN, "')'")
+        dst, src = args.get("dst"), args.get("src")
+        if not isinstance(dst, OperandNode) or not isinstance(src, OperandNode):
+            raise self.error(f"{kind} requires 'dst' and 'src'")
+        deps = args.get("deps", ())
+        assert isinstance(deps, tuple)
+        return TaskNode(
+            token,
+            kind,
+            kind,
+            mode,
+            (src,),
+            (dst,),
+            deps,
+            (),
+            self.decorators(),
+            loc,
+        )
+
+    def compute(self, token: str | None, opcode: str, mode: str, loc: SourceLocation) -> TaskNode:
+        self.expect(K.IN, "'in'")
+        inputs = self.operand_list()
+        self.expect(K.OUT, "'out'")
+        outputs = self.operand_list()
+        deps: tuple[str, ...] = ()
+        attrs: list[tuple[str, ValueNode]] = []
+        while self.at_attribute():
+            name = self.advance()
+            self.advance()
+            if name.lexeme == "deps":
+                deps = self.token_list()
+            else:
+                attrs.append((name.lexeme, self.value()))
+        return TaskNode(
+            token,
+            "compute",
+            opcode,
+            mode,
+            inputs,
+            outputs,
+            deps,
+            tuple(attrs),
+            self.decorators(),
+            loc,
+        )
+
+    def at_attribute(self) -> bool:
+        if not (self.at(K.ID) and self.peek().kind is K.EQUALS):
+            return False
+        after = self.peek(2).kind
+        if after in _DATA_MOVES or after in (K.WAIT, K.REGION):
+            return False
+        return not (
+            after is K.ID and self.peek(3).kind is K.DOT and self.peek(4).kind in (K.ASYNC, K.SYNC)
+        )
+
+    def operand_list(self) -> tuple[OperandNode, ...]:
+        operands = [self.operand()]
+        while self.accept(K.COMMA):
+            operands.append(self.operand())
+        return tuple(operands)
+
+    def operand(self) -> OperandNode:
+        tok = self.tok
+        if tok.kind is K.REGION:
+            return OperandNode(None, self.region_expr(), self.decorators(), tok.location)
+        self.expect(K.ID, "region name or region(...)")
+        return OperandNode(tok.lexeme, None, self.decorators(), tok.location)
+
+    def id_list(self) -> tuple[str, ...]:
+        ids = [self.expect(K.ID, "token name").lexeme]
+        while self.accept(K.COMMA):
+            ids.append(self.expect(K.ID, "token name").lexeme)
+        return tuple(ids)
+
+    def token_list(self) -> tuple[str, ...]:
+        self.expect(K.LBRACKET, "'['")
+        ids = self.id_list() if not self.at(K.RBRACKET) else ()
+        self.expect(K.RBRACKET, "']'")
+        return ids
+
+    def region_expr(self) -> RegionExprNode:
+        loc = self.expect(K.REGION).location
+        self.expect(K.LPAREN, "'('")
+        buffer = self.expect(K.ID, "buffer name").lexeme
+        self.expect(K.COMMA, "','")
+        offset = self.expr()
+        self.expect(K.COMMA, "','")
+        extent = self.expr()
+        self.expect(K.RPAREN, "')'")
+        if not (self.at_word("elem") and self.peek().kind is K.EQUALS):
+            return RegionExprNode(buffer, offset, extent, location=loc)
+        self.advance()
+        self.advance()
+        elem = self.expect(K.ID, "element type").lexeme
+        self.expect(K.COMMA, "','")
+        self.expect_word("shape")
+        shape = self.expr_list()
+        self.expect(K.COMMA, "','")
+        layout: str | None = None
+        strides: tuple[ExprNode, ...] | None = None
+        if self.at_word("layout"):
+            self.advance()
+            self.expect(K.EQUALS, "'='")
+            layout = self.expect(K.ID, "layout name").lexeme
+        else:
+            self.expect_word("strides")
+            strides = self.expr_list()
+        quant = None
+        if self.at(K.COMMA) and self.peek().lexeme == "quant" and self.peek(2).kind is K.EQUALS:
+            self.advance()
+            self.advance()
+            self.advance()
+            quant = self.quant_desc()
+        return RegionExprNode(buffer, offset, extent, elem, shape, layout, strides, quant, loc)
+
+    def expect_word(self, word: str) -> None:
+        if not self.at_word(word):
+            raise self.error(f"expected '{word}'")
+        self.advance()
+        self.expect(K.EQUALS, "'='")
+
+    def expr_list(self) -> tuple[ExprNode, ...]:
+        self.expect(K.LBRACKET, "'['")
+        items = [self.expr()]
+        while self.accept(K.COMMA):
+            items.append(self.expr())
+        self.expect(K.RBRACKET, "']'")
+        return tuple(items)
+
+    def quant_desc(self) -> QuantDescNode:
+        kind = self.expect(K.ID, "quantization kind")
+        if kind.lexeme not in _QUANT_KINDS:
+            raise self.error("expected 'per_tensor', 'per_channel' or 'per_group'", kind)
+        self.expect(K.LPAREN, "'('")
+        params: list[tuple[str, ValueNode]] = []
+        while True:
+            name = self.expect(K.ID, "quantization parameter").lexeme
+            self.expect(K.EQUALS, "'='")
+            params.append((name, self.value()))
+            if not self.accept(K.COMMA):
+                break
+        self.expect(K.RPAREN, "')'")
+        return QuantDescNode(kind.lexeme, tuple(params), kind.location)
+
+    def value(self) -> ValueNode:
+        tok = self.tok
+        if tok.kind is K.STRING:
+            self.advance()
+            return StringNode(str(tok.value), tok.location)
+        if tok.kind is K.REGION:
+            return self.region_expr()
+        if tok.kind is K.LBRACKET:
+            self.advance()
+            items: list[ValueNode] = []
+            if not self.at(K.RBRACKET):
+                items.append(self.value())
+                while self.accept(K.COMMA):
+                    items.append(self.value())
+            self.expect(K.RBRACKET, "']'")
+            return ListNode(tuple(items), tok.location)
+        return self.expr()
+
+    def decorators(self) -> tuple[DecoratorNode, ...]:
+        decos: list[DecoratorNode] = []
+        while self.at(K.AT):
+            loc = self.advance().location
+            name = self.expect(K.ID, "decorator name").lexeme
+            args: list[ValueNode | UnitRefNode] = []
+            if self.accept(K.LPAREN):
+                while True:
+                    tok = self.tok
+                    if (
+                        tok.kind is K.ID
+                        and tok.lexeme in _UNIT_TYPES
+                        and self.peek().kind is K.LBRACKET
+                    ):
+                        self.advance()
+                        self.advance()
+                        index = self.expr()
+                        self.expect(K.RBRACKET, "']'")
+                        args.append(UnitRefNode(tok.lexeme, index, tok.location))
+                    else:
+                        args.append(self.value())
+                    if not self.accept(K.COMMA):
+                        break
+                self.expect(K.RPAREN, "')'")
+            decos.append(DecoratorNode(name, tuple(args), loc))
+        return tuple(decos)
+
+    # -- expressions ------------------------------------------------------
+
+    def expr(self) -> ExprNode:
+        node = self.term()
+        while self.tok.kind in _ADDITIVE:
+            op = self.advance()
+            node = BinaryOp(_ADDITIVE[op.kind], node, self.term(), op.location)
+        return node
+
+    def term(self) -> ExprNode:
+        node = self.unary()
+        while self.tok.kind in _MULTIPLICATIVE:
+            op = self.advance()
+            node = BinaryOp(_MULTIPLICATIVE[op.kind], node, self.unary(), op.location)
+        return node
+
+    def unary(self) -> ExprNode:
+        if self.at(K.MINUS):
+            op = self.advance()
+            return UnaryOp("-", self.unary(), op.location)
+        return self.primary()
+
+    def primary(self) -> ExprNode:
+        tok = self.tok
+        if tok.kind is K.INT:
+            self.advance()
+            return IntLiteral(int(tok.value), tok.location)
+        if tok.kind is K.FLOAT:
+            self.advance()
+            return FloatLiteral(float(tok.value), tok.location)
+        if tok.kind is K.ID:
+            self.advance()
+            return Identifier(tok.lexeme, tok.location)
+        if tok.kind is K.LPAREN:
+            self.advance()
+            node = self.expr()
+            self.expect(K.RPAREN, "')'")
+            return node
+        raise self.error("expected an expression")
+
+
+def _describe(kind: TokenKind) -> str:
+    return kind.value if kind in (K.ID, K.INT, K.FLOAT, K.STRING) else f"'{kind.value}'"
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def parse_config_document(
+    tokens: list[Token], diag: DiagnosticCollector, file: str | None = None
+) -> ConfigDocumentNode:
+    """Parse a configuration document (includes, type families, devices)."""
+    name = file if file is not None else tokens[-1].file
+    return _Parser(tokens).config_document(diag, name)
+
+
+def parse_expr(tokens: list[Token]) -> ExprNode:
+    """Parse a single expression; raises :class:`NemSyntaxError` on trailing input."""
+    parser = _Parser(tokens)
+    node = parser.expr()
+    if not parser.at(K.EOF):
+        raise parser.error("unexpected token after expression")
+    return node
+
+
+def parse_program(
+    tokens: list[Token], diag: DiagnosticCollector, file: str | None = None
+) -> ProgramNode:
+    """Parse a program document (includes, device directive, header, statements)."""
+    name = file if file is not None else tokens[-1].file
+    return _Parser(tokens).program(diag, name)
+
+
+def parse(source: str, filename: str = "<string>") -> tuple[ProgramNode, list[Diagnostic]]:
+    """Lex and parse a program; returns the program and every diagnostic."""
+    diag = DiagnosticCollector()
+    try:
+        tokens = lex(source, filename)
+    except LexError as e:
+        diag.add(e.to_diagnostic())
+        return ProgramNode(None, None, (), (), filename), diag.get_all()
+    return parse_program(tokens, diag, filename), diag.get_all()
+
+
+def parse_config(
+    source: str, filename: str = "<string>", diag: DiagnosticCollector | None = None
+) -> tuple[ConfigDocumentNode, DiagnosticCollector]:
+    """Lex and parse a configuration document in one call.
+
+    Lexical errors are reported like syntax errors (the document is then empty).
+    """
+    diag = diag if diag is not None else DiagnosticCollector()
+    try:
+        tokens = lex(source, filename)
+    except LexError as e:
+        diag.add(e.to_diagnostic())
+        return ConfigDocumentNode((), (), (), filename), diag
+    return parse_config_document(tokens, diag, filename), diag
@@ -0,0 +1,164 @@
+"""
+Token kinds and the ``Token`` type produced by the lexer.
+
+A :class:`Token` does not copy its text: it records the ``[start, end)`` offsets
+into the source buffer (plus line/column of ``start``) and slices the lexeme on
+demand. Tokens of one lexer run all share the same source string.
+
+Only structural words are keywords. Contextual words (``elem``, ``shape``,
+``deps``, ``dst``, ``topology``, ``MUST``, element types, memory levels, ...)
+are lexed as ``ID`` and recognized by the parser by lexeme, so they remain
+usable as names elsewhere.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+
+from nemlib.diagnostics import SourceLocation
+
+
+class TokenKind(Enum):
+    # Literals and names
+    ID = "identifier"
+    INT = "integer"
+    FLOAT = "float"
+    STRING = "string"
+
+    # Keywords
+    PROGRAM = "program"
+    CONST = "const"
+    LET = "let"
+    BUFFER = "buffer"
+    REGION = "region"
+    LOOP = "loop"
+    ENDLOOP = "endloop"
+    IN = "in"
+    OUT = "out"
+    MOD = "mod"
+    WAIT = "wait"
+    ASYNC = "async"
+    SYNC = "sync"
+    INCLUDE = "include"
+    DEVICE = "device"
+    EXTENDS = "extends"
+    TYPE_FAMILY = "type_family"
+    VARIANTS = "variants"
+    CONFORMANCE = "conformance"
+
+    # Compound keywords (lexed as single tokens)
+    TRANSFER_ASYNC = "transfer.async"
+    TRANSFER_SYNC = "transfer.sync"
+    STORE_ASYNC = "store.async"
+    STORE_SYNC = "store.sync"
+    OPCODE_MANDATORY = "opcode.mandatory"
+    OPCODE_EXTENDED = "opcode.extended"
+
+    # Operators
+    PLUS = "+"
+    MINUS = "-"
+    STAR = "*"
+    SLASH = "/"
+    EQUALS = "="
+    DOTDOT = ".."
+    DOT = "."
+    AT = "@"
+
+    # Delimiters
+    LPAREN = "("
+    RPAREN = ")"
+    LBRACKET = "["
+    RBRACKET = "]"
+    LBRACE = "{"
+    RBRACE = "}"
+    LANGLE = "<"
+    RANGLE = ">"
+    COMMA = ","
+    COLON = ":"
+    SEMICOLON = ";"
+
+    EOF = "end of file"
+
+
+LITERALS = frozenset({TokenKind.ID, TokenKind.INT, TokenKind.FLOAT, TokenKind.STRING})
+
+# Lexeme -> kind for every keyword (simple and compound)
+KEYWORDS: dict[str, TokenKind] = {
+    kind.value: kind
+    for kind in TokenKind
+    if kind.value[0].isalpha() and kind not in LITERALS and kind is not TokenKind.EOF
+}
+
+# Single-character punctuation -> kind
+PUNCTUATION: dict[str, TokenKind] = {
+    kind.value: kind for kind in TokenKind if len(kind.value) == 1 and not kind.value.isalnum()
+}
+
+
+class Token:
+    """One token: kind plus offsets into the shared source buffer."""
+
+    __slots__ = ("kind", "start", "end", "line", "column", "source", "file")
+
+    def __init__(
+        self,
+        kind: TokenKind,
+        start: int,
+        end: int,
+        line: int,
+        column: int,
+        source: str,
+        file: str,
+    ) -> None:
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.line = line
+        self.column = column
+        self.source = source
+        self.file = file
+
+    @property
+    def lexeme(self) -> str:
+        """The token text (sliced from the source on each access)."""
+        return self.source[self.start : self.end]
+
+    @property
+    def location(self) -> SourceLocation:
+        return SourceLocation(self.file, self.line, self.column)
+
+    @property
+    def value(self) -> int | float | str:
+        """Literal value: ``int`` for INT, ``float`` for FLOAT, the unquoted,
+        unescaped text for STRING, the lexeme otherwise."""
+        if self.kind is TokenKind.INT:
+            return int(self.lexeme)
+        if self.kind is TokenKind.FLOAT:
+            return float(self.lexeme)
+        if self.kind is TokenKind.STRING:
+            body = self.source[self.start + 1 : self.end - 1]
+            if "\\" in body:
+                body = _unescape(body)
+            return body
+        return self.lexeme
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind.name}, {self.lexeme!r}, {self.line}:{self.column})"
+
+
+_ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+
+def _unescape(body: str) -> str:
+    out: list[str] = []
+    i = 0
+    while i < len(body):
+        ch = body[i]
+        if ch == "\\" and i + 1 < len(body):
+            nxt = body[i + 1]
+            out.append(_ESCAPES.get(nxt, nxt))
+            i += 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
@@ -0,0 +1,16 @@
+"""Type system (Layer 4): type families, signature tables and opcode matching."""
+
+from nemlib.types.families import TypeFamily, TypeVariant, VariantInstance, baseline_families
+from nemlib.types.matching import MatchResult, match_opcode_instance
+from nemlib.types.registry import SignatureTable, TypeFamilyRegistry
+
+__all__ = [
+    "MatchResult",
+    "SignatureTable",
+    "TypeFamily",
+    "TypeFamilyRegistry",
+    "TypeVariant",
+    "VariantInstance",
+    "baseline_families",
+    "match_opcode_instance",
+]
@@ -0,0 +1,258 @@
+"""
+Type family definitions (spec: Type Families and Matching, Appendix).
+
+:class:`TypeFamily` is the semantic form of a ``type_family`` declaration.
+:meth:`TypeFamily.instances` expands it into one :class:`VariantInstance` per
+variant and listed conformance instantiation. These instances are the unit
+that devices list in ``opcode.mandatory``/``opcode.extended`` and that
+matching resolves to.
+
+The normative NEM 1.0 families (the spec appendix, also shipped in
+``nem_baseline_1.0.nem``) are available from :func:`baseline_families`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+
+from nemlib.core.elements import ElementType
+from nemlib.device.model import FrozenDict
+from nemlib.diagnostics import SourceLocation
+from nemlib.parser.ast_nodes import TypeFamilyDeclNode
+from nemlib.parser.parser import parse_config
+
+# Operand type expressions besides type parameters and element types
+ABSENT = "absent"
+ANY_SUPPORTED = "any_supported"
+
+
+@dataclass(frozen=True, slots=True)
+class TypeVariant:
+    name: str  # "no_bias"
+    operands: tuple[tuple[str, str], ...]  # variant-specific bindings, e.g. (("B", "absent"),)
+    conformance: tuple[tuple[str, tuple[str, ...]], ...]  # (("MUST", ("f16",)), ("MAY", ...))
+
+
+@dataclass(frozen=True, slots=True)
+class VariantInstance:
+    """One variant at one type instantiation, e.g. ``gemm.float<f16>.no_bias``."""
+
+    ref: str
+    family: str
+    variant: str
+    instantiation: tuple[str, ...]
+    conformance: str  # "MUST" | "MAY"
+    # operand -> element type, ABSENT or ANY_SUPPORTED (parameters substituted)
+    operands: FrozenDict[str, str]
+    accum: str | None = None
+    quant: str | None = None  # "required" | "absent"
+    quant_target: str | None = None  # operand named by ``quant = required on <operand>``
+
+
+@dataclass(frozen=True, slots=True)
+class TypeFamily:
+    family_id: str  # "gemm.float"
+    type_params: tuple[tuple[str, tuple[str, ...]], ...]  # (("T", ("f16", "bf16", "f32")),)
+    operands: tuple[tuple[str, str], ...]  # (("A", "T"), ("B", "T"), ("Y", "T"))
+    attributes: FrozenDict[str, str]  # {"accum": "f32", "quant": "absent"}
+    variants: tuple[TypeVariant, ...]
+    quant_target: str | None = None
+    location: SourceLocation | None = None
+
+    @classmethod
+    def from_node(cls, node: TypeFamilyDeclNode) -> TypeFamily:
+        quant_target = next((a.target for a in node.attributes if a.name == "quant"), None)
+        return cls(
+            family_id=node.family_id,
+            type_params=tuple((p.name, p.allowed) for p in node.type_params),
+            operands=tuple((b.operand, b.type_expr) for b in node.operands),
+            attributes=FrozenDict((a.name, a.value) for a in node.attributes),
+            variants=tuple(
+                TypeVariant(
+                    v.name,
+                    tuple((b.operand, b.type_expr) for b in v.operands),
+                    tuple((c.conformance, c.instantiation) for c in v.conformance),
+                )
+                for v in node.variants
+            ),
+            quant_target=quant_target,
+            location=node.location,
+        )
+
+    def instances(self) -> Iterator[VariantInstance]:
+        """Every (variant, instantiation) the family lists a conformance class for."""
+        names = [name for name, _ in self.type_params]
+        for variant in self.variants:
+            bindings = dict(self.operands)
+            bindings.update(variant.operands)
+            for conformance, inst in variant.conformance:
+                subst = dict(zip(names, inst))
+                spelled = f"<{', '.join(inst)}>" if inst else ""
+                yield VariantInstance(
+                    ref=f"{self.family_id}{spelled}.{variant.name}",
+                    family=self.family_id,
+                    variant=variant.name,
+                    instantiation=inst,
+                    conformance=conformance,
+                    operands=FrozenDict((op, subst.get(t, t)) for op, t in bindings.items()),
+                    accum=self.attributes.get("accum"),
+                    quant=self.attributes.get("quant"),
+                    quant_target=self.quant_target,
+                )
+
+
+def families_from_nodes(nodes: Iterable[TypeFamilyDeclNode]) -> tuple[TypeFamily, ...]:
+    return tuple(TypeFamily.from_node(node) for node in nodes)
+
+
+@lru_cache(maxsize=1)
+def baseline_families() -> tuple[TypeFamily, ...]:
+    """The 13 normative NEM 1.0 type families."""
+    doc, diag = parse_config(BASELINE_TYPE_FAMILIES, "<nem_baseline_1.0 type families>")
+    if diag.has_errors():
+        raise RuntimeError(f"invalid built-in type families:\n{diag.format_all()}")
+    return families_from_nodes(doc.type_families)
+
+
+ELEMENT_TYPES: tuple[str, ...] = tuple(t.value for t in ElementType)
+
+# Spec appendix "Type Family Definitions (Normative)", NEM 1.0.
+BASELINE_TYPE_FAMILIES = """
+type_family conv2d.float<T: {f16, bf16, f32}> {
+    X: T
+    W: T
+    Y: T
+    accum = f32
+    quant = absent
+    variants:
+      no_bias: { B: absent }
+        conformance: { MUST <f16>   MAY <bf16>   MAY <f32> }
+      with_bias: { B: T }
+        conformance: { MUST <f16>   MAY <bf16>   MAY <f32> }
+}
+
+type_family conv2d.int8<T_out: {i8, i16}> {
+    X: i8
+    W: i8
+    Y: T_out
+    accum = i32
+    quant = required
+    variants:
+      no_bias: { B: absent }
+        conformance: { MUST <i8> }
+      with_bias: { B: i32 }
+        conformance: { MUST <i8>   MAY <i16> }
+}
+
+type_family conv2d.int4 {
+    X: i8
+    W: i4
+    Y: i8
+    accum = i32
+    quant = required
+    variants:
+      no_bias: { B: absent }
+        conformance: { MAY }
+      with_bias: { B: i32 }
+        conformance: { MAY }
+}
+
+type_family gemm.float<T: {f16, bf16, f32}> {
+    A: T
+    B: T
+    Y: T
+    accum = f32
+    quant = absent
+    variants:
+      no_bias: { C: absent }
+        conformance: { MUST <f16>   MAY <bf16>   MAY <f32> }
+      with_bias: { C: T }
+        conformance: { MUST <f16> }
+}
+
+type_family gemm.int8<T_out: {i8, i16}> {
+    A: i8
+    B: i8
+    Y: T_out
+    accum = i32
+    quant = required
+    variants:
+      no_bias: { C: absent }
+        conformance: { MUST <i8> }
+      with_bias: { C: i32 }
+        conformance: { MUST <i8>   MAY <i16> }
+}
+
+type_family gemm.int4 {
+    A: i8
+    B: i4
+    Y: i8
+    accum = i32
+    quant = required
+    variants:
+      no_bias: { C: absent }
+        conformance: { MAY }
+      with_bias: { C: i32 }
+        conformance: { MAY }
+}
+
+type_family eltwise<T: {i8, i16, i32, f16, bf16, f32}> {
+    input: T
+    output: T
+    variants:
+      default: {}
+        conformance: { MUST <i8>   MUST <f16>   MAY <i16>   MAY <i32>   MAY <bf16>   MAY <f32> }
+}
+
+type_family view<T: {i8, i16, i32, f16, bf16, f32}> {
+    input: T
+    output: T
+    variants:
+      default: {}
+        conformance: { MUST <i8>   MUST <f16>   MAY <i16>   MAY <i32>   MAY <bf16>   MAY <f32> }
+}
+
+type_family norm<T: {f16, bf16, f32}> {
+    input: T
+    output: T
+    variants:
+      default: {}
+        conformance: { MUST <f16>   MAY <bf16>   MAY <f32> }
+}
+
+type_family softmax<T: {f16, bf16, f32}> {
+    input: T
+    output: T
+    variants:
+      default: {}
+        conformance: { MUST <f16>   MAY <bf16>   MAY <f32> }
+}
+
+type_family cast {
+    src: any_supported
+    dst: any_supported
+    variants:
+      default: {}
+        conformance: { MUST }
+}
+
+type_family quantize<T_src: {f16, f32}, T_dst: {i8}> {
+    src: T_src
+    dst: T_dst
+    quant = required on dst
+    variants:
+      default: {}
+        conformance: { MUST <f16, i8>   MAY <f32, i8> }
+}
+
+type_family dequantize<T_src: {i8}, T_dst: {f16, f32}> {
+    src: T_src
+    dst: T_dst
+    quant = required on src
+    variants:
+      default: {}
+        conformance: { MUST <i8, f16>   MAY <i8, f32> }
+}
+"""
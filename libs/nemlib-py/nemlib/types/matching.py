@@ -0,0 +1,125 @@
+"""
+Opcode instance matching (spec: Type Family Matching Rule, Device Validity Rule).
+
+``match_opcode_instance`` finds the type family variant an opcode instance
+matches. The operand element types are looked up in the opcode's compiled
+:class:`~nemlib.types.registry.SignatureTable`; the few candidates that
+come back are filtered by ``accum_type`` and by the device's effective type
+family set. When several variants match, the first one wins, with MUST
+variants preferred over MAY ones.
+
+Quantization constraints (``quant = required``) concern region metadata and
+are checked with the regions, not here.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from nemlib.core.elements import ElementType
+from nemlib.device.model import DeviceConfig
+from nemlib.types.families import VariantInstance
+from nemlib.types.registry import SignatureTable, TypeFamilyRegistry
+
+
+@dataclass(frozen=True, slots=True)
+class MatchResult:
+    matched: bool
+    variant_ref: str | None  # e.g. "gemm.float<f16>.no_bias"
+    conformance: str | None  # "MUST" or "MAY"
+    error_detail: str | None = None  # why matching failed (if not matched)
+
+
+def match_opcode_instance(
+    opcode: str,
+    operand_types: Mapping[str, ElementType | str],
+    attributes: Mapping[str, Any],
+    device: DeviceConfig | None,
+    registry: TypeFamilyRegistry,
+) -> MatchResult:
+    """Match one opcode instance; ``device=None`` accepts any MUST or MAY variant."""
+    table = registry.table(opcode)
+    candidates = table.lookup(operand_types)
+    if candidates:
+        accum = _accum(attributes)
+        effective = device.effective_types.get(opcode, _NONE) if device is not None else None
+        for cand in candidates:
+            if accum is not None and cand.accum is not None and cand.accum != accum:
+                continue
+            if effective is None or cand.ref in effective:
+                result = _MATCHED.get(cand)
+                if result is None:
+                    result = _MATCHED[cand] = MatchResult(True, cand.ref, cand.conformance)
+                return result
+    return _mismatch(opcode, operand_types, attributes, device, table)
+
+
+_NONE: frozenset[str] = frozenset()
+
+# Successful results are shared: one MatchResult per variant instance
+_MATCHED: dict[VariantInstance, MatchResult] = {}
+
+
+def _accum(attributes: Mapping[str, Any]) -> str | None:
+    accum = attributes.get("accum_type") if attributes else None
+    return getattr(accum, "value", accum)
+
+
+def _mismatch(
+    opcode: str,
+    operand_types: Mapping[str, ElementType | str],
+    attributes: Mapping[str, Any],
+    device: DeviceConfig | None,
+    table: SignatureTable,
+) -> MatchResult:
+    if not table.instances:
+        return MatchResult(False, None, None, f"opcode '{opcode}' has no type family")
+    accum = _accum(attributes)
+    candidates = [
+        c for c in table.lookup(operand_types) if accum is None or c.accum in (None, accum)
+    ]
+    signature = ", ".join(
+        f"{name}: {operand_types.get(name) or 'absent'}" for name in table.operands
+    )
+    if candidates:
+        assert device is not None
+        names = ", ".join(f"{c.ref} ({c.conformance})" for c in candidates)
+        return MatchResult(
+            False,
+            None,
+            None,
+            f"{opcode} ({signature}) matches {names}, which device '{device.name}' "
+            "does not support",
+        )
+    detail = f"no type family variant of {opcode} accepts ({signature})"
+    if accum is not None:
+        detail += f" with accum_type = {accum}"
+    nearest = _nearest(table, operand_types, device)
+    if nearest is not None:
+        detail += f"; nearest variant: {nearest.ref}"
+    return MatchResult(False, None, None, detail)
+
+
+def _nearest(
+    table: SignatureTable,
+    operand_types: Mapping[str, ElementType | str],
+    device: DeviceConfig | None,
+) -> VariantInstance | None:
+    """The applicable variant (preferably one the device supports) whose operand
+    types differ from the instance's in the fewest places."""
+    effective = device.effective_types.get(table.opcode, frozenset()) if device else None
+    signatures: dict[VariantInstance, list[tuple[str | None, ...]]] = {}
+    for entry, insts in table.entries.items():
+        for inst in insts:
+            signatures.setdefault(inst, []).append(entry)
+    key = table.key(operand_types)
+    best: tuple[tuple[int, int, int], VariantInstance] | None = None
+    for rank, inst in enumerate(table.instances):
+        distance = min(sum(a != b for a, b in zip(key, entry)) for entry in signatures[inst])
+        unsupported = int(effective is not None and inst.ref not in effective)
+        score = (unsupported, distance, rank)
+        if best is None or score < best[0]:
+            best = (score, inst)
+    return best[1] if best is not None else None
@@ -0,0 +1,181 @@
+"""
+Type family registry: families by id and compiled per-opcode signature tables.
+
+Family operand names are bound to opcode operands (from the opcode registry)
+as follows:
+
+* a family operand with the name of an opcode operand binds that operand
+  (``gemm``: ``A``, ``B``, ``C``, ``Y``; ``conv2d``: ``X``, ``W``, ``B``, ``Y``);
+* ``input``/``src`` bind every typed input operand. For binary elementwise
+  ops both inputs share ``T``; for ``layernorm``/``rmsnorm``, ``scale`` and
+  ``bias`` must match ``T`` when present;
+* ``output``/``dst`` bind every output operand.
+
+Index operands (``gather``'s ``indices``) carry their own integer type and
+are not part of the signature.
+
+A :class:`SignatureTable` maps the tuple of operand element types (``None``
+for an absent optional operand) to the variant instances that accept it.
+Matching an instance is then one tuple build and one dict lookup, no matter
+how many families or variants apply to the opcode.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from itertools import product
+from typing import Any
+
+from nemlib.core.opcodes import OpcodeInfo, OpcodeRegistry, get_registry
+from nemlib.device.model import FrozenDict
+from nemlib.types.families import (
+    ABSENT,
+    ANY_SUPPORTED,
+    ELEMENT_TYPES,
+    TypeFamily,
+    VariantInstance,
+    baseline_families,
+)
+
+_INPUT_ROLES = frozenset({"input", "src"})
+_OUTPUT_ROLES = frozenset({"output", "dst"})
+_UNTYPED_OPERANDS = frozenset({"indices"})
+
+_ANY: tuple[str | None, ...] = ELEMENT_TYPES
+_ANY_OR_ABSENT: tuple[str | None, ...] = (*ELEMENT_TYPES, None)
+
+SignatureKey = tuple[str | None, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class SignatureTable:
+    """Operand-type tuple -> accepting variant instances, for one opcode."""
+
+    opcode: str
+    operands: tuple[str, ...]  # key order
+    entries: Mapping[SignatureKey, tuple[VariantInstance, ...]]
+    instances: tuple[VariantInstance, ...]  # every instance applicable to the opcode
+
+    def key(self, operand_types: Mapping[str, Any]) -> SignatureKey:
+        return tuple(map(operand_types.get, self.operands))
+
+    def lookup(self, operand_types: Mapping[str, Any]) -> tuple[VariantInstance, ...]:
+        return self.entries.get(self.key(operand_types), ())
+
+
+class TypeFamilyRegistry:
+    """Immutable set of type families, indexed by family id and by opcode."""
+
+    __slots__ = ("families", "opcodes", "_instances", "_tables")
+
+    def __init__(
+        self, families: Iterable[TypeFamily], opcodes: OpcodeRegistry | None = None
+    ) -> None:
+        self.families: FrozenDict[str, TypeFamily] = FrozenDict(
+            (family.family_id, family) for family in families
+        )
+        self.opcodes = opcodes if opcodes is not None else get_registry()
+        self._instances: dict[str, VariantInstance] = {
+            inst.ref: inst for family in self.families.values() for inst in family.instances()
+        }
+        self._tables: dict[str, SignatureTable] = {}
+
+    @classmethod
+    def baseline(cls, opcodes: OpcodeRegistry | None = None) -> TypeFamilyRegistry:
+        return cls(baseline_families(), opcodes)
+
+    def __contains__(self, family_id: object) -> bool:
+        return family_id in self.families
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.families)
+
+    def __len__(self) -> int:
+        return len(self.families)
+
+    def get(self, family_id: str) -> TypeFamily | None:
+        return self.families.get(family_id)
+
+    def instance(self, ref: str) -> VariantInstance | None:
+        """Look up a variant instance by reference, e.g. ``"gemm.float<f16>.no_bias"``."""
+        return self._instances.get(ref)
+
+    def families_for(self, opcode: str) -> tuple[TypeFamily, ...]:
+        info = self.opcodes.get(opcode)
+        if info is None:
+            return ()
+        return tuple(self.families[f] for f in info.type_families if f in self.families)
+
+    def table(self, opcode: str) -> SignatureTable:
+        """The compiled signature table of ``opcode`` (built on first use)."""
+        table = self._tables.get(opcode)
+        if table is None:
+            table = self._tables[opcode] = self._compile(opcode)
+        return table
+
+    # -- compilation ------------------------------------------------------
+
+    def _compile(self, opcode: str) -> SignatureTable:
+        info = self.opcodes.get(opcode)
+        if info is None:
+            return SignatureTable(opcode, (), FrozenDict(), ())
+        operands = tuple(op.name for op in info.operands if op.name not in _UNTYPED_OPERANDS)
+        entries: dict[SignatureKey, list[VariantInstance]] = {}
+        instances: list[VariantInstance] = []
+        for family in self.families_for(opcode):
+            for inst in family.instances():
+                allowed = _allowed_types(info, operands, inst)
+                if allowed is None:
+                    continue  # e.g. a with_bias variant for matmul, which has no C
+                instances.append(inst)
+                for key in product(*allowed):
+                    entries.setdefault(key, []).append(inst)
+        # MUST before MAY, so the first candidate is the most portable one
+        return SignatureTable(
+            opcode,
+            operands,
+            FrozenDict((k, tuple(sorted(v, key=_must_first))) for k, v in entries.items()),
+            tuple(instances),
+        )
+
+
+def _must_first(inst: VariantInstance) -> int:
+    return 0 if inst.conformance == "MUST" else 1
+
+
+def _allowed_types(
+    info: OpcodeInfo, operands: tuple[str, ...], inst: VariantInstance
+) -> list[tuple[str | None, ...]] | None:
+    """Per opcode operand, the element types ``inst`` accepts (``None`` = absent)."""
+    bound: dict[str, tuple[str | None, ...]] = {}
+    for name, type_expr in inst.operands.items():
+        if type_expr == ABSENT:
+            types: tuple[str | None, ...] = (None,)
+        elif type_expr == ANY_SUPPORTED:
+            types = _ANY
+        else:
+            types = (type_expr,)
+        if name in info.operand_by_name:
+            targets: tuple[str, ...] = (name,)
+        elif name in _INPUT_ROLES:
+            targets = tuple(op.name for op in info.inputs if op.name in operands)
+        elif name in _OUTPUT_ROLES:
+            targets = tuple(op.name for op in info.outputs)
+        else:
+            targets = ()
+        if not targets:
+            if type_expr != ABSENT:
+                return None
+            continue
+        for target in targets:
+            operand = info.operand_by_name[target]
+            generic = name != target
+            bound[target] = (*types, None) if generic and not operand.required else types
+    allowed: list[tuple[str | None, ...]] = []
+    for name in operands:
+        if name in bound:
+            allowed.append(bound[name])
+        else:
+            allowed.append(_ANY if info.operand_by_name[name].required else _ANY_OR_ABSENT)
+    return allowed
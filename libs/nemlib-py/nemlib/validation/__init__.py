@@ -0,0 +1,24 @@
+"""Validation (Layer 5): the ten semantic passes and the pipeline that runs them."""
+
+from nemlib.validation.pipeline import (
+    DEFAULT_PASSES,
+    PassRecord,
+    ValidationPass,
+    ValidationPipeline,
+    ValidationReport,
+    clear_validation_cache,
+    validate,
+)
+from nemlib.validation.program_index import ProgramIndex, index_program
+
+__all__ = [
+    "DEFAULT_PASSES",
+    "PassRecord",
+    "ProgramIndex",
+    "ValidationPass",
+    "ValidationPipeline",
+    "ValidationReport",
+    "clear_validation_cache",
+    "index_program",
+    "validate",
+]
@@ -0,0 +1,170 @@
+"""
+Periodic (affine plus ``mod``) analysis of loop-dependent expressions.
+
+An expression ``f`` of a loop variable ``i`` has a *periodic form* when
+``f(i) = coeff * i + h(i)`` for an integer ``coeff`` and an ``h`` that repeats
+every ``period`` iterations. Literals and other names are constant forms,
+``i`` itself is ``(1, 1)``, and forms are closed under ``+``, ``-``, scaling
+by a constant, products and quotients of purely periodic forms, and ``mod``
+by a constant of a form that keeps one sign over the loop (``mod``
+truncates, so a sign change would break the period). ``i * tile`` is
+``(tile, 1)``; the ping-pong offset ``(i mod 2) * tile`` is ``(0, 2)``.
+
+Restricted to one residue class of ``i`` modulo ``period``, a form is linear,
+so its extremes over ``[start..end]`` are reached at the first or last
+iteration of a class. Checks that compare forms (bounds, equalities) hold for
+every iteration once they hold for those at most ``2 * period`` iterations:
+:func:`sample_envs` yields just those bindings, and falls back to every
+iteration for expressions without a periodic form.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from math import lcm
+
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExpressionError,
+    ExprNode,
+    Identifier,
+    UnaryOp,
+    evaluate_int,
+)
+from nemlib.validation.program_index import LoopInfo, Scope, free_names
+
+
+@dataclass(frozen=True, slots=True)
+class PeriodicForm:
+    """``f(i) = coeff * i + h(i)`` with ``h(i + period) == h(i)``."""
+
+    coeff: int
+    period: int = 1
+
+
+CONSTANT = PeriodicForm(0)
+
+
+def periodic_form(
+    expr: ExprNode, var: str, env: Mapping[str, int], start: int, end: int
+) -> PeriodicForm | None:
+    """The periodic form of ``expr`` in ``var`` over ``[start..end]``, or None.
+
+    Names other than ``var`` are looked up in ``env`` where their value
+    matters (factors, divisors and ``mod`` operands); elsewhere they are
+    opaque constants, so enclosed loop variables may appear in sums.
+    """
+    if var not in free_names(expr):
+        return CONSTANT
+    if isinstance(expr, Identifier):
+        return PeriodicForm(1)
+    if isinstance(expr, UnaryOp):
+        inner = periodic_form(expr.operand, var, env, start, end)
+        return PeriodicForm(-inner.coeff, inner.period) if inner is not None else None
+    if not isinstance(expr, BinaryOp):
+        return None
+    left = periodic_form(expr.left, var, env, start, end)
+    right = periodic_form(expr.right, var, env, start, end)
+    if left is None or right is None:
+        return None
+    period = lcm(left.period, right.period)
+    if expr.op in ("+", "-"):
+        sign = 1 if expr.op == "+" else -1
+        return PeriodicForm(left.coeff + sign * right.coeff, period)
+    if expr.op == "*":
+        if right is CONSTANT or left is CONSTANT:
+            factor = _value(expr.right if right is CONSTANT else expr.left, env)
+            form = left if right is CONSTANT else right
+            return PeriodicForm(factor * form.coeff, form.period) if factor is not None else None
+        return PeriodicForm(0, period) if left.coeff == right.coeff == 0 else None
+    if right is not CONSTANT:
+        return None
+    divisor = _value(expr.right, env)
+    if not divisor:
+        return None
+    if expr.op == "/":
+        return PeriodicForm(0, left.period) if left.coeff == 0 else None
+    # mod: periodic in the dividend's period and the modulus, if its sign is fixed
+    values = []
+    for point in sample_points(start, end, left.period):
+        value = _value(expr.left, {**env, var: point})
+        if value is None:
+            return None
+        values.append(value)
+    if min(values) < 0 < max(values):
+        return None
+    return PeriodicForm(0, lcm(left.period, abs(divisor)))
+
+
+def sample_points(start: int, end: int, period: int) -> range | list[int]:
+    """The first and last iteration of every residue class of ``[start..end]``."""
+    if end - start + 1 <= 2 * period:
+        return range(start, end + 1)
+    return [*range(start, start + period), *range(end - period + 1, end + 1)]
+
+
+def sample_envs(
+    loops: tuple[LoopInfo, ...],
+    scope: Scope,
+    constants: Mapping[str, int],
+    exprs: Sequence[ExprNode],
+    periodic: Iterable[ExprNode] = (),
+) -> Iterator[dict[str, int]]:
+    """Bindings of the loop variables of ``scope`` that decide checks over ``exprs``.
+
+    Like :func:`~nemlib.validation.program_index.loop_envs`, but a loop whose
+    variable appears in ``exprs`` only through periodic forms contributes just
+    the first and last iteration of each residue class. ``periodic``
+    expressions must also be free of linear terms (their products are
+    compared, e.g. shape dimensions). A loop whose bounds depend on an outer
+    variable makes that outer loop enumerate every iteration.
+    """
+    checked = [(e, False) for e in exprs] + [(e, True) for e in periodic]
+    env = dict(constants)
+
+    def expand(depth: int) -> Iterator[dict[str, int]]:
+        if depth == len(scope):
+            yield env
+            return
+        loop = loops[scope[depth]]
+        try:
+            start, end = evaluate_int(loop.start, env), evaluate_int(loop.end, env)
+        except ExpressionError:
+            return
+        period = _period(loop.var, checked, scope[depth + 1 :], loops, env, start, end)
+        values = range(start, end + 1) if period is None else sample_points(start, end, period)
+        for value in values:
+            env[loop.var] = value
+            yield from expand(depth + 1)
+        env.pop(loop.var, None)
+
+    yield from expand(0)
+
+
+def _period(
+    var: str,
+    checked: Sequence[tuple[ExprNode, bool]],
+    inner: Scope,
+    loops: tuple[LoopInfo, ...],
+    env: Mapping[str, int],
+    start: int,
+    end: int,
+) -> int | None:
+    for k in inner:
+        if var in free_names(loops[k].start) | free_names(loops[k].end):
+            return None
+    period = 1
+    for expr, strict in checked:
+        form = periodic_form(expr, var, env, start, end)
+        if form is None or (strict and form.coeff):
+            return None
+        period = lcm(period, form.period)
+    return period
+
+
+def _value(expr: ExprNode, env: Mapping[str, int]) -> int | None:
+    try:
+        return evaluate_int(expr, env)
+    except ExpressionError:
+        return None
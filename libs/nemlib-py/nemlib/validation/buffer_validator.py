@@ -0,0 +1,81 @@
+"""
+Pass 3: buffer declarations.
+
+Sizes must be positive and alignments powers of two. Against a device, an
+``L1[k]`` buffer needs ``k < num_engines`` (a bare ``L1`` is ``L1[0]``), and
+the buffers of each memory level must fit its capacity (spec: Memory
+capacity rule). Each buffer is counted rounded up to its alignment; DDR is
+unbounded.
+"""
+
+from __future__ import annotations
+
+from nemlib.core.expressions import ExpressionError, ExprNode, evaluate_int
+from nemlib.device.model import DeviceConfig, FrozenDict
+from nemlib.diagnostics import DiagnosticCollector, SourceLocation
+from nemlib.parser.ast_nodes import BufferDeclNode
+from nemlib.validation.program_index import Scope
+
+
+def check_buffers(
+    diag: DiagnosticCollector,
+    buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+    constants: FrozenDict[str, int],
+    device: DeviceConfig | None,
+) -> None:
+    usage: dict[tuple[str, int], int] = {}  # (level, engine) -> bytes
+    first: dict[tuple[str, int], SourceLocation | None] = {}
+    for _, buf in buffers:
+        size = _value(buf.size, constants)
+        if size is not None and size <= 0:
+            diag.error(f"buffer '{buf.name}' has size {size}; sizes must be > 0", buf.location)
+        align = buf.align
+        if align is not None and (align <= 0 or align & (align - 1)):
+            diag.error(f"buffer '{buf.name}' alignment {align} is not a power of two", buf.location)
+            align = None
+        engine = 0
+        if buf.l1_index is not None:
+            index = _value(buf.l1_index, constants)
+            if index is None:
+                continue
+            if index < 0:
+                diag.error(f"buffer '{buf.name}' has negative L1 index {index}", buf.location)
+                continue
+            if device is not None and device.num_engines is not None:
+                if index >= device.num_engines:
+                    diag.error(
+                        f"buffer '{buf.name}' is placed in L1[{index}], but device "
+                        f"'{device.name}' has {device.num_engines} engine(s)",
+                        buf.location,
+                    )
+                    continue
+            engine = index
+        if size is None or size <= 0:
+            continue
+        if align:
+            size = -(-size // align) * align
+        key = (buf.mem_level, engine)
+        usage[key] = usage.get(key, 0) + size
+        first.setdefault(key, buf.location)
+
+    if device is None or device.is_abstract:
+        return
+    capacity = {"L1": device.l1_size_bytes, "L2": device.l2_size_bytes}
+    for (level, engine), used in usage.items():
+        limit = capacity.get(level)
+        if limit is not None and used > limit:
+            name = f"L1[{engine}]" if level == "L1" else level
+            diag.error(
+                f"{name} buffers need {used} bytes, exceeding the {limit}-byte capacity "
+                f"of device '{device.name}'",
+                first[(level, engine)],
+            )
+
+
+def _value(expr: ExprNode | None, constants: FrozenDict[str, int]) -> int | None:
+    if expr is None:
+        return None
+    try:
+        return evaluate_int(expr, constants)
+    except ExpressionError:
+        return None  # reported by the expression pass, or uses a loop variable
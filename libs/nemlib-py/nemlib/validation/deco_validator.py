@@ -0,0 +1,172 @@
+"""
+Pass 9: decorators (spec: Decorators).
+
+Every decorator must be known (:data:`~nemlib.core.decorators.DECORATORS`),
+be attached to something it applies to, and take the expected arguments.
+``@resource`` accepts only NMU, CSTL, DMA and VPU; a unit type the device
+lacks is translated by the implementation, so it is only a warning.
+A region cannot be both ``@readonly`` and ``@writeonly``, and tasks must not
+write a ``@readonly`` region or read a ``@writeonly`` one.
+"""
+
+from __future__ import annotations
+
+from nemlib.core.decorators import BUFFER, DECORATORS, LOOP, REGION, RESOURCE_UNITS, TASK
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExpressionError,
+    Identifier,
+    IntLiteral,
+    UnaryOp,
+    evaluate_int,
+)
+from nemlib.device.model import DeviceConfig, FrozenDict
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser.ast_nodes import (
+    BufferDeclNode,
+    DecoratorNode,
+    StringNode,
+    TaskNode,
+    UnitRefNode,
+    WaitNode,
+)
+from nemlib.validation.program_index import (
+    Declarations,
+    LoopInfo,
+    RegionInfo,
+    Scope,
+    has_decorator,
+)
+
+
+def check_decorators(
+    diag: DiagnosticCollector,
+    buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+    regions: tuple[RegionInfo, ...],
+    tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...],
+    loops: tuple[LoopInfo, ...],
+    constants: FrozenDict[str, int],
+    device: DeviceConfig | None,
+) -> None:
+    check = _Checker(diag, constants, device)
+    for _, buf in buffers:
+        check.all(buf.decorators, BUFFER, f"buffer '{buf.name}'")
+    for region in regions:
+        what = f"region '{region.name}'" if region.name else "operand"
+        check.all(region.decorators, REGION, what)
+        if has_decorator(region.decorators, "readonly") and has_decorator(
+            region.decorators, "writeonly"
+        ):
+            diag.error(f"{what} cannot be both @readonly and @writeonly", region.location)
+    for loop in loops:
+        check.all(loop.decorators, LOOP, f"loop over '{loop.var}'")
+
+    decls = Declarations(buffers, regions)
+    for scope, task in tasks:
+        what = "wait" if isinstance(task, WaitNode) else _name(task)
+        check.all(task.decorators, TASK, what)
+        if isinstance(task, WaitNode):
+            continue
+        for op in (*task.inputs, *task.outputs):
+            if op.region is None:  # inline regions are checked with the regions
+                check.all(op.decorators, REGION, f"operand '{op.name}' of {what}")
+        for ops, forbidden, verb in (
+            (task.inputs, "writeonly", "reads"),
+            (task.outputs, "readonly", "writes"),
+        ):
+            for op in ops:
+                info = decls.operand(scope, op)
+                if info is not None and has_decorator(info.decorators, forbidden):
+                    target = f"region '{info.name}'" if info.name else "its operand"
+                    diag.error(f"{what} {verb} @{forbidden} {target}", op.location)
+
+
+class _Checker:
+    def __init__(
+        self,
+        diag: DiagnosticCollector,
+        constants: FrozenDict[str, int],
+        device: DeviceConfig | None,
+    ) -> None:
+        self.diag = diag
+        self.constants = constants
+        self.device = device
+
+    def all(self, decorators: tuple[DecoratorNode, ...], target: str, what: str) -> None:
+        seen: set[str] = set()
+        for deco in decorators:
+            spec = DECORATORS.get(deco.name)
+            if spec is None:
+                self.diag.error(f"unknown decorator '@{deco.name}' on {what}", deco.location)
+                continue
+            if target not in spec.targets:
+                self.diag.error(f"@{deco.name} does not apply to {what}", deco.location)
+                continue
+            if deco.name in seen and not spec.informational:
+                self.diag.error(f"duplicate @{deco.name} on {what}", deco.location)
+            seen.add(deco.name)
+            self.arguments(deco, spec.args, what)
+
+    def arguments(self, deco: DecoratorNode, kind: str, what: str) -> None:
+        args = deco.args
+        if kind == "none":
+            if args:
+                self.diag.error(f"@{deco.name} takes no arguments", deco.location)
+            return
+        if len(args) != 1:
+            self.diag.error(f"@{deco.name} takes exactly one argument", deco.location)
+            return
+        arg = args[0]
+        if kind == "name":
+            if not isinstance(arg, Identifier | StringNode):
+                self.diag.error(f"@{deco.name} argument must be a name", deco.location)
+        elif kind == "int":
+            self.integer(deco, arg, what)
+        elif kind == "unit":
+            self.unit(deco, arg, what)
+
+    def integer(self, deco: DecoratorNode, arg: object, what: str) -> None:
+        if not isinstance(arg, IntLiteral | Identifier | UnaryOp | BinaryOp):
+            self.diag.error(f"@{deco.name} argument must be an integer", deco.location)
+            return
+        try:
+            value = evaluate_int(arg, self.constants)
+        except ExpressionError:
+            return  # depends on a loop variable, or reported by name resolution
+        if deco.name == "seq_engine":
+            engines = self.device.num_engines if self.device is not None else None
+            if value < 0 or (engines is not None and value >= engines):
+                device = self.device.name if self.device is not None else ""
+                self.diag.error(
+                    f"@seq_engine({value}) on {what} is not an engine of device '{device}'"
+                    if engines is not None
+                    else f"@seq_engine({value}) on {what} must be >= 0",
+                    deco.location,
+                )
+
+    def unit(self, deco: DecoratorNode, arg: object, what: str) -> None:
+        if not isinstance(arg, UnitRefNode):
+            self.diag.error(
+                f"@{deco.name} argument must be a unit reference such as NMU[0]", deco.location
+            )
+            return
+        if arg.unit not in RESOURCE_UNITS:
+            self.diag.error(
+                f"@{deco.name}({arg.unit}[...]) on {what}: {arg.unit} is not a valid resource; "
+                f"expected one of {', '.join(RESOURCE_UNITS)}",
+                deco.location,
+            )
+            return
+        device = self.device
+        if device is not None and device.num_engines is not None:
+            count = device.per_engine.get(arg.unit, device.device_units.get(arg.unit, 0))
+            if not count:
+                self.diag.warning(
+                    f"device '{device.name}' has no {arg.unit} units; {what} will be "
+                    "translated to other units",
+                    deco.location,
+                )
+
+
+def _name(task: TaskNode) -> str:
+    return f"task '{task.token}'" if task.token else f"{task.task_type} task"
@@ -0,0 +1,72 @@
+"""
+Pass 6: token dependencies.
+
+A token named in ``deps`` or ``wait`` binds to the latest task that produces
+it earlier in source order. Failing that, a producer later in the body of a
+loop that also encloses the use is a *loop-carried* dependency on the
+previous iteration (satisfied trivially in the first one). Any other use
+precedes its producer and is an error.
+
+The resolved bindings are provided as the ``token_bindings`` artifact, one
+tuple per entry of the ``tasks`` facet.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser.ast_nodes import TaskNode, WaitNode
+from nemlib.validation.program_index import Scope
+
+
+@dataclass(frozen=True, slots=True)
+class TokenBinding:
+    token: str
+    producer: int  # index into the tasks facet
+    carried: bool = False  # refers to the producer's previous loop iteration
+
+
+TokenBindings = tuple[tuple[TokenBinding, ...], ...]
+
+
+def check_dependencies(
+    diag: DiagnosticCollector,
+    tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...],
+) -> TokenBindings:
+    producers: dict[str, list[int]] = {}
+    for index, (_, task) in enumerate(tasks):
+        if isinstance(task, TaskNode) and task.token is not None:
+            producers.setdefault(task.token, []).append(index)
+
+    bindings: list[tuple[TokenBinding, ...]] = []
+    for index, (scope, task) in enumerate(tasks):
+        refs = task.deps if isinstance(task, TaskNode) else task.tokens
+        resolved: list[TokenBinding] = []
+        for token in refs:
+            candidates = producers.get(token)
+            if not candidates:
+                continue  # reported by name resolution
+            earlier = [p for p in candidates if p < index]
+            if earlier:
+                resolved.append(TokenBinding(token, earlier[-1]))
+                continue
+            carried = next((p for p in candidates if _common_loop(scope, tasks[p][0])), None)
+            if carried is not None:
+                resolved.append(TokenBinding(token, carried, carried=True))
+                continue
+            where = tasks[candidates[0]][1].location
+            if candidates[0] == index:
+                diag.error(f"task '{token}' depends on its own token", task.location)
+            else:
+                diag.error(
+                    f"token '{token}' is used before it is produced"
+                    + (f" (at {where})" if where else ""),
+                    task.location,
+                )
+        bindings.append(tuple(resolved))
+    return tuple(bindings)
+
+
+def _common_loop(a: Scope, b: Scope) -> bool:
+    return bool(a) and bool(b) and a[0] == b[0]
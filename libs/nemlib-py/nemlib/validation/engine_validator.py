@@ -0,0 +1,99 @@
+"""
+Pass 8: engine placement (spec: Task Placement and Engine Assignment).
+
+A task that references a region in ``L1[k]`` executes on engine ``k``, so it
+must not also reference ``L1[j]`` for ``j != k``, and a ``@seq_engine(k)``
+decorator must agree with its L1 references. Buffer indices that depend on a
+loop variable are checked for every iteration (only at the first and last
+iteration of each residue class when they have periodic forms, see
+:mod:`nemlib.validation.affine`); the first conflicting one is reported.
+(``k < num_engines`` is checked with the buffers.)
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExpressionError,
+    Identifier,
+    IntLiteral,
+    UnaryOp,
+    evaluate_int,
+)
+from nemlib.device.model import FrozenDict
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser.ast_nodes import BufferDeclNode, TaskNode, WaitNode
+from nemlib.validation.affine import sample_envs
+from nemlib.validation.program_index import (
+    Declarations,
+    LoopInfo,
+    RegionInfo,
+    Scope,
+    decorator,
+    describe_binding,
+)
+
+_EXPRS = (IntLiteral, Identifier, UnaryOp, BinaryOp)
+
+
+def check_engines(
+    diag: DiagnosticCollector,
+    buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+    regions: tuple[RegionInfo, ...],
+    tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...],
+    loops: tuple[LoopInfo, ...],
+    constants: FrozenDict[str, int],
+) -> None:
+    decls = Declarations(buffers, regions)
+    for scope, task in tasks:
+        if not isinstance(task, TaskNode):
+            continue
+        l1: list[BufferDeclNode] = []
+        for op in (*task.inputs, *task.outputs):
+            info = decls.operand(scope, op)
+            buf = decls.buffer(info.scope, info.region.buffer) if info else None
+            if buf is not None and buf.mem_level == "L1" and buf not in l1:
+                l1.append(buf)
+        seq = decorator(task.decorators, "seq_engine")
+        if not l1 or (len(l1) == 1 and seq is None):
+            continue
+        name = f"task '{task.token}'" if task.token else f"{task.task_type} task"
+        exprs = [b.l1_index for b in l1 if b.l1_index is not None]
+        if seq is not None:
+            exprs.extend(a for a in seq.args if isinstance(a, _EXPRS))
+        for env in sample_envs(loops, scope, constants, exprs):
+            engines = _engines(l1, env)
+            if engines is None:
+                break
+            message = None
+            if len(set(engines.values())) > 1:
+                refs = ", ".join(f"'{b}' in L1[{k}]" for b, k in engines.items())
+                message = f"{name} references L1 of different engines: {refs}"
+            elif seq is not None and len(seq.args) == 1:
+                arg = seq.args[0]
+                if isinstance(arg, _EXPRS):
+                    try:
+                        target = evaluate_int(arg, env)
+                    except ExpressionError:
+                        break
+                    (engine,) = set(engines.values())
+                    if engine != target:
+                        message = (
+                            f"{name} is pinned to engine {target} by @seq_engine but "
+                            f"references L1[{engine}]"
+                        )
+            if message is not None:
+                diag.error(message + describe_binding(loops, scope, env), task.location)
+                break
+
+
+def _engines(buffers: list[BufferDeclNode], env: Mapping[str, int]) -> dict[str, int] | None:
+    engines: dict[str, int] = {}
+    for buf in buffers:
+        try:
+            engines[buf.name] = evaluate_int(buf.l1_index, env) if buf.l1_index else 0
+        except ExpressionError:
+            return None
+    return engines
@@ -0,0 +1,57 @@
+"""
+Pass 2: constant expression evaluation.
+
+Evaluates the ``const`` declarations in order and provides them as the
+``constants`` artifact. Buffer and region expressions that use only
+constants are evaluated too, so division by zero or a non-integer result is
+reported once, here; expressions that mention a loop variable are deferred to
+the passes that expand the loop.
+"""
+
+from __future__ import annotations
+
+from nemlib.core.expressions import ExpressionError, ExprNode, evaluate_int
+from nemlib.device.model import FrozenDict
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser.ast_nodes import BufferDeclNode, ConstDeclNode
+from nemlib.validation.program_index import LoopInfo, RegionInfo, Scope, free_names
+
+
+def evaluate_constants(
+    diag: DiagnosticCollector,
+    consts: tuple[tuple[Scope, ConstDeclNode], ...],
+    buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+    regions: tuple[RegionInfo, ...],
+    loops: tuple[LoopInfo, ...],
+) -> FrozenDict[str, int]:
+    values: dict[str, int] = {}
+    for _, const in consts:
+        try:
+            values[const.name] = evaluate_int(const.value, values)
+        except ExpressionError as e:
+            diag.error(f"constant '{const.name}': {e.message}", e.location or const.location)
+
+    def check(expr: ExprNode | None, what: str) -> None:
+        if expr is None or not free_names(expr) <= values.keys():
+            return  # deferred (loop variable) or already reported
+        try:
+            evaluate_int(expr, values)
+        except ExpressionError as e:
+            diag.error(f"{what}: {e.message}", e.location or expr.location)
+
+    for _, buf in buffers:
+        check(buf.size, f"size of buffer '{buf.name}'")
+        check(buf.l1_index, f"L1 index of buffer '{buf.name}'")
+    for info in regions:
+        name = f"region '{info.name}'" if info.name else "region"
+        region = info.region
+        check(region.offset, f"offset of {name}")
+        check(region.extent, f"extent of {name}")
+        for dim in region.shape or ():
+            check(dim, f"shape of {name}")
+        for stride in region.strides or ():
+            check(stride, f"strides of {name}")
+    for loop in loops:
+        check(loop.start, f"start of loop '{loop.var}'")
+        check(loop.end, f"end of loop '{loop.var}'")
+    return FrozenDict(values)
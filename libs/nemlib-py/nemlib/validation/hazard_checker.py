@@ -0,0 +1,610 @@
+"""
+Pass 7: hazards and aliasing (spec: Hazards and Aliasing Rules).
+
+The program is expanded into task instances in program order, each with the
+byte ranges it reads (inputs) and writes (outputs). Instance ``b`` is ordered
+after ``a`` when ``b`` reaches ``a`` through:
+
+* a token dependency (bound by the dependency pass; loop-carried tokens bind
+  to the previous iteration's instance);
+* a ``wait`` or a ``.sync`` task earlier in the same loop iteration, which
+  blocks the rest of the iteration;
+* the ``@max_in_flight(N)`` window: iteration ``i + N`` starts after
+  iteration ``i`` completes (``N = 1`` by default);
+* a loop: statements after it start once all its iterations complete.
+
+Two unordered instances touching overlapping bytes of a buffer, at least one
+of them writing, are a hazard. A transfer or store whose source and
+destination overlap needs ``@memmove``.
+
+The check sweeps the instances in program order (a topological order of the
+DAG) over a per-buffer interval map, so each access is compared only with the
+accesses still unordered on its bytes, and ``a``-before-``b`` queries use
+ancestor bitsets instead of a graph search per pair.
+
+An innermost loop whose operand offsets have periodic forms in its variable
+(:mod:`nemlib.validation.affine`; one coefficient per buffer) and whose
+extents are periodic is not unrolled. Its instance graph repeats every
+``lcm(period, N)`` iterations once the window is full, and accesses drift
+apart linearly, so every race between its iterations already shows among
+the first ``N + lcm + max(lcm, reach)`` iterations, where ``reach`` is the
+distance beyond which two accesses of a buffer cannot overlap. Only those
+are expanded; the remaining iterations of each task become one *summary*
+instance covering all the bytes they touch, ordered after a full window of
+expanded iterations, which stands for them against tasks outside the loop.
+
+An asynchronous transfer whose source and destination do not depend on the
+loop variables, and whose source buffer no task writes, re-copies identical
+bytes every iteration. It is validated as if hoisted out of the loop (one
+instance, which every iteration's dependencies bind to), and an info
+diagnostic suggests doing so.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from math import lcm
+
+from nemlib.core.expressions import ExpressionError, evaluate_int
+from nemlib.device.model import FrozenDict
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser.ast_nodes import (
+    BufferDeclNode,
+    OperandNode,
+    RegionExprNode,
+    TaskNode,
+    WaitNode,
+)
+from nemlib.validation.affine import periodic_form
+from nemlib.validation.dep_validator import TokenBindings
+from nemlib.validation.program_index import (
+    Block,
+    Declarations,
+    LoopInfo,
+    RegionInfo,
+    Scope,
+    free_names,
+    has_decorator,
+    max_in_flight,
+    task_blocks,
+)
+
+# (buffer, start, end, write)
+Access = tuple[int, int, int, bool]
+
+
+@dataclass(slots=True)
+class _Instance:
+    task: int | None  # index into the tasks facet; None for loop/iteration ends
+    preds: list[int]
+    iteration: tuple[int, ...] = ()  # ordinal of each enclosing loop's iteration
+    binding: str = ""
+    accesses: list[Access] = field(default_factory=list)
+    run: int = -1  # summarized loop execution the instance belongs to
+    summary: bool = False  # stands for the unexpanded iterations of a task
+
+
+def check_hazards(
+    diag: DiagnosticCollector,
+    buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+    regions: tuple[RegionInfo, ...],
+    tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...],
+    loops: tuple[LoopInfo, ...],
+    constants: FrozenDict[str, int],
+    token_bindings: TokenBindings,
+) -> None:
+    hoisted = _invariant_transfers(buffers, regions, tasks, loops)
+    expansion = _Expansion(buffers, regions, tasks, loops, token_bindings, hoisted)
+    expansion.block(task_blocks(tasks), dict(constants), [], ())
+    instances = expansion.instances
+
+    for index, (_, task) in enumerate(tasks):
+        if isinstance(task, TaskNode) and task.kind != "compute":
+            if index in expansion.self_overlap and not has_decorator(task.decorators, "memmove"):
+                diag.error(
+                    f"{_name(task)} has overlapping source and destination and requires @memmove",
+                    task.location,
+                )
+
+    precedes = _Reachability(instances).precedes
+    reported: set[tuple[int, int]] = set()
+    maps = [_IntervalMap() for _ in expansion.buffer_names]
+    superseded: dict[int, set[int]] = {}
+    for node, inst in enumerate(instances):
+        found: set[int] = set()
+        dropped: set[int] = set()
+        # reads first, so an in-place task's own read does not outlive its write
+        for buf, lo, hi, write in sorted(inst.accesses, key=lambda a: a[3]):
+            maps[buf].access(lo, hi, node, write, precedes, found, dropped)
+        if dropped:
+            superseded[node] = dropped
+        # An access dropped from a frontier was ordered before the one that replaced
+        # it; if that one races with this instance, so may the dropped access.
+        work = list(found)
+        while work:
+            for s in superseded.get(work.pop(), ()):
+                if s in found or precedes(s, node):
+                    continue
+                if _conflict(instances[s].accesses, inst.accesses) is not None:
+                    found.add(s)
+                    work.append(s)
+        for other in sorted(found):
+            first = instances[other]
+            if first.run == inst.run != -1 and (first.summary or inst.summary):
+                continue  # races within a summarized loop show in its expanded iterations
+            assert first.task is not None and inst.task is not None
+            if (first.task, inst.task) in reported:
+                continue
+            reported.add((first.task, inst.task))
+            conflict = _conflict(first.accesses, inst.accesses)
+            assert conflict is not None
+            t1, t2 = tasks[first.task][1], tasks[inst.task][1]
+            diag.error(
+                f"hazard: {_name(t1)}{first.binding} and {_name(t2)}{inst.binding} access "
+                f"overlapping bytes [{conflict[1]}, {conflict[2]}) of buffer "
+                f"'{expansion.buffer_names[conflict[0]]}' and at least one writes them, but "
+                "no dependency orders them",
+                t2.location,
+            )
+    for index in sorted(hoisted):
+        task = tasks[index][1]
+        loop = loops[tasks[index][0][-1]]
+        diag.info(
+            f"{_name(task)} does not depend on loop variable '{loop.var}' and can be "
+            "hoisted out of the loop",
+            task.location,
+        )
+
+
+class _Expansion:
+    def __init__(
+        self,
+        buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+        regions: tuple[RegionInfo, ...],
+        tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...],
+        loops: tuple[LoopInfo, ...],
+        token_bindings: TokenBindings,
+        hoisted: set[int],
+    ) -> None:
+        self.decls = Declarations(buffers, regions)
+        self.tasks = tasks
+        self.loops = loops
+        self.bindings = token_bindings
+        self.hoisted = hoisted
+        self.instances: list[_Instance] = []
+        self.last: dict[int, int] = {}  # task index -> latest instance
+        self.buffer_ids: dict[int, int] = {}  # id(BufferDeclNode) -> buffer number
+        self.buffer_names: list[str] = []
+        self.self_overlap: set[int] = set()
+
+    def add(self, instance: _Instance) -> int:
+        self.instances.append(instance)
+        return len(self.instances) - 1
+
+    def block(
+        self, block: Block, env: dict[str, int], barrier: list[int], iteration: tuple[int, ...]
+    ) -> list[int]:
+        created: list[int] = []
+        for item in block:
+            if isinstance(item, int):
+                if item in self.hoisted and item in self.last:
+                    continue  # a hoisted transfer runs once
+                node = self.task(item, env, barrier, iteration)
+                created.append(node)
+                task = self.tasks[item][1]
+                if isinstance(task, WaitNode) or task.mode == "sync":
+                    barrier = [node]
+                continue
+            loop_index, body = item
+            loop = self.loops[loop_index]
+            try:
+                start, end = evaluate_int(loop.start, env), evaluate_int(loop.end, env)
+            except ExpressionError:
+                continue  # reported by the expression pass
+            window = max_in_flight(loop, env)
+            repetition = self.repetition(loop, body, env, start, end)
+            expanded = end - start + 1
+            if repetition is not None:
+                period, reach = repetition
+                cycle = lcm(period, window)
+                expanded = min(expanded, window + cycle + max(cycle, reach))
+            run = len(self.instances)
+            ends: list[int] = []
+            for ordinal, value in enumerate(range(start, start + expanded)):
+                env[loop.var] = value
+                before = list(barrier)
+                if ordinal >= window:
+                    before.append(ends[ordinal - window])
+                inner = self.block(body, env, before, (*iteration, ordinal))
+                ends.append(self.add(_Instance(None, inner or before, iteration)))
+                created.extend(inner)
+                created.append(ends[-1])
+            env.pop(loop.var, None)
+            if start + expanded <= end:
+                assert repetition is not None
+                for node in range(run, len(self.instances)):
+                    if self.instances[node].task not in self.hoisted:
+                        self.instances[node].run = run
+                # iteration 0 may hold hoisted instances, so follow another window chain
+                chain = expanded - window + (1 - expanded) % window
+                summaries = self.summarize(
+                    body, env, loop, (start + expanded, end), repetition[0], ends[chain], run
+                )
+                created.extend(summaries)
+                ends.extend(summaries)
+            done = self.add(_Instance(None, ends or list(barrier), iteration))
+            created.append(done)
+            barrier = [done]
+        return created
+
+    def task(
+        self, index: int, env: dict[str, int], barrier: list[int], iteration: tuple[int, ...]
+    ) -> int:
+        scope, task = self.tasks[index]
+        preds = list(barrier)
+        preds.extend(self.last[b.producer] for b in self.bindings[index] if b.producer in self.last)
+        binding = ""
+        if scope:
+            binding = (
+                " ("
+                + ", ".join(f"{self.loops[k].var} = {env.get(self.loops[k].var)}" for k in scope)
+                + ")"
+            )
+        instance = _Instance(index, preds, iteration, binding)
+        if isinstance(task, TaskNode):
+            reads = [a for op in task.inputs if (a := self.access(scope, op, env, False))]
+            writes = [a for op in task.outputs if (a := self.access(scope, op, env, True))]
+            instance.accesses = reads + writes
+            if task.kind != "compute" and _conflict(reads, writes) is not None:
+                self.self_overlap.add(index)
+        node = self.add(instance)
+        self.last[index] = node
+        return node
+
+    def access(
+        self, scope: Scope, op: OperandNode, env: Mapping[str, int], write: bool
+    ) -> Access | None:
+        operand = self.operand(scope, op)
+        if operand is None:
+            return None
+        region, number = operand
+        try:
+            offset = evaluate_int(region.offset, env)
+            extent = evaluate_int(region.extent, env)
+        except ExpressionError:
+            return None
+        return (number, offset, offset + extent, write)
+
+    def operand(self, scope: Scope, op: OperandNode) -> tuple[RegionExprNode, int] | None:
+        """The operand's region and buffer number."""
+        info = self.decls.operand(scope, op)
+        if info is None:
+            return None
+        buf = self.decls.buffer(info.scope, info.region.buffer)
+        if buf is None:
+            return None
+        number = self.buffer_ids.get(id(buf))
+        if number is None:
+            number = self.buffer_ids[id(buf)] = len(self.buffer_names)
+            self.buffer_names.append(buf.name)
+        return info.region, number
+
+    def repetition(
+        self, loop: LoopInfo, body: Block, env: dict[str, int], start: int, end: int
+    ) -> tuple[int, int] | None:
+        """``(period, reach)`` of a loop whose iterations can be summarized, else None.
+
+        ``period`` is the lcm of the periods of its accesses; two accesses of a
+        buffer ``reach`` or more iterations apart never overlap.
+        """
+        indices = [item for item in body if isinstance(item, int)]
+        if len(indices) != len(body):
+            return None  # only innermost loops
+        period = 1
+        slopes: dict[int, int] = {}
+        uses: list[tuple[RegionExprNode, int, int]] = []
+        for index in indices:
+            scope, task = self.tasks[index]
+            if index in self.hoisted or not isinstance(task, TaskNode):
+                continue
+            for op in (*task.inputs, *task.outputs):
+                operand = self.operand(scope, op)
+                if operand is None:
+                    continue
+                region, number = operand
+                shift = periodic_form(region.offset, loop.var, env, start, end)
+                size = periodic_form(region.extent, loop.var, env, start, end)
+                if shift is None or size is None or size.coeff:
+                    return None
+                if slopes.setdefault(number, shift.coeff) != shift.coeff:
+                    return None  # accesses of one buffer drifting at different rates
+                period = lcm(period, shift.period, size.period)
+                uses.append((region, number, shift.coeff))
+        # the bytes each buffer's accesses cover over one period, net of their drift
+        lows: dict[int, int] = {}
+        highs: dict[int, int] = {}
+        covered: list[list[tuple[int, int, int]]] = [[] for _ in uses]
+        try:
+            for value in range(start, min(start + period, end + 1)):
+                env[loop.var] = value
+                for use, (region, number, coeff) in enumerate(uses):
+                    offset = evaluate_int(region.offset, env)
+                    extent = evaluate_int(region.extent, env)
+                    covered[use].append((number, offset, offset + extent))
+                    low, high = offset - coeff * value, offset + extent - coeff * value
+                    lows[number] = min(lows.get(number, low), low)
+                    highs[number] = max(highs.get(number, high), high)
+        except ExpressionError:
+            return None
+        finally:
+            env.pop(loop.var, None)
+        for spans, (_, _, coeff) in zip(covered, uses):
+            merged = _merge(spans)
+            if coeff and (len(merged) != 1 or merged[0][2] - merged[0][1] < abs(coeff) * period):
+                return None  # gaps between periods, a summary would cover extra bytes
+        reach = 0
+        for number, coeff in slopes.items():
+            if coeff and number in lows:
+                reach = max(reach, (highs[number] - lows[number]) // abs(coeff) + 1)
+        return period, reach
+
+    def summarize(
+        self,
+        body: Block,
+        env: dict[str, int],
+        loop: LoopInfo,
+        iterations: tuple[int, int],
+        period: int,
+        after: int,
+        run: int,
+    ) -> list[int]:
+        """One instance per task standing for its iterations ``first..last``."""
+        first, last = iterations
+        nodes: list[int] = []
+        for index in body:
+            assert isinstance(index, int)
+            scope, task = self.tasks[index]
+            if index in self.hoisted or not isinstance(task, TaskNode):
+                continue
+            values = ", ".join(
+                f"{v} = {first}..{last}" if v == loop.var else f"{v} = {env.get(v)}"
+                for v in (self.loops[k].var for k in scope)
+            )
+            preds = [after]
+            preds.extend(
+                self.last[b.producer]
+                for b in self.bindings[index]
+                if b.producer in self.last and self.instances[self.last[b.producer]].run != run
+            )
+            instance = _Instance(index, preds, binding=f" ({values})", run=run, summary=True)
+            for ops, write in ((task.inputs, False), (task.outputs, True)):
+                for op in ops:
+                    spans: list[tuple[int, int, int]] = []
+                    for residue in range(first, min(first + period, last + 1)):
+                        final = last - (last - residue) % period
+                        ends = []
+                        for value in (residue, final):
+                            env[loop.var] = value
+                            access = self.access(scope, op, env, write)
+                            if access is not None:
+                                ends.append(access)
+                        if ends:
+                            number = ends[0][0]
+                            spans.append((number, min(a[1] for a in ends), max(a[2] for a in ends)))
+                    env.pop(loop.var, None)
+                    instance.accesses.extend(
+                        (number, lo, hi, write) for number, lo, hi in _merge(spans)
+                    )
+            nodes.append(self.add(instance))
+            self.last[index] = nodes[-1]
+        return nodes
+
+
+def _merge(spans: list[tuple[int, int, int]]) -> list[tuple[int, int, int]]:
+    """Union of ``(buffer, start, end)`` intervals."""
+    merged: list[tuple[int, int, int]] = []
+    for number, lo, hi in sorted(spans):
+        if merged and merged[-1][0] == number and lo <= merged[-1][2]:
+            merged[-1] = (number, merged[-1][1], max(merged[-1][2], hi))
+        else:
+            merged.append((number, lo, hi))
+    return merged
+
+
+def _conflict(first: list[Access], second: list[Access]) -> tuple[int, int, int] | None:
+    for buf, lo, hi, write in first:
+        for buf2, lo2, hi2, write2 in second:
+            if buf == buf2 and (write or write2) and lo < hi2 and lo2 < hi:
+                return (buf, max(lo, lo2), min(hi, hi2))
+    return None
+
+
+# (writes, reads) that later conflicting accesses must be ordered after
+_Frontier = tuple[tuple[int, ...], tuple[int, ...]]
+_EMPTY: _Frontier = ((), ())
+
+
+class _IntervalMap:
+    """Disjoint byte segments of one buffer, each with its access frontier.
+
+    Segment ``k`` covers ``[starts[k], starts[k + 1])``. Instances are swept in
+    program order, which is a topological order of the dependency DAG: an
+    access conflicts with the frontier entries of the segments it overlaps,
+    and a frontier entry ordered before a write (or a read before a read) is
+    dropped, since anything that must follow the new access follows it too.
+    Each access therefore costs a bisection plus a check against the few
+    accesses still "in flight" on its bytes, not a scan of all earlier ones.
+    """
+
+    __slots__ = ("starts", "frontiers")
+
+    def __init__(self) -> None:
+        self.starts: list[int] = [-(1 << 62)]
+        self.frontiers: list[_Frontier] = [_EMPTY]
+
+    def _split(self, at: int) -> int:
+        k = bisect_right(self.starts, at) - 1
+        if self.starts[k] == at:
+            return k
+        self.starts.insert(k + 1, at)
+        self.frontiers.insert(k + 1, self.frontiers[k])
+        return k + 1
+
+    def access(
+        self,
+        lo: int,
+        hi: int,
+        node: int,
+        write: bool,
+        precedes: Callable[[int, int], bool],
+        unordered: set[int],
+        dropped: set[int],
+    ) -> None:
+        if lo >= hi:
+            return
+        first = self._split(lo)
+        last = self._split(hi)
+        updated: dict[int, _Frontier] = {}  # frontiers are shared between segments
+        for k in range(first, last):
+            frontier = self.frontiers[k]
+            new = updated.get(id(frontier))
+            if new is None:
+                new = updated[id(frontier)] = _advance(
+                    frontier, node, write, precedes, unordered, dropped
+                )
+            self.frontiers[k] = new
+
+
+def _advance(
+    frontier: _Frontier,
+    node: int,
+    write: bool,
+    precedes: Callable[[int, int], bool],
+    unordered: set[int],
+    dropped: set[int],
+) -> _Frontier:
+    writes, reads = frontier
+    live_writes = []
+    for w in writes:
+        if w == node or precedes(w, node):
+            if not write:
+                live_writes.append(w)  # later reads must still follow it
+            elif w != node:
+                dropped.add(w)
+        else:
+            unordered.add(w)
+            live_writes.append(w)
+    live_reads = []
+    for r in reads:
+        if r == node or precedes(r, node):
+            if r != node:
+                dropped.add(r)
+            continue
+        if write:
+            unordered.add(r)
+        live_reads.append(r)
+    if write:
+        live_writes.append(node)
+    else:
+        live_reads.append(node)
+    return tuple(live_writes), tuple(live_reads)
+
+
+class _Reachability:
+    """``a`` precedes ``b`` queries over the instance DAG.
+
+    Every instance keeps a bitset of its ancestors among the ``WINDOW``
+    instances created just before it (bit ``j`` is instance ``b - 1 - j``),
+    built from its predecessors' bitsets. Older ancestors are found by a
+    search that stops at instances whose window covers the target; those
+    answers are memoized.
+    """
+
+    WINDOW = 1024
+
+    def __init__(self, instances: list[_Instance]) -> None:
+        self.preds = [inst.preds for inst in instances]
+        mask = (1 << self.WINDOW) - 1
+        self.bits: list[int] = []
+        for b, preds in enumerate(self.preds):
+            bits = 0
+            for p in preds:
+                shift = b - 1 - p
+                if shift < self.WINDOW:
+                    bits |= ((self.bits[p] << 1) | 1) << shift
+            self.bits.append(bits & mask)
+        self.memo: dict[tuple[int, int], bool] = {}
+
+    def precedes(self, a: int, b: int) -> bool:
+        if a >= b:
+            return False
+        shift = b - 1 - a
+        if shift < self.WINDOW:
+            return bool(self.bits[b] >> shift & 1)
+        known = self.memo.get((a, b))
+        if known is None:
+            known = self.memo[(a, b)] = self._search(a, b)
+        return known
+
+    def _search(self, a: int, b: int) -> bool:
+        stack = [b]
+        seen = {b}
+        while stack:
+            for p in self.preds[stack.pop()]:
+                if p == a:
+                    return True
+                if p < a or p in seen:
+                    continue
+                shift = p - 1 - a
+                if shift < self.WINDOW:
+                    if self.bits[p] >> shift & 1:
+                        return True
+                    continue
+                seen.add(p)
+                stack.append(p)
+        return False
+
+
+def _invariant_transfers(
+    buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+    regions: tuple[RegionInfo, ...],
+    tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...],
+    loops: tuple[LoopInfo, ...],
+) -> set[int]:
+    """Async transfers inside a loop that copy the same, never-written bytes every iteration."""
+    decls = Declarations(buffers, regions)
+    written: set[int] = set()  # id() of buffers some task writes
+    for scope, task in tasks:
+        if isinstance(task, TaskNode):
+            for op in task.outputs:
+                info = decls.operand(scope, op)
+                buf = decls.buffer(info.scope, info.region.buffer) if info else None
+                if buf is not None:
+                    written.add(id(buf))
+    invariant: set[int] = set()
+    for index, (scope, task) in enumerate(tasks):
+        if not scope or not isinstance(task, TaskNode) or task.kind != "transfer":
+            continue
+        if task.mode != "async" or len(task.inputs) != 1:
+            continue
+        loop_vars = {loops[k].var for k in scope}
+        names: set[str] = set()
+        for op in (*task.inputs, *task.outputs):
+            info = decls.operand(scope, op)
+            if info is None:
+                break
+            names |= free_names(info.region.offset) | free_names(info.region.extent)
+        else:
+            src = decls.operand(scope, task.inputs[0])
+            buf = decls.buffer(src.scope, src.region.buffer) if src else None
+            if buf is not None and id(buf) not in written and not names & loop_vars:
+                invariant.add(index)
+    return invariant
+
+
+def _name(task: TaskNode | WaitNode) -> str:
+    if isinstance(task, WaitNode):
+        return "wait"
+    return f"task '{task.token}'" if task.token else f"{task.task_type} task"
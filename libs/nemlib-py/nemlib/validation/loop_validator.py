@@ -0,0 +1,67 @@
+"""
+Pass 10: loops.
+
+Constants are program-level: a ``const`` inside a loop body is an error.
+For every binding of the enclosing loops, a loop's bounds must satisfy
+``start <= end`` and its ``@max_in_flight(N)`` needs ``N >= 1``. Bounds with
+periodic forms in the enclosing loop variables are checked only at the
+bindings that bound them (:func:`~nemlib.validation.affine.sample_envs`).
+Only the first failing binding of a loop is reported.
+"""
+
+from __future__ import annotations
+
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExpressionError,
+    Identifier,
+    IntLiteral,
+    UnaryOp,
+    evaluate_int,
+)
+from nemlib.device.model import FrozenDict
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser.ast_nodes import ConstDeclNode
+from nemlib.validation.affine import sample_envs
+from nemlib.validation.program_index import (
+    LoopInfo,
+    Scope,
+    decorator,
+    describe_binding,
+)
+
+
+def check_loops(
+    diag: DiagnosticCollector,
+    consts: tuple[tuple[Scope, ConstDeclNode], ...],
+    loops: tuple[LoopInfo, ...],
+    constants: FrozenDict[str, int],
+) -> None:
+    for scope, const in consts:
+        if scope:
+            diag.error(
+                f"constant '{const.name}' is declared inside loop '{loops[scope[-1]].var}'; "
+                "constants must be declared at program level",
+                const.location,
+            )
+    for loop in loops:
+        deco = decorator(loop.decorators, "max_in_flight")
+        window = deco.args[0] if deco is not None and len(deco.args) == 1 else None
+        if not isinstance(window, IntLiteral | Identifier | UnaryOp | BinaryOp):
+            window = None
+        exprs = (loop.start, loop.end) if window is None else (loop.start, loop.end, window)
+        for env in sample_envs(loops, loop.scope, constants, exprs):
+            message = None
+            try:
+                start, end = evaluate_int(loop.start, env), evaluate_int(loop.end, env)
+                if start > end:
+                    message = f"loop '{loop.var}' has an empty range [{start}..{end}]"
+                if window is not None:
+                    value = evaluate_int(window, env)
+                    if value < 1:
+                        message = f"@max_in_flight({value}) on loop '{loop.var}' must be >= 1"
+            except ExpressionError:
+                break  # reported by the expression pass
+            if message is not None:
+                diag.error(message + describe_binding(loops, loop.scope, env), loop.location)
+                break
@@ -0,0 +1,183 @@
+"""
+Pass 1: name resolution.
+
+Every identifier must resolve to a declaration that precedes it: expressions
+to constants or loop variables, ``region(...)`` buffers to buffers, task
+operands to regions. Names are unique per scope; a loop body opens a new
+scope, so an inner declaration may shadow an outer one. Tokens in ``deps``
+and ``wait`` must be produced by some task of the program; whether the
+producer precedes the use is checked by the dependency pass.
+
+Compute attribute values (``accum_type=i32``, ``pads=[...]``) are not names
+and are left to the type checker.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from itertools import chain
+
+from nemlib.core.expressions import BinaryOp, ExprNode, Identifier, UnaryOp
+from nemlib.diagnostics import DiagnosticCollector, SourceLocation
+from nemlib.parser.ast_nodes import (
+    BufferDeclNode,
+    ConstDeclNode,
+    DecoratorNode,
+    LetDeclNode,
+    ListNode,
+    LoopNode,
+    ProgramNode,
+    RegionDeclNode,
+    RegionExprNode,
+    StmtNode,
+    TaskNode,
+    UnitRefNode,
+    ValueNode,
+    WaitNode,
+)
+
+_EXPR_KINDS = ("constant", "loop variable")
+
+
+def resolve_names(diag: DiagnosticCollector, program: ProgramNode) -> None:
+    _Resolver(diag, _all_tokens(program.statements)).block(program.statements)
+
+
+class _Resolver:
+    def __init__(self, diag: DiagnosticCollector, tokens: set[str]) -> None:
+        self.diag = diag
+        self.tokens = tokens
+        self.scopes: list[dict[str, tuple[str, SourceLocation | None]]] = [{}]
+
+    def declare(self, name: str, kind: str, loc: SourceLocation | None) -> None:
+        scope = self.scopes[-1]
+        if name in scope:
+            first = scope[name][1]
+            self.diag.error(
+                f"duplicate declaration of '{name}'"
+                + (f" (first declared at {first})" if first else ""),
+                loc,
+            )
+            return
+        scope[name] = (kind, loc)
+
+    def kind(self, name: str) -> str | None:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name][0]
+        return None
+
+    def block(self, stmts: tuple[StmtNode, ...]) -> None:
+        for stmt in stmts:
+            if isinstance(stmt, ConstDeclNode):
+                self.expr(stmt.value)
+                self.declare(stmt.name, "constant", stmt.location)
+            elif isinstance(stmt, BufferDeclNode):
+                if stmt.l1_index is not None:
+                    self.expr(stmt.l1_index)
+                if stmt.size is not None:
+                    self.expr(stmt.size)
+                else:
+                    self.diag.error(f"buffer '{stmt.name}' has no size", stmt.location)
+                self.decorators(stmt.decorators)
+                self.declare(stmt.name, "buffer", stmt.location)
+            elif isinstance(stmt, RegionDeclNode):
+                self.region(stmt.region)
+                self.decorators(stmt.decorators)
+                self.declare(stmt.name, "region", stmt.location)
+            elif isinstance(stmt, LetDeclNode):
+                self.value(stmt.value)
+                self.decorators(stmt.decorators)
+                self.declare(stmt.name, "let binding", stmt.location)
+            elif isinstance(stmt, TaskNode):
+                self.task(stmt)
+            elif isinstance(stmt, WaitNode):
+                self.token_refs(stmt.tokens, stmt.location)
+            elif isinstance(stmt, LoopNode):
+                self.expr(stmt.start)
+                self.expr(stmt.end)
+                self.decorators(stmt.decorators)
+                self.scopes.append({})
+                self.declare(stmt.var, "loop variable", stmt.location)
+                self.block(stmt.body)
+                self.scopes.pop()
+
+    def task(self, task: TaskNode) -> None:
+        for op in chain(task.inputs, task.outputs):
+            if op.region is not None:
+                self.region(op.region)
+            elif op.name is not None:
+                kind = self.kind(op.name)
+                if kind is None:
+                    self.diag.error(f"undefined region '{op.name}'", op.location)
+                elif kind != "region":
+                    self.diag.error(f"'{op.name}' is a {kind}, not a region", op.location)
+            self.decorators(op.decorators)
+        self.token_refs(task.deps, task.location)
+        self.decorators(task.decorators)
+        if task.token is not None:
+            self.declare(task.token, "token", task.location)
+
+    def token_refs(self, tokens: tuple[str, ...], loc: SourceLocation | None) -> None:
+        for token in tokens:
+            if token not in self.tokens:
+                self.diag.error(f"undefined token '{token}'", loc)
+
+    def region(self, region: RegionExprNode) -> None:
+        kind = self.kind(region.buffer)
+        if kind is None:
+            self.diag.error(f"undefined buffer '{region.buffer}'", region.location)
+        elif kind != "buffer":
+            self.diag.error(f"'{region.buffer}' is a {kind}, not a buffer", region.location)
+        for expr in (region.offset, region.extent, *(region.shape or ()), *(region.strides or ())):
+            self.expr(expr)
+
+    def value(self, value: ValueNode) -> None:
+        if isinstance(value, RegionExprNode):
+            self.region(value)
+        elif isinstance(value, ListNode):
+            for item in value.items:
+                self.value(item)
+        elif isinstance(value, Identifier | BinaryOp | UnaryOp):
+            self.expr(value)
+
+    def decorators(self, decorators: tuple[DecoratorNode, ...]) -> None:
+        for deco in decorators:
+            if deco.name not in ("max_in_flight", "seq_engine", "resource"):
+                continue  # other arguments are names or strings, not expressions
+            for arg in deco.args:
+                if isinstance(arg, UnitRefNode):
+                    self.expr(arg.index)
+                elif isinstance(arg, Identifier | BinaryOp | UnaryOp):
+                    self.expr(arg)
+
+    def expr(self, expr: ExprNode) -> None:
+        for ident in _identifiers(expr):
+            kind = self.kind(ident.name)
+            if kind is None:
+                self.diag.error(f"undefined name '{ident.name}'", ident.location)
+            elif kind not in _EXPR_KINDS:
+                self.diag.error(
+                    f"'{ident.name}' is a {kind}, not a constant or loop variable",
+                    ident.location,
+                )
+
+
+def _identifiers(expr: ExprNode) -> Iterator[Identifier]:
+    if isinstance(expr, Identifier):
+        yield expr
+    elif isinstance(expr, UnaryOp):
+        yield from _identifiers(expr.operand)
+    elif isinstance(expr, BinaryOp):
+        yield from _identifiers(expr.left)
+        yield from _identifiers(expr.right)
+
+
+def _all_tokens(stmts: tuple[StmtNode, ...]) -> set[str]:
+    tokens: set[str] = set()
+    for stmt in stmts:
+        if isinstance(stmt, TaskNode) and stmt.token is not None:
+            tokens.add(stmt.token)
+        elif isinstance(stmt, LoopNode):
+            tokens |= _all_tokens(stmt.body)
+    return tokens
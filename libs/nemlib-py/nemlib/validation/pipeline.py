@@ -0,0 +1,338 @@
+"""
+ValidationPipeline: runs the validation passes as a dependency graph.
+
+Each :class:`ValidationPass` declares the artifacts it ``requires`` and the
+one it ``provides``. The base artifacts are ``program``, ``device`` and the
+facets of :func:`~nemlib.validation.program_index.index_program` (``consts``,
+``buffers``, ``regions``, ``tasks``, ``loops``); passes add ``constants`` and
+``token_bindings``. A pass starts as soon as its inputs exist. Passes run in
+the calling thread by default; with a thread or process pool, an *offloaded*
+pass (hazard checking, whose work grows with the loop iterations rather than
+with its inputs) runs on the pool while the other passes run inline. The
+other passes take less time than shipping their inputs to a worker, and the
+GIL keeps threads from overlapping them anyway.
+A *critical* pass (name resolution) runs before every later pass, which are
+skipped if it reports errors.
+
+Pass results (diagnostics and provided artifact) are cached by fingerprints
+of the pass's inputs, so re-validating after a small edit only reruns the
+passes whose inputs changed. A fingerprint is the artifact's structural
+``hash()`` (AST nodes, device configurations and pass outputs are frozen
+dataclasses, tuples and frozen mappings), which costs a fraction of the
+passes, unlike pickling and digesting the artifacts. Unequal artifacts may
+share a hash (``hash(-1) == hash(-2)``), so a cache entry keeps the inputs
+it was computed from and is only used when they equal the pass's inputs.
+Diagnostics are always reported in pass order,
+whatever order the passes finished in, and :class:`ValidationReport` records
+the time spent in each pass.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import pickle
+import time
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, Literal
+
+from nemlib.core.cache import ContentCache, content_key
+from nemlib.device.model import DeviceConfig
+from nemlib.diagnostics import Diagnostic, DiagnosticCollector, DiagnosticSeverity
+from nemlib.parser.ast_nodes import ProgramNode
+from nemlib.validation.buffer_validator import check_buffers
+from nemlib.validation.deco_validator import check_decorators
+from nemlib.validation.dep_validator import check_dependencies
+from nemlib.validation.engine_validator import check_engines
+from nemlib.validation.expr_evaluator import evaluate_constants
+from nemlib.validation.hazard_checker import check_hazards
+from nemlib.validation.loop_validator import check_loops
+from nemlib.validation.name_resolver import resolve_names
+from nemlib.validation.program_index import index_program
+from nemlib.validation.region_validator import check_regions
+from nemlib.validation.type_checker import check_types
+
+ExecutorKind = Literal["serial", "thread", "process"]
+
+# (diagnostics, provided artifact) and, once run, (..., seconds)
+_Outcome = tuple[tuple[Diagnostic, ...], Any, float]
+# (inputs, diagnostics, provided artifact)
+_PassResult = tuple[tuple[Any, ...], tuple[Diagnostic, ...], Any]
+
+_CACHE: ContentCache[_PassResult] = ContentCache("validation", max_entries=1024, disk=False)
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationPass:
+    """A pass ``run(diag, *requires) -> artifact | None``."""
+
+    name: str
+    run: Callable[..., Any]
+    requires: tuple[str, ...]
+    provides: str | None = None
+    critical: bool = False
+    offload: bool = False  # run on the pipeline's pool, if it has one
+
+
+DEFAULT_PASSES: tuple[ValidationPass, ...] = (
+    ValidationPass("names", resolve_names, ("program",), critical=True),
+    ValidationPass(
+        "constants",
+        evaluate_constants,
+        ("consts", "buffers", "regions", "loops"),
+        provides="constants",
+    ),
+    ValidationPass("buffers", check_buffers, ("buffers", "constants", "device")),
+    ValidationPass("regions", check_regions, ("buffers", "regions", "loops", "constants")),
+    ValidationPass("types", check_types, ("regions", "tasks", "constants", "device")),
+    ValidationPass("dependencies", check_dependencies, ("tasks",), provides="token_bindings"),
+    ValidationPass(
+        "hazards",
+        check_hazards,
+        ("buffers", "regions", "tasks", "loops", "constants", "token_bindings"),
+        offload=True,
+    ),
+    ValidationPass("engines", check_engines, ("buffers", "regions", "tasks", "loops", "constants")),
+    ValidationPass(
+        "decorators",
+        check_decorators,
+        ("buffers", "regions", "tasks", "loops", "constants", "device"),
+    ),
+    ValidationPass("loops", check_loops, ("consts", "loops", "constants")),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PassRecord:
+    name: str
+    seconds: float  # time spent in the pass (0.0 when cached)
+    cached: bool
+    diagnostics: tuple[Diagnostic, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationReport:
+    passes: tuple[PassRecord, ...]  # in pass order
+    skipped: tuple[str, ...]  # passes not run because a critical pass failed
+    wall_time: float
+
+    @property
+    def timings(self) -> dict[str, float]:
+        return {record.name: record.seconds for record in self.passes}
+
+    def format_timings(self) -> str:
+        lines = [
+            f"{r.name:<14} {r.seconds * 1e3:9.3f} ms{'  (cached)' if r.cached else ''}"
+            for r in self.passes
+        ]
+        lines.extend(f"{name:<14} {'skipped':>12}" for name in self.skipped)
+        lines.append(f"{'total (wall)':<14} {self.wall_time * 1e3:9.3f} ms")
+        return "\n".join(lines)
+
+
+class ValidationPipeline:
+    """Run validation passes concurrently, reusing cached pass results.
+
+    ``executor`` is ``"serial"`` (default), ``"thread"`` or ``"process"``
+    (offloaded passes run in worker processes, so their inputs are pickled);
+    only offloaded passes go to a pool. The pool is created on first use and
+    kept until :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        passes: tuple[ValidationPass, ...] = DEFAULT_PASSES,
+        *,
+        executor: ExecutorKind = "serial",
+        max_workers: int | None = None,
+        cache: bool = True,
+    ) -> None:
+        provided = {"program", "device", "consts", "buffers", "regions", "tasks", "loops"}
+        for p in passes:
+            missing = [name for name in p.requires if name not in provided]
+            if missing:
+                raise ValueError(
+                    f"pass '{p.name}' requires {', '.join(missing)}, which no earlier pass provides"
+                )
+            if p.provides is not None:
+                provided.add(p.provides)
+        if executor not in ("serial", "thread", "process"):
+            raise ValueError(f"unknown executor '{executor}'")
+        self.passes = passes
+        self.executor = executor
+        self.max_workers = max_workers
+        self.cache = cache
+        self._pool: Executor | None = None
+
+    def run(
+        self, program: ProgramNode, device: DeviceConfig | None, diag: DiagnosticCollector
+    ) -> ValidationReport:
+        started = time.perf_counter()
+        index = index_program(program)
+        artifacts: dict[str, Any] = {
+            "program": program,
+            "device": device,
+            "consts": index.consts,
+            "buffers": index.buffers,
+            "regions": index.regions,
+            "tasks": index.tasks,
+            "loops": index.loops,
+        }
+        digests: dict[str, str] = {}  # fingerprints of the artifacts
+        equal: dict[tuple[int, int], bool] = {}  # (id(cached input), id(artifact)) compared
+        records: dict[str, PassRecord] = {}
+        running: dict[Future[_Outcome], tuple[ValidationPass, str | None]] = {}
+        pending = list(self.passes)
+        failed = False  # a critical pass reported errors
+
+        def finish(p: ValidationPass, key: str | None, outcome: _Outcome, cached: bool) -> None:
+            nonlocal failed
+            diagnostics, output, seconds = outcome
+            records[p.name] = PassRecord(p.name, seconds, cached, diagnostics)
+            if p.provides is not None:
+                artifacts[p.provides] = output
+            if p.critical and any(d.severity is DiagnosticSeverity.ERROR for d in diagnostics):
+                failed = True
+            if key is not None and not cached:
+                _CACHE.put(key, (_inputs(p, artifacts), diagnostics, output))
+
+        while (pending and not failed) or running:
+            ready = [p for p in pending if not failed and self._ready(p, records, artifacts)]
+            ready.sort(key=lambda p: not p.offload)  # submitted before the inline ones run
+            for p in ready:
+                pending.remove(p)
+                key = self._key(p, artifacts, digests)
+                hit = _CACHE.get(key) if key is not None else None
+                if hit is not None and _same(hit[0], _inputs(p, artifacts), equal):
+                    finish(p, key, (hit[1], hit[2], 0.0), True)
+                elif self.executor == "serial" or not p.offload:
+                    finish(p, key, _run_pass(p.run, _inputs(p, artifacts)), False)
+                else:
+                    future = self._executor().submit(_run_pass, p.run, _inputs(p, artifacts))
+                    running[future] = (p, key)
+            if not running:
+                if not ready:
+                    break
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                p, key = running.pop(future)
+                finish(p, key, future.result(), False)
+
+        ordered = tuple(records[p.name] for p in self.passes if p.name in records)
+        for record in ordered:
+            diag.extend(record.diagnostics)
+        skipped = tuple(p.name for p in self.passes if p.name not in records)
+        return ValidationReport(ordered, skipped, time.perf_counter() - started)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> ValidationPipeline:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            pool = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+            self._pool = pool(max_workers=self.max_workers)
+        return self._pool
+
+    def _key(
+        self, p: ValidationPass, artifacts: dict[str, Any], digests: dict[str, str]
+    ) -> str | None:
+        if not self.cache:
+            return None
+        parts = [p.name, f"{p.run.__module__}.{p.run.__qualname__}"]
+        for name in p.requires:
+            digest = digests.get(name)
+            if digest is None:
+                digest = digests[name] = _fingerprint(artifacts[name])
+            parts.append(digest)
+        return content_key("validation", *parts)
+
+    def _ready(
+        self, p: ValidationPass, records: dict[str, PassRecord], artifacts: dict[str, Any]
+    ) -> bool:
+        """Inputs available, and every earlier critical pass (any pass, for a critical one) done."""
+        for q in self.passes:
+            if q is p:
+                break
+            if (q.critical or p.critical) and q.name not in records:
+                return False
+        return all(name in artifacts for name in p.requires)
+
+
+def validate(
+    program: ProgramNode,
+    device: DeviceConfig | None = None,
+    diag: DiagnosticCollector | None = None,
+) -> ValidationReport:
+    """Validate ``program`` (against ``device``, when given) with the default passes."""
+    return _DEFAULT_PIPELINE.run(
+        program, device, diag if diag is not None else DiagnosticCollector()
+    )
+
+
+def clear_validation_cache() -> None:
+    _CACHE.clear_memory()
+
+
+def _inputs(p: ValidationPass, artifacts: dict[str, Any]) -> tuple[Any, ...]:
+    return tuple(artifacts[name] for name in p.requires)
+
+
+def _run_pass(run: Callable[..., Any], inputs: tuple[Any, ...]) -> _Outcome:
+    diag = DiagnosticCollector()
+    started = time.perf_counter()
+    output = run(diag, *inputs)
+    return tuple(diag.get_all()), output, time.perf_counter() - started
+
+
+def _fingerprint(artifact: Any) -> str:
+    """The structural hash of an artifact, or its content digest when it is unhashable."""
+    try:
+        return f"{hash(artifact):x}"
+    except TypeError:
+        return _digest(artifact)
+
+
+def _same(
+    cached: tuple[Any, ...], inputs: tuple[Any, ...], equal: dict[tuple[int, int], bool]
+) -> bool:
+    """Whether a cache entry's inputs equal ``inputs``; comparisons are memoized in
+    ``equal``, as the passes of a run share their inputs."""
+    for a, b in zip(cached, inputs):
+        if a is b:
+            continue
+        same = equal.get((id(a), id(b)))
+        if same is None:
+            same = equal[id(a), id(b)] = a == b
+        if not same:
+            return False
+    return True
+
+
+def _digest(artifact: Any) -> str:
+    return hashlib.sha256(pickle.dumps(artifact, pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+_DEFAULT_PIPELINE = ValidationPipeline(executor="serial")
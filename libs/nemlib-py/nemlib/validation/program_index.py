@@ -0,0 +1,247 @@
+"""
+Flattened view of a program shared by the validation passes.
+
+:func:`index_program` splits a :class:`ProgramNode` into per-kind tuples
+(*facets*): constants, buffers, regions, tasks and loops. Every entry records
+its scope, the indices of the enclosing loops (outermost first). Passes
+declare which facets they read, so an edit to a task leaves the cached
+results of passes that only read buffers and regions valid.
+
+Regions include the inline ``region(...)`` operands of tasks (with
+``name=None``), so region checks cover them too.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, TypeVar
+
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExpressionError,
+    ExprNode,
+    Identifier,
+    IntLiteral,
+    UnaryOp,
+    evaluate_int,
+)
+from nemlib.diagnostics import SourceLocation
+from nemlib.parser.ast_nodes import (
+    BufferDeclNode,
+    ConstDeclNode,
+    DecoratorNode,
+    LoopNode,
+    OperandNode,
+    ProgramNode,
+    RegionDeclNode,
+    RegionExprNode,
+    StmtNode,
+    TaskNode,
+    WaitNode,
+)
+
+T = TypeVar("T")
+
+Scope = tuple[int, ...]  # indices into ProgramIndex.loops, outermost first
+
+# A block is a tuple of task indices and nested (loop index, block) pairs
+Block = tuple["int | tuple[int, Block]", ...]
+
+
+@dataclass(frozen=True, slots=True)
+class LoopInfo:
+    var: str
+    start: ExprNode
+    end: ExprNode
+    decorators: tuple[DecoratorNode, ...]
+    scope: Scope  # enclosing loops
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class RegionInfo:
+    """A region declaration, or an inline ``region(...)`` operand (``name=None``)."""
+
+    name: str | None
+    region: RegionExprNode
+    decorators: tuple[DecoratorNode, ...]
+    scope: Scope
+    location: SourceLocation | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ProgramIndex:
+    consts: tuple[tuple[Scope, ConstDeclNode], ...]
+    buffers: tuple[tuple[Scope, BufferDeclNode], ...]
+    regions: tuple[RegionInfo, ...]
+    tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...]
+    loops: tuple[LoopInfo, ...]
+
+
+def index_program(program: ProgramNode) -> ProgramIndex:
+    consts: list[tuple[Scope, ConstDeclNode]] = []
+    buffers: list[tuple[Scope, BufferDeclNode]] = []
+    regions: list[RegionInfo] = []
+    tasks: list[tuple[Scope, TaskNode | WaitNode]] = []
+    loops: list[LoopInfo] = []
+
+    def walk(stmts: tuple[StmtNode, ...], scope: Scope) -> None:
+        for stmt in stmts:
+            if isinstance(stmt, ConstDeclNode):
+                consts.append((scope, stmt))
+            elif isinstance(stmt, BufferDeclNode):
+                buffers.append((scope, stmt))
+            elif isinstance(stmt, RegionDeclNode):
+                regions.append(
+                    RegionInfo(stmt.name, stmt.region, stmt.decorators, scope, stmt.location)
+                )
+            elif isinstance(stmt, TaskNode | WaitNode):
+                tasks.append((scope, stmt))
+                if isinstance(stmt, TaskNode):
+                    for op in chain(stmt.inputs, stmt.outputs):
+                        if op.region is not None:
+                            regions.append(
+                                RegionInfo(None, op.region, op.decorators, scope, op.location)
+                            )
+            elif isinstance(stmt, LoopNode):
+                loops.append(
+                    LoopInfo(stmt.var, stmt.start, stmt.end, stmt.decorators, scope, stmt.location)
+                )
+                walk(stmt.body, (*scope, len(loops) - 1))
+
+    walk(program.statements, ())
+    return ProgramIndex(tuple(consts), tuple(buffers), tuple(regions), tuple(tasks), tuple(loops))
+
+
+def task_blocks(tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...]) -> Block:
+    """Rebuild the loop nesting of the task facet."""
+    root: list[Any] = []
+    stack: list[tuple[Scope, list[Any]]] = [((), root)]
+    for k, (scope, _) in enumerate(tasks):
+        while stack[-1][0] != scope[: len(stack[-1][0])]:
+            stack.pop()
+        while len(stack[-1][0]) < len(scope):
+            depth = len(stack[-1][0])
+            body: list[Any] = []
+            stack[-1][1].append((scope[depth], body))
+            stack.append((scope[: depth + 1], body))
+        stack[-1][1].append(k)
+    return _freeze(root)
+
+
+def _freeze(items: list[Any]) -> Block:
+    return tuple(item if isinstance(item, int) else (item[0], _freeze(item[1])) for item in items)
+
+
+# ---------------------------------------------------------------------------
+# Helpers shared by the passes
+# ---------------------------------------------------------------------------
+
+
+class Declarations:
+    """Scoped lookup of buffers and named regions (innermost declaration wins)."""
+
+    __slots__ = ("_buffers", "_regions")
+
+    def __init__(
+        self,
+        buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+        regions: tuple[RegionInfo, ...],
+    ) -> None:
+        self._buffers: dict[str, list[tuple[Scope, BufferDeclNode]]] = {}
+        self._regions: dict[str, list[tuple[Scope, RegionInfo]]] = {}
+        for scope, buf in buffers:
+            self._buffers.setdefault(buf.name, []).append((scope, buf))
+        for info in regions:
+            if info.name is not None:
+                self._regions.setdefault(info.name, []).append((info.scope, info))
+
+    def buffer(self, scope: Scope, name: str) -> BufferDeclNode | None:
+        return _innermost(self._buffers.get(name, ()), scope)
+
+    def region(self, scope: Scope, name: str) -> RegionInfo | None:
+        return _innermost(self._regions.get(name, ()), scope)
+
+    def operand(self, scope: Scope, op: OperandNode) -> RegionInfo | None:
+        """The region an operand names, or the operand's inline region."""
+        if op.region is not None:
+            return RegionInfo(None, op.region, op.decorators, scope, op.location)
+        return self.region(scope, op.name) if op.name is not None else None
+
+
+def _innermost(entries: Iterable[tuple[Scope, T]], scope: Scope) -> T | None:
+    best: tuple[int, T] | None = None
+    for decl_scope, item in entries:
+        depth = len(decl_scope)
+        if scope[:depth] == decl_scope and (best is None or depth >= best[0]):
+            best = (depth, item)
+    return best[1] if best is not None else None
+
+
+def free_names(expr: ExprNode) -> set[str]:
+    """Identifiers referenced by ``expr``."""
+    if isinstance(expr, Identifier):
+        return {expr.name}
+    if isinstance(expr, UnaryOp):
+        return free_names(expr.operand)
+    if isinstance(expr, BinaryOp):
+        return free_names(expr.left) | free_names(expr.right)
+    return set()
+
+
+def loop_envs(
+    loops: tuple[LoopInfo, ...], scope: Scope, constants: Mapping[str, int]
+) -> Iterator[dict[str, int]]:
+    """Every binding of the loop variables of ``scope`` (constants included).
+
+    Loops whose bounds do not evaluate contribute no iterations. The same dict
+    is updated in place between iterations; copy it to keep a binding.
+    """
+    env = dict(constants)
+
+    def expand(depth: int) -> Iterator[dict[str, int]]:
+        if depth == len(scope):
+            yield env
+            return
+        loop = loops[scope[depth]]
+        try:
+            start, end = evaluate_int(loop.start, env), evaluate_int(loop.end, env)
+        except ExpressionError:
+            return
+        for value in range(start, end + 1):
+            env[loop.var] = value
+            yield from expand(depth + 1)
+        env.pop(loop.var, None)
+
+    yield from expand(0)
+
+
+def describe_binding(loops: tuple[LoopInfo, ...], scope: Scope, env: Mapping[str, int]) -> str:
+    """Diagnostic suffix naming the loop variable values, e.g. ``" (at i = 3)"``."""
+    if not scope:
+        return ""
+    return " (at " + ", ".join(f"{loops[k].var} = {env[loops[k].var]}" for k in scope) + ")"
+
+
+def max_in_flight(loop: LoopInfo, env: Mapping[str, int]) -> int:
+    """The loop's ``@max_in_flight`` bound (1 when absent or invalid)."""
+    deco = decorator(loop.decorators, "max_in_flight")
+    if deco is None or len(deco.args) != 1:
+        return 1
+    arg = deco.args[0]
+    if not isinstance(arg, IntLiteral | Identifier | UnaryOp | BinaryOp):
+        return 1
+    try:
+        return max(evaluate_int(arg, env), 1)
+    except ExpressionError:
+        return 1
+
+
+def decorator(decorators: tuple[DecoratorNode, ...], name: str) -> DecoratorNode | None:
+    return next((d for d in decorators if d.name == name), None)
+
+
+def has_decorator(decorators: tuple[DecoratorNode, ...], name: str) -> bool:
+    return any(d.name == name for d in decorators)
@@ -0,0 +1,151 @@
+"""
+Pass 4: region bounds and extent consistency (spec: Extent Consistency).
+
+For every region (declared or inline) and every binding of its loop
+variables: ``0 <= offset``, ``extent > 0`` and ``offset + extent`` within the
+buffer. Typed regions also need ``extent >= ceil(numel * bitwidth / 8)``,
+positive dimensions, a layout or stride list of the shape's rank, every
+stride-addressable element inside the extent, and quantization parameters
+consistent with the shape.
+
+A region whose expressions do not mention a loop variable is checked once.
+Offsets, extents and buffer sizes with periodic forms (affine in the loop
+variable, plus ``mod``) and periodic shapes and strides are checked only at
+the first and last iteration of each residue class, which bound every
+iteration (:mod:`nemlib.validation.affine`); other regions are checked at
+every iteration. Only the first failing iteration checked is reported.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from math import prod
+
+from nemlib.core.elements import ElementType
+from nemlib.core.expressions import ExpressionError, IntLiteral, evaluate_int
+from nemlib.device.model import FrozenDict
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser.ast_nodes import BufferDeclNode, ListNode, QuantDescNode
+from nemlib.validation.affine import sample_envs
+from nemlib.validation.program_index import (
+    Declarations,
+    LoopInfo,
+    RegionInfo,
+    Scope,
+    describe_binding,
+    free_names,
+)
+
+
+def check_regions(
+    diag: DiagnosticCollector,
+    buffers: tuple[tuple[Scope, BufferDeclNode], ...],
+    regions: tuple[RegionInfo, ...],
+    loops: tuple[LoopInfo, ...],
+    constants: FrozenDict[str, int],
+) -> None:
+    decls = Declarations(buffers, regions)
+    for info in regions:
+        buf = decls.buffer(info.scope, info.region.buffer)
+        if buf is None or buf.size is None:
+            continue  # reported by name resolution
+        region = info.region
+        scope = info.scope if _uses_loop_vars(info, buf, loops) else ()
+        exprs = (region.offset, region.extent, buf.size)
+        dims = (*(region.shape or ()), *(region.strides or ()))
+        for env in sample_envs(loops, scope, constants, exprs, dims):
+            errors = _check(info, buf, env)
+            if errors:
+                where = describe_binding(loops, scope, env)
+                for message in errors:
+                    diag.error(message + where, info.location)
+                break
+
+
+def _uses_loop_vars(info: RegionInfo, buf: BufferDeclNode, loops: tuple[LoopInfo, ...]) -> bool:
+    region = info.region
+    names: set[str] = set()
+    for expr in (region.offset, region.extent, *(region.shape or ()), *(region.strides or ())):
+        names |= free_names(expr)
+    if buf.size is not None:
+        names |= free_names(buf.size)
+    return any(loops[k].var in names for k in info.scope)
+
+
+def _check(info: RegionInfo, buf: BufferDeclNode, env: Mapping[str, int]) -> list[str]:
+    region = info.region
+    name = f"region '{info.name}'" if info.name else "region"
+    try:
+        offset = evaluate_int(region.offset, env)
+        extent = evaluate_int(region.extent, env)
+        size = evaluate_int(buf.size, env) if buf.size is not None else None
+        shape = [evaluate_int(d, env) for d in region.shape or ()]
+        strides = [evaluate_int(s, env) for s in region.strides or ()]
+    except ExpressionError:
+        return []  # reported by the expression pass
+
+    errors: list[str] = []
+    if offset < 0:
+        errors.append(f"{name} has negative offset {offset}")
+    if extent <= 0:
+        errors.append(f"{name} has extent {extent}; extents must be > 0")
+    if size is not None and offset + extent > size:
+        errors.append(
+            f"{name} [{offset}, {offset + extent}) exceeds buffer '{buf.name}' (size {size})"
+        )
+    if region.elem is None:
+        return errors
+
+    try:
+        elem = ElementType(region.elem)
+    except ValueError:
+        return [*errors, f"{name} has unknown element type '{region.elem}'"]
+    if any(d <= 0 for d in shape):
+        return [*errors, f"{name} has non-positive dimension in shape {shape}"]
+    needed = -(-prod(shape) * elem.bitwidth() // 8)
+    if extent < needed:
+        errors.append(
+            f"{name} extent {extent} is smaller than {needed} bytes needed for {elem}{shape}"
+        )
+    layout = region.layout
+    if layout is not None and layout.isalpha() and layout.isupper() and len(layout) != len(shape):
+        errors.append(f"{name} layout {layout} does not match the rank of shape {shape}")
+    if region.strides is not None:
+        if len(strides) != len(shape):
+            errors.append(f"{name} has {len(strides)} strides for shape {shape}")
+        elif any(s < 0 for s in strides):
+            errors.append(f"{name} has negative strides {strides}")
+        else:
+            last = sum((d - 1) * s for d, s in zip(shape, strides))
+            reach = -(-(last + 1) * elem.bitwidth() // 8)
+            if reach > extent:
+                errors.append(
+                    f"{name} strides {strides} address {reach} bytes, beyond its extent {extent}"
+                )
+    if region.quant is not None:
+        errors.extend(_check_quant(name, region.quant, elem, shape))
+    return errors
+
+
+def _check_quant(name: str, quant: QuantDescNode, elem: ElementType, shape: list[int]) -> list[str]:
+    if not elem.is_integer():
+        return [f"{name} has a quantization descriptor but element type {elem}"]
+    if quant.kind == "per_tensor":
+        return []
+    params = dict(quant.params)
+    axis_node = params.get("axis")
+    if not isinstance(axis_node, IntLiteral) or not 0 <= axis_node.value < len(shape):
+        return [f"{name} {quant.kind} axis must be a dimension of shape {shape}"]
+    channels = shape[axis_node.value]
+    groups = channels
+    if quant.kind == "per_group":
+        size = params.get("group_size")
+        if not isinstance(size, IntLiteral) or size.value <= 0 or channels % size.value:
+            return [f"{name} group_size must divide dimension {axis_node.value} ({channels})"]
+        groups = channels // size.value
+    errors = []
+    for key in ("scales", "zero_points"):
+        values = params.get(key)
+        if isinstance(values, ListNode) and len(values.items) != groups:
+            errors.append(f"{name} has {len(values.items)} {key}, expected {groups}")
+    return errors
@@ -0,0 +1,209 @@
+"""
+Pass 5: compute task signatures and type family legality.
+
+Operands are bound positionally to the registry signature of the opcode (a
+variadic input list binds to its single declared input, whose element types
+must agree). Every compute operand must be a typed region. Attributes must be
+known to the opcode, have the declared value type, and required ones must be
+present. Finally the operand element types are matched against the
+opcode's type families and the device's effective set
+(:func:`~nemlib.types.matching.match_opcode_instance`); a matched variant
+with ``quant = required on <operand>`` needs a quantization descriptor on
+that operand.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+from nemlib.core.elements import ElementType
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExpressionError,
+    FloatLiteral,
+    Identifier,
+    IntLiteral,
+    UnaryOp,
+    evaluate,
+)
+from nemlib.core.opcodes import OpcodeInfo, OperandInfo, get_registry
+from nemlib.device.model import DeviceConfig, FrozenDict
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser.ast_nodes import ListNode, OperandNode, StringNode, TaskNode, ValueNode, WaitNode
+from nemlib.types.matching import match_opcode_instance
+from nemlib.types.registry import TypeFamilyRegistry
+from nemlib.validation.program_index import Declarations, RegionInfo, Scope
+
+_ELEMENT_TYPES = frozenset(t.value for t in ElementType)
+
+
+@lru_cache(maxsize=1)
+def _families() -> TypeFamilyRegistry:
+    return TypeFamilyRegistry.baseline()
+
+
+def check_types(
+    diag: DiagnosticCollector,
+    regions: tuple[RegionInfo, ...],
+    tasks: tuple[tuple[Scope, TaskNode | WaitNode], ...],
+    constants: FrozenDict[str, int],
+    device: DeviceConfig | None,
+) -> None:
+    decls = Declarations((), regions)
+    opcodes = get_registry()
+    for scope, task in tasks:
+        if not isinstance(task, TaskNode) or task.kind != "compute":
+            continue
+        info = opcodes.get(task.opcode)
+        what = f"task '{task.token}'" if task.token else f"{task.task_type} task"
+        if info is None or info.category == "data_movement":
+            diag.error(f"unknown opcode '{task.opcode}'", task.location)
+            continue
+        if task.mode not in info.forms:
+            diag.error(f"opcode '{task.opcode}' has no '{task.mode}' form", task.location)
+        _check_attributes(diag, task, info, constants, what)
+
+        operand_types: dict[str, str] = {}
+        quantized: dict[str, bool] = {}
+        ok = True
+        for given, declared, variadic, direction in (
+            (task.inputs, info.inputs, info.variadic_inputs, "input"),
+            (task.outputs, info.outputs, info.variadic_outputs, "output"),
+        ):
+            bound = _bind(diag, task, what, given, declared, variadic, direction)
+            if bound is None:
+                ok = False
+                continue
+            for op_info, op in bound:
+                region = decls.operand(scope, op)
+                if region is None:
+                    ok = False  # reported by name resolution
+                    continue
+                elem = region.region.elem
+                if elem is None:
+                    diag.error(
+                        f"operand {op_info.name} of {what} must be a typed region "
+                        "(elem, shape, layout/strides)",
+                        op.location,
+                    )
+                    ok = False
+                    continue
+                previous = operand_types.setdefault(op_info.name, elem)
+                if previous != elem:
+                    diag.error(
+                        f"operands {op_info.name} of {what} mix element types "
+                        f"{previous} and {elem}",
+                        op.location,
+                    )
+                    ok = False
+                quantized[op_info.name] = region.region.quant is not None
+        if not ok:
+            continue
+
+        attributes: dict[str, Any] = {
+            name: value.name for name, value in task.attributes if isinstance(value, Identifier)
+        }
+        result = match_opcode_instance(task.opcode, operand_types, attributes, device, _families())
+        if not result.matched:
+            if _families().table(task.opcode).instances:
+                diag.error(f"{what}: {result.error_detail}", task.location)
+            continue
+        inst = _families().instance(result.variant_ref or "")
+        if inst is not None and inst.quant == "required" and inst.quant_target is not None:
+            targets = [
+                op.name
+                for op in info.operands
+                if op.name in quantized
+                and (op.name == inst.quant_target or _role(op) == inst.quant_target)
+            ]
+            for name in targets:
+                if not quantized[name]:
+                    diag.error(
+                        f"{what} matches {result.variant_ref}, which requires a quantization "
+                        f"descriptor on operand {name}",
+                        task.location,
+                    )
+
+
+def _role(op: OperandInfo) -> str:
+    return "src" if op.direction == "in" else "dst"
+
+
+def _bind(
+    diag: DiagnosticCollector,
+    task: TaskNode,
+    what: str,
+    given: tuple[OperandNode, ...],
+    declared: tuple[OperandInfo, ...],
+    variadic: bool,
+    direction: str,
+) -> list[tuple[OperandInfo, OperandNode]] | None:
+    required = sum(op.required for op in declared)
+    if variadic and declared:
+        if not given:
+            diag.error(f"{what} needs at least one {direction}", task.location)
+            return None
+        return [(declared[0], op) for op in given]
+    if not required <= len(given) <= len(declared):
+        expected = f"{required}" if required == len(declared) else f"{required} to {len(declared)}"
+        names = ", ".join(op.name for op in declared)
+        diag.error(
+            f"{what} has {len(given)} {direction}(s); {task.opcode} takes {expected} ({names})",
+            task.location,
+        )
+        return None
+    return list(zip(declared, given))
+
+
+def _check_attributes(
+    diag: DiagnosticCollector,
+    task: TaskNode,
+    info: OpcodeInfo,
+    constants: FrozenDict[str, int],
+    what: str,
+) -> None:
+    seen: set[str] = set()
+    for name, value in task.attributes:
+        attr = info.attribute(name)
+        if attr is None:
+            diag.error(
+                f"{what}: unknown attribute '{name}' for opcode '{task.opcode}'", task.location
+            )
+            continue
+        if name in seen:
+            diag.error(f"{what}: duplicate attribute '{name}'", task.location)
+        seen.add(name)
+        if not _value_has_type(value, attr.type, constants):
+            diag.error(f"{what}: attribute '{name}' must be of type {attr.type}", task.location)
+    for name in sorted(info.required_attributes - seen):
+        diag.error(f"{what}: missing required attribute '{name}'", task.location)
+
+
+def _value_has_type(value: ValueNode, kind: str, constants: FrozenDict[str, int]) -> bool:
+    if kind == "int":
+        return isinstance(_number(value, constants), int)
+    if kind == "float":
+        return _number(value, constants) is not None
+    if kind == "int_list":
+        return isinstance(value, ListNode) and all(
+            isinstance(_number(item, constants), int) for item in value.items
+        )
+    if kind == "elem_type":
+        return isinstance(value, Identifier) and value.name in _ELEMENT_TYPES
+    if kind == "bool":
+        return isinstance(value, Identifier) and value.name in ("true", "false")
+    if kind == "string":
+        return isinstance(value, StringNode)
+    if kind == "id":
+        return isinstance(value, Identifier)
+    return True
+
+
+def _number(value: ValueNode, constants: FrozenDict[str, int]) -> int | float | None:
+    if not isinstance(value, IntLiteral | FloatLiteral | Identifier | UnaryOp | BinaryOp):
+        return None
+    try:
+        return evaluate(value, constants)
+    except ExpressionError:
+        return None
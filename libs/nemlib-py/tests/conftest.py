@@ -0,0 +1,18 @@
+"""Shared fixtures for nemlib unit tests."""
+
+import os
+from collections.abc import Iterator
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_cache_dir(tmp_path_factory: pytest.TempPathFactory) -> Iterator[None]:
+    """Keep registry snapshots written by tests out of the user's cache."""
+    previous = os.environ.get("NEMLIB_CACHE_DIR")
+    os.environ["NEMLIB_CACHE_DIR"] = str(tmp_path_factory.mktemp("nemlib-cache"))
+    yield
+    if previous is None:
+        del os.environ["NEMLIB_CACHE_DIR"]
+    else:
+        os.environ["NEMLIB_CACHE_DIR"] = previous
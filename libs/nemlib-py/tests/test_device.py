@@ -0,0 +1,197 @@
+"""Tests for nemlib.device: resolution of device inheritance and loading."""
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+from nemlib.core.opcodes import get_registry
+from nemlib.device import (
+    DeviceConfig,
+    DeviceConfigError,
+    FrozenDict,
+    load_device,
+    load_device_library,
+    resolve_device,
+)
+from nemlib.device.model import split_variant_ref
+from nemlib.device.resolver import _resolve, clear_resolver_cache
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser import parse_config
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+NPM_LITE = EXAMPLES_DIR / "npm_lite_.nem"
+
+BASE = """
+device base {
+    spec_version = "NEM-1.0"
+    unit_characteristics {
+        NMU { int8_macs = 1024  fp16_macs = 512 }
+    }
+    opcode.mandatory { eltwise<f16>.default }
+    opcode.extended { eltwise<i8>.default }
+}
+"""
+
+
+def resolve(source: str) -> tuple[dict[str, DeviceConfig], DiagnosticCollector]:
+    doc, diag = parse_config(source, "t.nem")
+    devices: dict[str, DeviceConfig] = {}
+    for node in doc.devices:
+        dev = resolve_device(node, devices, diag)
+        if dev is not None:
+            devices[dev.name] = dev
+    return devices, diag
+
+
+def test_npm_lite() -> None:
+    dev = load_device(NPM_LITE)
+    assert (dev.name, dev.parent, dev.spec_version) == ("npm_lite", "npm_baseline_1_0", "NEM-1.0")
+    assert dev.num_engines == 1
+    assert dict(dev.per_engine) == {"NMU": 1, "CSTL": 2, "DMA": 2, "VPU": 1, "SEQ": 1}
+    assert dict(dev.device_units) == {"sDMA": 1, "WDM": 0}
+    assert (dev.l1_size_bytes, dev.l2_size_bytes) == (524288, 1048576)
+    assert dev.unit_characteristics["NMU"]["int8_macs"] == 4096
+    base = load_device_library(NPM_LITE).devices["npm_baseline_1_0"]
+    assert base.is_abstract
+    assert dev.mandatory_variants == base.mandatory_variants | {
+        "conv2d.int8<i16>.with_bias",
+        "eltwise<i32>.default",
+        "dequantize<i8, f32>.default",
+    }
+    assert dev.effective_set("gemm") == {
+        "gemm.float<f16>.no_bias",
+        "gemm.float<f16>.with_bias",
+        "gemm.int8<i8>.no_bias",
+        "gemm.int8<i8>.with_bias",
+    }
+    assert dev.effective_set("no_such_opcode") == frozenset()
+    assert dev.supports("gemm", "gemm.int8<i8>.no_bias")
+    assert not dev.supports("gemm", "conv2d.int8<i8>.no_bias")
+    assert not dev.supports("conv2d", "conv2d.int8<i16>.no_bias")  # MAY, not promoted
+    assert dev.supports("conv2d", "conv2d.int8<i16>.with_bias")
+
+
+def test_effective_types_index() -> None:
+    dev = load_device(NPM_LITE)
+    registry = get_registry()
+    for opcode, refs in dev.effective_types.items():
+        families = set(registry[opcode].type_families)
+        assert refs and all(split_variant_ref(ref)[0] in families for ref in refs)
+    indexed = set().union(*dev.effective_types.values())
+    assert indexed <= dev.mandatory_variants | dev.extended_variants
+    assert "dequantize<i8, f32>.default" in dev.effective_types["dequantize"]
+    hash(dev.effective_types)
+    # A child only adds to its parent's index
+    base = load_device_library(NPM_LITE).devices["npm_baseline_1_0"]
+    for opcode, refs in base.effective_types.items():
+        assert refs <= dev.effective_types[opcode]
+
+
+def test_device_config_is_hashable_and_picklable() -> None:
+    dev = load_device(NPM_LITE)
+    assert pickle.loads(pickle.dumps(dev)) == dev
+    assert hash(pickle.loads(pickle.dumps(dev))) == hash(dev)
+    with pytest.raises(TypeError):
+        dev.per_engine["NMU"] = 2  # type: ignore[index]
+    assert FrozenDict({"a": 1}) == {"a": 1}
+
+
+def test_inheritance_merges_and_unions() -> None:
+    devices, diag = resolve(
+        BASE
+        + """
+device child extends base {
+    topology {
+        num_engines = 2
+        l2_size_bytes = 2 * 1024 * 1024
+        per_engine { NMU = 1  CSTL = 1  DMA = 1  l1_size_bytes = 256 * 1024 }
+    }
+    unit_characteristics { NMU { int8_macs = 4096 } }
+    opcode.mandatory { eltwise<i8>.default }
+}
+"""
+    )
+    child = devices["child"]
+    assert child.spec_version == "NEM-1.0"
+    assert (child.num_engines, child.l1_size_bytes, child.l2_size_bytes) == (2, 262144, 2097152)
+    assert dict(child.unit_characteristics["NMU"]) == {"int8_macs": 4096, "fp16_macs": 512}
+    assert child.mandatory_variants == {"eltwise<f16>.default", "eltwise<i8>.default"}
+    # Promoted from extended to mandatory: warned about and dropped from extended
+    assert child.extended_variants == frozenset()
+    assert [d.severity.value for d in diag.get_all()] == ["warning"]
+
+
+def test_shared_parent_resolved_once() -> None:
+    source = BASE + "".join(
+        f"device d{i} extends base {{ opcode.extended {{ eltwise<i32>.default }} }}\n"
+        for i in range(3)
+    )
+    clear_resolver_cache()
+    first, _ = resolve(source)
+    misses = _resolve.cache_info().misses
+    assert misses == 4
+    second, diag = resolve(source)
+    assert _resolve.cache_info().misses == misses
+    assert second["d2"] is first["d2"]
+    assert first["d0"].effective_types["relu"] == {
+        "eltwise<f16>.default",
+        "eltwise<i8>.default",
+        "eltwise<i32>.default",
+    }
+    assert "gemm" not in first["d0"].effective_types  # nothing declared
+    # Memoized warnings are replayed
+    promote = source.replace("opcode.extended { eltwise<i32>", "opcode.mandatory { eltwise<i8>")
+    for _ in range(2):
+        _, diag = resolve(promote)
+        assert [d.severity.value for d in diag.get_all()] == ["warning"] * 3
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        ('device d extends base { spec_version = "NEM-1.0" }', "must not specify spec_version"),
+        ("device d extends nowhere { }", "unknown device 'nowhere'"),
+        (
+            "device d extends base { topology { num_engines = 0 l2_size_bytes = 1 "
+            "per_engine { NMU = 1 l1_size_bytes = 1 } } }",
+            "num_engines must be >= 1",
+        ),
+        (
+            "device d extends base { topology { num_engines = 1 l2_size_bytes = 1 "
+            "per_engine { NMU = 0 l1_size_bytes = 1 } } }",
+            "per_engine count for NMU",
+        ),
+        (
+            "device d extends base { topology { num_engines = 1 l2_size_bytes = 4 - 4 "
+            "per_engine { NMU = 1 l1_size_bytes = 1 } } }",
+            "l2_size_bytes must be > 0",
+        ),
+    ],
+)
+def test_resolution_errors(body: str, message: str) -> None:
+    devices, diag = resolve(BASE + body)
+    assert "d" not in devices
+    assert message in diag.format_all()
+
+
+def test_load_errors(tmp_path: Path) -> None:
+    (tmp_path / "a.nem").write_text('include "b.nem"\n' + BASE)
+    (tmp_path / "b.nem").write_text('include "a.nem"\n')
+    with pytest.raises(DeviceConfigError) as info:
+        load_device_library(tmp_path / "a.nem")
+    assert "circular include" in info.value.diagnostics[0].message
+
+    (tmp_path / "dup.nem").write_text('include "base.nem"\n' + BASE)
+    (tmp_path / "base.nem").write_text(BASE)
+    with pytest.raises(DeviceConfigError) as info:
+        load_device_library(tmp_path / "dup.nem")
+    assert "duplicate device 'base'" in info.value.diagnostics[0].message
+
+    (tmp_path / "missing.nem").write_text('include "nope.nem"\n')
+    with pytest.raises(DeviceConfigError) as info:
+        load_device_library(tmp_path / "missing.nem")
+    assert "cannot read" in info.value.diagnostics[0].message
+
+    with pytest.raises(DeviceConfigError, match="abstract"):
+        load_device(tmp_path / "base.nem")
@@ -0,0 +1,104 @@
+"""Tests for nemlib.core.cache and the device configuration caches."""
+
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from nemlib.core.cache import ContentCache, content_key
+from nemlib.device import load_device, loader
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+DEVICE = """
+device base {{
+    spec_version = "NEM-1.0"
+    topology {{
+        num_engines = {engines}
+        l2_size_bytes = 1024
+        per_engine {{ NMU = 1 l1_size_bytes = 256 }}
+    }}
+}}
+"""
+
+
+@pytest.fixture
+def fresh(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Private cache directory and empty in-process caches."""
+    monkeypatch.setenv("NEMLIB_CACHE_DIR", str(tmp_path / "cache"))
+    loader.clear_caches()
+    for cache in (loader._AST_CACHE, loader._LIBRARY_CACHE):
+        monkeypatch.setattr(cache, "stats", type(cache.stats)())
+    yield tmp_path
+    loader.clear_caches()
+
+
+def test_content_key() -> None:
+    assert content_key("a", b"b") == content_key("a", "b")
+    assert content_key("ab", "") != content_key("a", "b")  # length-prefixed
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    cache: ContentCache[str] = ContentCache("t", max_entries=2, cache_dir=tmp_path, disk=False)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # "b" becomes least recently used
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.stats.evictions == 1
+
+
+def test_disk_tier_and_size_cap(tmp_path: Path) -> None:
+    cache: ContentCache[bytes] = ContentCache("t", max_bytes=3000, cache_dir=tmp_path)
+    cache.put("k1", b"x" * 1000)
+    cache.clear_memory()
+    assert cache.get("k1") == b"x" * 1000
+    assert cache.stats.disk_hits == 1
+    past = time.time() - 100
+    os.utime(cache._path("k1"), (past, past))
+    cache.put("k2", b"y" * 1000)
+    cache.put("k3", b"z" * 1000)  # over the cap: the oldest file goes
+    cache.clear_memory()
+    assert cache.get("k1") is None
+    assert cache.get("k3") == b"z" * 1000
+    # Oversized values are only kept in memory
+    cache.put("big", b"b" * 5000)
+    assert not cache._path("big").exists()
+
+
+def test_corrupt_file_is_a_miss(tmp_path: Path) -> None:
+    cache: ContentCache[str] = ContentCache("t", cache_dir=tmp_path)
+    cache.put("k", "v")
+    cache.clear_memory()
+    cache._path("k").write_bytes(b"not a pickle")
+    assert cache.get("k") is None
+    assert not cache._path("k").exists()
+
+
+def test_device_parsed_and_resolved_once(fresh: Path) -> None:
+    path = EXAMPLES_DIR / "npm_lite_.nem"
+    first = load_device(path)
+    for _ in range(20):
+        assert load_device(path) is first
+    stats = loader.cache_stats()
+    assert stats["devices"].misses == 1 and stats["devices"].memory_hits == 20
+    assert stats["config-ast"].misses == 2  # npm_lite_.nem + npm_baseline_1.0.nem
+
+    loader.clear_caches()  # a new process: served from disk, nothing re-parsed
+    again = load_device(path)
+    assert again == first and again is not first
+    assert stats["devices"].disk_hits == 1
+    assert stats["config-ast"].misses == 2
+
+
+def test_edit_invalidates(fresh: Path) -> None:
+    path = fresh / "dev.nem"
+    path.write_text(DEVICE.format(engines=1))
+    assert load_device(path).num_engines == 1
+    path.write_text(DEVICE.format(engines=4) + "\n")
+    assert load_device(path).num_engines == 4
+    path.write_text(DEVICE.format(engines=1))
+    assert load_device(path).num_engines == 1
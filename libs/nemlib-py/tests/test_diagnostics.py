@@ -0,0 +1,51 @@
+"""Tests for nemlib.diagnostics."""
+
+from nemlib.diagnostics import (
+    Diagnostic,
+    DiagnosticCollector,
+    DiagnosticSeverity,
+    SourceLocation,
+    to_sarif,
+)
+
+
+def test_collector_accumulates_in_order() -> None:
+    diag = DiagnosticCollector()
+    diag.warning("w1")
+    diag.info("i1")
+    assert not diag.has_errors()
+    diag.error("e1", SourceLocation("a.nem", 3, 5), code="X001")
+    assert diag.has_errors()
+    assert [d.message for d in diag.get_all()] == ["w1", "i1", "e1"]
+    assert len(diag) == 3
+
+
+def test_format() -> None:
+    d = Diagnostic(
+        DiagnosticSeverity.ERROR, "bad thing", SourceLocation("a.nem", 3, 5), ["why"], "X001"
+    )
+    assert d.format() == "a.nem:3:5: error [X001]: bad thing\n  note: why"
+    assert Diagnostic(DiagnosticSeverity.INFO, "fyi").format() == "info: fyi"
+
+
+def test_dict_round_trip() -> None:
+    d = Diagnostic(
+        DiagnosticSeverity.WARNING, "msg", SourceLocation("f", 1, 2, 1, 9), ["n"], "X002"
+    )
+    assert Diagnostic.from_dict(d.to_dict()) == d
+
+
+def test_sarif_levels_and_locations() -> None:
+    diags = [
+        Diagnostic(DiagnosticSeverity.ERROR, "e", SourceLocation("dir/a.nem", 4, 2), code="A"),
+        Diagnostic(DiagnosticSeverity.INFO, "i", code="B"),
+    ]
+    log = to_sarif(diags, tool_name="t", rules={"A": "rule a"})
+    run = log["runs"][0]
+    assert log["version"] == "2.1.0"
+    assert [r["id"] for r in run["tool"]["driver"]["rules"]] == ["A", "B"]
+    first, second = run["results"]
+    assert first["level"] == "error" and first["ruleId"] == "A"
+    region = first["locations"][0]["physicalLocation"]["region"]
+    assert region == {"startLine": 4, "startColumn": 2}
+    assert second["level"] == "note" and "locations" not in second
@@ -0,0 +1,124 @@
+"""Tests for nemlib.parser.lexer and nemlib.parser.tokens."""
+
+import types
+from pathlib import Path
+
+import pytest
+
+from nemlib.parser import LexError, Token, TokenKind, lex, tokenize
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+K = TokenKind
+
+
+def kinds(source: str) -> list[TokenKind]:
+    return [t.kind for t in lex(source)]
+
+
+def lexemes(source: str) -> list[str]:
+    return [t.lexeme for t in lex(source)][:-1]
+
+
+def test_keywords_and_identifiers() -> None:
+    assert kinds("program gemm_1: const K = 4") == [
+        K.PROGRAM, K.ID, K.COLON, K.CONST, K.ID, K.EQUALS, K.INT, K.EOF,
+    ]  # fmt: skip
+    # Contextual words are identifiers
+    assert kinds("elem shape deps MUST i8 L1") == [K.ID] * 6 + [K.EOF]
+    assert kinds("loop endloop in out mod wait") == [
+        K.LOOP, K.ENDLOOP, K.IN, K.OUT, K.MOD, K.WAIT, K.EOF,
+    ]  # fmt: skip
+
+
+def test_compound_keywords() -> None:
+    assert kinds("transfer.async store.sync opcode.mandatory opcode.extended") == [
+        K.TRANSFER_ASYNC, K.STORE_SYNC, K.OPCODE_MANDATORY, K.OPCODE_EXTENDED, K.EOF,
+    ]  # fmt: skip
+    # Compute opcodes are ID "." async|sync
+    assert kinds("gemm.async relu.sync") == [K.ID, K.DOT, K.ASYNC, K.ID, K.DOT, K.SYNC, K.EOF]
+    # Not a compound keyword when the word continues
+    assert lexemes("transfer.asyncx") == ["transfer", ".", "asyncx"]
+
+
+def test_numbers_and_ranges() -> None:
+    assert kinds("[0..T-1]") == [
+        K.LBRACKET, K.INT, K.DOTDOT, K.ID, K.MINUS, K.INT, K.RBRACKET, K.EOF,
+    ]  # fmt: skip
+    toks = lex("1.0 0.00001 1.0e-5 42")
+    assert [t.kind for t in toks[:-1]] == [K.FLOAT, K.FLOAT, K.FLOAT, K.INT]
+    assert [t.value for t in toks[:3]] == [1.0, 0.00001, 1.0e-5]
+    assert toks[-2].value == 42
+    # A FLOAT needs a fractional part
+    assert kinds("2E+3") == [K.INT, K.ID, K.PLUS, K.INT, K.EOF]
+
+
+def test_strings() -> None:
+    (tok, _) = lex(r'"npm_lite.cfg"')
+    assert tok.kind is K.STRING and tok.value == "npm_lite.cfg"
+    assert lex(r'"a\"b\\c\n"')[0].value == 'a"b\\c\n'
+
+
+def test_comments_and_positions() -> None:
+    source = (
+        "# header comment\n"
+        "\n"
+        "const A = 1   # trailing\n"
+        "\t  let B = region(X, 0, 4)\n"
+        "     elem=f16  # continuation\n"
+    )
+    toks = lex(source, "k.nem")
+    assert [(t.lexeme, t.line, t.column) for t in toks[:3]] == [
+        ("const", 3, 1),
+        ("A", 3, 7),
+        ("=", 3, 9),
+    ]
+    let = toks[4]
+    assert (let.kind, let.line, let.column) == (K.LET, 4, 4)
+    elem = next(t for t in toks if t.lexeme == "elem")
+    assert str(elem.location) == "k.nem:5:6"
+    eof = toks[-1]
+    assert eof.kind is K.EOF and (eof.line, eof.column) == (6, 1)
+
+
+@pytest.mark.parametrize(
+    ("tail", "eof"),
+    [("   ", (1, 15)), ("\t", (1, 13)), (" \t\n", (2, 1)), ("\n \t", (2, 3)), ("\n\t\n ", (3, 2))],
+)
+def test_trailing_blanks(tail: str, eof: tuple[int, int]) -> None:
+    toks = lex("const x = 1" + tail)
+    assert [t.kind for t in toks] == [K.CONST, K.ID, K.EQUALS, K.INT, K.EOF]
+    assert (toks[-1].line, toks[-1].column) == eof
+
+
+def test_tokens_reference_the_source() -> None:
+    source = "buffer A_L2 : L2 (size=64, align=64)"
+    toks = lex(source)
+    assert all(t.source is source for t in toks)
+    assert [source[t.start : t.end] for t in toks] == [t.lexeme for t in toks]
+    assert not hasattr(toks[0], "__dict__")
+    assert Token.__slots__
+
+
+def test_tokenize_is_lazy() -> None:
+    gen = tokenize("const A = 1\n$ invalid")
+    assert isinstance(gen, types.GeneratorType)
+    assert [next(gen).kind for _ in range(4)] == [K.CONST, K.ID, K.EQUALS, K.INT]
+    with pytest.raises(LexError):
+        next(gen)
+
+
+def test_lex_errors() -> None:
+    with pytest.raises(LexError) as info:
+        lex("const A = 1\nconst B = $", "bad.nem")
+    assert str(info.value.location) == "bad.nem:2:11"
+    assert "'$'" in info.value.message
+    with pytest.raises(LexError, match="unterminated string"):
+        lex('device "npm_lite.cfg\n')
+
+
+@pytest.mark.parametrize("path", sorted(EXAMPLES_DIR.glob("*.nem")), ids=lambda p: p.name)
+def test_examples_lex(path: Path) -> None:
+    toks = lex(path.read_text(), str(path))
+    assert toks[-1].kind is K.EOF
+    assert K.ID in {t.kind for t in toks}
@@ -0,0 +1,248 @@
+"""Tests for nemlib.core.opcodes — registry loading and compiled snapshots."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from nemlib.core import opcodes
+from nemlib.core.opcodes import (
+    REGISTRY_PATH,
+    SCHEMA_PATH,
+    DuplicateKeyError,
+    OpcodeRegistry,
+    RegistryError,
+    get_attributes,
+    get_opcode,
+    get_operands,
+    get_registry,
+    is_supported,
+    load_registry_data,
+    load_registry_document,
+    registry_digest,
+    snapshot_path,
+)
+
+yaml = pytest.importorskip("yaml")
+
+
+@pytest.fixture
+def registry_copy(tmp_path: Path) -> Path:
+    """A private copy of the registry + schema that tests may edit."""
+    reg_dir = tmp_path / "registry"
+    reg_dir.mkdir()
+    shutil.copy(REGISTRY_PATH, reg_dir / "opcodes.yaml")
+    shutil.copy(SCHEMA_PATH, reg_dir / "schema.json")
+    return reg_dir / "opcodes.yaml"
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path) -> Path:
+    return tmp_path / "cache"
+
+
+def _forbid_yaml(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(raw: bytes, path: Path) -> None:
+        raise AssertionError(f"YAML parsed unexpectedly: {path}")
+
+    monkeypatch.setattr(opcodes, "_parse_yaml", fail)
+
+
+def test_snapshot_matches_yaml(registry_copy: Path, cache_dir: Path) -> None:
+    with open(registry_copy) as f:
+        expected = yaml.safe_load(f)
+    assert load_registry_data(registry_copy, cache_dir=cache_dir) == expected
+    # Second load comes from the snapshot and is identical
+    assert load_registry_data(registry_copy, cache_dir=cache_dir) == expected
+
+
+def test_second_load_skips_yaml(
+    registry_copy: Path, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    load_registry_data(registry_copy, cache_dir=cache_dir)
+    digest = registry_digest(registry_copy, registry_copy.with_name("schema.json"))
+    assert snapshot_path(digest, cache_dir).is_file()
+
+    _forbid_yaml(monkeypatch)
+    data = load_registry_data(registry_copy, cache_dir=cache_dir)
+    assert "gemm" in data["opcodes"]
+
+
+def test_registry_edit_invalidates_snapshot(registry_copy: Path, cache_dir: Path) -> None:
+    load_registry_data(registry_copy, cache_dir=cache_dir)
+    text = registry_copy.read_text()
+    registry_copy.write_text(text.replace('version: "1.0"', 'version: "1.1"', 1))
+
+    data = load_registry_data(registry_copy, cache_dir=cache_dir)
+    assert data["version"] == "1.1"
+
+
+def test_schema_edit_invalidates_snapshot(registry_copy: Path, cache_dir: Path) -> None:
+    schema = registry_copy.with_name("schema.json")
+    before = registry_digest(registry_copy, schema)
+    schema.write_text(schema.read_text() + "\n")
+    assert registry_digest(registry_copy, schema) != before
+
+
+def test_corrupt_snapshot_falls_back_to_yaml(registry_copy: Path, cache_dir: Path) -> None:
+    load_registry_data(registry_copy, cache_dir=cache_dir)
+    digest = registry_digest(registry_copy, registry_copy.with_name("schema.json"))
+    snapshot_path(digest, cache_dir).write_bytes(b"not a snapshot")
+
+    data = load_registry_data(registry_copy, cache_dir=cache_dir)
+    assert "gemm" in data["opcodes"]
+
+
+def test_unwritable_cache_still_loads(registry_copy: Path, tmp_path: Path) -> None:
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")  # a file where the cache directory should be
+    data = load_registry_data(registry_copy, cache_dir=blocker / "cache")
+    assert "gemm" in data["opcodes"]
+
+
+def test_cache_disabled(registry_copy: Path, cache_dir: Path) -> None:
+    data = load_registry_data(registry_copy, cache=False, cache_dir=cache_dir)
+    assert "gemm" in data["opcodes"]
+    assert not cache_dir.exists()
+
+
+def test_missing_registry(tmp_path: Path, cache_dir: Path) -> None:
+    with pytest.raises(RegistryError, match="not found"):
+        load_registry_data(tmp_path / "missing.yaml", cache_dir=cache_dir)
+
+
+def test_env_overrides(
+    registry_copy: Path, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("NEMLIB_REGISTRY", str(registry_copy))
+    monkeypatch.setenv("NEMLIB_CACHE_DIR", str(cache_dir))
+    load_registry_data()
+    assert any(cache_dir.glob("opcodes-*.marshal"))
+
+
+def test_registry_read_once(
+    registry_copy: Path, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    reads: list[Path] = []
+    real = Path.read_bytes
+
+    def counting(self: Path) -> bytes:
+        if self == registry_copy:
+            reads.append(self)
+        return real(self)
+
+    monkeypatch.setattr(Path, "read_bytes", counting)
+    load_registry_data(registry_copy, cache_dir=cache_dir)  # miss: hash + parse
+    load_registry_data(registry_copy, cache_dir=cache_dir)  # hit
+    assert len(reads) == 2
+
+
+def _duplicate_relu(path: Path) -> None:
+    text = path.read_text()
+    start = text.index("  relu:\n")
+    block = text[start : text.index("\n\n", start)]
+    path.write_text(text.rstrip("\n") + "\n\n" + block + "\n")
+
+
+def test_duplicate_opcode_raises(registry_copy: Path, cache_dir: Path) -> None:
+    _duplicate_relu(registry_copy)
+    for _ in range(2):  # the snapshot keeps the duplicates, so cached loads fail too
+        with pytest.raises(DuplicateKeyError) as info:
+            load_registry_data(registry_copy, cache_dir=cache_dir)
+        (dup,) = info.value.duplicates
+        assert (dup.kind, dup.name, dup.column) == ("opcode", "relu", 3)
+        assert f":{dup.line}:3: duplicate opcode 'relu'" in str(info.value)
+
+    doc = load_registry_document(registry_copy, cache_dir=cache_dir)
+    assert [d.name for d in doc.duplicates] == ["relu"]
+    assert "relu" in doc.data["opcodes"]
+
+
+def test_document_positions(cache_dir: Path) -> None:
+    doc = load_registry_document(cache_dir=cache_dir)
+    assert doc.duplicates == ()
+    lines = REGISTRY_PATH.read_text().splitlines()
+    line, col = doc.positions["opcodes.gemm"]
+    assert lines[line - 1][col - 1 :].startswith("gemm:")
+    line, col = doc.positions["opcodes.conv2d.attributes.groups"]
+    assert lines[line - 1][col - 1 :] == "name: groups"
+    assert set(doc.data["opcodes"]) == {
+        key.split(".")[1] for key in doc.positions if key.count(".") == 1
+    }
+
+
+# ---------------------------------------------------------------------------
+# Query API
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def registry() -> OpcodeRegistry:
+    return OpcodeRegistry.from_data(load_registry_data(cache=False))
+
+
+def test_lookup_by_name(registry: OpcodeRegistry) -> None:
+    gemm = registry["gemm"]
+    assert gemm.category == "linear_algebra"
+    assert gemm.execution_unit == "NMU"
+    assert gemm.forms == ("async", "sync")
+    assert gemm.type_families == ("gemm.float", "gemm.int8", "gemm.int4")
+    assert "gemm" in registry
+    assert registry.get("no_such_op") is None
+    with pytest.raises(KeyError):
+        registry["no_such_op"]
+
+
+def test_operand_and_attribute_tables(registry: OpcodeRegistry) -> None:
+    conv = registry["conv2d"]
+    assert [op.name for op in conv.operands] == ["X", "W", "B", "Y"]
+    assert [op.name for op in conv.inputs] == ["X", "W", "B"]
+    assert [op.name for op in conv.outputs] == ["Y"]
+    bias = conv.operand("B")
+    assert bias is not None and not bias.required
+    groups = conv.attribute("groups")
+    assert groups is not None and groups.has_default and groups.default == 1
+    assert conv.required_attributes == {"pads", "strides", "dilations", "accum_type"}
+    assert conv.operand("Q") is None
+
+
+def test_indexes_match_linear_scan(registry: OpcodeRegistry) -> None:
+    infos = list(registry.opcodes.values())
+    for cat in registry.categories():
+        assert registry.by_category(cat) == tuple(i for i in infos if i.category == cat)
+    for unit in registry.execution_units():
+        assert registry.by_execution_unit(unit) == tuple(
+            i for i in infos if i.execution_unit == unit
+        )
+    for fam in registry.type_families():
+        assert registry.by_type_family(fam) == tuple(i for i in infos if fam in i.type_families)
+    for hw in ("supported", "future", "partial", "escape_hatch"):
+        assert registry.by_hardware_status(hw) == tuple(i for i in infos if i.hardware_status == hw)
+
+
+def test_index_queries(registry: OpcodeRegistry) -> None:
+    assert {i.name for i in registry.by_type_family("gemm.int4")} == {"gemm", "matmul"}
+    assert {i.name for i in registry.by_execution_unit("DMA")} == {"transfer", "store"}
+    assert registry.by_category("no_such_category") == ()
+    assert all(i.status == "future" for i in registry.by_status("future"))
+
+
+def test_registry_is_immutable(registry: OpcodeRegistry) -> None:
+    with pytest.raises(AttributeError):
+        registry.version = "9.9"  # type: ignore[misc]
+    with pytest.raises(AttributeError):
+        registry["gemm"].category = "other"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        registry.opcodes["gemm"] = registry["relu"]  # type: ignore[index]
+    assert not hasattr(registry, "__dict__")
+    assert not hasattr(registry["gemm"], "__dict__")
+
+
+def test_module_level_queries() -> None:
+    assert get_registry() is get_registry()
+    info = get_opcode("relu")
+    assert info is not None and info.execution_unit == "CSTL"
+    assert [a.name for a in get_attributes("gemm")] == ["accum_type"]
+    assert [o.name for o in get_operands("transfer")] == ["src", "dst"]
+    assert is_supported("gemm")
+    assert not is_supported("no_such_op")
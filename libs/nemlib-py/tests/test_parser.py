@@ -0,0 +1,202 @@
+"""Tests for nemlib.parser.parser (programs and configuration documents) and expressions."""
+
+from pathlib import Path
+
+import pytest
+
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExpressionError,
+    Identifier,
+    IntLiteral,
+    compile_expr,
+    compile_int,
+    evaluate,
+    evaluate_int,
+    fold,
+)
+from nemlib.parser import lex, parse, parse_config, parse_expr
+from nemlib.parser.ast_nodes import (
+    BufferDeclNode,
+    DeviceConfigNode,
+    LoopNode,
+    RegionDeclNode,
+    TaskNode,
+    WaitNode,
+)
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def expr(source: str):  # type: ignore[no-untyped-def]
+    return parse_expr(lex(source))
+
+
+def test_expression_precedence() -> None:
+    node = expr("1 + 2 * K")
+    assert isinstance(node, BinaryOp) and node.op == "+"
+    assert isinstance(node.left, IntLiteral)
+    assert isinstance(node.right, BinaryOp) and isinstance(node.right.right, Identifier)
+    assert evaluate_int(expr("(1 + 2) * 4 - 6 / 4")) == 11
+    assert evaluate_int(expr("-7 / 2")) == -3  # truncates toward zero
+    assert evaluate_int(expr("-7 mod 2")) == -1
+    assert evaluate(expr("K * 2"), {"K": 8}) == 16
+
+
+def test_expression_errors() -> None:
+    with pytest.raises(ExpressionError, match="division by zero"):
+        evaluate_int(expr("4 / (2 - 2)"))
+    with pytest.raises(ExpressionError, match="undefined"):
+        evaluate_int(expr("K + 1"))
+
+
+def test_expression_folding_and_compilation() -> None:
+    constants = {"TiH": 16, "TiW": 16, "Cin": 64}
+    preamble = fold(expr("TiH * TiW * Cin"), constants)
+    assert isinstance(preamble, IntLiteral) and preamble.value == 16384
+    folded = fold(expr("(i mod 2) * (TiH * TiW * Cin)"), constants)
+    assert isinstance(folded, BinaryOp) and isinstance(folded.right, IntLiteral)
+    assert folded.right.value == 16384
+    unfolded = fold(expr("4 / (2 - 2)"))  # kept, so evaluation reports it
+    assert isinstance(unfolded, BinaryOp) and isinstance(unfolded.right, IntLiteral)
+    for source in ("(i mod 2) * TiH - i / 3", "-i mod 3 + TiW", "i / j", "i mod j * 2.5"):
+        compiled = compile_expr(expr(source), ("i", "j"), constants)
+        for i in range(-4, 5):
+            for j in (-3, 2):
+                assert compiled(i, j) == evaluate(expr(source), {**constants, "i": i, "j": j})
+    with pytest.raises(ExpressionError, match="division by zero"):
+        compile_expr(expr("i / (j - 2)"), ("i", "j"))(1, 2)
+    with pytest.raises(ExpressionError, match="undefined name 'K'"):
+        compile_expr(expr("K + i"), ("i",))
+    with pytest.raises(ExpressionError, match="expected an integer"):
+        compile_int(expr("i * 0.5"), ("i",))
+    assert compile_int(expr("TiH + 1"), ("TiH",), constants)(1) == 2  # parameters shadow
+
+
+def test_example_documents_parse_cleanly() -> None:
+    for name in ("npm_baseline_1.0.nem", "npm_lite_.nem"):
+        path = EXAMPLES_DIR / name
+        doc, diag = parse_config(path.read_text(), str(path))
+        assert not diag.get_all(), diag.format_all()
+        assert doc.file == str(path)
+    base, _ = parse_config((EXAMPLES_DIR / "npm_baseline_1.0.nem").read_text())
+    assert len(base.type_families) == 13
+    assert [d.name for d in base.devices] == ["npm_baseline_1_0"]
+
+
+def test_device_config_structure() -> None:
+    doc, diag = parse_config((EXAMPLES_DIR / "npm_lite_.nem").read_text(), "lite.nem")
+    assert not diag.has_errors()
+    assert [inc.path for inc in doc.includes] == ["npm_baseline_1.0.nem"]
+    (dev,) = doc.devices
+    assert isinstance(dev, DeviceConfigNode)
+    assert (dev.name, dev.parent, dev.spec_version) == ("npm_lite", "npm_baseline_1_0", None)
+    assert dev.topology is not None and dev.topology.num_engines == 1
+    assert [(u.unit, u.count) for u in dev.topology.device_units] == [("sDMA", 1), ("WDM", 0)]
+    assert [str(ref) for ref in dev.mandatory or ()] == [
+        "conv2d.int8<i16>.with_bias",
+        "eltwise<i32>.default",
+        "dequantize<i8, f32>.default",
+    ]
+    assert dev.extended is None
+    assert dev.location is not None and (dev.location.line, dev.location.column) == (9, 1)
+    # AST nodes are immutable and hashable
+    assert hash(doc) == hash(
+        parse_config((EXAMPLES_DIR / "npm_lite_.nem").read_text(), "lite.nem")[0]
+    )
+
+
+def test_type_family_structure() -> None:
+    doc, _ = parse_config((EXAMPLES_DIR / "npm_baseline_1.0.nem").read_text())
+    conv = doc.type_families[0]
+    assert conv.family_id == "conv2d.float"
+    assert [(p.name, p.allowed) for p in conv.type_params] == [("T", ("f16", "bf16", "f32"))]
+    assert [v.name for v in conv.variants] == ["no_bias", "with_bias"]
+    assert [(c.conformance, c.instantiation) for c in conv.variants[0].conformance] == [
+        ("MUST", ("f16",)), ("MAY", ("bf16",)), ("MAY", ("f32",)),
+    ]  # fmt: skip
+    targets = [
+        (a.name, a.value, a.target) for tf in doc.type_families for a in tf.attributes if a.target
+    ]
+    assert ("quant", "required", "dst") in targets
+
+
+def test_syntax_errors_recover_at_next_declaration() -> None:
+    source = (
+        "device a {\n"
+        "    topology { num_engines = }\n"
+        "}\n"
+        "device b extends a {\n"
+        '    spec_version = "NEM-1.0"\n'
+        "}\n"
+    )
+    doc, diag = parse_config(source, "bad.nem")
+    errors = diag.get_all()
+    assert len(errors) == 1
+    assert errors[0].location is not None and errors[0].location.line == 2
+    assert [d.name for d in doc.devices] == ["b"]
+
+
+def test_lex_error_is_reported_as_diagnostic() -> None:
+    doc, diag = parse_config("device a { $ }", "bad.nem")
+    assert diag.has_errors()
+    assert doc.devices == ()
+
+
+PROGRAM = """device "npm_lite.cfg"
+program p:
+const T = 2
+buffer A : L1[0] (size=T * 64, align=64)
+buffer B : L2 (size=128)
+let a = region(A, 0, 64) elem=i8, shape=[64], layout=C
+loop i in [0..T-1] @max_in_flight(2):
+  t1 = transfer.async(dst=region(A, i * 64, 64), src=region(B, i * 64, 64))
+  t2 = relu.async
+         in a
+         out a @materialized
+         deps=[t1]
+  wait(t2)
+endloop
+"""
+
+
+def test_example_programs_parse_cleanly() -> None:
+    for path in sorted(EXAMPLES_DIR.glob("*.nem")):
+        if path.name.startswith("npm_"):
+            continue
+        program, diagnostics = parse(path.read_text(), str(path))
+        assert not diagnostics, [str(d) for d in diagnostics]
+        assert program.name == path.stem and program.file == str(path)
+        assert program.device is not None and program.device.path == "npm_lite.cfg"
+
+
+def test_program_structure() -> None:
+    program, diagnostics = parse(PROGRAM, "p.nem")
+    assert not diagnostics
+    kinds = [type(s).__name__ for s in program.statements]
+    assert kinds == [
+        "ConstDeclNode", "BufferDeclNode", "BufferDeclNode", "RegionDeclNode", "LoopNode"
+    ]  # fmt: skip
+    buf = program.statements[1]
+    assert isinstance(buf, BufferDeclNode)
+    assert (buf.mem_level, buf.align) == ("L1", 64) and buf.l1_index is not None
+    region = program.statements[3]
+    assert isinstance(region, RegionDeclNode)
+    assert (region.region.elem, region.region.layout) == ("i8", "C")
+    loop = program.statements[4]
+    assert isinstance(loop, LoopNode)
+    assert loop.var == "i" and [d.name for d in loop.decorators] == ["max_in_flight"]
+    t1, t2, w = loop.body
+    assert isinstance(t1, TaskNode) and (t1.kind, t1.mode) == ("transfer", "async")
+    assert t1.inputs[0].region is not None and t1.inputs[0].region.buffer == "B"
+    assert isinstance(t2, TaskNode) and t2.task_type == "relu.async"
+    # "out a @materialized" decorates the operand, "deps=" is an attribute line of t2
+    assert [d.name for d in t2.outputs[0].decorators] == ["materialized"]
+    assert t2.deps == ("t1",)
+    assert isinstance(w, WaitNode) and w.tokens == ("t2",)
+
+
+def test_program_errors_recover_at_next_statement() -> None:
+    program, diagnostics = parse("program p:\nbuffer A : L9 (size=1)\nconst X = 3\n", "bad.nem")
+    assert len(diagnostics) == 1 and "memory level" in diagnostics[0].message
+    assert [type(s).__name__ for s in program.statements] == ["ConstDeclNode"]
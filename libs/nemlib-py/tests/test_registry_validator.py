@@ -0,0 +1,215 @@
+"""Tests for nemlib.core.registry_validator."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from nemlib.core.opcodes import REGISTRY_PATH, SCHEMA_PATH
+from nemlib.core.registry_validator import scan_nem_files, validate_registry
+
+pytest.importorskip("yaml")
+
+EXAMPLES_DIR = REGISTRY_PATH.parents[2] / "examples"
+
+CONFIG = """\
+type_family eltwise<T: {i8}> {
+    input: T
+    output: T
+}
+"""
+
+
+@pytest.fixture
+def reg(tmp_path: Path) -> Path:
+    d = tmp_path / "registry"
+    d.mkdir()
+    shutil.copy(REGISTRY_PATH, d / "opcodes.yaml")
+    shutil.copy(SCHEMA_PATH, d / "schema.json")
+    return d / "opcodes.yaml"
+
+
+def _edit(path: Path, old: str, new: str) -> None:
+    text = path.read_text()
+    assert old in text
+    path.write_text(text.replace(old, new, 1))
+
+
+def _line_of(path: Path, needle: str) -> int:
+    for n, line in enumerate(path.read_text().splitlines(), start=1):
+        if line.startswith(needle):
+            return n
+    raise AssertionError(needle)
+
+
+def _codes(report) -> list[str]:  # type: ignore[no-untyped-def]
+    return [d.code for d in report.diagnostics if d.code != "REG008"]
+
+
+def test_repository_registry_is_clean(tmp_path: Path) -> None:
+    report = validate_registry(cache_dir=tmp_path)
+    assert not report.has_errors(), [d.format() for d in report.errors()]
+    assert report.warnings() == []
+    assert report.summary["total"] >= 40
+    assert report.summary["by_category"]["linear_algebra"] == 2
+    assert "gemm.int4" in report.type_families
+
+
+def test_unknown_type_family(reg: Path, tmp_path: Path) -> None:
+    _edit(
+        reg,
+        "type_families: [gemm.float, gemm.int8, gemm.int4]",
+        "type_families: [gemm.float, gemm.nope]",
+    )
+    report = validate_registry(reg, examples_dir=EXAMPLES_DIR, cache_dir=tmp_path)
+    codes = _codes(report)
+    assert "REG006" in codes
+    unknown = next(d for d in report.diagnostics if d.code == "REG006")
+    assert "gemm.nope" in unknown.message
+    assert unknown.location is not None
+    assert unknown.location.line == _line_of(reg, "  gemm:")
+
+
+def test_missing_out_operand(reg: Path, tmp_path: Path) -> None:
+    _edit(
+        reg, "      - name: dst\n        direction: out", "      - name: dst\n        direction: in"
+    )
+    report = validate_registry(reg, examples_dir=EXAMPLES_DIR, cache_dir=tmp_path)
+    errors = [d for d in report.errors() if d.code == "REG003"]
+    assert [e.message for e in errors] == ["Opcode 'transfer' has no 'out' direction operands"]
+    assert errors[0].location is not None
+    assert errors[0].location.line == _line_of(reg, "  transfer:")
+
+
+def test_duplicate_operand_name(reg: Path, tmp_path: Path) -> None:
+    _edit(
+        reg,
+        "      - name: dst\n        direction: out",
+        "      - name: src\n        direction: out",
+    )
+    report = validate_registry(reg, examples_dir=EXAMPLES_DIR, cache_dir=tmp_path)
+    dups = [d for d in report.errors() if d.code == "REG004"]
+    assert len(dups) == 1 and "'transfer'" in dups[0].message
+    assert dups[0].location is not None
+    # Reported at the second entry's "- name: src" (line 16, column 9)
+    assert (dups[0].location.line, dups[0].location.column) == (16, 9)
+    assert dups[0].notes == ["first defined at line 12, column 9"]
+
+
+def test_duplicate_opcode_name(reg: Path, tmp_path: Path) -> None:
+    text = reg.read_text()
+    start = text.index("  transfer:\n")
+    end = text.index("\n  store:\n")
+    # Append a second, different "transfer" definition at the end of the opcodes table
+    second = text[start:end].replace("hardware_status: supported", "hardware_status: future")
+    reg.write_text(text.rstrip("\n") + "\n\n" + second + "\n")
+    dup_line = reg.read_text().count("\n", 0, reg.read_text().rindex("  transfer:\n")) + 1
+
+    report = validate_registry(reg, examples_dir=EXAMPLES_DIR, cache_dir=tmp_path)
+    dups = [d for d in report.errors() if d.code == "REG009"]
+    assert len(dups) == 1 and "'transfer'" in dups[0].message
+    assert dups[0].location is not None
+    assert (dups[0].location.line, dups[0].location.column) == (dup_line, 3)
+    assert dups[0].notes == ["first defined at line 7, column 3"]
+
+
+def test_example_opcode_cross_reference(reg: Path, tmp_path: Path) -> None:
+    prog = tmp_path / "prog.nem"
+    prog.write_text(
+        "# frobnicate.async in comments is ignored\n"
+        "t0 = relu.async in X out Y\n"
+        "t1 = frobnicate.async in X out Y\n"
+    )
+    cfg = tmp_path / "cfg.nem"
+    cfg.write_text(CONFIG)
+    report = validate_registry(reg, examples=[prog, cfg], cache_dir=tmp_path)
+    bad = [d for d in report.errors() if d.code == "REG007"]
+    assert len(bad) == 1
+    assert bad[0].location is not None
+    assert (bad[0].location.line, bad[0].location.column) == (3, 6)
+    # Only eltwise is declared, so other families are unknown
+    assert report.type_families == {"eltwise"}
+    assert any(d.code == "REG006" for d in report.warnings())
+
+
+def test_load_errors_are_diagnostics(tmp_path: Path) -> None:
+    report = validate_registry(
+        tmp_path / "missing.yaml", schema_path=SCHEMA_PATH, cache_dir=tmp_path
+    )
+    assert [d.code for d in report.diagnostics] == ["REG000"]
+    assert report.has_errors()
+
+    bad = tmp_path / "opcodes.yaml"
+    bad.write_text("opcodes: [unclosed\n")
+    report = validate_registry(bad, schema_path=SCHEMA_PATH, cache_dir=tmp_path)
+    assert [d.code for d in report.diagnostics] == ["REG000"]
+
+
+def test_incremental_rechecks_only_changed_opcodes(reg: Path, tmp_path: Path) -> None:
+    kwargs = dict(examples_dir=EXAMPLES_DIR, incremental=True, cache_dir=tmp_path)
+    first = validate_registry(reg, **kwargs)  # type: ignore[arg-type]
+    assert first.reused == 0 and len(first.rechecked) == first.summary["total"]
+
+    second = validate_registry(reg, **kwargs)  # type: ignore[arg-type]
+    assert second.rechecked == ()
+    assert second.diagnostics == first.diagnostics
+
+    _edit(
+        reg,
+        "type_families: [gemm.float, gemm.int8, gemm.int4]\n    execution_unit: NMU\n"
+        "    hardware_status: supported\n\n  matmul",
+        "type_families: [gemm.nope]\n    execution_unit: NMU\n"
+        "    hardware_status: supported\n\n  matmul",
+    )
+    third = validate_registry(reg, **kwargs)  # type: ignore[arg-type]
+    assert third.rechecked == ("gemm",)
+    assert [d.code for d in third.warnings()] == ["REG006"]
+
+
+def test_failed_cache_writes_leave_no_temporary_files(
+    reg: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fail(src: str, dst: str) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr("os.replace", fail)
+    cache = tmp_path / "cache"
+    report = validate_registry(reg, examples_dir=EXAMPLES_DIR, incremental=True, cache_dir=cache)
+    assert report.summary["total"] > 0
+    assert list(cache.iterdir()) == []
+
+
+def test_incremental_reanchors_cached_locations(reg: Path, tmp_path: Path) -> None:
+    _edit(
+        reg,
+        "type_families: [gemm.float, gemm.int8, gemm.int4]\n    execution_unit: NMU\n"
+        "    hardware_status: supported\n\n  matmul",
+        "type_families: [gemm.nope]\n    execution_unit: NMU\n"
+        "    hardware_status: supported\n\n  matmul",
+    )
+    kwargs = dict(examples_dir=EXAMPLES_DIR, incremental=True, cache_dir=tmp_path)
+    validate_registry(reg, **kwargs)  # type: ignore[arg-type]
+
+    # Insert comment lines above gemm: nothing changes semantically, lines shift
+    _edit(reg, "opcodes:\n", "opcodes:\n# one\n# two\n")
+    report = validate_registry(reg, **kwargs)  # type: ignore[arg-type]
+    assert report.rechecked == ()
+    (warning,) = report.warnings()
+    assert warning.location is not None
+    assert warning.location.line == _line_of(reg, "  gemm:")
+
+
+def test_json_and_sarif_output(tmp_path: Path) -> None:
+    report = validate_registry(cache_dir=tmp_path)
+    assert json.loads(json.dumps(report.to_json()))["status"] == "passed"
+    sarif = report.to_sarif()
+    assert sarif["runs"][0]["tool"]["driver"]["name"] == "nem-registry-validator"
+
+
+def test_scan_preserves_order() -> None:
+    paths = sorted(EXAMPLES_DIR.glob("*.nem"))
+    scans = scan_nem_files(paths, max_workers=4)
+    assert [s.path for s in scans] == [str(p) for p in paths]
+    baseline = next(s for s in scans if s.path.endswith("npm_baseline_1.0.nem"))
+    assert "gemm.float" in {name for name, _, _ in baseline.type_families}
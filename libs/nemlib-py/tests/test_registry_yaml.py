@@ -0,0 +1,71 @@
+"""Tests for nemlib.core.registry_yaml — the event-driven registry parser."""
+
+import pytest
+
+from nemlib.core.opcodes import REGISTRY_PATH
+from nemlib.core.registry_yaml import DuplicateKey, parse_registry_yaml
+
+yaml = pytest.importorskip("yaml")
+
+SAMPLE = """\
+version: "1.0"
+base: &base
+  required: false
+  default: 1
+opcodes:
+  op_a:
+    operands:
+      - name: X
+        direction: in
+      - name: Y
+        direction: out
+    attributes:
+      - <<: *base
+        name: k
+      - name: k
+        required: true
+    values: [1, 2.5, true, null, ~, 0x10, "7"]
+  op_b:
+    operands: []
+    operands: []
+  op_a:
+    status: future
+"""
+
+
+def test_matches_safe_load_on_registry() -> None:
+    raw = REGISTRY_PATH.read_bytes()
+    assert parse_registry_yaml(raw).data == yaml.safe_load(raw)
+
+
+def test_matches_safe_load_on_sample() -> None:
+    # Scalars, anchors, aliases and merge keys resolve exactly as in safe_load
+    assert parse_registry_yaml(SAMPLE).data == yaml.safe_load(SAMPLE)
+
+
+def test_duplicates_reported_with_positions() -> None:
+    doc = parse_registry_yaml(SAMPLE)
+    assert doc.duplicates == (
+        DuplicateKey("attribute", "k", "opcodes.op_a.attributes", 15, 9, 13, 9),
+        DuplicateKey("key", "operands", "opcodes.op_b", 20, 5, 19, 5),
+        DuplicateKey("opcode", "op_a", "opcodes", 21, 3, 6, 3),
+    )
+    assert doc.duplicates[2].describe() == (
+        "duplicate opcode 'op_a' in 'opcodes' at line 21, column 3 "
+        "(first defined at line 6, column 3)"
+    )
+
+
+def test_positions() -> None:
+    doc = parse_registry_yaml(SAMPLE)
+    assert doc.positions["opcodes.op_a"] == (6, 3)  # first definition
+    assert doc.positions["opcodes.op_b"] == (18, 3)
+    assert doc.positions["opcodes.op_a.operands.Y"] == (10, 9)
+    assert doc.positions["opcodes.op_a.attributes.k"] == (13, 9)
+
+
+def test_malformed_yaml_raises() -> None:
+    with pytest.raises(yaml.YAMLError):
+        parse_registry_yaml("opcodes: [unclosed\n")
+    with pytest.raises(yaml.YAMLError):
+        parse_registry_yaml("opcodes: *missing\n")
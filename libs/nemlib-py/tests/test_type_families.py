@@ -0,0 +1,67 @@
+"""Tests for nemlib.types.families, nemlib.types.registry and nemlib.core.elements."""
+
+from pathlib import Path
+
+from nemlib.core import ElementType
+from nemlib.device import load_device_library
+from nemlib.types import TypeFamily, TypeFamilyRegistry, baseline_families
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def test_element_types() -> None:
+    assert ElementType("i8") is ElementType.I8
+    assert ElementType.I8 == "i8" and hash(ElementType.I8) == hash("i8")
+    assert str(ElementType.BF16) == "bf16"
+    assert (ElementType.I4.bitwidth(), ElementType.I4.sizeof()) == (4, 0.5)
+    assert ElementType.F32.sizeof() == 4
+    assert ElementType.U16.is_integer() and not ElementType.U16.is_signed()
+    assert ElementType.BF16.is_float()
+
+
+def test_baseline_families_match_example_catalog() -> None:
+    families = {f.family_id: f for f in baseline_families()}
+    assert len(families) == 13
+    library = load_device_library(EXAMPLES_DIR / "npm_baseline_1.0.nem")
+    for family_id, node in library.type_families.items():
+        from_file = TypeFamily.from_node(node)
+        assert [i.ref for i in from_file.instances()] == [
+            i.ref for i in families[family_id].instances()
+        ]
+
+
+def test_instances_expand_conformance() -> None:
+    registry = TypeFamilyRegistry.baseline()
+    inst = registry.instance("gemm.float<f16>.with_bias")
+    assert inst is not None
+    assert (inst.conformance, inst.accum, inst.quant) == ("MUST", "f32", "absent")
+    assert dict(inst.operands) == {"A": "f16", "B": "f16", "Y": "f16", "C": "f16"}
+    assert registry.instance("gemm.float<bf16>.with_bias") is None  # not listed
+    assert registry.instance("gemm.int4.no_bias").conformance == "MAY"  # type: ignore[union-attr]
+    quant = registry.instance("quantize<f16, i8>.default")
+    assert quant is not None and quant.quant_target == "dst"
+    # Every MUST variant is listed by the baseline device
+    baseline = load_device_library(EXAMPLES_DIR / "npm_baseline_1.0.nem").devices[
+        "npm_baseline_1_0"
+    ]
+    must = {i.ref for f in baseline_families() for i in f.instances() if i.conformance == "MUST"}
+    assert must == baseline.mandatory_variants
+
+
+def test_signature_tables() -> None:
+    registry = TypeFamilyRegistry.baseline()
+    gemm = registry.table("gemm")
+    assert gemm.operands == ("A", "B", "C", "Y")
+    assert [i.ref for i in gemm.entries[("i8", "i8", "i32", "i8")]] == ["gemm.int8<i8>.with_bias"]
+    assert [i.ref for i in gemm.entries[("f16", "f16", None, "f16")]] == ["gemm.float<f16>.no_bias"]
+    # matmul has no C operand, so only the no_bias variants apply
+    assert {i.variant for i in registry.table("matmul").instances} == {"no_bias"}
+    # Generic input/output bind all inputs; optional ones may be absent
+    layernorm = registry.table("layernorm")
+    assert ("f16", None, "f16", "f16") in layernorm.entries
+    assert ("f16", "f32", None, "f16") not in layernorm.entries
+    # gather's index operand is not part of the signature
+    assert registry.table("gather").operands == ("X", "Y")
+    assert len(registry.table("cast").entries) == len(ElementType) ** 2
+    assert registry.table("conv1d").instances == ()
+    assert registry.table("gemm") is gemm  # compiled once
@@ -0,0 +1,83 @@
+"""Tests for nemlib.types.matching."""
+
+from pathlib import Path
+
+import pytest
+
+from nemlib.core import ElementType
+from nemlib.device import load_device
+from nemlib.types import MatchResult, TypeFamilyRegistry, match_opcode_instance
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+I4, I8, I16, I32 = ElementType.I4, ElementType.I8, ElementType.I16, ElementType.I32
+F16, BF16, F32 = ElementType.F16, ElementType.BF16, ElementType.F32
+
+
+@pytest.fixture(scope="module")
+def registry() -> TypeFamilyRegistry:
+    return TypeFamilyRegistry.baseline()
+
+
+@pytest.fixture(scope="module")
+def npm_lite():  # type: ignore[no-untyped-def]
+    return load_device(EXAMPLES_DIR / "npm_lite_.nem")
+
+
+@pytest.mark.parametrize(
+    "opcode, operands, ref, conformance",
+    [
+        ("gemm", {"A": I8, "B": I8, "Y": I8}, "gemm.int8<i8>.no_bias", "MUST"),
+        ("gemm", {"A": I8, "B": I8, "C": I32, "Y": I16}, "gemm.int8<i16>.with_bias", "MAY"),
+        ("matmul", {"A": BF16, "B": BF16, "Y": BF16}, "gemm.float<bf16>.no_bias", "MAY"),
+        ("gemm", {"A": I8, "B": I4, "Y": I8}, "gemm.int4.no_bias", "MAY"),
+        ("conv2d", {"X": F16, "W": F16, "B": F16, "Y": F16}, "conv2d.float<f16>.with_bias", "MUST"),
+        ("add", {"A": "i8", "B": "i8", "Y": "i8"}, "eltwise<i8>.default", "MUST"),
+        ("rmsnorm", {"X": F32, "scale": F32, "Y": F32}, "norm<f32>.default", "MAY"),
+        ("cast", {"X": F32, "Y": I4}, "cast.default", "MUST"),
+        ("dequantize", {"X": I8, "Y": F16}, "dequantize<i8, f16>.default", "MUST"),
+    ],
+)
+def test_match_without_device(
+    registry: TypeFamilyRegistry, opcode: str, operands: dict, ref: str, conformance: str
+) -> None:
+    assert match_opcode_instance(opcode, operands, {}, None, registry) == MatchResult(
+        True, ref, conformance
+    )
+
+
+@pytest.mark.parametrize(
+    "opcode, operands, detail",
+    [
+        ("add", {"A": I8, "B": F16, "Y": I8}, "nearest variant: eltwise<i8>.default"),
+        ("gemm", {"A": I8, "B": I8}, "no type family variant of gemm accepts"),
+        ("conv2d", {"X": I8, "W": I8, "B": I8, "Y": I8}, "nearest variant: conv2d.int8<i8>"),
+        ("gemm", {"A": BF16, "B": BF16, "C": BF16, "Y": BF16}, "gemm.float<bf16>.no_bias"),
+        ("maxpool", {"X": F16, "Y": F16}, "has no type family"),
+    ],
+)
+def test_mismatch(registry: TypeFamilyRegistry, opcode: str, operands: dict, detail: str) -> None:
+    result = match_opcode_instance(opcode, operands, {}, None, registry)
+    assert not result.matched and result.variant_ref is None
+    assert result.error_detail is not None and detail in result.error_detail
+
+
+def test_accum_type(registry: TypeFamilyRegistry) -> None:
+    operands = {"A": F16, "B": F16, "Y": F16}
+    assert match_opcode_instance("gemm", operands, {"accum_type": F32}, None, registry).matched
+    result = match_opcode_instance("gemm", operands, {"accum_type": "i32"}, None, registry)
+    assert not result.matched and "accum_type = i32" in (result.error_detail or "")
+
+
+def test_device_effective_set(registry: TypeFamilyRegistry, npm_lite) -> None:  # type: ignore[no-untyped-def]
+    # MAY variant promoted by npm_lite
+    result = match_opcode_instance("add", {"A": I32, "B": I32, "Y": I32}, {}, npm_lite, registry)
+    assert (result.matched, result.variant_ref) == (True, "eltwise<i32>.default")
+    # MAY variant npm_lite does not list
+    result = match_opcode_instance("add", {"A": F32, "B": F32, "Y": F32}, {}, npm_lite, registry)
+    assert not result.matched
+    assert "eltwise<f32>.default (MAY)" in (result.error_detail or "")
+    assert "does not support" in (result.error_detail or "")
+    # Nearest suggestion prefers variants the device has
+    result = match_opcode_instance("gemm", {"A": I8, "B": I8, "Y": I16}, {}, npm_lite, registry)
+    assert "nearest variant: gemm.int8<i8>.no_bias" in (result.error_detail or "")
@@ -0,0 +1,204 @@
+"""Tests for the individual validation passes (nemlib.validation)."""
+
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+
+from nemlib.device import DeviceConfig, load_device
+from nemlib.diagnostics import DiagnosticCollector, DiagnosticSeverity
+from nemlib.parser import parse
+from nemlib.validation import validate
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+HEADER = """program p:
+const N = 4
+buffer X : L2 (size=N * 64, align=64)
+buffer Y : L1 (size=256, align=64)
+"""
+
+
+@lru_cache(maxsize=1)
+def lite() -> DeviceConfig:
+    return load_device(EXAMPLES_DIR / "npm_lite_.nem")
+
+
+def errors(body: str, severity: DiagnosticSeverity = DiagnosticSeverity.ERROR) -> list[str]:
+    program, diagnostics = parse(HEADER + body, "t.nem")
+    assert not diagnostics, [str(d) for d in diagnostics]
+    diag = DiagnosticCollector()
+    validate(program, lite(), diag)
+    return [d.message for d in diag.get_all() if d.severity is severity]
+
+
+@pytest.mark.parametrize(
+    "name", ["conv2d_relu", "conv2d_maxpool", "gemm_bias_relu", "gemm_rmsnorm"]
+)
+def test_examples_validate(name: str) -> None:
+    path = EXAMPLES_DIR / f"{name}.nem"
+    program, diagnostics = parse(path.read_text(), str(path))
+    diag = DiagnosticCollector()
+    diag.extend(diagnostics)
+    validate(program, lite(), diag)
+    assert not diag.has_errors(), diag.format_all()
+    # the weights/bias transfer re-copies the same bytes every iteration
+    (info,) = diag.get_all()
+    assert "can be hoisted out of the loop" in info.message
+
+
+def test_name_resolution() -> None:
+    assert errors("let a = region(Q, 0, 64)\nt = relu.async in a out a deps=[t0]\n") == [
+        "undefined buffer 'Q'",
+        "undefined token 't0'",
+    ]
+    assert errors("const N = 2\n") == ["duplicate declaration of 'N' (first declared at t.nem:2:1)"]
+
+
+def test_constants_and_buffers() -> None:
+    assert errors("const Z = N / 0\n") == ["constant 'Z': division by zero"]
+    assert errors("buffer Z : L1[1] (size=64, align=48)\n") == [
+        "buffer 'Z' alignment 48 is not a power of two",
+        "buffer 'Z' is placed in L1[1], but device 'npm_lite' has 1 engine(s)",
+    ]
+    big = errors("buffer Z : L1 (size=4 * 1024 * 1024)\n")
+    assert len(big) == 1 and "exceeding the" in big[0]
+
+
+def test_region_bounds() -> None:
+    assert errors("let a = region(X, 200, 64)\n") == [
+        "region 'a' [200, 264) exceeds buffer 'X' (size 256)"
+    ]
+    assert errors("let a = region(Y, 0, 64) elem=f16, shape=[8, 8], layout=MN\n") == [
+        "region 'a' extent 64 is smaller than 128 bytes needed for f16[8, 8]"
+    ]
+    loop = "loop i in [0..N] :\n  let a = region(X, i * 64, 64)\nendloop\n"
+    assert errors(loop) == ["region 'a' [256, 320) exceeds buffer 'X' (size 256) (at i = 4)"]
+
+
+def test_types() -> None:
+    untyped = "let a = region(Y, 0, 64)\nt = relu.async in a out a\n"
+    assert errors(untyped) == [
+        "operand X of task 't' must be a typed region (elem, shape, layout/strides)",
+        "operand Y of task 't' must be a typed region (elem, shape, layout/strides)",
+    ]
+    typed = "let a = region(Y, 0, 128) elem=f16, shape=[8, 8], layout=MN\n"
+    assert errors(typed + "t = relu.async in a out a bogus=1\n") == [
+        "task 't': unknown attribute 'bogus' for opcode 'relu'"
+    ]
+    assert errors(typed + "t = frobnicate.async in a out a\n") == ["unknown opcode 'frobnicate'"]
+
+
+def test_dependencies_and_hazards() -> None:
+    regions = "let a = region(X, 0, 64)\nlet b = region(Y, 0, 64)\n"
+    racy = regions + "t1 = transfer.async(dst=b, src=a)\nt2 = store.async(dst=a, src=b)\n"
+    (hazard,) = errors(racy)
+    assert hazard.startswith("hazard: task 't1' and task 't2' access overlapping bytes [0, 64)")
+    ordered = racy.replace("src=b)", "src=b, deps=[t1])")
+    assert errors(ordered) == []
+    early = (
+        regions + "t1 = transfer.async(dst=b, src=a, deps=[t2])\nt2 = store.async(dst=a, src=b)\n"
+    )
+    assert errors(early)[0] == "token 't2' is used before it is produced (at t.nem:8:1)"
+    overlap = "t = transfer.async(dst=region(X, 32, 64), src=region(X, 0, 64))\n"
+    assert errors(overlap) == [
+        "task 't' has overlapping source and destination and requires @memmove"
+    ]
+    assert errors(overlap.replace("\n", " @memmove\n")) == []
+
+
+def test_loop_iterations_race_without_dependency() -> None:
+    body = (
+        "let b = region(Y, 0, 64)\n"
+        "loop i in [0..N-1] @max_in_flight(2):\n"
+        "  t1 = transfer.async(dst=b, src=region(X, i * 64, 64))\n"
+        "  t2 = store.async(dst=region(X, i * 64, 64), src=b, deps=[t1])\n"
+        "endloop\n"
+    )
+    (hazard, *_) = errors(body)
+    assert "(i = 0)" in hazard and "(i = 1)" in hazard
+    assert errors(body.replace("@max_in_flight(2)", "@max_in_flight(1)")) == []
+
+
+def test_invariant_transfer_is_validated_as_hoisted() -> None:
+    body = (
+        "let w = region(Y, 0, 64)\n"
+        "loop i in [0..N-1] @max_in_flight(2):\n"
+        "  tW = transfer.async(dst=w, src=region(X, 0, 64))\n"
+        "  tC = transfer.async(dst=region(Y, 64 + (i mod 2) * 64, 64), src=w, deps=[tW])\n"
+        "endloop\n"
+    )
+    assert errors(body) == []
+    assert errors(body, DiagnosticSeverity.INFO) == [
+        "task 'tW' does not depend on loop variable 'i' and can be hoisted out of the loop"
+    ]
+    # once something writes the source, every iteration's copy matters
+    clobber = body.replace(
+        "endloop", "  tX = store.async(dst=region(X, 0, 64), src=w, deps=[tC])\nendloop"
+    )
+    assert errors(clobber)[0].startswith("hazard: task 'tW' (i = 0) and task 'tW' (i = 1)")
+
+
+def test_hazards_on_a_fully_unrolled_loop() -> None:
+    path = EXAMPLES_DIR / "conv2d_relu.nem"
+    source = path.read_text().replace("const T = 4", "const T = 1024")
+    racy = source.replace("src=Y_pp_i, deps=[tR])", "src=Y_pp_i)")
+    messages = []
+    for text in (source, racy):
+        program, _ = parse(text, str(path))
+        diag = DiagnosticCollector()
+        validate(program, None, diag)
+        messages.append(
+            [d.message for d in diag.get_all() if d.severity is DiagnosticSeverity.ERROR]
+        )
+    assert messages[0] == []
+    assert messages[1] == [
+        f"hazard: task '{t}' (i = 0) and task 'tS' (i = 0) access overlapping bytes [0, 25088) "
+        "of buffer 'Y_L1' and at least one writes them, but no dependency orders them"
+        for t in ("tC", "tR")
+    ]
+
+
+def test_periodic_loops_are_not_unrolled() -> None:
+    path = EXAMPLES_DIR / "conv2d_relu.nem"
+    source = path.read_text().replace("const T = 4", "const T = 1000000")
+    early = "t0 = store.async(dst=region(X_L2, 999990 * tileX_bytes, 64), src=region(B_L2, 0, 64))"
+    program, _ = parse(source.replace("loop i in", early + "\nloop i in"), str(path))
+    diag = DiagnosticCollector()
+    validate(program, None, diag)
+    (hazard,) = [d.message for d in diag.get_all() if d.severity is DiagnosticSeverity.ERROR]
+    assert hazard.startswith("hazard: task 't0' and task 'tX' (i = 6..999999) access overlapping")
+    # offsets without a periodic form fall back to checking every iteration
+    squares = "loop i in [0..N-1]:\n  let a = region(X, i * i * 32, 64)\nendloop\n"
+    assert errors(squares) == ["region 'a' [288, 352) exceeds buffer 'X' (size 256) (at i = 3)"]
+    ping_pong = "loop i in [0..N * 1000]:\n  let a = region(Y, 64 + (i mod 4) * 64, 64)\nendloop\n"
+    assert errors(ping_pong) == ["region 'a' [256, 320) exceeds buffer 'Y' (size 256) (at i = 3)"]
+
+
+def test_engines_and_decorators() -> None:
+    two = (
+        "buffer Z : L1[0] (size=64)\nt = transfer.async(dst=region(Z, 0, 64), src=region(Y, 0, 64))"
+    )
+    assert errors(two + " @seq_engine(1)\n") == [
+        "task 't' is pinned to engine 1 by @seq_engine but references L1[0]",
+        "@seq_engine(1) on task 't' is not an engine of device 'npm_lite'",
+    ]
+    move = "t = transfer.async(dst=region(Y, 0, 64), src=region(X, 0, 64))"
+    assert errors(move + " @resource(SEQ[0])\n") == [
+        "@resource(SEQ[...]) on task 't': SEQ is not a valid resource; "
+        "expected one of NMU, CSTL, DMA, VPU"
+    ]
+    assert errors(move + " @bogus\n") == ["unknown decorator '@bogus' on task 't'"]
+    assert errors(move + " @materialized\n") == ["@materialized does not apply to task 't'"]
+    readonly = (
+        "let a = region(Y, 0, 64) @readonly\nt = transfer.async(dst=a, src=region(X, 0, 64))\n"
+    )
+    assert errors(readonly) == ["task 't' writes @readonly region 'a'"]
+
+
+def test_loops() -> None:
+    assert errors("loop i in [0..N-1] @max_in_flight(0):\n  const Q = 1\nendloop\n") == [
+        "constant 'Q' is declared inside loop 'i'; constants must be declared at program level",
+        "@max_in_flight(0) on loop 'i' must be >= 1",
+    ]
+    assert errors("loop i in [3..1]:\nendloop\n") == ["loop 'i' has an empty range [3..1]"]
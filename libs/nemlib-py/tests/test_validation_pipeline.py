@@ -0,0 +1,103 @@
+"""Tests for nemlib.validation.pipeline (pass graph, executors, pass-level caching)."""
+
+from pathlib import Path
+
+import pytest
+
+import nemlib.validation.pipeline
+from nemlib.device import load_device
+from nemlib.device.model import FrozenDict
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser import parse
+from nemlib.validation import (
+    DEFAULT_PASSES,
+    ValidationPass,
+    ValidationPipeline,
+    clear_validation_cache,
+)
+from nemlib.validation.pipeline import ExecutorKind
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+SOURCE = (EXAMPLES_DIR / "gemm_bias_relu.nem").read_text()
+BROKEN = SOURCE.replace(
+    "buffer Y_L1 : L1 (size=2*tileY_bytes", "buffer Y_L1 : L1 (size=tileY_bytes"
+)
+
+
+def run(pipeline: ValidationPipeline, source: str) -> tuple[list[str], dict[str, bool]]:
+    program, _ = parse(source, "gemm.nem")
+    diag = DiagnosticCollector()
+    report = pipeline.run(program, load_device(EXAMPLES_DIR / "npm_lite_.nem"), diag)
+    assert [r.name for r in report.passes] == [p.name for p in DEFAULT_PASSES]
+    return [str(d) for d in diag.get_all()], {r.name: r.cached for r in report.passes}
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_executors_report_the_same_diagnostics(executor: ExecutorKind) -> None:
+    expected, _ = run(ValidationPipeline(executor="serial", cache=False), BROKEN)
+    assert any("exceeds buffer 'Y_L1'" in d for d in expected)
+    with ValidationPipeline(executor=executor, max_workers=4, cache=False) as pipeline:
+        for _ in range(2):  # the pool is reused
+            assert run(pipeline, BROKEN)[0] == expected
+
+
+def test_revalidation_reuses_unaffected_passes() -> None:
+    clear_validation_cache()
+    pipeline = ValidationPipeline(executor="serial")
+    first, cached = run(pipeline, SOURCE)
+    assert not any(cached.values())
+    again, cached = run(pipeline, SOURCE)
+    assert again == first and all(cached.values())
+    # changing a task attribute in place leaves buffers, regions and loops untouched
+    _, cached = run(pipeline, SOURCE.replace("accum_type=f32", "accum_type=f16"))
+    assert {name for name, hit in cached.items() if not hit} == {
+        "names", "types", "dependencies", "hazards", "engines", "decorators"
+    }  # fmt: skip
+
+
+def test_hash_collisions_do_not_share_results(monkeypatch: pytest.MonkeyPatch) -> None:
+    # the buffer pass reads the constants, {X: -1} and {X: -2}: equal hashes
+    assert hash(FrozenDict({"X": -1})) == hash(FrozenDict({"X": -2}))
+    pipeline = ValidationPipeline(executor="serial")
+
+    def errors(x: int) -> list[str]:
+        source = f"program p:\nconst X = {x}\nbuffer A : L2 (size=X + 2, align=64)\n"
+        program, _ = parse(source, "p.nem")
+        diag = DiagnosticCollector()
+        pipeline.run(program, None, diag)
+        return [d.message for d in diag.get_all()]
+
+    size_0 = ["buffer 'A' has size 0; sizes must be > 0"]
+    for fingerprint in (None, lambda artifact: "0"):  # then every artifact collides
+        if fingerprint is not None:
+            monkeypatch.setattr(nemlib.validation.pipeline, "_fingerprint", fingerprint)
+        clear_validation_cache()
+        assert [errors(x) for x in (-1, -2, -1, 5, -2)] == [[], size_0, [], [], size_0]
+    assert run(pipeline, BROKEN)[0] == run(ValidationPipeline(cache=False), BROKEN)[0]
+
+
+def test_critical_errors_skip_later_passes() -> None:
+    program, _ = parse("program p:\nt = relu.async in a out a\n", "p.nem")
+    diag = DiagnosticCollector()
+    report = ValidationPipeline(cache=False, executor="serial").run(program, None, diag)
+    assert [r.name for r in report.passes] == ["names"]
+    assert report.skipped == tuple(p.name for p in DEFAULT_PASSES[1:])
+    assert diag.has_errors()
+
+
+def test_timings_are_reported() -> None:
+    program, _ = parse(SOURCE, "gemm.nem")
+    report = ValidationPipeline(cache=False, executor="serial").run(
+        program, None, DiagnosticCollector()
+    )
+    assert set(report.timings) == {p.name for p in DEFAULT_PASSES}
+    assert all(seconds >= 0.0 for seconds in report.timings.values())
+    assert report.wall_time >= max(report.timings.values())
+    assert "hazards" in report.format_timings()
+
+
+def test_pass_inputs_must_be_provided_earlier() -> None:
+    late = ValidationPass("late", lambda diag, x: None, ("token_bindings",))
+    with pytest.raises(ValueError, match="no earlier pass provides"):
+        ValidationPipeline((late, *DEFAULT_PASSES))
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the NumPy backend's GEMM and conv2d kernels vs naive versions.
+
+1. ``gemm`` on i8 operands with an i32 accumulator (and on f16 with f32):
+   the backend's exact panelled BLAS path vs NumPy's integer ``matmul`` (exact,
+   no BLAS) and vs the float32 upcast of the interpreter spec's sketch
+   (§8.2), which rounds once partial sums outgrow 24 bits, as sums of
+   non-negative operands do; reports time and how many outputs each gets
+   wrong.
+2. ``conv2d`` (NHWC, HWIO) in dense, strided, grouped and depthwise shapes:
+   the backend's per-tap strided views vs im2col (a zero-padded copy of the
+   input unrolled into a [N*Ho*Wo, Kh*Kw*Cin] matrix) followed by an integer
+   GEMM; reports time and peak memory, and checks the outputs are equal.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_compute.py [--runs N]
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from neminterp.compute import NumpyBackend
+from neminterp.memory import MemoryLevel, RegionView
+
+KERNELS = NumpyBackend()
+
+
+def measure(f: Callable[[], Any], runs: int) -> tuple[float, float, Any]:
+    """Median time, peak traced memory (MiB) and the result of ``f``."""
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        result = f()
+        samples.append(time.perf_counter() - t)
+    tracemalloc.start()
+    f()
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return statistics.median(samples), peak, result
+
+
+def output(shape: tuple[int, ...], elem: str) -> RegionView:
+    level = MemoryLevel("L1", int(np.prod(shape)) * 4)
+    return RegionView(level, 0, level.size, elem, shape)
+
+
+def kernel(opcode: str, inputs: list[np.ndarray], y: RegionView, **attributes: Any) -> np.ndarray:
+    KERNELS.kernel(opcode)(inputs, [y], attributes)
+    return y.array()
+
+
+def im2col_conv2d(x: np.ndarray, w: np.ndarray, pad: int, stride: int, groups: int) -> np.ndarray:
+    padded = np.pad(x, ((0, 0), (pad, pad), (pad, pad), (0, 0)))
+    kh, kw, depth, cout = w.shape
+    windows = sliding_window_view(padded, (kh, kw), axis=(1, 2))[:, ::stride, ::stride]
+    n, out_h, out_w = windows.shape[:3]
+    per_group = cout // groups
+    y = np.empty((n, out_h, out_w, cout), np.int32)
+    for g in range(groups):
+        group = windows[..., g * depth : (g + 1) * depth, :, :]  # [N, Ho, Wo, C, Kh, Kw]
+        columns = group.transpose(0, 1, 2, 4, 5, 3).reshape(n * out_h * out_w, -1)
+        weights = w[..., g * per_group : (g + 1) * per_group].reshape(-1, per_group)
+        y[..., g * per_group : (g + 1) * per_group] = np.matmul(
+            columns, weights, dtype=np.int32
+        ).reshape(n, out_h, out_w, per_group)
+    return y
+
+
+def bench_gemm(m: int, k: int, n: int, runs: int) -> None:
+    rng = np.random.default_rng(0)
+    # non-negative, like activations after a ReLU: sums outgrow 24 bits
+    a = rng.integers(0, 128, (m, k), np.int8)
+    b = rng.integers(0, 128, (k, n), np.int8)
+    print(f"gemm [{m} x {k}] x [{k} x {n}] i8 (non-negative), i32 accumulator:")
+    exact = np.matmul(a, b, dtype=np.int32)
+    y = output((m, n), "i32")
+    for label, f in (
+        ("integer matmul", lambda: np.matmul(a, b, dtype=np.int32)),
+        ("float32 upcast (§8.2)", lambda: a.astype(np.float32) @ b.astype(np.float32)),
+        ("backend", lambda: kernel("gemm", [a, b], y, accum_type="i32")),
+    ):
+        elapsed, _, result = measure(f, runs)
+        wrong = np.count_nonzero(result.astype(np.int64) != exact)
+        print(f"  {label:24s} {elapsed * 1e3:9.1f} ms   {wrong:8d} outputs wrong")
+    af, bf = a.astype(np.float16), (b / 128).astype(np.float16)
+    yf = output((m, n), "f32")
+    print(f"gemm [{m} x {k}] x [{k} x {n}] f16, f32 accumulator:")
+    for label, f in (
+        ("matmul(dtype=f32)", lambda: np.matmul(af, bf, dtype=np.float32)),
+        ("backend", lambda: kernel("gemm", [af, bf], yf, accum_type="f32")),
+    ):
+        print(f"  {label:24s} {measure(f, runs)[0] * 1e3:9.1f} ms")
+
+
+def bench_conv2d(
+    label: str,
+    x_shape: tuple[int, ...],
+    w_shape: tuple[int, ...],
+    stride: int,
+    groups: int,
+    runs: int,
+) -> None:
+    rng = np.random.default_rng(0)
+    x = rng.integers(-128, 128, x_shape, np.int8)
+    w = rng.integers(-128, 128, w_shape, np.int8)
+    pad = w_shape[0] // 2
+    n, h, width, _ = x_shape
+    out_h, out_w = (
+        (h + 2 * pad - w_shape[0]) // stride + 1,
+        (width + 2 * pad - w_shape[1]) // stride + 1,
+    )
+    y = output((n, out_h, out_w, w_shape[3]), "i32")
+    attributes = dict(pads=[pad] * 4, strides=[stride] * 2, dilations=[1, 1], groups=groups)
+    print(f"conv2d {label}: X {list(x_shape)} i8, W {list(w_shape)} i8, stride {stride}:")
+    results = []
+    for name, f in (
+        ("im2col + integer matmul", lambda: im2col_conv2d(x, w, pad, stride, groups)),
+        ("backend", lambda: kernel("conv2d", [x, w], y, accum_type="i32", **attributes)),
+    ):
+        elapsed, peak, result = measure(f, runs)
+        results.append(result.copy())
+        print(f"  {name:24s} {elapsed * 1e3:9.1f} ms   peak {peak:8.2f} MiB")
+    assert np.array_equal(results[0], results[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    bench_gemm(128, 4096, 512, args.runs)
+    bench_conv2d("3x3", (1, 56, 56, 64), (3, 3, 64, 64), 1, 1, args.runs)
+    bench_conv2d("3x3 stride 2", (1, 56, 56, 128), (3, 3, 128, 128), 2, 1, args.runs)
+    bench_conv2d("grouped (8)", (1, 56, 56, 128), (3, 3, 16, 128), 1, 8, args.runs)
+    bench_conv2d("depthwise", (1, 112, 112, 32), (3, 3, 1, 32), 1, 32, args.runs)
+
+
+if __name__ == "__main__":
+    main()
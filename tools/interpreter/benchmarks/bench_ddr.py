@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: lazy, file-mapped DDR vs an eager ``bytearray`` DDR.
+
+1. Starts ``--instances`` interpreters in parallel processes, each with the
+   default 256 MiB DDR, running ``examples/gemm_rmsnorm.nem`` with its L2
+   tensors moved to DDR. Reports the peak resident set size of each process
+   with a ``bytearray`` DDR (interpreter_spec §7.1) and with the lazy one.
+2. Writes a ``--weights-mib`` raw weight file and places it in DDR (sized to
+   fit) in a fresh process, with ``np.fromfile`` + ``ddr_write_tensor`` and
+   with ``ddr_load_file``. Reports load time and peak resident set size.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_ddr.py [--instances N] [--weights-mib N]
+"""
+
+import argparse
+import multiprocessing
+import re
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from neminterp import NemInterpreter
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def run_instance(lazy: bool) -> float:
+    source = (EXAMPLES_DIR / "gemm_rmsnorm.nem").read_text()
+    source = re.sub(r"(buffer [A-Z]_L2) : L2", r"\1 : DDR", source)
+    interp = NemInterpreter(lazy_ddr=lazy)
+    interp.run(interp.load_string(source))
+    return peak_rss_mib()
+
+
+def load_weights(path: str, size: int, mapped: bool) -> tuple[float, float]:
+    interp = NemInterpreter(ddr_size=size + 2**20)
+    before = peak_rss_mib()
+    t = time.perf_counter()
+    if mapped:
+        interp.ddr_load_file(0, path)
+    else:
+        interp.ddr_write_tensor(0, np.fromfile(path, np.uint8))
+    elapsed = time.perf_counter() - t
+    # touch one byte per MiB, as a run streaming a few tiles would
+    checksum = int(np.frombuffer(interp.memory.ddr.data, np.uint8, size)[:: 2**20].sum())
+    assert checksum >= 0
+    return elapsed, peak_rss_mib() - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--instances", type=int, default=8)
+    parser.add_argument("--weights-mib", type=int, default=1024)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{args.instances} parallel interpreters, 256 MiB DDR each:")
+    for lazy in (False, True):
+        with context.Pool(args.instances) as pool:
+            rss = pool.map(run_instance, [lazy] * args.instances)
+        label = "lazy mmap" if lazy else "bytearray"
+        print(f"  {label:10s} peak RSS per process {max(rss):8.1f} MiB   total {sum(rss):9.1f} MiB")
+
+    size = args.weights_mib * 2**20
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "weights.bin")
+        np.random.default_rng(0).integers(0, 255, size, np.uint8).tofile(path)
+        print(f"{args.weights_mib} MiB weight file:")
+        for mapped in (False, True):
+            with context.Pool(1) as pool:
+                elapsed, rss = pool.apply(load_weights, (path, size, mapped))
+            label = "ddr_load_file" if mapped else "read + ddr_write_tensor"
+            print(f"  {label:24s} {elapsed * 1e3:9.1f} ms   RSS growth {rss:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fused elementwise chains vs one task at a time.
+
+Runs ``examples/gemm_bias_relu.nem`` (``gemm → relu`` on the same L1 tile)
+with its L2 tensors moved to DDR, extended by ``--post-ops`` further
+in-place elementwise tasks per tile (``clamp``, ``neg``, ``abs``, ...), with
+the NumPy backend unfused and with ``NumpyBackend(fuse=True)``, where each
+tile's chain runs right after its ``gemm``. Reports the median time per run
+for small tiles (where per-task overhead dominates) and for large ones, and
+checks that the outputs are bit-identical.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_fusion.py [--post-ops N] [--runs N]
+"""
+
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from neminterp import NemInterpreter
+from neminterp.compute import NumpyBackend
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+POST_OPS = ["neg", "abs", "sqrt", "tanh", "relu", "neg", "abs", "exp"]
+
+
+def source(tile_m: int, k: int, n: int, trips: int, post_ops: int) -> str:
+    text = (EXAMPLES_DIR / "gemm_bias_relu.nem").read_text()
+    for name, value in (("TiM", tile_m), ("K", k), ("N", n), ("T", trips)):
+        text = re.sub(rf"const {name} = \d+", f"const {name} = {value}", text)
+    text = re.sub(r"(buffer [A-Z]_L2) : L2", r"\1 : DDR", text)
+    previous, ops = "tR", []
+    for k, opcode in enumerate(POST_OPS[:post_ops]):
+        ops.append(f"  tP{k} = {opcode}.async in Y_pp_i out Y_pp_i deps=[{previous}]")
+        previous = f"tP{k}"
+    store = "  tS = store.async(dst=Y_tile_i, src=Y_pp_i, deps=[tR])"
+    return text.replace(store, "\n".join([*ops, store.replace("[tR]", f"[{previous}]")]))
+
+
+def bench(tile_m: int, k: int, n: int, trips: int, post_ops: int, runs: int) -> None:
+    m = tile_m * trips
+    results = {}
+    print(
+        f"{trips} tiles of [{tile_m} x {k}] x [{k} x {n}] f16, "
+        f"gemm + {1 + post_ops} elementwise tasks per tile:"
+    )
+    for fuse in (False, True):
+        interp = NemInterpreter(ddr_size=2 * (m * k + k * n + n + m * n) + 2**20, l1_size=2**23)
+        interp.backend = NumpyBackend(fuse=fuse)
+        program = interp.load_string(source(tile_m, k, n, trips, post_ops))
+        rng = np.random.default_rng(0)
+        interp.ddr_write_tensor(0, rng.standard_normal((m, k)).astype(np.float16))
+        interp.ddr_write_tensor(2 * m * k, (rng.standard_normal((k, n)) / 32).astype(np.float16))
+        interp.ddr_write_tensor(2 * (m * k + k * n), rng.standard_normal(n).astype(np.float16))
+        samples = []
+        for _ in range(runs):
+            t = time.perf_counter()
+            interp.run(program)
+            samples.append(time.perf_counter() - t)
+        results[fuse] = bytes(interp.read_buffer("Y_L2"))
+        label = "fused chains" if fuse else "one task at a time"
+        print(f"  {label:20s} median {statistics.median(samples) * 1e3:9.1f} ms")
+    assert results[False] == results[True]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--post-ops", type=int, default=4, choices=range(len(POST_OPS) + 1))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    bench(8, 64, 64, 2000, args.post_ops, args.runs)
+    bench(256, 1024, 512, 8, args.post_ops, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized INT4 unpacking and cached decoding of int4 GEMM weights.
+
+1. Decodes a ``--k`` x ``--n`` i4 weight matrix (two elements per byte, sign
+   extended) with ``unpack_int4`` and with a per-element Python reference on
+   a slice of it, and encodes it back with ``pack_int4``; reports throughput.
+2. Runs a ``gemm.int4`` program in the shape of an LLM decoder projection:
+   the [K x N] i4 weights are transferred to L1 once (``@readonly``) and
+   ``--trips`` tiles of ``--tile-m`` i8 activation rows stream past them.
+   Reports the time per tile with the decode cache (the weights are decoded
+   on the first tile only) and with it disabled (decoded on every tile), and
+   checks both against a NumPy reference; then the time the weight operand
+   takes to fetch on its own, decoded and from the cache.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_int4.py [--k N] [--n N] [--tile-m N] [--trips N]
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+import neminterp.memory.region
+from neminterp import NemInterpreter
+from neminterp.memory import RegionView, pack_int4, unpack_int4
+
+
+def unpack_reference(packed: np.ndarray) -> list[int]:
+    values = []
+    for byte in packed.tolist():
+        for nibble in (byte & 0x0F, byte >> 4):
+            values.append(nibble - 16 if nibble & 0x08 else nibble)
+    return values
+
+
+def median_time(f: Callable[[], object], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        f()
+        samples.append(time.perf_counter() - t)
+    return statistics.median(samples)
+
+
+def source(k: int, n: int, tile_m: int, trips: int) -> str:
+    a, w, y = tile_m * k, k * n // 2, tile_m * n
+    weights = f"elem=i4, shape=[{k}, {n}], layout=KN, quant=per_tensor(scale=1.0, zero_point=0)"
+    return "\n".join(
+        [
+            "program gemm_int4:",
+            f"buffer A : DDR (size={trips * a}, align=64)",
+            f"buffer W : DDR (size={w}, align=64)",
+            f"buffer Y : DDR (size={trips * y}, align=64)",
+            f"buffer W1 : L1 (size={w}, align=64)",
+            f"buffer A1 : L1 (size={2 * a}, align=64)",
+            f"buffer Y1 : L1 (size={2 * y}, align=64)",
+            f"let W_l1 = region(W1, 0, {w}) {weights} @readonly",
+            f"tW = transfer.sync(dst=W_l1, src=region(W, 0, {w}) {weights})",
+            f"loop i in [0..{trips - 1}] @max_in_flight(2):",
+            f"  let A_i = region(A1, (i mod 2) * {a}, {a}) elem=i8, shape=[{tile_m}, {k}],"
+            " layout=MK",
+            f"  let Y_i = region(Y1, (i mod 2) * {y}, {y}) elem=i8, shape=[{tile_m}, {n}],"
+            " layout=MN",
+            f"  tA = transfer.async(dst=A_i, src=region(A, i * {a}, {a}))",
+            "  tG = gemm.async in A_i, W_l1 out Y_i deps=[tA] accum_type=i32",
+            f"  tY = store.async(dst=region(Y, i * {y}, {y}), src=Y_i, deps=[tG])",
+            "endloop",
+        ]
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=4096)
+    parser.add_argument("--n", type=int, default=4096)
+    parser.add_argument("--tile-m", type=int, default=4)
+    parser.add_argument("--trips", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    k, n, m = args.k, args.n, args.tile_m * args.trips
+
+    rng = np.random.default_rng(0)
+    w = rng.integers(-8, 8, (k, n), np.int8)
+    packed = pack_int4(w)
+    print(f"[{k} x {n}] i4 weights ({packed.nbytes / 2**20:.1f} MiB packed):")
+    sample = packed[: 2**16]
+    t = time.perf_counter()
+    assert unpack_reference(sample) == w.reshape(-1)[: 2 * sample.size].tolist()
+    reference = (time.perf_counter() - t) / (2 * sample.size)
+    for label, f in (
+        ("unpack_int4", lambda: unpack_int4(packed)),
+        ("pack_int4", lambda: pack_int4(w)),
+    ):
+        elapsed = median_time(f, args.runs)
+        print(f"  {label:22s} {elapsed * 1e3:9.1f} ms   {w.size / elapsed / 1e9:6.2f} Gelem/s")
+    print(f"  {'per-element reference':22s} {reference * w.size * 1e3:9.1f} ms   (extrapolated)")
+
+    interp = NemInterpreter(ddr_size=2 * m * (k + n) + packed.nbytes + 2**20, l1_size=2**26)
+    program = interp.load_string(source(k, n, args.tile_m, args.trips))
+    a = rng.integers(-8, 8, (m, k), np.int8)
+    interp.ddr_write_tensor(0, a)
+    interp.ddr_write_tensor(a.nbytes, packed)
+    expected = (a.astype(np.int32) @ w.astype(np.int32)).astype(np.int8)
+    print(f"gemm.int4: {args.trips} tiles of [{args.tile_m} x {k}] i8 x [{k} x {n}] i4")
+    budget = neminterp.memory.region.DECODE_CACHE_BYTES
+    for cached in (False, True):
+        neminterp.memory.region.DECODE_CACHE_BYTES = budget if cached else 0
+        samples = []
+        for _ in range(args.runs):
+            t = time.perf_counter()
+            interp.run(program)
+            samples.append(time.perf_counter() - t)
+        y = interp.ddr_read_tensor(interp.buffers["Y"].offset, (m, n), np.int8)
+        assert np.array_equal(y, expected)
+        label = "decode cache" if cached else "decode every tile"
+        per_tile = statistics.median(samples) / args.trips
+        print(f"  {label:22s} {per_tile * 1e3:9.1f} ms per tile")
+    w1 = interp.buffers["W1"]
+    weights = RegionView(w1.level, w1.offset, w1.size, "i4", (k, n))
+
+    def rewritten() -> None:
+        w1.level.touch(w1.offset, 1)
+        weights.array()
+
+    print(f"  weight operand, decoded   {median_time(rewritten, args.runs) * 1e3:9.3f} ms")
+    print(f"  weight operand, cache hit {median_time(weights.array, args.runs) * 1e3:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
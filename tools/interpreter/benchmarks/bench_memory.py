@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: zero-copy region views vs copying reads and writes.
+
+Runs ``examples/gemm_rmsnorm.nem`` with its L2 tensors moved to DDR and its
+tiles resized (``--tile-m``, ``--k``, ``--n``), twice: with the interpreter's
+views (transfers are one ``memoryview`` slice assignment, compute reads and
+writes the regions in place), and with a reference data path following
+interpreter_spec §8.2 and plan step 2, where ``read_bytes()`` returns a
+``bytes`` copy, ``read_array()`` decodes a copy of it, and results are
+encoded back with ``write_bytes()``. Reports time and peak traced memory of
+each and checks the outputs match. The views' remaining peak is the f32
+working arrays of the compute itself.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_memory.py [--tile-m N] [--k N] [--n N]
+"""
+
+import argparse
+import re
+import statistics
+import time
+import tracemalloc
+from collections.abc import Mapping
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from neminterp import NemInterpreter
+from neminterp.compute import Kernel, NumpyBackend
+from neminterp.engine import Executor, TaskGraph, TaskRunner
+from neminterp.memory import MemoryLevel, RegionView
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+class CopyingBackend(NumpyBackend):
+    """Decodes inputs from byte copies and encodes outputs through scratch copies."""
+
+    def kernel(self, opcode: str) -> Kernel:
+        return partial(self.execute, opcode)
+
+    def execute(
+        self,
+        opcode: str,
+        inputs: list[np.ndarray],
+        outputs: list[RegionView],
+        attributes: Mapping[str, Any],
+    ) -> None:
+        copies = [np.frombuffer(a.tobytes(), a.dtype).reshape(a.shape) for a in inputs]
+        scratch = []
+        for out in outputs:
+            level = MemoryLevel("scratch", out.extent)
+            scratch.append(RegionView(level, 0, out.extent, out.elem, out.shape, out.strides))
+        super().execute(opcode, copies, scratch, attributes)
+        for out, tmp in zip(outputs, scratch):
+            out.write_bytes(bytes(tmp.level.data))
+
+
+class CopyingRunner(TaskRunner):
+    def _copy(self, src: RegionView, dst: RegionView) -> None:
+        dst.write_bytes(bytes(src.read_bytes()))
+
+
+def source(tile_m: int, k: int, n: int, trips: int) -> str:
+    text = (EXAMPLES_DIR / "gemm_rmsnorm.nem").read_text()
+    for name, value in (("TiM", tile_m), ("K", k), ("N", n), ("T", trips)):
+        text = re.sub(rf"const {name} = \d+", f"const {name} = {value}", text)
+    return re.sub(r"(buffer [A-Z]_L2) : L2", r"\1 : DDR", text)
+
+
+def run(interp: NemInterpreter, program: Any, copying: bool) -> None:
+    if not copying:
+        interp.run(program)
+        return
+    graph = TaskGraph(program)
+    handles = interp.allocate(program)
+    Executor(graph, run_task=CopyingRunner(graph, handles, CopyingBackend())).run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tile-m", type=int, default=256)
+    parser.add_argument("--k", type=int, default=1024)
+    parser.add_argument("--n", type=int, default=512)
+    parser.add_argument("--trips", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    m, k, n = args.tile_m * args.trips, args.k, args.n
+    interp = NemInterpreter(ddr_size=2 * (m * k + k * n + n + m * n) + 2**20, l1_size=2**23)
+    program = interp.load_string(source(args.tile_m, k, n, args.trips))
+    rng = np.random.default_rng(0)
+    interp.ddr_write_tensor(0, rng.standard_normal((m, k)).astype(np.float16))
+    interp.ddr_write_tensor(2 * m * k, (rng.standard_normal((k, n)) / 32).astype(np.float16))
+    interp.ddr_write_tensor(2 * (m * k + k * n), np.ones(n, np.float16))
+    print(
+        f"gemm_rmsnorm: {args.trips} tiles of [{args.tile_m} x {k}] x [{k} x {n}] f16 "
+        f"({2 * (m * k + k * n + 2 * m * n) / 2**20:.1f} MiB of operands)"
+    )
+    results = {}
+    for copying in (True, False):
+        samples = []
+        for _ in range(args.runs):
+            t = time.perf_counter()
+            run(interp, program, copying)
+            samples.append(time.perf_counter() - t)
+        tracemalloc.start()
+        run(interp, program, copying)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        y = interp.buffers["Y_L2"]
+        results[copying] = bytes(y.level.read(y.offset, y.size))
+        label = "copying reads/writes" if copying else "zero-copy views"
+        print(
+            f"  {label:22s} median {statistics.median(samples) * 1e3:9.1f} ms"
+            f"   peak {peak / 2**20:8.2f} MiB"
+        )
+    assert results[True] == results[False]
+
+
+if __name__ == "__main__":
+    main()
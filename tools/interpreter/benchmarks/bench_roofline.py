@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: roofline analysis of conv2d_relu.nem against a dry timed run.
+
+Scales the example's trip count to ``--trips`` tiles and analyzes it on
+npm_lite, then dry-runs it in timed mode with the same units and MAC
+throughput. Reports the time each takes (the analysis does not depend on
+the trip count), the bound unit with its share, and how close the
+roofline's lower bound comes to the scheduled cycle count.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_roofline.py [--trips N ...]
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from nemlib.device.loader import load_device
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser import parse
+
+from neminterp import NemInterpreter, analyze
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, nargs="+", default=[4, 1000, 100000])
+    args = parser.parse_args()
+    device = load_device(EXAMPLES_DIR / "npm_lite_.nem")
+    for trips in args.trips:
+        source = (EXAMPLES_DIR / "conv2d_relu.nem").read_text()
+        source = re.sub(r"const T = \d+", f"const T = {trips}", source)
+        source = re.sub(r"(buffer \w+) : L2", r"\1 : DDR", source)
+        program, _ = parse(source, "conv2d_relu.nem")
+        diag = DiagnosticCollector()
+        t = time.perf_counter()
+        report = analyze(program, device, diag)
+        analyzed = time.perf_counter() - t
+        interp = NemInterpreter(per_engine=device.per_engine, device_units=device.device_units)
+        interp.set_timing_profile({"NMU": {"mac_throughput": 2048}})
+        t = time.perf_counter()
+        dry = interp.run(interp.load_string(source), dry=True)
+        ran = time.perf_counter() - t
+        summary = report.program
+        print(
+            f"{trips:7d} trips: roofline {analyzed * 1e3:7.1f} ms, dry run {ran * 1e3:9.1f} ms; "
+            f"{summary.bound}-bound at {summary.share:.0%}, "
+            f"{summary.cycles:.0f} of {dry.cycle_count} cycles "
+            f"({summary.cycles / dry.cycle_count:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: heap/dependency-counter scheduling vs the linear-scan ready queue.
+
+Generates a synthetic pipelined loop (``--width`` store tasks per iteration,
+each depending on up to two random earlier tasks of the iteration and on its
+own previous instance, ``@max_in_flight(--in-flight)``) and sizes its trip
+count to each ``--tasks`` value. The task graph is expanded before timing,
+so only scheduling is measured. Runs the ``Executor`` in functional mode
+(source-order heap) and timed mode (earliest-start heap, three unit
+instances), and, up to ``--reference-max`` instances, the per-step algorithm
+of interpreter_spec §4.3/§5.3 (scan the waiting set, then take the first
+ready task in source order or ``min(ready, key=...)``), checking that both
+produce the same schedule.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_scheduler.py [--tasks N ...] [--width N]
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+import numpy as np
+from nemlib.parser import parse
+
+from neminterp.engine import (
+    Executor,
+    FunctionalScheduler,
+    TaskGraph,
+    TimedScheduler,
+    compile_program,
+)
+
+UNITS = 3
+
+
+def synthetic_program(trips: int, width: int, in_flight: int, seed: int) -> str:
+    rng = random.Random(seed)
+    lines = [
+        "program synthetic:",
+        f"buffer A : L2 (size={width * 64}, align=64)",
+        f"buffer B : L1 (size={width * 64}, align=64)",
+        f"loop i in [0..{trips - 1}] @max_in_flight({in_flight}):",
+    ]
+    for k in range(width):
+        deps = {f"t{j}" for j in rng.sample(range(k), min(k, 2))} | {f"t{k}"}
+        lines.append(
+            f"  t{k} = store.async(dst=region(A, {k * 64}, 64), src=region(B, {k * 64}, 64),"
+            f" deps=[{', '.join(sorted(deps))}])"
+        )
+    lines.append("endloop")
+    return "\n".join(lines) + "\n"
+
+
+def timing_model(graph: TaskGraph) -> tuple[list[int], list[int]]:
+    templates = graph.template_ids.astype(np.int64)
+    unit = np.where(templates >= 0, templates % UNITS, -1)
+    cost = np.where(templates >= 0, 4 + 3 * (templates % 5), 0)
+    return unit.tolist(), cost.tolist()
+
+
+def run_heap(graph: TaskGraph, timed: bool) -> tuple[list[int], int]:
+    unit, cost = timing_model(graph)
+    scheduler = (
+        TimedScheduler(cost.__getitem__, unit.__getitem__, [[u] for u in range(UNITS)])
+        if timed
+        else FunctionalScheduler()
+    )
+    executor = Executor(graph, scheduler)
+    order = []
+    while (node := executor.step()) is not None:
+        order.append(node)
+    return order, executor.time
+
+
+def run_linear_scan(graph: TaskGraph, timed: bool) -> tuple[list[int], int]:
+    """interpreter_spec §4.3 per step: rescan the waiting set, then select."""
+    unit, cost = timing_model(graph)
+    n = len(graph)
+    preds = [graph.preds(node).tolist() for node in range(n)]
+    done, finish, free = [False] * n, [0] * n, [0] * UNITS
+    waiting, ready, order = list(range(n)), [], []
+
+    def start(node: int) -> int:
+        ready_time = max((finish[p] for p in preds[node]), default=0)
+        return max(ready_time, free[unit[node]]) if unit[node] >= 0 else ready_time
+
+    while waiting or ready:
+        still = []
+        for node in waiting:
+            (ready if all(done[p] for p in preds[node]) else still).append(node)
+        waiting = still
+        if timed:
+            node = min(ready, key=lambda t: (start(t), t))
+            ready.remove(node)
+            finish[node] = start(node) + cost[node]
+            if unit[node] >= 0:
+                free[unit[node]] = finish[node]
+        else:
+            node = min(ready)  # first ready task in source order
+            ready.remove(node)
+        done[node] = True
+        order.append(node)
+    return order, max(finish)
+
+
+def measure(
+    fn: Callable[[TaskGraph, bool], tuple[list[int], int]], graph: TaskGraph, timed: bool
+) -> tuple[list[int], int, float]:
+    t = time.perf_counter()
+    order, makespan = fn(graph, timed)
+    return order, makespan, time.perf_counter() - t
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--in-flight", type=int, default=4)
+    parser.add_argument("--reference-max", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for tasks in args.tasks:
+        trips = max(1, tasks // (args.width + 2))
+        source = synthetic_program(trips, args.width, args.in_flight, args.seed)
+        program, diagnostics = parse(source)
+        assert not diagnostics, [str(d) for d in diagnostics]
+        graph = TaskGraph(compile_program(program))
+        graph.expand()
+        print(f"{len(graph)} instances ({trips} iterations x {args.width} tasks):")
+        for timed in (False, True):
+            mode = "timed" if timed else "functional"
+            order, makespan, heap = measure(run_heap, graph, timed)
+            line = (
+                f"  {mode:10s} heap {heap * 1e3:10.1f} ms ({heap / len(graph) * 1e9:6.0f} ns/task)"
+            )
+            if len(graph) <= args.reference_max:
+                ref_order, ref_makespan, scan = measure(run_linear_scan, graph, timed)
+                assert ref_order == order and ref_makespan == makespan, mode
+                line += f"   linear scan {scan * 1e3:10.1f} ms   speedup {scan / heap:7.1f}x"
+            if timed:
+                line += f"   makespan {makespan} cycles"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: task instantiation for long tiled loops.
+
+Sets ``T`` of ``examples/conv2d_relu.nem`` to each ``--trips`` value and
+instantiates every task of the loop, comparing the structure-of-arrays
+``TaskGraph`` with a per-object reference that follows interpreter_spec
+§4.3/§4.5 (evaluate each region, create a task object with its dependency
+list, register its token, per statement per iteration). Reports time and
+peak traced memory of each.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_task_graph.py [--trips N ...] [--runs N]
+"""
+
+import argparse
+import re
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from nemlib.core.expressions import evaluate_int
+from nemlib.parser import parse
+from nemlib.parser.ast_nodes import TaskNode
+
+from neminterp.engine import ProgramTemplate, TaskGraph, compile_program
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+@dataclass
+class ObjectTask:
+    name: str
+    task_type: str
+    env: dict[str, int]
+    regions: list[dict[str, Any]]
+    deps: list["ObjectTask"] = field(default_factory=list)
+
+
+def instantiate_objects(template: ProgramTemplate) -> int:
+    """Reference: one object per task per iteration, tokens in a dict."""
+    tasks: list[ObjectTask] = []
+    tokens: dict[str, ObjectTask] = {}
+    ((loop_index, body),) = [item for item in template.body if not isinstance(item, int)]
+    loop = template.index.loops[loop_index]
+    env = dict(template.constants)
+    for i in range(evaluate_int(loop.start, env), evaluate_int(loop.end, env) + 1):
+        env[loop.var] = i
+        for index in body:
+            task = template.tasks[index]
+            node = task.node
+            regions = [
+                {
+                    "buffer": template.buffers[op.buffer].name,
+                    "offset": evaluate_int(op.region.offset, env),
+                    "extent": evaluate_int(op.region.extent, env),
+                }
+                for op in task.operands
+            ]
+            name = node.token if isinstance(node, TaskNode) and node.token else "wait"
+            deps = [tokens[t] for t in (node.deps if isinstance(node, TaskNode) else node.tokens)]
+            instance = ObjectTask(
+                name, getattr(node, "task_type", "wait"), dict(env), regions, deps
+            )
+            tasks.append(instance)
+            tokens[name] = instance
+    return len(tasks)
+
+
+def instantiate_arrays(template: ProgramTemplate) -> int:
+    graph = TaskGraph(template)
+    graph.expand()
+    return len(graph)
+
+
+def measure(fn: Callable[[ProgramTemplate], int], template: ProgramTemplate, runs: int) -> None:
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        count = fn(template)
+        samples.append(time.perf_counter() - t)
+    tracemalloc.start()
+    fn(template)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    med = statistics.median(samples)
+    print(
+        f"  {fn.__name__:22s} {count:9d} instances   median {med * 1e3:9.1f} ms"
+        f"   peak {peak / 2**20:8.1f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, nargs="+", default=[1024, 16384, 131072])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    source = (EXAMPLES_DIR / "conv2d_relu.nem").read_text()
+    for trips in args.trips:
+        program, _ = parse(re.sub(r"const T = \d+", f"const T = {trips}", source))
+        template = compile_program(program)
+        print(f"conv2d_relu, T = {trips}:")
+        measure(instantiate_objects, template, args.runs)
+        measure(instantiate_arrays, template, args.runs)
+
+
+if __name__ == "__main__":
+    main()
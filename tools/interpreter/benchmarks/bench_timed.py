@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: timed mode and dry runs vs functional mode on long pipelines.
+
+Runs a double-buffered ``transfer -> gemm -> relu -> store`` pipeline of f16
+tiles (``--engines`` engines, ``@max_in_flight(2)``) for each ``--trips``
+count in functional mode, in timed mode and as a dry run (scheduling only),
+and reports the median time per run, the timed mode's overhead per task
+instance and the simulated cycle count. With the event-driven scheduler the
+overhead per task stays flat as the trip count grows; the outputs of
+functional and timed runs, and the cycle counts of timed and dry runs, are
+identical. The default tiles are tiny, so that scheduling dominates; a dry
+run's advantage grows with ``--tile-m``/``--k``/``--n``.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_timed.py [--trips N ...] [--engines N]
+        [--tile-m N] [--k N] [--n N] [--runs N]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from neminterp import NemInterpreter
+
+
+def source(engines: int, trips: int, tile_m: int = 8, k: int = 32, n: int = 16) -> str:
+    a, b, y = 2 * tile_m * k, 2 * k * n, 2 * tile_m * n
+    lines = [
+        "program pipeline:",
+        f"buffer A : DDR (size={engines * trips * a}, align=64)",
+        f"buffer B : DDR (size={b}, align=64)",
+        f"buffer Y : DDR (size={engines * trips * y}, align=64)",
+    ]
+    for e in range(engines):
+        lines += [
+            f"buffer A{e} : L1[{e}] (size={2 * a}, align=64)",
+            f"buffer B{e} : L1[{e}] (size={b}, align=64)",
+            f"buffer Y{e} : L1[{e}] (size={2 * y}, align=64)",
+            f"let B_{e} = region(B{e}, 0, {b}) elem=f16, shape=[{k}, {n}], layout=KN",
+            f"tB{e} = transfer.sync(dst=B_{e}, src=region(B, 0, {b}))",
+        ]
+    lines.append(f"loop i in [0..{trips - 1}] @max_in_flight(2):")
+    for e in range(engines):
+        tile = f"(i * {engines} + {e})"
+        lines += [
+            f"  let A_{e} = region(A{e}, (i mod 2) * {a}, {a})"
+            f" elem=f16, shape=[{tile_m}, {k}], layout=MK",
+            f"  let Y_{e} = region(Y{e}, (i mod 2) * {y}, {y})"
+            f" elem=f16, shape=[{tile_m}, {n}], layout=MN",
+            f"  tA{e} = transfer.async(dst=A_{e}, src=region(A, {tile} * {a}, {a}))",
+            f"  tG{e} = gemm.async in A_{e}, B_{e} out Y_{e} deps=[tA{e}] accum_type=f32",
+            f"  tR{e} = relu.async in Y_{e} out Y_{e} deps=[tG{e}]",
+            f"  tS{e} = store.async(dst=region(Y, {tile} * {y}, {y}), src=Y_{e}, deps=[tR{e}])",
+        ]
+    lines.append("endloop")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument("--engines", type=int, default=2)
+    parser.add_argument("--tile-m", type=int, default=8)
+    parser.add_argument("--k", type=int, default=32)
+    parser.add_argument("--n", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    e, k, n = args.engines, args.k, args.n
+    rng = np.random.default_rng(0)
+    print(f"tiles [{args.tile_m} x {k}] x [{k} x {n}] f16, {e} engines:")
+    for trips in args.trips:
+        m = e * trips * args.tile_m
+        l1 = 2 * (2 * args.tile_m * k + k * n + 2 * args.tile_m * n) + 256
+        interp = NemInterpreter(
+            ddr_size=2 * (m * k + k * n + m * n) + 2**16, l1_size=max(l1, 2**20), engines=e
+        )
+        program = interp.load_string(source(e, trips, args.tile_m, k, n))
+        interp.ddr_write_tensor(0, rng.standard_normal((m, k)).astype(np.float16))
+        interp.ddr_write_tensor(2 * m * k, (rng.standard_normal((k, n)) / 8).astype(np.float16))
+        medians, outputs, cycles = {}, {}, {}
+        for mode in ("functional", "timed", "dry"):
+            interp.set_mode("functional" if mode == "functional" else "timed")
+            samples = []
+            for _ in range(args.runs):
+                t = time.perf_counter()
+                result = interp.run(program, dry=mode == "dry")
+                samples.append(time.perf_counter() - t)
+            medians[mode] = statistics.median(samples)
+            outputs[mode] = bytes(interp.read_buffer("Y"))
+            cycles[mode] = result.cycle_count
+        assert outputs["functional"] == outputs["timed"]
+        assert cycles["timed"] == cycles["dry"]
+        overhead = (medians["timed"] - medians["functional"]) / result.tasks
+        print(
+            f"  {trips:6d} trips, {result.tasks:7d} tasks: "
+            f"functional {medians['functional'] * 1e3:8.1f} ms, "
+            f"timed {medians['timed'] * 1e3:8.1f} ms ({overhead * 1e6:5.2f} us/task), "
+            f"dry {medians['dry'] * 1e3:7.1f} ms "
+            f"({medians['functional'] / medians['dry']:5.1f}x faster), {cycles['dry']} cycles"
+        )
+
+
+if __name__ == "__main__":
+    main()
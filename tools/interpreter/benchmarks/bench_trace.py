@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: writing, summarizing and exporting timing traces of long runs.
+
+Dry-runs a double-buffered ``transfer -> relu -> store`` pipeline of
+``--trips`` iterations with and without a trace and reports the time per
+task the trace adds, the peak Python heap of both runs (the trace adds its
+chunk of rows and two integers per task instance, whatever the trip count),
+the size of the trace file, and the time :func:`summarize` and :func:`export_chrome` take to
+stream through it.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_trace.py [--trips N ...] [--chunk N]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from neminterp import NemInterpreter
+from neminterp.engine import export_chrome, summarize
+
+
+def source(trips: int) -> str:
+    return "\n".join(
+        [
+            "program pipeline:",
+            f"buffer A : DDR (size={trips * 256}, align=64)",
+            "buffer B : L1 (size=512, align=64)",
+            f"buffer C : DDR (size={trips * 256}, align=64)",
+            f"loop i in [0..{trips - 1}] @max_in_flight(2):",
+            "  let b = region(B, (i mod 2) * 256, 256) elem=f16, shape=[128], layout=N",
+            "  tA = transfer.async(dst=b, src=region(A, i * 256, 256))",
+            "  tR = relu.async in b out b deps=[tA]",
+            "  tS = store.async(dst=region(C, i * 256, 256), src=b, deps=[tR])",
+            "endloop",
+        ]
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--chunk", type=int, default=1 << 16)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "trace.npy"
+        for trips in args.trips:
+            interp = NemInterpreter()
+            program = interp.load_string(source(trips))
+            seconds, peaks = {}, {}
+            for traced in (False, True):
+                t = time.perf_counter()
+                result = interp.run(program, dry=True, trace=path if traced else None)
+                seconds[traced] = time.perf_counter() - t
+                tracemalloc.start()
+                interp.run(program, dry=True, trace=path if traced else None)
+                peaks[traced] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            t = time.perf_counter()
+            summary = summarize(path, args.chunk)
+            summarized = time.perf_counter() - t
+            t = time.perf_counter()
+            export_chrome(path, Path(tmp) / "trace.json", args.chunk)
+            exported = time.perf_counter() - t
+            assert summary.cycles == result.cycle_count
+            overhead = (seconds[True] - seconds[False]) / result.tasks
+            print(
+                f"{trips:7d} trips, {result.tasks:7d} tasks: "
+                f"trace +{overhead * 1e6:4.2f} us/task, "
+                f"peak heap {peaks[False] / 2**20:6.1f} -> {peaks[True] / 2**20:6.1f} MiB, "
+                f"file {path.stat().st_size / 2**20:6.1f} MiB, "
+                f"summarize {summarized * 1e3:7.1f} ms "
+                f"({len(summary.critical_path)} tasks on the critical path), "
+                f"Chrome export {exported * 1e3:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
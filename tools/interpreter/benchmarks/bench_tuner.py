@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tuning gemm_bias_relu.nem's tile height and window.
+
+Rewrites the example over a fixed ``--m`` rows (``T = M / TiM``) with its
+``@max_in_flight`` window as ``const F``, and tunes ``TiM`` (powers of two
+from 8 to 1024) and ``F`` (1 to 3) for a target with ``--l1`` bytes of L1,
+once in this process and once with a process pool. Reports the time each
+search takes, the CPU cores available (the speedup is bounded by them), the
+candidates rejected by the capacity rule or by validation, and the Pareto
+front of cycles against L1 footprint; checks that both searches agree.
+
+Usage:
+    python tools/interpreter/benchmarks/bench_tuner.py [--m N] [--l1 BYTES] [--workers N]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from neminterp import NemInterpreter
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def source(m: int) -> str:
+    text = (EXAMPLES_DIR / "gemm_bias_relu.nem").read_text()
+    text = text.replace("const T = 4", f"const M = {m}\nconst T = M / TiM\nconst F = 2")
+    return text.replace("@max_in_flight(2)", "@max_in_flight(F)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--m", type=int, default=8192)
+    parser.add_argument("--l1", type=int, default=2**19)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    interp = NemInterpreter(l2_size=2**26, l1_size=args.l1)
+    space = {"TiM": [2**k for k in range(3, 11)], "F": [1, 2, 3]}
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    reports = {}
+    for workers in (1, args.workers):
+        t = time.perf_counter()
+        reports[workers] = interp.tune(source(args.m), space, workers)
+        label = "serial" if workers == 1 else f"pool ({workers or cores} workers)"
+        print(f"{label:22s} {(time.perf_counter() - t) * 1e3:9.1f} ms")
+    report = reports[1]
+    assert reports[args.workers] == report
+    print(f"M = {args.m}, L1 = {args.l1} bytes ({cores} CPU cores available):")
+    for c in report.rejected:
+        print(f"  rejected {c.describe():14s} {c.reason}")
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
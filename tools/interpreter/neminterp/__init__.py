@@ -0,0 +1,25 @@
+"""NEM reference interpreter."""
+
+from neminterp.engine import TaskGraph, compile_program
+from neminterp.errors import ExecutionError
+from neminterp.interpreter import NemInterpreter, RunResult
+from neminterp.roofline import LoopRoofline, RooflineReport, TaskRoofline, analyze
+from neminterp.tuner import Candidate, TuningReport, tune
+
+__version__ = "0.1.0"
+
+__all__ = [
+    "Candidate",
+    "ExecutionError",
+    "LoopRoofline",
+    "NemInterpreter",
+    "RooflineReport",
+    "RunResult",
+    "TaskGraph",
+    "TaskRoofline",
+    "TuningReport",
+    "__version__",
+    "analyze",
+    "compile_program",
+    "tune",
+]
@@ -0,0 +1,7 @@
+"""Compute backends."""
+
+from neminterp.compute.backend import ComputeBackend, Kernel
+from neminterp.compute.numpy_backend import NumpyBackend
+from neminterp.compute.opcode_registry import DispatchTable, OpcodeEntry
+
+__all__ = ["ComputeBackend", "DispatchTable", "Kernel", "NumpyBackend", "OpcodeEntry"]
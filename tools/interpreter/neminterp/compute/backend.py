@@ -0,0 +1,37 @@
+"""The compute backend protocol (interpreter_spec §8.1)."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from typing import Any, Protocol
+
+import numpy as np
+import numpy.typing as npt
+
+from neminterp.memory.region import RegionView
+
+# kernel(inputs, outputs, attributes): one opcode's implementation
+Kernel = Callable[[list[npt.NDArray[Any]], list[RegionView], Mapping[str, Any]], None]
+
+
+class ComputeBackend(Protocol):
+    """Executes compute opcodes on region views.
+
+    ``inputs`` are arrays viewing the input regions; ``outputs`` are the
+    output regions, written in place through :meth:`RegionView.array` or
+    :meth:`RegionView.write_array`.
+
+    A backend may also provide ``kernel(opcode) -> Kernel``, the function
+    :meth:`execute` dispatches to; :class:`~neminterp.compute.opcode_registry.DispatchTable`
+    resolves opcodes through it once instead of per call.
+    """
+
+    def supports(self, opcode: str) -> bool: ...
+
+    def execute(
+        self,
+        opcode: str,
+        inputs: list[npt.NDArray[np.generic]],
+        outputs: list[RegionView],
+        attributes: Mapping[str, Any],
+    ) -> None: ...
@@ -0,0 +1,313 @@
+"""
+NumPy backend: reference implementations of compute opcodes (interpreter_spec §8.2).
+
+Operations read their inputs through region views and write results into the
+output region's view, with ``out=`` wherever the result type allows, so no
+operand is copied out of or back into memory. Packed (``i4``) inputs arrive
+decoded to ``int8``; packed outputs are encoded with
+:meth:`RegionView.write_array`.
+
+Integer GEMMs are exact, wrapping like an integer accumulator, but do not use
+NumPy's integer ``matmul`` (a plain loop, no BLAS): the products are summed by
+float BLAS in panels of the inner dimension shallow enough that every partial
+sum is an integer the float type represents exactly, and the panels are added
+in the accumulator type (:func:`_matmul`).
+
+``conv2d`` (NHWC input, HWIO weights) never builds an im2col matrix: for each
+kernel tap it takes a strided view of the input, the rows and columns that
+tap reads for the outputs it reaches (padding needs no copy; out-of-range taps
+are skipped), and accumulates that window times the tap's weights into the
+output: one GEMM per tap and group, or a broadcast multiply per tap when
+each group has one input channel (depthwise).
+
+``NumpyBackend(fuse=True)`` lets the task runner run chains of elementwise
+and normalization tasks right after the task producing their input (see
+:mod:`neminterp.engine.fusion`). The kernels run unchanged, on the values
+stored in memory, so fused results are bit-identical to unfused ones.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from functools import partial
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from neminterp.compute.backend import Kernel
+from neminterp.errors import ExecutionError
+from neminterp.memory.region import RegionView, element_dtype
+
+Array = npt.NDArray[Any]
+
+_UNARY: dict[str, np.ufunc] = {
+    "abs": np.absolute,
+    "neg": np.negative,
+    "exp": np.exp,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "tanh": np.tanh,
+}
+_BINARY: dict[str, np.ufunc] = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": np.divide,
+    "min": np.minimum,
+    "max": np.maximum,
+    "pow": np.power,
+}
+
+
+class NumpyBackend:
+    """Pure NumPy compute backend."""
+
+    def __init__(self, fuse: bool = False) -> None:
+        self.fuse = fuse
+        self._ops: dict[str, Kernel] = {
+            "gemm": _gemm,
+            "conv2d": _conv2d,
+            "depthwise_conv2d": _depthwise_conv2d,
+            "relu": _relu,
+            "leaky_relu": _leaky_relu,
+            "clamp": _clamp,
+            "sigmoid": _sigmoid,
+            "silu": _silu,
+            "rmsnorm": _rmsnorm,
+        }
+        for name, ufunc in (_UNARY | _BINARY).items():
+            self._ops[name] = partial(_ufunc, ufunc)
+
+    def supports(self, opcode: str) -> bool:
+        return opcode in self._ops
+
+    def kernel(self, opcode: str) -> Kernel:
+        op = self._ops.get(opcode)
+        if op is None:
+            raise ExecutionError(f"the NumPy backend does not implement '{opcode}'")
+        return op
+
+    def execute(
+        self,
+        opcode: str,
+        inputs: list[Array],
+        outputs: list[RegionView],
+        attributes: Mapping[str, Any],
+    ) -> None:
+        op = self._ops.get(opcode)
+        if op is None:
+            raise ExecutionError(f"the NumPy backend does not implement '{opcode}'")
+        op(inputs, outputs, attributes)
+
+
+def _accumulator(attributes: Mapping[str, Any], *operands: Array) -> np.dtype[Any]:
+    accum = attributes.get("accum_type")
+    if accum is not None:
+        return element_dtype(str(accum))
+    floating = any(np.issubdtype(a.dtype, np.floating) for a in operands)
+    return np.dtype(np.float32 if floating else np.int32)
+
+
+# Float types summing integers exactly up to 2**bits
+_EXACT_FLOATS = ((np.dtype(np.float32), 24), (np.dtype(np.float64), 53))
+
+# Shallower panels cost more in conversions and additions than BLAS saves
+MIN_PANEL = 64
+
+
+def _magnitude(dtype: np.dtype[Any]) -> int:
+    info = np.iinfo(dtype)
+    return max(-info.min, info.max)
+
+
+def _panel(a: np.dtype[Any], b: np.dtype[Any], accum: np.dtype[Any]) -> tuple[np.dtype[Any], int]:
+    """A float type and panel depth summing products of ``a`` and ``b`` exactly (depth 0: none)."""
+    product = _magnitude(a) * _magnitude(b)
+    for dtype, bits in _EXACT_FLOATS:
+        depth = min(2**bits, np.iinfo(accum).max) // product
+        if depth >= MIN_PANEL:
+            return dtype, depth
+    return np.dtype(np.float64), 0
+
+
+def _matmul(a: Array, b: Array, accum: np.dtype[Any], out: Array | None = None) -> Array:
+    """``a @ b`` accumulated in ``accum``; integer results are exact."""
+    if accum.kind == "f" or a.dtype.kind not in "iu" or b.dtype.kind not in "iu":
+        return np.matmul(a.astype(accum, copy=False), b.astype(accum, copy=False), out=out)
+    dtype, depth = _panel(a.dtype, b.dtype, accum)
+    if not depth:
+        return np.matmul(a, b, out=out, dtype=accum)
+    k = a.shape[-1]
+    a = a.astype(dtype)
+    result: Array = np.matmul(a[..., :depth], b[..., :depth, :].astype(dtype)).astype(accum)
+    for k0 in range(depth, k, depth):
+        part = np.matmul(a[..., k0 : k0 + depth], b[..., k0 : k0 + depth, :].astype(dtype))
+        result += part.astype(accum)
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+
+def _gemm(inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]) -> None:
+    a, b, *bias = inputs
+    accum = _accumulator(attributes, a, b)
+    if not bias and not outputs[0].packed:
+        y = outputs[0].array()
+        if y.dtype == accum:
+            _matmul(a, b, accum, out=y)
+            return
+    result = _matmul(a, b, accum)
+    if bias:
+        result += bias[0]
+    outputs[0].write_array(result)
+
+
+def _conv2d(inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]) -> None:
+    _convolve(inputs, outputs[0], attributes, int(attributes.get("groups", 1)))
+
+
+def _depthwise_conv2d(
+    inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]
+) -> None:
+    _convolve(inputs, outputs[0], attributes, inputs[0].shape[-1])
+
+
+def _convolve(
+    inputs: list[Array], output: RegionView, attributes: Mapping[str, Any], groups: int
+) -> None:
+    x, w, *bias = inputs
+    if x.ndim != 4 or w.ndim != 4:
+        raise ExecutionError(
+            f"conv2d needs X [N, H, W, C] and W [Kh, Kw, C/groups, Cout], "
+            f"got {list(x.shape)} and {list(w.shape)}"
+        )
+    n, height, width, channels = x.shape
+    kh, kw, depth, cout = w.shape
+    if groups < 1 or depth * groups != channels or cout % groups:
+        raise ExecutionError(
+            f"weights {list(w.shape)} do not split {channels} input channels into {groups} groups"
+        )
+    top, left, bottom, right = _pads(attributes.get("pads"))
+    sh, sw = attributes.get("strides") or (1, 1)
+    dh, dw = attributes.get("dilations") or (1, 1)
+    rows, out_h = _taps(height, kh, top, bottom, int(sh), int(dh))
+    cols, out_w = _taps(width, kw, left, right, int(sw), int(dw))
+    shape = (n, out_h, out_w, cout)
+    if out_h < 1 or out_w < 1 or (output.shape is not None and tuple(output.shape) != shape):
+        raise ExecutionError(
+            f"conv2d output shape {list(output.shape or ())} does not match {list(shape)}, "
+            "derived from X, W, pads, strides and dilations"
+        )
+    accum = _accumulator(attributes, x, w)
+    acc = np.zeros(shape, accum)
+    per_group = cout // groups
+    for i, x_rows, y_rows in rows:
+        for j, x_cols, y_cols in cols:
+            window = x[:, x_rows, x_cols, :]  # a strided view, not a copy
+            target = acc[:, y_rows, y_cols, :]
+            tap = w[i, j]
+            if depth == 1:
+                per_channel = tap.reshape(channels, cout // channels)
+                target += np.multiply(window[..., None], per_channel, dtype=accum).reshape(
+                    target.shape
+                )
+                continue
+            for g in range(groups):
+                a = window[..., g * depth : (g + 1) * depth].reshape(-1, depth)
+                outputs = target[..., g * per_group : (g + 1) * per_group]
+                b = tap[:, g * per_group : (g + 1) * per_group]
+                outputs += _matmul(a, b, accum).reshape(outputs.shape)
+    if bias:
+        acc += bias[0]
+    output.write_array(acc)
+
+
+def _pads(pads: Any) -> tuple[int, int, int, int]:
+    """``pads`` as (top, left, bottom, right); two values pad both sides alike."""
+    if not pads:
+        return 0, 0, 0, 0
+    if len(pads) == 2:
+        return int(pads[0]), int(pads[1]), int(pads[0]), int(pads[1])
+    if len(pads) == 4:
+        return int(pads[0]), int(pads[1]), int(pads[2]), int(pads[3])
+    raise ExecutionError(f"pads {list(pads)} must have 2 or 4 values")
+
+
+def _taps(
+    size: int, kernel: int, before: int, after: int, stride: int, dilation: int
+) -> tuple[list[tuple[int, slice, slice]], int]:
+    """The kernel taps along one axis with the input and output windows they connect, and
+    the output size.
+
+    Taps reaching no input position (only padding) are left out.
+    """
+    if stride < 1 or dilation < 1:
+        raise ExecutionError(f"strides and dilations must be positive, got {stride}, {dilation}")
+    out = (size + before + after - dilation * (kernel - 1) - 1) // stride + 1
+    taps = []
+    for t in range(kernel):
+        shift = t * dilation - before  # input position of output 0
+        first = max(0, -(shift // stride))
+        last = min(out - 1, (size - 1 - shift) // stride)
+        if first > last:
+            continue
+        start = first * stride + shift
+        window = slice(start, start + (last - first) * stride + 1, stride)
+        taps.append((t, window, slice(first, last + 1)))
+    return taps, out
+
+
+def _ufunc(
+    ufunc: np.ufunc,
+    inputs: list[Array],
+    outputs: list[RegionView],
+    attributes: Mapping[str, Any],
+) -> None:
+    if outputs[0].packed:
+        outputs[0].write_array(ufunc(*inputs))
+        return
+    ufunc(*inputs, out=outputs[0].array(), casting="unsafe")
+
+
+def _relu(inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]) -> None:
+    _ufunc(np.maximum, [inputs[0], np.zeros((), inputs[0].dtype)], outputs, attributes)
+
+
+def _leaky_relu(
+    inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]
+) -> None:
+    x = inputs[0].astype(np.float32)
+    outputs[0].write_array(np.where(x >= 0, x, x * np.float32(attributes.get("alpha", 0.01))))
+
+
+def _clamp(inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]) -> None:
+    lo, hi = attributes.get("min_val"), attributes.get("max_val")
+    outputs[0].write_array(np.clip(inputs[0], lo, hi))
+
+
+def _sigmoid(inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]) -> None:
+    x = inputs[0].astype(np.float32)
+    outputs[0].write_array(1 / (1 + np.exp(-x)))
+
+
+def _silu(inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]) -> None:
+    x = inputs[0].astype(np.float32)
+    outputs[0].write_array(x / (1 + np.exp(-x)))
+
+
+def _rmsnorm(inputs: list[Array], outputs: list[RegionView], attributes: Mapping[str, Any]) -> None:
+    x, *scale = inputs
+    axis = int(attributes.get("axis", -1))
+    epsilon = float(attributes.get("epsilon", 1e-5))
+    result = x.astype(np.float32)
+    rms = np.mean(np.square(result), axis=axis, keepdims=True, dtype=np.float32)
+    rms += np.float32(epsilon)
+    np.sqrt(rms, out=rms)
+    result /= rms
+    if scale:
+        shape = [1] * result.ndim
+        shape[axis] = -1
+        result *= scale[0].reshape(shape)
+    outputs[0].write_array(result)
@@ -0,0 +1,61 @@
+"""
+Opcode registry: compute kernels by opcode, resolved once (interpreter_spec §2.3).
+
+A :class:`DispatchTable` joins the normative opcode registry
+(:func:`nemlib.core.opcodes.get_registry`) with a compute backend: for every
+registry opcode the backend supports, it holds the backend's kernel, the
+registry entry and the registry's attribute defaults. The task runner looks
+an opcode up once per task template and then calls the kernel directly for
+every instance, so running a task does no lookup by name.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import partial
+from types import MappingProxyType
+from typing import Any
+
+from nemlib.core.opcodes import OpcodeInfo, OpcodeRegistry, get_registry
+
+from neminterp.compute.backend import ComputeBackend, Kernel
+
+# Categories whose ops map elements (or rows, for normalization) of one
+# region to the same positions of another, and may run fused after the task
+# producing their input
+FUSIBLE_CATEGORIES = frozenset(
+    {"elementwise_unary", "elementwise_binary", "elementwise_other", "normalization"}
+)
+
+
+@dataclass(frozen=True, slots=True)
+class OpcodeEntry:
+    info: OpcodeInfo
+    kernel: Kernel
+    defaults: Mapping[str, Any]  # attribute defaults from the registry
+
+    @property
+    def fusible(self) -> bool:
+        return self.info.category in FUSIBLE_CATEGORIES
+
+
+class DispatchTable:
+    """The kernels of ``backend`` for the registry's opcodes."""
+
+    def __init__(self, backend: ComputeBackend, registry: OpcodeRegistry | None = None) -> None:
+        registry = registry if registry is not None else get_registry()
+        resolve = getattr(backend, "kernel", None)
+        self.entries: dict[str, OpcodeEntry] = {}
+        for name, info in registry.opcodes.items():
+            if not backend.supports(name):
+                continue
+            kernel = resolve(name) if resolve is not None else partial(backend.execute, name)
+            defaults = {a.name: a.default for a in info.attributes if a.has_default}
+            self.entries[name] = OpcodeEntry(info, kernel, MappingProxyType(defaults))
+
+    def __contains__(self, opcode: object) -> bool:
+        return opcode in self.entries
+
+    def get(self, opcode: str) -> OpcodeEntry | None:
+        return self.entries.get(opcode)
@@ -0,0 +1,48 @@
+"""Execution engine: task templates, the task graph, and the executor of a run."""
+
+from neminterp.engine.executor import Executor, TaskRunner
+from neminterp.engine.fusion import fusion_chains
+from neminterp.engine.parallel import ParallelExecutor
+from neminterp.engine.scheduler import FunctionalScheduler
+from neminterp.engine.scheduler_timed import TimedScheduler, TimingModel
+from neminterp.engine.task_graph import JOIN, TaskGraph
+from neminterp.engine.template import (
+    OperandTemplate,
+    ProgramTemplate,
+    TaskTemplate,
+    compile_program,
+)
+from neminterp.engine.token_manager import TokenManager
+from neminterp.engine.trace import (
+    Trace,
+    TraceSummary,
+    TraceWriter,
+    UnitSummary,
+    export_chrome,
+    open_trace,
+    summarize,
+)
+
+__all__ = [
+    "Executor",
+    "FunctionalScheduler",
+    "JOIN",
+    "OperandTemplate",
+    "ParallelExecutor",
+    "ProgramTemplate",
+    "TaskGraph",
+    "TaskRunner",
+    "TaskTemplate",
+    "TimedScheduler",
+    "TimingModel",
+    "TokenManager",
+    "Trace",
+    "TraceSummary",
+    "TraceWriter",
+    "UnitSummary",
+    "compile_program",
+    "export_chrome",
+    "fusion_chains",
+    "open_trace",
+    "summarize",
+]
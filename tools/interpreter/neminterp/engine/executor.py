@@ -0,0 +1,449 @@
+"""
+Executor: the core loop of a run (interpreter_spec §4.3).
+
+Each step pops the next instance from the scheduler, runs it, satisfies its
+token, and hands the waiters it made ready back to the scheduler. The
+readiness check of the spec's algorithm (scan the waiting set every step) is
+replaced by the dependency counters of
+:class:`~neminterp.engine.token_manager.TokenManager`, so a step costs
+O(log n) for the ready queue plus O(1) per outgoing dependency edge.
+
+The task graph is expanded lazily (the executor owns the expansion of its
+graph): whenever fewer than ``lookahead`` instantiated instances are left to
+run, the next chunk is instantiated and registered. Running a task
+instance's operation is delegated to ``run_task``; synchronization nodes
+(:data:`~neminterp.engine.task_graph.JOIN`) only complete.
+
+:class:`TaskRunner` is the ``run_task`` of an actual run. Transfers and
+stores are one ``memoryview`` slice assignment between the two levels'
+storage; compute tasks pass :class:`~neminterp.memory.region.RegionView`
+arrays over the operands to the compute backend, which works in place. The
+per-template part of that (buffers, element types, shapes, attributes, the
+backend's kernel from its
+:class:`~neminterp.compute.opcode_registry.DispatchTable`) is resolved once
+per template, not per instance. With a backend that asks for fusion
+(``fuse = True``), the chains found by :func:`~neminterp.engine.fusion.fusion_chains`
+run right after their first task, and their own instances only complete.
+
+Running an instance is two calls: :meth:`TaskRunner.prepare` resolves its
+operands to :class:`Step` objects (reading the task graph), and
+:meth:`TaskRunner.run` performs them (touching memory only), so the second
+half can run on another thread (see :mod:`neminterp.engine.parallel`).
+
+A timed run may also write a trace (see :mod:`neminterp.engine.trace`): each
+instance's row is appended as it completes.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from nemlib.core.expressions import (
+    ExpressionError,
+    ExprNode,
+    FloatLiteral,
+    Identifier,
+    IntLiteral,
+    compile_expr,
+    compile_int,
+    fold,
+)
+from nemlib.parser.ast_nodes import (
+    ListNode,
+    RegionExprNode,
+    StringNode,
+    TaskNode,
+    ValueNode,
+)
+
+from neminterp.compute.backend import ComputeBackend, Kernel
+from neminterp.compute.opcode_registry import DispatchTable
+from neminterp.engine.fusion import fusion_chains
+from neminterp.engine.scheduler import FunctionalScheduler
+from neminterp.engine.scheduler_timed import TimedScheduler
+from neminterp.engine.task_graph import JOIN, TaskGraph
+from neminterp.engine.template import OperandTemplate
+from neminterp.engine.token_manager import TokenManager
+from neminterp.engine.trace import TraceWriter
+from neminterp.errors import ExecutionError
+from neminterp.memory.buffer_manager import BufferHandle
+from neminterp.memory.memory_model import MemoryLevel
+from neminterp.memory.region import RegionView
+
+
+class Executor:
+    """Runs the instances of ``graph`` in dependency order."""
+
+    def __init__(
+        self,
+        graph: TaskGraph,
+        scheduler: FunctionalScheduler | TimedScheduler | None = None,
+        run_task: Callable[[int], None] | None = None,
+        lookahead: int = 4096,
+        trace: TraceWriter | None = None,
+    ) -> None:
+        self.graph = graph
+        self.scheduler = scheduler if scheduler is not None else FunctionalScheduler()
+        self.tokens = TokenManager(graph)
+        self.run_task = run_task
+        self.lookahead = lookahead
+        if trace is not None and not isinstance(self.scheduler, TimedScheduler):
+            raise ValueError("only timed runs are traced")
+        self.trace = trace
+        self.executed = 0
+        self.time = 0  # latest completion time so far
+        self._refill_at = 0  # executed count at which to instantiate more
+
+    def step(self) -> int | None:
+        """Run one instance; returns it, or None when the run is finished."""
+        if self.executed >= self._refill_at:
+            self._refill()
+        scheduler = self.scheduler
+        if not scheduler:
+            if self.executed < len(self.graph):
+                pending = self.tokens.pending()[:4]
+                labels = ", ".join(self.graph.label(int(n)) for n in pending)
+                raise ExecutionError(f"execution stalled: no ready task ({labels} waiting)")
+            return None
+        node, start = scheduler.pop()
+        if self.run_task is not None and self.graph.template_ids[node] != JOIN:
+            self.run_task(node)
+        self._complete(node, start)
+        return node
+
+    def run(self) -> int:
+        """Run to completion; returns the number of instances executed."""
+        while self.step() is not None:
+            pass
+        return self.executed
+
+    def _complete(self, node: int, start: int) -> None:
+        """Satisfy the token of ``node``, which ran from ``start``."""
+        if self.trace is not None:
+            self._record(node, start)
+        finish = self.scheduler.complete(node, start)
+        if finish > self.time:
+            self.time = finish
+        for succ in self.tokens.satisfy(node, finish):
+            self.scheduler.push(succ, self.tokens.ready_time(succ))
+        self.executed += 1
+
+    def _record(self, node: int, start: int) -> None:
+        """Append the trace row of ``node``, before its token is satisfied."""
+        scheduler = self.scheduler
+        assert isinstance(scheduler, TimedScheduler) and self.trace is not None
+        end = start + scheduler.cost(node)
+        unit = scheduler.assigned.get(node, -1)
+        self.trace.append(node, unit, self.tokens.ready_time(node), start, end)
+
+    def _refill(self) -> None:
+        graph, tokens = self.graph, self.tokens
+        while True:
+            for node in tokens.register():
+                self.scheduler.push(node, tokens.ready_time(node))
+            if graph.complete:
+                self._refill_at = len(graph)
+                return
+            if len(graph) - self.executed >= self.lookahead:
+                self._refill_at = len(graph) - self.lookahead + 1
+                return
+            graph.expand(len(graph) + 1)
+
+
+# A static value, or a function of the enclosing loop variables
+Dims = tuple[int, ...] | Callable[..., tuple[int, ...]] | None
+# (offset, extent) functions of the loop variables, per operand
+Windows = tuple[tuple[Callable[..., int], Callable[..., int]], ...]
+
+
+# Bytes [start, end) of a level that an operation reads, or writes (True)
+Access = tuple[MemoryLevel, int, int, bool]
+
+
+@dataclass(frozen=True, slots=True)
+class _Operand:
+    buffer: BufferHandle
+    elem: str | None
+    shape: Dims
+    strides: Dims
+    region: int  # identifies the region expression (with the buffer)
+
+
+@dataclass(frozen=True, slots=True)
+class _Plan:
+    """What running an instance of one task template takes."""
+
+    opcode: str | None  # None for a wait
+    copy: bool  # transfer or store
+    inputs: int
+    operands: tuple[_Operand, ...]
+    attributes: Mapping[str, Any]
+    dynamic: Mapping[str, Callable[..., Any]]  # attributes using loop variables
+    kernel: Kernel | None = None
+    chain: tuple[int, ...] = ()  # templates run fused after this one
+    windows: Windows | None = None  # operand windows, for a task run in a chain
+    indexed: bool = False  # whether running it needs the loop variables
+
+
+@dataclass(slots=True)
+class Step:
+    """One operation of a task instance, with its operands resolved."""
+
+    template: int
+    plan: _Plan
+    views: list[RegionView]
+    attributes: Mapping[str, Any]
+
+    def accesses(self) -> list[Access]:
+        """The memory the operation reads and writes."""
+        inputs = 1 if self.plan.copy else self.plan.inputs
+        return [
+            (view.level, view.offset, view.offset + view.extent, k >= inputs)
+            for k, view in enumerate(self.views)
+        ]
+
+
+class TaskRunner:
+    """Runs task instances of ``graph`` against allocated buffers.
+
+    ``buffers`` are the handles of ``graph.template.buffers``, in order.
+    """
+
+    def __init__(
+        self, graph: TaskGraph, buffers: Sequence[BufferHandle], backend: ComputeBackend
+    ) -> None:
+        self.graph = graph
+        self.buffers = buffers
+        self.backend = backend
+        self.table = DispatchTable(backend)
+        self.chains: dict[int, tuple[int, ...]] = {}
+        if getattr(backend, "fuse", False):
+            self.chains = fusion_chains(graph.template, self.table)
+        self._fused = {template for chain in self.chains.values() for template in chain}
+        self._plans: dict[int, _Plan] = {}
+
+    def __call__(self, node: int) -> None:
+        self.run(node, self.prepare(node))
+
+    def prepare(self, node: int) -> list[Step]:
+        """The operations running instance ``node`` takes, their operands resolved.
+
+        Empty for a wait and for a task its chain runs; a fused chain's
+        operations follow those of its first task.
+        """
+        graph = self.graph
+        template = int(graph.template_ids[node])
+        plan = self._plan_of(template)
+        if plan.opcode is None or plan.windows is not None:
+            return []
+        try:
+            windows = graph.operands(node)
+            _check(plan, windows)
+            if plan.copy:
+                (src_offset, length), (dst_offset, dst_extent) = windows
+                if dst_extent < length:
+                    raise ExecutionError(
+                        f"destination extent {dst_extent} is smaller than the source extent "
+                        f"{length}"
+                    )
+                src, dst = plan.operands
+                views = [
+                    self._view(src, (src_offset, length)),
+                    self._view(dst, (dst_offset, length)),
+                ]
+                return [Step(template, plan, views, plan.attributes)]
+            values: list[int] = graph.values[node].tolist() if plan.indexed else []
+            views = [self._view(op, window, values) for op, window in zip(plan.operands, windows)]
+            steps = [Step(template, plan, views, _attributes(plan, values))]
+        except ExecutionError as e:
+            raise self._located(node, template, e) from None
+        if plan.chain:
+            steps.extend(self._chain(node, plan, views, values))
+        return steps
+
+    def run(self, node: int, steps: Sequence[Step]) -> None:
+        """Run the operations :meth:`prepare` returned for ``node``."""
+        for step in steps:
+            try:
+                if step.plan.copy:
+                    self._copy(*step.views)
+                else:
+                    self._kernel(step)
+            except ExecutionError as e:
+                raise self._located(node, step.template, e) from None
+
+    def _copy(self, src: RegionView, dst: RegionView) -> None:
+        dst.level.view[dst.offset : dst.offset + dst.extent] = src.bytes()
+        dst.level.touch(dst.offset, dst.extent)
+
+    def _chain(
+        self, node: int, plan: _Plan, views: list[RegionView], values: list[int]
+    ) -> list[Step]:
+        """The chain fused after ``node``; operands of one region share a view."""
+        shared = {(op.buffer.name, op.region): view for op, view in zip(plan.operands, views)}
+        steps = []
+        for template in plan.chain:
+            link = self._plan_of(template)
+            assert link.windows is not None
+            try:
+                link_views = []
+                for op, (offset, extent) in zip(link.operands, link.windows):
+                    view = shared.get((op.buffer.name, op.region))
+                    if view is None:
+                        window = (offset(*values), extent(*values))
+                        _check_operand(op, window)
+                        view = shared[op.buffer.name, op.region] = self._view(op, window, values)
+                    link_views.append(view)
+            except ExecutionError as e:
+                raise self._located(node, template, e) from None
+            steps.append(Step(template, link, link_views, _attributes(link, values)))
+        return steps
+
+    def _located(self, node: int, template: int, e: ExecutionError) -> ExecutionError:
+        """``e``, labelled with ``template``'s task in ``node``'s iteration."""
+        if e.location is not None:
+            return e
+        location = self.graph.template.tasks[template].node.location
+        return ExecutionError(f"{self.graph.label(node, template)}: {e.message}", location)
+
+    @staticmethod
+    def _view(op: _Operand, window: tuple[int, int], values: Sequence[int] = ()) -> RegionView:
+        offset, extent = window
+        return RegionView(
+            op.buffer.level,
+            op.buffer.offset + offset,
+            extent,
+            op.elem,
+            op.shape(*values) if callable(op.shape) else op.shape,
+            op.strides(*values) if callable(op.strides) else op.strides,
+        )
+
+    @staticmethod
+    def _kernel(step: Step) -> None:
+        plan, views = step.plan, step.views
+        assert plan.kernel is not None
+        plan.kernel(
+            [view.array() for view in views[: plan.inputs]], views[plan.inputs :], step.attributes
+        )
+        for view in views[plan.inputs :]:
+            view.level.touch(view.offset, view.extent)
+
+    def _plan_of(self, template: int) -> _Plan:
+        plan = self._plans.get(template)
+        if plan is None:
+            plan = self._plans[template] = self._plan(template)
+        return plan
+
+    def _plan(self, template: int) -> _Plan:
+        task = self.graph.template.tasks[template]
+        node = task.node
+        if not isinstance(node, TaskNode):
+            return _Plan(None, False, 0, (), {}, {})
+        index = self.graph.template.index
+        params = [index.loops[k].var for k in task.scope]
+        constants = self.graph.template.constants
+        try:
+            operands = tuple(
+                _Operand(
+                    self.buffers[op.buffer],
+                    op.region.elem,
+                    _dims(op.region.shape, params, constants),
+                    _dims(op.region.strides, params, constants),
+                    id(op.region),
+                )
+                for op in task.operands
+            )
+            entry = self.table.get(node.opcode) if node.kind == "compute" else None
+            attributes: dict[str, Any] = dict(entry.defaults) if entry is not None else {}
+            dynamic: dict[str, Callable[..., Any]] = {}
+            for name, value in node.attributes:
+                attribute = _attribute(value, params, constants)
+                if callable(attribute):
+                    dynamic[name] = attribute
+                else:
+                    attributes[name] = attribute
+            windows = None
+            if template in self._fused:
+                windows = _windows(task.operands, params, constants)
+        except ExpressionError as e:
+            raise ExecutionError(e.message, e.location) from None
+        if node.kind == "compute" and entry is None:
+            raise ExecutionError(f"no compute backend implements '{node.opcode}'", node.location)
+        return _Plan(
+            node.opcode,
+            node.kind != "compute",
+            len(node.inputs),
+            operands,
+            attributes,
+            dynamic,
+            entry.kernel if entry is not None else None,
+            self.chains.get(template, ()),
+            windows,
+            bool(dynamic)
+            or template in self.chains
+            or any(callable(op.shape) or callable(op.strides) for op in operands),
+        )
+
+
+def _attributes(plan: _Plan, values: list[int]) -> Mapping[str, Any]:
+    if not plan.dynamic:
+        return plan.attributes
+    return {**plan.attributes, **{k: f(*values) for k, f in plan.dynamic.items()}}
+
+
+def _check(plan: _Plan, windows: list[tuple[int, int]]) -> None:
+    for op, window in zip(plan.operands, windows):
+        _check_operand(op, window)
+
+
+def _check_operand(op: _Operand, window: tuple[int, int]) -> None:
+    offset, extent = window
+    if offset < 0 or offset + extent > op.buffer.size:
+        raise ExecutionError(
+            f"region [{offset}, {offset + extent}) is out of bounds of buffer "
+            f"'{op.buffer.name}' ({op.buffer.size} bytes)"
+        )
+
+
+def _windows(
+    operands: Sequence[OperandTemplate], params: list[str], constants: Mapping[str, int]
+) -> Windows:
+    """The operand window functions of a task, of its loop variables."""
+    return tuple(
+        (compile_int(op.offset, params, constants), compile_int(op.extent, params, constants))
+        for op in operands
+    )
+
+
+def _dims(
+    exprs: tuple[ExprNode, ...] | None, params: list[str], constants: Mapping[str, int]
+) -> Dims:
+    if exprs is None:
+        return None
+    folded = [fold(e, constants) for e in exprs]
+    values = [e.value for e in folded if isinstance(e, IntLiteral)]
+    if len(values) == len(folded):
+        return tuple(values)
+    functions = [compile_int(e, params, constants) for e in folded]
+    return lambda *values: tuple(f(*values) for f in functions)
+
+
+def _attribute(value: ValueNode, params: list[str], constants: Mapping[str, int]) -> Any:
+    """The value of a task attribute, or a function of the loop variables."""
+    if isinstance(value, StringNode):
+        return value.value
+    if isinstance(value, ListNode):
+        items = [_attribute(item, params, constants) for item in value.items]
+        if any(callable(item) for item in items):
+            return lambda *values: [item(*values) if callable(item) else item for item in items]
+        return items
+    if isinstance(value, RegionExprNode):
+        raise ExecutionError("region-valued attributes are not supported", value.location)
+    if isinstance(value, Identifier) and value.name not in constants and value.name not in params:
+        return value.name  # an enumerated value, e.g. accum_type=f32
+    folded = fold(value, constants)
+    if isinstance(folded, (IntLiteral, FloatLiteral)):
+        return folded.value
+    return compile_expr(folded, params, constants)
@@ -0,0 +1,81 @@
+"""
+Fusion: chains of elementwise tasks that run right after their producer.
+
+A compute task *C* joins the chain of compute task *P* when
+
+- C's opcode is elementwise or a normalization
+  (:data:`~neminterp.compute.opcode_registry.FUSIBLE_CATEGORIES`),
+- C's first input is P's output region,
+- all of C's dependency tokens are P's, of the same iteration, and
+- C follows P in the same loop body with no barrier (a ``wait``, a
+  ``.sync`` task other than P, or a loop) between them.
+
+C's predecessors are then P and predecessors of P (see
+:mod:`neminterp.engine.task_graph`): every task C must follow has completed
+when P completes, so running C at that point is an order the unfused run
+may take as well. C then reads the values P stored, so a program whose
+result does not depend on the order of unordered tasks gets bit-identical
+results fused and unfused. Chains extend transitively (``conv2d → relu →
+clamp``); the instance of a fused task itself only completes its token.
+
+What fusing saves is everything around the kernels: a chain's tasks share
+the region views (and their arrays) of their common operands, so an
+in-place link is one ``ufunc(y, out=y)`` call, with no operand windows to
+evaluate or check and no overlap copy of ``y``.
+"""
+
+from __future__ import annotations
+
+from nemlib.parser.ast_nodes import TaskNode
+from nemlib.validation.program_index import Block
+
+from neminterp.compute.opcode_registry import DispatchTable
+from neminterp.engine.template import ProgramTemplate, TaskTemplate
+
+
+def fusion_chains(template: ProgramTemplate, table: DispatchTable) -> dict[int, tuple[int, ...]]:
+    """The fused chains of ``template``: task templates by the one they run after."""
+    chains: dict[int, list[int]] = {}
+
+    def walk(block: Block) -> None:
+        heads: dict[int, int] = {}  # compute tasks since the last barrier -> chain head
+        for item in block:
+            if not isinstance(item, int):
+                walk(item[1])
+                heads = {}
+                continue
+            task = template.tasks[item]
+            if not isinstance(task.node, TaskNode) or task.node.kind != "compute":
+                if task.barrier:
+                    heads = {}
+                continue
+            producer = _producer(template, task, table)
+            head = heads.get(producer, item) if producer is not None else item
+            if head != item:
+                chains.setdefault(head, []).append(item)
+            if task.barrier:
+                heads = {}
+            heads[item] = head
+
+    walk(template.body)
+    return {head: tuple(chain) for head, chain in chains.items()}
+
+
+def _producer(template: ProgramTemplate, task: TaskTemplate, table: DispatchTable) -> int | None:
+    """The task ``task`` may run fused after, by the rules above (barriers aside)."""
+    node = task.node
+    assert isinstance(node, TaskNode)
+    entry = table.get(node.opcode)
+    if entry is None or not entry.fusible or not node.inputs or not task.deps:
+        return None
+    producers = {b.producer for b in task.deps}
+    if len(producers) != 1 or any(b.carried for b in task.deps):
+        return None
+    (producer,) = producers
+    source = template.tasks[producer]
+    if not isinstance(source.node, TaskNode) or len(source.node.outputs) != 1:
+        return None
+    output, first = source.operands[-1], task.operands[0]
+    if (output.buffer, output.region) != (first.buffer, first.region):
+        return None
+    return producer
@@ -0,0 +1,176 @@
+"""
+Parallel functional mode: engines running concurrently (interpreter_spec §4.4).
+
+The serialized functional mode runs one task instance at a time across all
+engines. :class:`ParallelExecutor` gives each engine a worker thread of its
+own and keeps them busy at once; NumPy releases the GIL inside its kernels
+and copies, so engine-local work on disjoint ``L1[k]`` instances overlaps.
+
+The main thread still owns everything but the operations themselves: it
+pops ready instances from the scheduler in source order, resolves their
+operands (:meth:`TaskRunner.prepare`), hands them to a worker and, as they
+complete, satisfies their tokens and expands the graph. An instance runs on
+engine ``k``'s worker when one of its operands is in ``L1[k]``, and on the
+least busy worker when it only touches L2 and DDR. Each worker runs its
+instances in the order it got them.
+
+There are no more workers than CPU cores available: on a single core the
+instances run on the main thread, as in the serialized mode, since threads
+would only add their hand-offs. Instances are handed over through plain
+queues rather than futures, which keeps a hand-off to a few microseconds.
+
+Shared L2 and DDR are coordinated by the token DAG: an instance is only
+dispatched once its dependencies have completed. On top of that, an
+instance is held back while an instance in flight writes memory it touches
+or touches memory it writes, so no two operations ever race on the same
+bytes; conflicting instances run one after the other. A program whose
+result does not depend on the order of unordered tasks (which functional
+mode assumes) therefore gets bit-identical results in both modes.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Sequence
+from queue import Empty, SimpleQueue
+
+from neminterp.engine.executor import Access, Executor, Step, TaskRunner
+from neminterp.engine.scheduler import FunctionalScheduler
+from neminterp.engine.task_graph import JOIN, TaskGraph
+from neminterp.errors import ExecutionError
+from neminterp.memory.memory_model import MemoryLevel
+
+# A worker's queue: instances and their steps, then None to stop
+_Work = SimpleQueue["tuple[int, list[Step]] | None"]
+
+
+class ParallelExecutor(Executor):
+    """Runs the instances of ``graph`` with one worker thread per engine.
+
+    ``l1`` are the engines' L1 levels, engine ``k``'s at index ``k``.
+    ``threads`` (default: the CPU cores available, at most one per engine)
+    caps the workers; engine ``k`` runs on worker ``k mod threads``. With a
+    single one, nothing can overlap, and the instances run on the calling
+    thread as in the serialized mode.
+    """
+
+    def __init__(
+        self,
+        graph: TaskGraph,
+        runner: TaskRunner,
+        l1: Sequence[MemoryLevel],
+        lookahead: int = 4096,
+        threads: int | None = None,
+    ) -> None:
+        super().__init__(graph, FunctionalScheduler(), runner, lookahead)
+        self.runner = runner
+        if threads is None:
+            threads = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 1
+        self.workers = max(1, min(threads, len(l1)))
+        self.engines = {id(level): k % self.workers for k, level in enumerate(l1)}
+
+    def run(self) -> int:
+        """Run to completion; returns the number of instances executed."""
+        if self.workers == 1:
+            return super().run()
+        queues: list[_Work] = [SimpleQueue() for _ in range(self.workers)]
+        done: SimpleQueue[tuple[int, BaseException | None]] = SimpleQueue()
+        stop = threading.Event()
+
+        def work(queue: _Work) -> None:
+            while (item := queue.get()) is not None:
+                if stop.is_set():
+                    continue
+                node, steps = item
+                try:
+                    self.runner.run(node, steps)
+                except BaseException as e:  # handed to the main thread
+                    done.put((node, e))
+                else:
+                    done.put((node, None))
+
+        threads = [
+            threading.Thread(target=work, args=(queue,), name=f"engine{k}", daemon=True)
+            for k, queue in enumerate(queues)
+        ]
+        for thread in threads:
+            thread.start()
+        # submitted and not yet completed: instance -> its accesses, its worker
+        in_flight: dict[int, tuple[list[Access], int]] = {}
+        busy = [0] * self.workers
+        prepared: dict[int, list[Step]] = {}  # held back instances
+        try:
+            while True:
+                if self.executed >= self._refill_at:
+                    self._refill()
+                held = []
+                while self.scheduler:
+                    node, start = self.scheduler.pop()
+                    steps = prepared.pop(node, None)
+                    if steps is None:
+                        steps = self._prepare(node)
+                    if not steps:
+                        self._complete(node, start)
+                        continue
+                    accesses = [a for step in steps for a in step.accesses()]
+                    if any(_conflict(accesses, other) for other, _ in in_flight.values()):
+                        prepared[node] = steps
+                        held.append(node)
+                        continue
+                    worker = self._worker(accesses, busy)
+                    queues[worker].put((node, steps))
+                    in_flight[node] = (accesses, worker)
+                    busy[worker] += 1
+                for node in held:
+                    self.scheduler.push(node)
+                if not in_flight:
+                    if not self.scheduler and self.executed >= self._refill_at:
+                        self._refill()
+                    if self.scheduler:
+                        continue
+                    if self.executed < len(self.graph):
+                        pending = self.tokens.pending()[:4]
+                        labels = ", ".join(self.graph.label(int(n)) for n in pending)
+                        raise ExecutionError(f"execution stalled: no ready task ({labels} waiting)")
+                    return self.executed
+                finished = [done.get()]
+                try:
+                    while True:
+                        finished.append(done.get_nowait())
+                except Empty:
+                    pass
+                for node, error in sorted(finished, key=lambda f: f[0]):
+                    busy[in_flight.pop(node)[1]] -= 1
+                    if error is not None:
+                        raise error
+                    self._complete(node, 0)
+        finally:
+            stop.set()
+            for queue in queues:
+                queue.put(None)
+            for thread in threads:
+                thread.join()
+
+    def _prepare(self, node: int) -> list[Step]:
+        if self.graph.template_ids[node] == JOIN:
+            return []
+        return self.runner.prepare(node)
+
+    def _worker(self, accesses: list[Access], busy: list[int]) -> int:
+        """The worker of the engine owning an L1 level in ``accesses``, else the least
+        busy one."""
+        for level, _, _, _ in accesses:
+            worker = self.engines.get(id(level))
+            if worker is not None:
+                return worker
+        return busy.index(min(busy))
+
+
+def _conflict(a: list[Access], b: list[Access]) -> bool:
+    """Whether ``a`` and ``b`` overlap with at least one of the two writing."""
+    for level, start, end, write in a:
+        for other, lo, hi, other_write in b:
+            if level is other and start < hi and lo < end and (write or other_write):
+                return True
+    return False
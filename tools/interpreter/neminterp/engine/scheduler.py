@@ -0,0 +1,43 @@
+"""
+Schedulers: the ready queue of the executor and its selection strategy.
+
+interpreter_spec §5.3 selects the first ready task in source order
+(functional mode) or the task whose unit is available earliest (timed mode).
+Both are kept as binary heaps, so selecting costs O(log n) in the number of
+ready instances instead of a scan:
+
+- :class:`FunctionalScheduler` orders by instance id. Instances are created
+  in source order (loop iterations in order, statements in order within an
+  iteration), so the smallest id is the first ready task in source order.
+- :class:`~neminterp.engine.scheduler_timed.TimedScheduler` orders by
+  earliest start: the later of the task's ready time and the time a unit it
+  may run on becomes free (see :mod:`neminterp.engine.scheduler_timed`).
+
+A scheduler sees instances only, never their operations; the executor asks
+it for the next instance and reports back when that instance has run.
+"""
+
+from __future__ import annotations
+
+import heapq
+
+
+class FunctionalScheduler:
+    """Dependency-only scheduling: ready instances in source order, no time."""
+
+    def __init__(self) -> None:
+        self._heap: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, node: int, ready_time: int = 0) -> None:
+        heapq.heappush(self._heap, node)
+
+    def pop(self) -> tuple[int, int]:
+        """The next instance to run and its start time."""
+        return heapq.heappop(self._heap), 0
+
+    def complete(self, node: int, start: int) -> int:
+        """Record that ``node`` ran from ``start``; returns its completion time."""
+        return 0
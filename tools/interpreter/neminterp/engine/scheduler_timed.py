@@ -0,0 +1,426 @@
+"""
+Timed mode: a discrete-event simulation of the execution units (interpreter_spec §5.2).
+
+Every execution unit instance (``NMU[k]``, ``CSTL[k]``, ``DMA[k]`` of each
+engine, the device-level ``sDMA`` and ``WDM``) has a clock: the time it
+becomes free. A task may run on a *pool* of instances: the one its
+``@resource`` decorator names, the instances of its unit type on its engine,
+or, for a task touching only L2 and DDR, those of every engine (engine-agnostic
+transfers and stores run on ``sDMA`` when the device has one). Each pool
+keeps its instances in a heap by free time, so the first available one is
+found in O(log n); an instance shared by several pools is re-entered in each
+when it is taken, and entries whose time went stale are dropped as they
+surface.
+
+:class:`TimedScheduler` keeps the pending events in one priority queue: an
+instance enters it when its last dependency completes, keyed by that
+completion time, or by the time its pool frees up if that is later. Popping
+it jumps the clock straight to the next task start; no time step is ever
+simulated without one, and no unit or ready task is scanned. Starting a task
+only delays its pool, so a popped entry whose key went stale is pushed back
+with its new key, once per task that delayed it. A timed run therefore costs
+a functional run plus O(log n) per task.
+
+:class:`TimingModel` maps the instances of a task graph to their pools and
+costs. Costs follow the table of §5.2 with the parameters of a timing
+profile, plus the unit type's ``latency`` for every task::
+
+    transfer / store     ceil(bytes / bandwidth)
+    gemm / matmul        ceil(M * N * K / mac_throughput)
+    convolutions         ceil(output_elements * K_h * K_w * C_in / mac_throughput)
+    other compute        ceil(elements / eltwise_throughput)  (largest operand)
+    wait                 0
+
+Both depend on the program only, never on memory contents.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from math import prod
+
+import numpy as np
+from nemlib.core.expressions import ExpressionError, IntLiteral, compile_int, evaluate_int, fold
+from nemlib.core.opcodes import get_registry
+from nemlib.parser.ast_nodes import TaskNode, UnitRefNode
+
+from neminterp.engine.task_graph import TaskGraph
+from neminterp.engine.template import OperandTemplate
+from neminterp.errors import ExecutionError
+from neminterp.memory.region import PACKED, element_dtype
+
+# interpreter_spec §5.2 and §6.2
+DEFAULT_PROFILE: dict[str, dict[str, int]] = {
+    "NMU": {"mac_throughput": 4096, "latency": 2},
+    "CSTL": {"eltwise_throughput": 256, "latency": 1},
+    "DMA": {"bandwidth": 32, "latency": 4},
+}
+DEFAULT_PER_ENGINE: dict[str, int] = {"NMU": 1, "CSTL": 2, "DMA": 2}
+DEFAULT_DEVICE_UNITS: dict[str, int] = {"sDMA": 1, "WDM": 0}
+
+# Parameters sDMA tasks take from DMA's unless the profile has an sDMA entry
+_PROFILE_FALLBACK = {"sDMA": "DMA"}
+
+_CONVOLUTIONS = frozenset({"conv1d", "conv2d", "conv3d", "depthwise_conv2d"})
+
+
+class TimedScheduler:
+    """Resource-aware scheduling: earliest start first, ties in source order.
+
+    ``pools`` are the sets of unit instances (indices into :attr:`free`) a
+    task may run on; ``unit(node)`` is the pool of ``node`` (``-1`` for none,
+    e.g. synchronization nodes), ``cost(node)`` its duration in cycles.
+    """
+
+    def __init__(
+        self,
+        cost: Callable[[int], int],
+        unit: Callable[[int], int],
+        pools: Sequence[Sequence[int]],
+    ) -> None:
+        self.cost = cost
+        self.unit = unit
+        instances = 1 + max((u for pool in pools for u in pool), default=-1)
+        self.free = [0] * instances  # time each unit instance becomes available
+        self.busy = [0] * instances  # cycles each unit instance spent running tasks
+        self.now = 0  # start time of the latest task
+        self.assigned: dict[int, int] = {}  # instance running each started, uncompleted node
+        self._pools: list[list[tuple[int, int]]] = [[(0, u) for u in sorted(p)] for p in pools]
+        self._member: list[list[int]] = [[] for _ in range(instances)]
+        for p, pool in enumerate(pools):
+            for u in pool:
+                self._member[u].append(p)
+        self._heap: list[tuple[int, int, int, int]] = []  # (start, node, ready, pool)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, node: int, ready_time: int = 0) -> None:
+        p = self.unit(node)
+        start = max(ready_time, self._available(p)[0]) if p >= 0 else ready_time
+        heapq.heappush(self._heap, (start, node, ready_time, p))
+
+    def pop(self) -> tuple[int, int]:
+        heap = self._heap
+        while True:
+            start, node, ready, p = heap[0]
+            if p < 0:
+                break
+            free, u = self._available(p)
+            if free <= start:
+                self.assigned[node] = u
+                break
+            heapq.heapreplace(heap, (max(ready, free), node, ready, p))
+        heapq.heappop(heap)
+        self.now = start
+        return node, start
+
+    def complete(self, node: int, start: int) -> int:
+        cost = self.cost(node)
+        finish = start + cost
+        u = self.assigned.pop(node, -1)
+        if u >= 0:
+            self.busy[u] += cost
+            if finish != self.free[u]:
+                self.free[u] = finish
+                for p in self._member[u]:
+                    heapq.heappush(self._pools[p], (finish, u))
+        return finish
+
+    def _available(self, p: int) -> tuple[int, int]:
+        """The first available instance of pool ``p``: (free time, instance)."""
+        pool, free = self._pools[p], self.free
+        while pool[0][0] != free[pool[0][1]]:
+            heapq.heappop(pool)
+        return pool[0]
+
+
+class TimingModel:
+    """The unit pools and costs of the instances of ``graph``.
+
+    ``per_engine`` and ``device_units`` are the unit counts of the device
+    topology (interpreter_spec §6.2); ``profile`` overrides parameters of
+    :data:`DEFAULT_PROFILE`, per unit type. Raises :class:`ExecutionError`
+    when a task needs a unit the topology lacks.
+    """
+
+    def __init__(
+        self,
+        graph: TaskGraph,
+        engines: int = 1,
+        per_engine: Mapping[str, int] | None = None,
+        device_units: Mapping[str, int] | None = None,
+        profile: Mapping[str, Mapping[str, int]] | None = None,
+    ) -> None:
+        self.graph = graph
+        self.engines = engines
+        self.per_engine = dict(DEFAULT_PER_ENGINE if per_engine is None else per_engine)
+        self.device_units = dict(DEFAULT_DEVICE_UNITS if device_units is None else device_units)
+        self.profile = _merge(profile)
+        self.instances: list[str] = []  # unit instance names
+        self.instance_engines: list[int | None] = []  # None for device-level units
+        self._first: dict[tuple[str, int | None], int] = {}  # (type, engine) -> first instance
+        for e in range(engines):
+            for unit, count in self.per_engine.items():
+                self._add(unit, e, count, f"engine{e}." if engines > 1 else "")
+        for unit, count in self.device_units.items():
+            self._add(unit, None, count, "")
+        self.pools: list[list[int]] = []
+        self.pool_units: list[str] = []  # the unit type of each pool
+        # per template: the unit type costing it and its pool (None for waits)
+        self.placements: list[tuple[str, int] | None] = []
+        self._pool_ids: dict[tuple[str, int | None, int | None], int] = {}
+        template = graph.template
+        self._levels = [(buf.mem_level, buf.l1_index) for buf in template.buffers]
+        # per template, then JOIN: the pool, the cost (-1: per instance), copy parameters
+        pools, costs, bandwidth, latency = [], [], [], []
+        self._per_instance: dict[int, Callable[[int], int]] = {}
+        for k, task in enumerate(template.tasks):
+            node = task.node
+            cost: int | tuple[int, int] | Callable[[int], int] = 0
+            pool = -1
+            placement = None
+            if isinstance(node, TaskNode):
+                try:
+                    unit, resource, engine, index = self._placement(node, task.operands)
+                    pool = self._pool(resource, engine, index, node)
+                    placement = (unit, pool)
+                    params = [template.index.loops[d].var for d in task.scope]
+                    cost = self._template_cost(node, unit, task.operands, params)
+                except ExpressionError as e:
+                    raise ExecutionError(e.message, e.location) from None
+                except ExecutionError as e:
+                    if e.location is not None:
+                        raise
+                    name = template.tokens[task.token] if task.token >= 0 else node.task_type
+                    raise ExecutionError(f"{name}: {e.message}", node.location) from None
+            self.placements.append(placement)
+            pools.append(pool)
+            costs.append(cost if isinstance(cost, int) else -1)
+            bandwidth.append(cost[0] if isinstance(cost, tuple) else 0)
+            latency.append(cost[1] if isinstance(cost, tuple) else 0)
+            if callable(cost):
+                self._per_instance[k] = cost
+        self._pool_of = np.array([*pools, -1], np.int64)
+        self._cost_of = np.array([*costs, 0], np.int64)
+        self._bandwidth = np.array([*bandwidth, 0], np.int64)
+        self._latency = np.array([*latency, 0], np.int64)
+        # per instance, looked up as the graph expands
+        self._node_pools: list[int] = []
+        self._node_costs: list[int] = []
+
+    def unit(self, node: int) -> int:
+        """The pool of instances ``node`` may run on, or -1."""
+        if node >= len(self._node_pools):
+            self._extend()
+        return self._node_pools[node]
+
+    def cost(self, node: int) -> int:
+        """The cycles ``node`` takes."""
+        if node >= len(self._node_costs):
+            self._extend()
+        return self._node_costs[node]
+
+    def _extend(self) -> None:
+        """Look up the pools and costs of the instances expanded since the last call."""
+        graph = self.graph
+        start = len(self._node_pools)
+        templates = graph.template_ids[start:]
+        costs = self._cost_of[templates]
+        copies = np.flatnonzero(self._bandwidth[templates])
+        if len(copies):
+            t = templates[copies]
+            length = graph.op_extent[graph.op_ptr[start + copies]]  # the sources'
+            costs[copies] = -(-length // self._bandwidth[t]) + self._latency[t]
+        for k in np.flatnonzero(costs < 0).tolist():
+            costs[k] = self._per_instance[int(templates[k])](start + k)
+        self._node_pools.extend(self._pool_of[templates].tolist())
+        self._node_costs.extend(costs.tolist())
+
+    def scheduler(self) -> TimedScheduler:
+        return TimedScheduler(self.cost, self.unit, self.pools)
+
+    # -- topology ----------------------------------------------------------
+
+    def _add(self, unit: str, engine: int | None, count: int, prefix: str) -> None:
+        self._first[unit, engine] = len(self.instances)
+        self.instances.extend(f"{prefix}{unit}[{i}]" for i in range(count))
+        self.instance_engines.extend([engine] * count)
+
+    def _count(self, unit: str, engine: int | None) -> int:
+        if engine is None and unit in self.device_units:
+            return self.device_units[unit]
+        return self.per_engine.get(unit, 0)
+
+    def _pool(self, unit: str, engine: int | None, index: int | None, node: TaskNode) -> int:
+        """The pool of ``unit`` instances on ``engine`` (None: on all), or of instance ``index``."""
+        key = (unit, engine, index)
+        p = self._pool_ids.get(key)
+        if p is not None:
+            return p
+        count = self._count(unit, engine)
+        if index is not None and not 0 <= index < count:
+            raise ExecutionError(
+                f"@resource({unit}[{index}]) needs {index + 1} {unit} units per engine, "
+                f"the topology has {count}"
+            )
+        if unit in self.device_units:
+            engines: list[int | None] = [None]
+        else:
+            engines = list(range(self.engines)) if engine is None else [engine]
+        pool = [
+            self._first[unit, e] + i
+            for e in engines
+            if (unit, e) in self._first
+            for i in (range(count) if index is None else (index,))
+        ]
+        if not pool:
+            raise ExecutionError(f"'{node.opcode}' runs on {unit}, which the topology lacks")
+        self._pool_ids[key] = p = len(self.pools)
+        self.pools.append(pool)
+        self.pool_units.append(unit)
+        return p
+
+    def _placement(
+        self, node: TaskNode, operands: Sequence[OperandTemplate]
+    ) -> tuple[str, str, int | None, int | None]:
+        """The unit type costing a task, the one running it, its engine (None: any) and
+        its ``@resource`` instance."""
+        constants = self.graph.template.constants
+        engine = None
+        for op in operands:
+            level, l1_index = self._levels[op.buffer]
+            if level == "L1":
+                engine = evaluate_int(l1_index, constants) if l1_index is not None else 0
+                if not 0 <= engine < self.engines:
+                    raise ExecutionError(f"engine {engine} does not exist ({self.engines} engines)")
+                break
+        if node.kind != "compute":
+            unit = "DMA"
+            if engine is None and self.device_units.get("sDMA", 0) > 0:
+                unit = "sDMA"
+        else:
+            info = get_registry().opcodes.get(node.opcode)
+            unit = info.execution_unit if info is not None and info.execution_unit else "CSTL"
+        for deco in node.decorators:
+            if deco.name == "resource" and deco.args and isinstance(deco.args[0], UnitRefNode):
+                ref = deco.args[0]
+                return unit, ref.unit, engine or 0, evaluate_int(ref.index, constants)
+        return unit, unit, engine, None
+
+    # -- costs -------------------------------------------------------------
+
+    def _template_cost(
+        self,
+        node: TaskNode,
+        unit: str,
+        operands: Sequence[OperandTemplate],
+        params: list[str],
+    ) -> int | tuple[int, int] | Callable[[int], int]:
+        """The cost of a task's instances: a number of cycles, (bandwidth, latency) for a
+        copy, or a function of the instance when shapes depend on the loop variables."""
+        if node.kind != "compute":
+            return self.parameters(unit, "bandwidth")
+        name = "mac_throughput" if unit == "NMU" else "eltwise_throughput"
+        throughput, latency = self.parameters(unit, name)
+        work, static = task_work(node, unit, operands, params, self.graph.template.constants)
+        if static:
+            return -(-work([0] * len(params)) // throughput) + latency
+        graph, scope = self.graph, len(params)
+
+        def compute_cost(instance: int) -> int:
+            values = graph.values[instance, :scope].tolist()
+            return -(-work(values) // throughput) + latency
+
+        return compute_cost
+
+    def parameters(self, unit: str, name: str) -> tuple[int, int]:
+        """A unit type's throughput parameter ``name`` and its latency."""
+        params = self.profile.get(_PROFILE_FALLBACK.get(unit, unit), {}) | self.profile.get(
+            unit, {}
+        )
+        return params[name], params.get("latency", 0)
+
+
+def task_work(
+    node: TaskNode,
+    unit: str,
+    operands: Sequence[OperandTemplate],
+    params: list[str],
+    constants: Mapping[str, int],
+) -> tuple[Callable[[list[int]], int], bool]:
+    """The work of a compute task's instances on ``unit``: MACs on the NMU, else the
+    elements of its largest operand.
+
+    Returns it as a function of the values of the loop variables ``params``,
+    and whether it is the same for every instance.
+    """
+    shapes = [_shape(op, params, constants) for op in operands]
+    static = all(shape.static for shape in shapes)
+    inputs = len(node.inputs)
+    if unit == "NMU":
+        if node.opcode in _CONVOLUTIONS:
+            depth = _depth(shapes[1], slice(None, -1)) if inputs > 1 else _one
+        else:
+            depth = _depth(shapes[0], slice(-1, None))
+        out = _elements(shapes[inputs]) if len(shapes) > inputs else _one
+
+        def macs(values: list[int]) -> int:
+            return out(values) * depth(values)
+
+        return macs, static
+    counts = [_elements(shape) for shape in shapes]
+
+    def elements(values: list[int]) -> int:
+        return max((count(values) for count in counts), default=0)
+
+    return elements, static
+
+
+@dataclass(frozen=True, slots=True)
+class _Shape:
+    """An operand's dimensions (without a shape: its element count), of the loop variables."""
+
+    dims: list[Callable[..., int]]
+    static: bool  # whether no dimension depends on the loop variables
+
+
+def _shape(op: OperandTemplate, params: list[str], constants: Mapping[str, int]) -> _Shape:
+    region = op.region
+    if region.shape is not None:
+        exprs = [fold(e, constants) for e in region.shape]
+        static = all(isinstance(e, IntLiteral) for e in exprs)
+        return _Shape([compile_int(e, params, constants) for e in exprs], static)
+    # untyped or shapeless: elements from the byte extent
+    bits = 8
+    if region.elem is not None:
+        bits = 4 if region.elem in PACKED else 8 * element_dtype(region.elem).itemsize
+    extent = compile_int(op.extent, params, constants)
+    return _Shape([lambda *values: extent(*values) * 8 // bits], isinstance(op.extent, IntLiteral))
+
+
+def _elements(shape: _Shape) -> Callable[[list[int]], int]:
+    dims = shape.dims
+    return lambda values: prod(d(*values) for d in dims)
+
+
+def _depth(shape: _Shape, axes: slice) -> Callable[[list[int]], int]:
+    """The product of the dimensions ``axes`` of ``shape``: the MACs per output element."""
+    dims = shape.dims[axes]
+    return lambda values: prod(d(*values) for d in dims)
+
+
+def _one(values: list[int]) -> int:
+    return 1
+
+
+def _merge(profile: Mapping[str, Mapping[str, int]] | None) -> dict[str, dict[str, int]]:
+    merged = {unit: dict(params) for unit, params in DEFAULT_PROFILE.items()}
+    for unit, params in (profile or {}).items():
+        for name, value in params.items():
+            if not isinstance(value, int) or value < 0 or (value == 0 and name != "latency"):
+                raise ValueError(f"timing parameter {unit}.{name} must be a positive integer")
+        merged.setdefault(unit, {}).update(params)
+    return merged
@@ -0,0 +1,395 @@
+"""
+Task graph: the task instances of a program run, as structure-of-arrays records.
+
+Expanding the loops of a :class:`~neminterp.engine.template.ProgramTemplate`
+creates one instance per task statement per iteration. Instances are rows of
+NumPy columns rather than objects:
+
+- ``template_ids``: the task template of each instance (:data:`JOIN` for the
+  synchronization nodes below); ``token_ids`` derives the produced token.
+- ``values``: the enclosing loop variables, outermost first.
+- ``dep_ptr``/``deps``: predecessor instances, in CSR form.
+- ``op_ptr``/``op_offset``/``op_extent``: operand byte ranges (inputs, then
+  outputs, in template order), in CSR form.
+
+Every loop iteration is bracketed by a *begin* and an *end* join node. A
+task's predecessors are the latest barrier of its block (a ``wait``, a
+``.sync`` task, a loop, or the iteration's begin node) and the latest
+instances of the tasks producing its dependency tokens (the previous
+iteration's for loop-carried ones). The end node follows every task of the
+iteration, and the begin node of iteration ``k`` follows the end node of
+iteration ``k - N`` for ``@max_in_flight(N)``, which bounds the iterations in
+flight. A loop ends with a join node after its last ``N`` iterations.
+
+An innermost loop body (tasks only) is instantiated for a chunk of iterations
+at once: expressions are evaluated over an array of loop variable values and
+the records of the whole chunk are assembled with array operations. Bodies
+containing loops are expanded one iteration at a time. Expansion is lazy:
+:meth:`TaskGraph.expand` instantiates chunks until enough instances exist, so
+an executor keeps only a bounded prefix of a long loop ahead of it.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Generator, Mapping
+
+import numpy as np
+import numpy.typing as npt
+from nemlib.core.expressions import (
+    BinaryOp,
+    ExpressionError,
+    ExprNode,
+    FloatLiteral,
+    Identifier,
+    IntLiteral,
+    UnaryOp,
+    evaluate_int,
+)
+from nemlib.parser.ast_nodes import TaskNode
+from nemlib.validation.program_index import Block, max_in_flight
+
+from neminterp.engine.template import ProgramTemplate
+from neminterp.errors import ExecutionError
+
+JOIN = -1  # template id of the begin/end nodes of iterations and loops
+
+IntArray = npt.NDArray[np.int64]
+_Expansion = Generator[None, None, list[int]]
+
+
+class _Column:
+    """A NumPy array that grows by doubling."""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype: type[np.generic], width: int | None = None) -> None:
+        self.data: np.ndarray = np.empty((64,) if width is None else (64, width), dtype)
+        self.size = 0
+
+    def extend(self, values: npt.ArrayLike) -> None:
+        values = np.asarray(values)
+        end = self.size + len(values)
+        if end > len(self.data):
+            grown = np.empty((max(end, 2 * len(self.data)), *self.data.shape[1:]), self.data.dtype)
+            grown[: self.size] = self.data[: self.size]
+            self.data = grown
+        self.data[self.size : end] = values
+        self.size = end
+
+    def view(self) -> np.ndarray:
+        return self.data[: self.size]
+
+
+class TaskGraph:
+    """The task instances of one run of ``template``, expanded on demand."""
+
+    def __init__(self, template: ProgramTemplate, chunk: int = 1024) -> None:
+        self.template = template
+        self.chunk = max(chunk, 1)
+        self.depth = max(template.depth, 1)
+        self.complete = False
+        self._template = _Column(np.int32)
+        self._values = _Column(np.int64, self.depth)
+        self._dep_ptr = _Column(np.int64)
+        self._dep_ptr.extend([0])
+        self._deps = _Column(np.int64)
+        self._op_ptr = _Column(np.int64)
+        self._op_ptr.extend([0])
+        self._op_offset = _Column(np.int64)
+        self._op_extent = _Column(np.int64)
+        # token of each template; index JOIN (-1) picks the trailing -1
+        self._tokens = np.array([t.token for t in template.tasks] + [-1], np.int32)
+        self._last: dict[int, int] = {}  # task index -> latest instance
+        self._binding: list[int] = []  # values of the enclosing loop variables
+        self._expansion = self._block(template.body, dict(template.constants), [])
+
+    def __len__(self) -> int:
+        return self._template.size
+
+    # -- expansion ---------------------------------------------------------
+
+    def expand(self, instances: int | None = None) -> bool:
+        """Instantiate until ``instances`` instances exist (all if None).
+
+        Returns whether the graph is complete. Raises :class:`ExecutionError`
+        when a loop bound or region expression cannot be evaluated.
+        """
+        while not self.complete and (instances is None or len(self) < instances):
+            try:
+                next(self._expansion)
+            except StopIteration:
+                self.complete = True
+            except ExpressionError as e:
+                raise ExecutionError(e.message, e.location) from None
+        return self.complete
+
+    # -- records -----------------------------------------------------------
+
+    @property
+    def template_ids(self) -> npt.NDArray[np.int32]:
+        return self._template.view()
+
+    @property
+    def token_ids(self) -> npt.NDArray[np.int32]:
+        tokens: npt.NDArray[np.int32] = self._tokens[self._template.view()]
+        return tokens
+
+    @property
+    def values(self) -> IntArray:
+        return self._values.view()
+
+    @property
+    def dep_ptr(self) -> IntArray:
+        return self._dep_ptr.view()
+
+    @property
+    def deps(self) -> IntArray:
+        return self._deps.view()
+
+    @property
+    def op_ptr(self) -> IntArray:
+        return self._op_ptr.view()
+
+    @property
+    def op_offset(self) -> IntArray:
+        return self._op_offset.view()
+
+    @property
+    def op_extent(self) -> IntArray:
+        return self._op_extent.view()
+
+    def preds(self, node: int) -> IntArray:
+        ptr = self._dep_ptr.data
+        return self._deps.data[ptr[node] : ptr[node + 1]]
+
+    def operands(self, node: int) -> list[tuple[int, int]]:
+        """``(offset, extent)`` of each operand of ``node``."""
+        lo, hi = self._op_ptr.data[node], self._op_ptr.data[node + 1]
+        return list(zip(self._op_offset.data[lo:hi].tolist(), self._op_extent.data[lo:hi].tolist()))
+
+    def label(self, node: int, template: int | None = None) -> str:
+        """``tX (i = 3)`` / ``wait (i = 3)`` / ``join``.
+
+        With ``template``, the label of that task template in ``node``'s
+        iteration (of the same loops).
+        """
+        index = int(self._template.data[node]) if template is None else template
+        if index == JOIN:
+            return "join"
+        task = self.template.tasks[index]
+        if task.token >= 0:
+            name = self.template.tokens[task.token]
+        else:
+            name = task.node.task_type if isinstance(task.node, TaskNode) else "wait"
+        if not task.scope:
+            return name
+        loops = self.template.index.loops
+        values = self._values.data[node]
+        bound = ", ".join(f"{loops[k].var} = {values[d]}" for d, k in enumerate(task.scope))
+        return f"{name} ({bound})"
+
+    # -- expansion internals -----------------------------------------------
+
+    def _append(
+        self,
+        templates: npt.ArrayLike,
+        values: npt.ArrayLike,
+        dep_counts: npt.ArrayLike,
+        deps: npt.ArrayLike,
+        op_counts: npt.ArrayLike,
+        offsets: npt.ArrayLike,
+        extents: npt.ArrayLike,
+    ) -> None:
+        self._template.extend(templates)
+        self._values.extend(values)
+        self._dep_ptr.extend(self._dep_ptr.data[self._dep_ptr.size - 1] + np.cumsum(dep_counts))
+        self._deps.extend(deps)
+        self._op_ptr.extend(self._op_ptr.data[self._op_ptr.size - 1] + np.cumsum(op_counts))
+        self._op_offset.extend(offsets)
+        self._op_extent.extend(extents)
+
+    def _row(self) -> list[int]:
+        return self._binding + [0] * (self.depth - len(self._binding))
+
+    def _join(self, preds: list[int]) -> int:
+        self._append([JOIN], [self._row()], [len(preds)], preds, [0], [], [])
+        return len(self) - 1
+
+    def _task(self, index: int, env: Mapping[str, int], barrier: list[int]) -> int:
+        task = self.template.tasks[index]
+        preds = list(barrier)
+        preds.extend(self._last[b.producer] for b in task.deps if b.producer in self._last)
+        offsets = [evaluate_int(op.offset, env) for op in task.operands]
+        extents = [evaluate_int(op.extent, env) for op in task.operands]
+        count = len(task.operands)
+        self._append([index], [self._row()], [len(preds)], preds, [count], offsets, extents)
+        self._last[index] = len(self) - 1
+        return len(self) - 1
+
+    def _block(self, block: Block, env: dict[str, int], barrier: list[int]) -> _Expansion:
+        """Instantiate ``block``; returns the nodes created directly in it."""
+        created: list[int] = []
+        for item in block:
+            if isinstance(item, int):
+                node = self._task(item, env, barrier)
+                created.append(node)
+                if self.template.tasks[item].barrier:
+                    barrier = [node]
+            else:
+                done = yield from self._loop(item[0], item[1], env, barrier)
+                created.append(done)
+                barrier = [done]
+        return created
+
+    def _loop(
+        self, loop_index: int, body: Block, env: dict[str, int], barrier: list[int]
+    ) -> Generator[None, None, int]:
+        loop = self.template.index.loops[loop_index]
+        start, end = evaluate_int(loop.start, env), evaluate_int(loop.end, env)
+        window = max_in_flight(loop, env)
+        ends: deque[int] = deque(maxlen=window)  # the latest iterations' end nodes
+        if all(isinstance(item, int) for item in body):
+            for first in range(start, end + 1, self.chunk):
+                values = np.arange(first, min(first + self.chunk, end + 1), dtype=np.int64)
+                self._chunk(loop.var, body, values, env, barrier, ends, window)  # type: ignore[arg-type]
+                yield
+        else:
+            for value in range(start, end + 1):
+                env[loop.var] = value
+                self._binding.append(value)
+                before = [*barrier, ends[0]] if len(ends) == window else list(barrier)
+                begin = self._join(before)
+                created = yield from self._block(body, env, [begin])
+                ends.append(self._join(created or [begin]))
+                self._binding.pop()
+                yield
+            env.pop(loop.var, None)
+        return self._join(list(ends) or list(barrier))
+
+    def _chunk(
+        self,
+        var: str,
+        body: tuple[int, ...],
+        values: IntArray,
+        env: Mapping[str, int],
+        barrier: list[int],
+        ends: deque[int],
+        window: int,
+    ) -> None:
+        """Instantiate an innermost ``body`` for each of ``values`` at once."""
+        tasks = self.template.tasks
+        n, m = len(values), len(body)
+        stride = m + 2  # begin, the tasks, end
+        iteration = np.arange(n, dtype=np.int64)
+        ids = len(self) + iteration[:, None] * stride + np.arange(stride, dtype=np.int64)
+        slot = {index: k + 1 for k, index in enumerate(body)}
+        missing = np.full(n, -1, np.int64)
+
+        # begin: the block's barrier, and the end of iteration k - window
+        prior = np.array(ends, np.int64)
+        all_ends = np.concatenate([prior, ids[:, -1]])
+        back = iteration - window + len(prior)
+        window_dep = np.where(back >= 0, all_ends[np.maximum(back, 0)], -1)
+        columns: list[list[IntArray]] = [[np.full(n, b, np.int64) for b in barrier] + [window_dep]]
+        op_columns: list[tuple[IntArray, IntArray]] = []
+        op_counts = [0]
+        block_barrier = 0
+        for k, index in enumerate(body):
+            task = tasks[index]
+            deps = [ids[:, block_barrier]]
+            for b in task.deps:
+                if b.producer in slot and not b.carried:
+                    deps.append(ids[:, slot[b.producer]])
+                elif b.producer in slot:
+                    previous = np.empty(n, np.int64)
+                    previous[0] = self._last.get(b.producer, -1)
+                    previous[1:] = ids[:-1, slot[b.producer]]
+                    deps.append(previous)
+                elif b.producer in self._last:
+                    deps.append(np.full(n, self._last[b.producer], np.int64))
+            columns.append(deps)
+            for op in task.operands:
+                op_columns.append(
+                    (
+                        _broadcast(_evaluate(op.offset, env, var, values), n),
+                        _broadcast(_evaluate(op.extent, env, var, values), n),
+                    )
+                )
+            op_counts.append(len(task.operands))
+            if task.barrier:
+                block_barrier = k + 1
+        columns.append([ids[:, k] for k in range(1, m + 1)])
+        op_counts.append(0)
+
+        dep_matrix = np.column_stack([c for cols in columns for c in cols] or [missing])
+        widths = [len(cols) for cols in columns]
+        bounds = np.cumsum([0, *widths])
+        present = dep_matrix >= 0
+        dep_counts = np.column_stack(
+            [present[:, bounds[s] : bounds[s + 1]].sum(axis=1) for s in range(stride)]
+        )
+        flat = dep_matrix.ravel()
+        if op_columns:
+            offsets = np.column_stack([o for o, _ in op_columns]).ravel()
+            extents = np.column_stack([e for _, e in op_columns]).ravel()
+        else:
+            offsets = extents = np.empty(0, np.int64)
+
+        rows = np.empty((n * stride, self.depth), np.int64)
+        rows[:] = self._row()
+        rows[:, len(self._binding)] = np.repeat(values, stride)
+        templates = np.tile(np.array([JOIN, *body, JOIN], np.int32), n)
+        self._append(
+            templates,
+            rows,
+            dep_counts.ravel(),
+            flat[flat >= 0],
+            np.tile(op_counts, n),
+            offsets,
+            extents,
+        )
+        for index in body:
+            self._last[index] = int(ids[-1, slot[index]])
+        ends.extend(ids[-window:, -1].tolist())
+
+
+def _broadcast(value: IntArray | int, n: int) -> IntArray:
+    return np.broadcast_to(np.asarray(value, np.int64), (n,))
+
+
+def _evaluate(expr: ExprNode, env: Mapping[str, int], var: str, values: IntArray) -> IntArray | int:
+    """Evaluate ``expr`` with ``var`` bound to every element of ``values``.
+
+    Follows :func:`nemlib.core.expressions.evaluate_int`: ``/`` truncates
+    toward zero and ``mod`` takes the sign of the dividend.
+    """
+    if isinstance(expr, IntLiteral):
+        return expr.value
+    if isinstance(expr, Identifier):
+        if expr.name == var:
+            return values
+        if expr.name not in env:
+            raise ExpressionError(f"undefined name '{expr.name}'", expr.location)
+        return env[expr.name]
+    if isinstance(expr, UnaryOp):
+        return -_evaluate(expr.operand, env, var, values)
+    if isinstance(expr, FloatLiteral) or not isinstance(expr, BinaryOp):
+        raise ExpressionError("expected an integer expression", expr.location)
+    left = _evaluate(expr.left, env, var, values)
+    right = _evaluate(expr.right, env, var, values)
+    if expr.op == "+":
+        return left + right
+    if expr.op == "-":
+        return left - right
+    if expr.op == "*":
+        return left * right
+    if np.any(np.asarray(right) == 0):
+        raise ExpressionError("division by zero", expr.location)
+    quotient = np.abs(left) // np.abs(right)
+    quotient = np.where((np.asarray(left) >= 0) == (np.asarray(right) >= 0), quotient, -quotient)
+    if expr.op == "/":
+        return quotient
+    if expr.op == "mod":
+        return left - right * quotient
+    raise ExpressionError(f"unknown operator '{expr.op}'", expr.location)
@@ -0,0 +1,136 @@
+"""
+Task templates: a program compiled once for instantiation.
+
+:func:`compile_program` indexes a parsed program with
+:func:`nemlib.validation.index_program`, evaluates its constants and resolves
+its token dependencies (nemlib passes 2 and 6), then compiles every task
+statement into a :class:`TaskTemplate`. Operand regions are resolved to their
+buffers up front and their offset and extent expressions are folded with the
+constants, so instantiating a task only evaluates what depends on the loop
+variables.
+
+Templates are immutable and depend only on the program, so one template
+serves every run of it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import chain
+
+from nemlib.core.expressions import ExprNode, fold
+from nemlib.device.model import FrozenDict
+from nemlib.diagnostics import DiagnosticCollector, DiagnosticSeverity
+from nemlib.parser.ast_nodes import (
+    BufferDeclNode,
+    DecoratorNode,
+    ProgramNode,
+    RegionExprNode,
+    TaskNode,
+    WaitNode,
+)
+from nemlib.validation import ProgramIndex, index_program
+from nemlib.validation.dep_validator import TokenBinding, check_dependencies
+from nemlib.validation.expr_evaluator import evaluate_constants
+from nemlib.validation.program_index import Block, Declarations, Scope, task_blocks
+
+from neminterp.errors import ExecutionError
+
+
+@dataclass(frozen=True, slots=True)
+class OperandTemplate:
+    """A task operand resolved to its buffer, with constants folded."""
+
+    buffer: int  # index into ProgramIndex.buffers
+    offset: ExprNode
+    extent: ExprNode
+    region: RegionExprNode
+    decorators: tuple[DecoratorNode, ...]
+    write: bool
+
+
+@dataclass(frozen=True, slots=True)
+class TaskTemplate:
+    index: int  # into ProgramIndex.tasks
+    node: TaskNode | WaitNode
+    scope: Scope
+    token: int  # into ProgramTemplate.tokens, or -1
+    operands: tuple[OperandTemplate, ...]  # inputs, then outputs
+    deps: tuple[TokenBinding, ...]
+    barrier: bool  # a wait or .sync task: later tasks of its block wait for it
+
+
+@dataclass(frozen=True, slots=True)
+class ProgramTemplate:
+    program: ProgramNode
+    index: ProgramIndex
+    constants: FrozenDict[str, int]
+    tasks: tuple[TaskTemplate, ...]
+    tokens: tuple[str, ...]
+    body: Block
+    depth: int  # deepest loop nesting
+
+    @property
+    def buffers(self) -> tuple[BufferDeclNode, ...]:
+        return tuple(buf for _, buf in self.index.buffers)
+
+
+def compile_program(program: ProgramNode) -> ProgramTemplate:
+    """Compile ``program`` into templates.
+
+    Raises :class:`ExecutionError` when constants or token dependencies do not
+    resolve, or an operand names an unknown region or buffer; run the
+    validation pipeline first for the full set of diagnostics.
+    """
+    index = index_program(program)
+    diag = DiagnosticCollector()
+    constants = evaluate_constants(diag, index.consts, index.buffers, index.regions, index.loops)
+    bindings = check_dependencies(diag, index.tasks)
+    if diag.has_errors():
+        first = next(d for d in diag.get_all() if d.severity is DiagnosticSeverity.ERROR)
+        raise ExecutionError(first.message, first.location, tuple(diag.get_all()))
+
+    decls = Declarations(index.buffers, index.regions)
+    buffer_ids = {id(buf): k for k, (_, buf) in enumerate(index.buffers)}
+    tokens: dict[str, int] = {}
+    tasks: list[TaskTemplate] = []
+    for k, (scope, node) in enumerate(index.tasks):
+        operands: list[OperandTemplate] = []
+        token = -1
+        if isinstance(node, TaskNode):
+            if node.token is not None:
+                token = tokens.setdefault(node.token, len(tokens))
+            for op, write in chain(
+                ((op, False) for op in node.inputs), ((op, True) for op in node.outputs)
+            ):
+                info = decls.operand(scope, op)
+                if info is None:
+                    raise ExecutionError(f"undefined region '{op.name}'", op.location)
+                buf = decls.buffer(info.scope, info.region.buffer)
+                if buf is None:
+                    raise ExecutionError(
+                        f"undefined buffer '{info.region.buffer}'", info.region.location
+                    )
+                region = info.region
+                operands.append(
+                    OperandTemplate(
+                        buffer_ids[id(buf)],
+                        fold(region.offset, constants),
+                        fold(region.extent, constants),
+                        region,
+                        info.decorators,
+                        write,
+                    )
+                )
+        barrier = isinstance(node, WaitNode) or node.mode == "sync"
+        tasks.append(TaskTemplate(k, node, scope, token, tuple(operands), bindings[k], barrier))
+
+    return ProgramTemplate(
+        program,
+        index,
+        constants,
+        tuple(tasks),
+        tuple(tokens),
+        task_blocks(index.tasks),
+        max((len(loop.scope) + 1 for loop in index.loops), default=0),
+    )
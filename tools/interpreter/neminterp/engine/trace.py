@@ -0,0 +1,310 @@
+"""
+Timing traces: the per-task records of a timed run (interpreter_spec §5.2).
+
+A trace has one row per task instance, in start order: the instance, its task
+template, the unit instance that ran it, the time it became ready (its last
+dependency completed), its start and end cycles, and its *cause*, the row
+whose completion it started on: the task that last occupied its unit if it
+waited for the unit (a stall), else its latest-completing dependency. Chasing
+causes back from the last row to finish yields the critical path.
+
+:class:`TraceWriter` appends the rows to an ``.npy`` file of
+:data:`TRACE_DTYPE` records a chunk at a time, so the rows held in memory stay
+bounded by the chunk whatever the length of the run; the header is rewritten
+with every chunk, and the file loads with ``np.load``. The names of the units and tasks
+go into a JSON file next to it (:func:`metadata_path`).
+
+:func:`open_trace` maps a trace file into memory, and :func:`summarize` and
+:func:`export_chrome` read it chunk by chunk: the first computes the
+utilization and stalls of every unit and the critical path, the second writes
+the Chrome trace event format (``chrome://tracing``, https://ui.perfetto.dev),
+with one process per engine and one thread per unit instance.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+
+import numpy as np
+from nemlib.parser.ast_nodes import TaskNode
+
+from neminterp.engine.scheduler_timed import TimingModel
+
+TRACE_DTYPE = np.dtype(
+    [
+        ("node", "<i8"),  # task instance
+        ("task", "<i4"),  # task template (JOIN for synchronization nodes)
+        ("unit", "<i4"),  # unit instance, or -1
+        ("ready", "<i8"),
+        ("start", "<i8"),
+        ("end", "<i8"),
+        ("cause", "<i8"),  # row whose completion the task started on, or -1
+    ]
+)
+
+_HEADER_SIZE = 256  # bytes reserved for the .npy header, shape included
+
+
+def metadata_path(path: str | Path) -> Path:
+    """The JSON file naming the units and tasks of the trace at ``path``."""
+    path = Path(path)
+    return path.with_name(path.name + ".json")
+
+
+class TraceWriter:
+    """Writes the trace of a timed run of ``model``'s graph to ``path``, ``chunk`` rows at
+    a time.
+
+    Rows are buffered as they come and completed per chunk: their task
+    templates and causes are looked up with array operations over the task
+    graph. Besides the chunk, the writer keeps the row and end time of every
+    instance (for the causes of later rows).
+    """
+
+    def __init__(self, path: str | Path, model: TimingModel, chunk: int = 1 << 16) -> None:
+        self.path = Path(path)
+        self.graph = model.graph
+        self.chunk = max(chunk, 1)
+        self.rows = 0  # rows written to the file
+        self._pending: list[tuple[int, int, int, int, int]] = []  # (node, unit, ready, start, end)
+        self._row_of = np.empty(0, np.int64)  # trace row of each instance
+        self._end_of = np.empty(0, np.int64)  # end time of each instance
+        self._last = np.full(len(model.instances), -1, np.int64)  # last row of each unit
+        template = self.graph.template
+        names, types = [], []
+        for task in template.tasks:
+            kind = task.node.task_type if isinstance(task.node, TaskNode) else "wait"
+            names.append(template.tokens[task.token] if task.token >= 0 else kind)
+            types.append(kind)
+        metadata = {
+            "units": model.instances,
+            "engines": [-1 if e is None else e for e in model.instance_engines],
+            "tasks": names,
+            "types": types,
+        }
+        metadata_path(self.path).write_text(json.dumps(metadata))
+        self._file = self.path.open("wb")
+        self._write_header()
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def append(self, node: int, unit: int, ready: int, start: int, end: int) -> None:
+        """Add the row of instance ``node``, which started after its predecessors' rows."""
+        self._pending.append((node, unit, ready, start, end))
+        if len(self._pending) == self.chunk:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows to the file."""
+        if not self._pending:
+            return
+        columns = np.array(self._pending, np.int64).T
+        self._pending.clear()
+        node, unit, ready, start, end = columns
+        lo, hi = self.rows, self.rows + len(node)
+        if node.max() >= len(self._row_of):
+            size = max(int(node.max()) + 1, 2 * len(self._row_of))
+            self._row_of = np.resize(self._row_of, size)
+            self._end_of = np.resize(self._end_of, size)
+        rows = np.arange(lo, hi)
+        self._row_of[node] = rows
+        self._end_of[node] = end
+        records = np.empty(len(node), TRACE_DTYPE)
+        records["node"], records["unit"] = node, unit
+        records["ready"], records["start"], records["end"] = ready, start, end
+        records["task"] = self.graph.template_ids[node]
+        records["cause"] = -1
+        self._unit_causes(records, rows)
+        self._dependency_causes(records)
+        self._file.write(records.tobytes())
+        self.rows = hi
+        self._write_header()
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def _unit_causes(self, records: np.ndarray, rows: np.ndarray) -> None:
+        """Rows that waited for their unit were started by its previous row."""
+        on_unit = np.flatnonzero(records["unit"] >= 0)
+        order = on_unit[np.argsort(records["unit"][on_unit], kind="stable")]
+        units = records["unit"][order]
+        previous = np.empty(len(order), np.int64)
+        if len(order):
+            first = np.flatnonzero(np.diff(units, prepend=-1))
+            previous[1:] = rows[order[:-1]]
+            previous[first] = self._last[units[first]]
+            self._last[units] = rows[order]  # the last assignment per unit wins
+        stalled = records["start"][order] > records["ready"][order]
+        records["cause"][order[stalled]] = previous[stalled]
+
+    def _dependency_causes(self, records: np.ndarray) -> None:
+        """Other rows started once ready were started by their latest-completing predecessor."""
+        k = np.flatnonzero((records["cause"] < 0) & (records["ready"] > 0))
+        if not len(k):
+            return
+        ptr = self.graph.dep_ptr
+        nodes = records["node"][k]
+        first, counts = ptr[nodes], ptr[nodes + 1] - ptr[nodes]
+        segment = np.repeat(np.arange(len(k)), counts)
+        offsets = np.cumsum(counts) - counts
+        preds = self.graph.deps[first[segment] + np.arange(len(segment)) - offsets[segment]]
+        match = np.flatnonzero(self._end_of[preds] == records["ready"][k][segment])
+        found, at = np.unique(segment[match], return_index=True)
+        records["cause"][k[found]] = self._row_of[preds[match[at]]]
+
+    def _write_header(self) -> None:
+        """(Re)write the ``.npy`` header (format 1.0) with the current row count."""
+        header = repr(
+            {
+                "descr": np.lib.format.dtype_to_descr(TRACE_DTYPE),
+                "fortran_order": False,
+                "shape": (self.rows,),
+            }
+        )
+        prefix = b"\x93NUMPY\x01\x00" + struct.pack("<H", _HEADER_SIZE - 10)
+        self._file.seek(0)
+        self._file.write(prefix + header.ljust(_HEADER_SIZE - 11).encode("latin1") + b"\n")
+        self._file.seek(0, 2)
+
+
+@dataclass(frozen=True, slots=True)
+class Trace:
+    """A trace file mapped into memory, with the names of its units and tasks."""
+
+    records: np.ndarray  # TRACE_DTYPE rows, in start order
+    units: list[str]
+    engines: list[int]  # engine of each unit instance; -1 for device-level units
+    tasks: list[str]  # token (or task type) of each task template
+    types: list[str]  # task type of each task template
+
+    def chunks(self, rows: int = 1 << 16) -> Iterator[tuple[int, np.ndarray]]:
+        """The records ``rows`` at a time, with the row number of their first."""
+        for lo in range(0, len(self.records), rows):
+            yield lo, self.records[lo : lo + rows]
+
+
+def open_trace(path: str | Path) -> Trace:
+    metadata = json.loads(metadata_path(path).read_text())
+    records = np.load(path, mmap_mode="r")
+    if records.dtype != TRACE_DTYPE:
+        raise ValueError(f"{path} is not a timing trace")
+    return Trace(
+        records, metadata["units"], metadata["engines"], metadata["tasks"], metadata["types"]
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class UnitSummary:
+    name: str
+    tasks: int
+    busy: int  # cycles running tasks
+    stalled: int  # cycles its tasks waited for it once ready
+    utilization: float  # busy / total cycles
+
+
+@dataclass(frozen=True, slots=True)
+class TraceSummary:
+    cycles: int  # end of the last task
+    tasks: int  # task instances, synchronization nodes excluded
+    units: list[UnitSummary]
+    critical_path: list[int]  # rows of the tasks on the critical path, in order
+
+
+def summarize(path: str | Path, chunk: int = 1 << 16) -> TraceSummary:
+    """Unit utilization, stalls and the critical path of the trace at ``path``."""
+    trace = open_trace(path)
+    n = len(trace.units)
+    busy = np.zeros(n + 1, np.int64)  # the last bin collects rows without a unit
+    stalled = np.zeros(n + 1, np.int64)
+    counts = np.zeros(n + 1, np.int64)
+    tasks = cycles = 0
+    last = -1
+    for lo, records in trace.chunks(chunk):
+        bins = np.where(records["unit"] < 0, n, records["unit"])
+        start = records["start"]
+        busy += np.bincount(bins, records["end"] - start, n + 1).astype(np.int64)
+        stalled += np.bincount(bins, start - records["ready"], n + 1).astype(np.int64)
+        counts += np.bincount(bins, minlength=n + 1)
+        tasks += int(np.count_nonzero(records["task"] >= 0))
+        k = int(np.argmax(records["end"]))
+        if records["end"][k] > cycles or last < 0:
+            cycles, last = int(records["end"][k]), lo + k
+    critical = []
+    task, cause = trace.records["task"], trace.records["cause"]
+    row = last
+    while row >= 0:
+        if task[row] >= 0:
+            critical.append(row)
+        row = int(cause[row])
+    critical.reverse()
+    units = [
+        UnitSummary(
+            name,
+            int(counts[u]),
+            int(busy[u]),
+            int(stalled[u]),
+            int(busy[u]) / cycles if cycles else 0.0,
+        )
+        for u, name in enumerate(trace.units)
+    ]
+    return TraceSummary(cycles, tasks, units, critical)
+
+
+def export_chrome(path: str | Path, out: str | Path, chunk: int = 1 << 16) -> None:
+    """Write the trace at ``path`` to ``out`` in the Chrome trace event format.
+
+    Cycles are written as the format's microseconds; synchronization nodes
+    are left out.
+    """
+    trace = open_trace(path)
+    with Path(out).open("w") as f:
+        f.write('{"displayTimeUnit": "ns", "traceEvents": [\n')
+        f.write(",\n".join(_chrome_events(trace, chunk)))
+        f.write("\n]}\n")
+
+
+def _chrome_events(trace: Trace, chunk: int) -> Iterator[str]:
+    device = max(trace.engines, default=-1) + 1  # the process of device-level units
+    names = [json.dumps(name) for name in trace.tasks]
+    types = [json.dumps(kind) for kind in trace.types]
+    pids = [device if e < 0 else e for e in trace.engines]
+    for pid in sorted(set(pids)):
+        process = "device" if pid == device else f"engine {pid}"
+        yield (
+            f'{{"ph": "M", "name": "process_name", "pid": {pid}, "args": {{"name": "{process}"}}}}'
+        )
+    for u, unit in enumerate(trace.units):
+        yield (
+            f'{{"ph": "M", "name": "thread_name", "pid": {pids[u]}, "tid": {u}, '
+            f'"args": {{"name": {json.dumps(unit)}}}}}'
+        )
+    for lo, records in trace.chunks(chunk):
+        rows = np.flatnonzero(records["task"] >= 0)
+        columns = [records[field][rows].tolist() for field in ("node", "task", "unit", "ready")]
+        spans = [records[field][rows].tolist() for field in ("start", "end")]
+        for row, (node, task, unit, ready), (start, end) in zip(
+            (lo + rows).tolist(), zip(*columns), zip(*spans)
+        ):
+            pid, tid = (pids[unit], unit) if unit >= 0 else (device, -1)
+            yield (
+                f'{{"ph": "X", "name": {names[task]}, "cat": {types[task]}, '
+                f'"ts": {start}, "dur": {end - start}, "pid": {pid}, "tid": {tid}, '
+                f'"args": {{"step": {row}, "node": {node}, "ready": {ready}}}}}'
+            )
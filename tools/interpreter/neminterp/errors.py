@@ -0,0 +1,20 @@
+"""Exceptions raised by the interpreter."""
+
+from __future__ import annotations
+
+from nemlib.diagnostics import Diagnostic, SourceLocation
+
+
+class ExecutionError(Exception):
+    """Raised when a program cannot be prepared or executed."""
+
+    def __init__(
+        self,
+        message: str,
+        location: SourceLocation | None = None,
+        diagnostics: tuple[Diagnostic, ...] = (),
+    ) -> None:
+        super().__init__(f"{location}: {message}" if location else message)
+        self.message = message
+        self.location = location
+        self.diagnostics = diagnostics
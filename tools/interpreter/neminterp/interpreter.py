@@ -0,0 +1,271 @@
+"""
+NemInterpreter: loading and running NEM programs (interpreter_spec §3).
+
+A run allocates the program's buffers (interpreter_spec §7.2), expands its
+task graph and executes it in functional mode, serialized or with the engines
+running in parallel, or in timed mode (:meth:`NemInterpreter.set_mode`),
+which also simulates the execution units and reports the cycles the run
+takes (see :mod:`neminterp.engine.scheduler_timed`). A *dry* run only
+simulates: it schedules the tasks by their costs without executing them, so
+it touches no memory and needs no compute backend. L2 and L1 start zeroed
+for every run; DDR keeps its contents across runs, so inputs written with
+:meth:`NemInterpreter.ddr_write_tensor` before :meth:`NemInterpreter.run` and
+results read afterwards use the offsets the buffer declarations get.
+
+DDR is lazy by default (see :mod:`neminterp.memory.memory_model`): its pages
+are allocated on first touch, and :meth:`NemInterpreter.ddr_load_file` and
+:meth:`NemInterpreter.ddr_load_npy` map input files into it copy-on-write
+rather than reading them, wherever the placement allows.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from nemlib.diagnostics import DiagnosticSeverity
+from nemlib.parser import parse
+
+from neminterp.compute.backend import ComputeBackend
+from neminterp.compute.numpy_backend import NumpyBackend
+from neminterp.engine import (
+    Executor,
+    ParallelExecutor,
+    ProgramTemplate,
+    TaskGraph,
+    TaskRunner,
+    TimingModel,
+    TraceWriter,
+    compile_program,
+)
+from neminterp.engine.task_graph import JOIN
+from neminterp.errors import ExecutionError
+from neminterp.memory import BufferHandle, BufferManager, MemorySystem
+from neminterp.memory.memory_model import (
+    DEFAULT_DDR_SIZE,
+    DEFAULT_L1_SIZE,
+    DEFAULT_L2_SIZE,
+    BytesLike,
+)
+from neminterp.tuner import TuningReport, tune
+
+
+@dataclass(frozen=True, slots=True)
+class RunResult:
+    status: str  # "completed"
+    tasks: int  # task instances executed
+    cycle_count: int | None = None  # timed mode only: cycles until the last task completes
+
+
+class NemInterpreter:
+    """Loads NEM programs and runs them against a modeled memory hierarchy."""
+
+    def __init__(
+        self,
+        ddr_size: int = DEFAULT_DDR_SIZE,
+        l2_size: int = DEFAULT_L2_SIZE,
+        l1_size: int = DEFAULT_L1_SIZE,
+        engines: int = 1,
+        backend: ComputeBackend | None = None,
+        lazy_ddr: bool = True,
+        per_engine: Mapping[str, int] | None = None,
+        device_units: Mapping[str, int] | None = None,
+    ) -> None:
+        self.engines = engines
+        self._memory_sizes = (ddr_size, l2_size, l1_size, engines, lazy_ddr)
+        self.backend: ComputeBackend = backend if backend is not None else NumpyBackend()
+        self.buffers: dict[str, BufferHandle] = {}
+        self.per_engine = per_engine  # unit counts of timed mode; None: the defaults
+        self.device_units = device_units
+        self.mode = "functional"
+        self.timing_profile: dict[str, dict[str, int]] = {}
+
+    @cached_property
+    def memory(self) -> MemorySystem:
+        """The memory levels, created on first use (dry runs do not use them)."""
+        return MemorySystem(*self._memory_sizes)
+
+    # -- configuration -----------------------------------------------------
+
+    def set_mode(self, mode: str) -> None:
+        """``"functional"`` (dependency-only scheduling) or ``"timed"``."""
+        if mode not in ("functional", "timed"):
+            raise ValueError(f"unknown execution mode '{mode}'")
+        self.mode = mode
+
+    def set_timing_profile(self, profile: Mapping[str, Mapping[str, int]]) -> None:
+        """Override timed-mode cost parameters per unit type, e.g.
+        ``{"DMA": {"bandwidth": 64, "latency": 4}}``."""
+        for unit, params in profile.items():
+            self.timing_profile.setdefault(unit, {}).update(params)
+
+    # -- programs ----------------------------------------------------------
+
+    def load(self, path: str | Path) -> ProgramTemplate:
+        path = Path(path)
+        return self.load_string(path.read_text(), str(path))
+
+    def load_string(self, source: str, filename: str = "<string>") -> ProgramTemplate:
+        """Parse and compile ``source``; raises :class:`ExecutionError` on errors."""
+        program, diagnostics = parse(source, filename)
+        errors = [d for d in diagnostics if d.severity is DiagnosticSeverity.ERROR]
+        if errors:
+            raise ExecutionError(errors[0].message, errors[0].location, tuple(diagnostics))
+        return compile_program(program)
+
+    def run(
+        self,
+        program: ProgramTemplate,
+        parallel: bool | int = False,
+        dry: bool = False,
+        trace: str | Path | None = None,
+    ) -> RunResult:
+        """Execute ``program`` to completion in the current mode.
+
+        With ``parallel``, engines run their tasks concurrently, one thread
+        each up to the CPU cores available, or up to ``parallel`` threads when
+        it is a number (see :mod:`neminterp.engine.parallel`); results are
+        the same. Timed runs are serialized.
+
+        With ``dry``, the run is timed but not executed: the tasks are
+        scheduled with timed mode's cost models and nothing else happens. No
+        memory is allocated or touched and the backend is never called, so
+        buffers keep the contents of the last run and operand bounds are
+        not checked; the result's ``cycle_count`` is that of a timed run.
+
+        With ``trace``, a timed (or dry) run writes the timing trace of its
+        tasks to that ``.npy`` file as it goes (see
+        :mod:`neminterp.engine.trace` for the format, the summary and the
+        Chrome/Perfetto export).
+        """
+        timed = dry or self.mode == "timed"
+        if parallel and timed:
+            raise ValueError("timed runs do not run engines in parallel")
+        if trace is not None and not timed:
+            raise ValueError("only timed runs are traced")
+        graph = TaskGraph(program)
+        runner = None
+        if not dry:
+            runner = TaskRunner(graph, self.allocate(program), self.backend)
+        cycles = None
+        if timed:
+            model = TimingModel(
+                graph, self.engines, self.per_engine, self.device_units, self.timing_profile
+            )
+            writer = TraceWriter(trace, model) if trace is not None else None
+            try:
+                executor = Executor(graph, model.scheduler(), runner, trace=writer)
+                executor.run()
+            finally:
+                if writer is not None:
+                    writer.close()
+            cycles = executor.time
+        elif parallel:
+            assert runner is not None
+            threads = None if parallel is True else int(parallel)
+            ParallelExecutor(graph, runner, self.memory.l1, threads=threads).run()
+        else:
+            Executor(graph, run_task=runner).run()
+        tasks = int(np.count_nonzero(graph.template_ids != JOIN))
+        return RunResult("completed", tasks, cycles)
+
+    def tune(
+        self,
+        source: str,
+        space: Mapping[str, Sequence[int]],
+        workers: int | None = None,
+        filename: str = "<string>",
+    ) -> TuningReport:
+        """Search the ``const`` values of ``space`` for the fastest fits of this target.
+
+        Candidates are checked against the L1/L2 sizes and timed as dry runs
+        with this interpreter's engines, units and timing profile, in
+        ``workers`` processes; see :mod:`neminterp.tuner`.
+        """
+        program, diagnostics = parse(source, filename)
+        errors = [d for d in diagnostics if d.severity is DiagnosticSeverity.ERROR]
+        if errors:
+            raise ExecutionError(errors[0].message, errors[0].location, tuple(diagnostics))
+        _, l2_size, l1_size, engines, _ = self._memory_sizes
+        return tune(
+            program,
+            space,
+            engines,
+            l1_size,
+            l2_size,
+            self.per_engine,
+            self.device_units,
+            self.timing_profile,
+            workers,
+        )
+
+    def allocate(self, program: ProgramTemplate) -> list[BufferHandle]:
+        """Reset the memory levels for a run of ``program`` and allocate its buffers."""
+        self.memory.ddr.release()
+        self.memory.l2.clear()
+        for l1 in self.memory.l1:
+            l1.clear()
+        manager = BufferManager(self.memory)
+        handles = manager.allocate_all(program.buffers, program.constants)
+        self.buffers = manager.buffers
+        return handles
+
+    # -- memory ------------------------------------------------------------
+
+    def ddr_write(self, offset: int, data: BytesLike) -> None:
+        self.memory.ddr.write(offset, data)
+
+    def ddr_read(self, offset: int, size: int) -> bytes:
+        return bytes(self.memory.ddr.read(offset, size))
+
+    def ddr_write_tensor(self, offset: int, tensor: npt.ArrayLike) -> None:
+        """Write ``tensor``'s bytes (C order, native dtype) at ``offset``."""
+        self.memory.ddr.write(offset, np.ascontiguousarray(tensor).reshape(-1).view(np.uint8).data)
+
+    def ddr_load_file(self, offset: int, path: str | Path) -> None:
+        """Place the raw contents of ``path`` at ``offset``."""
+        self.memory.ddr.load_file(offset, path)
+
+    def ddr_load_npy(self, offset: int, path: str | Path) -> None:
+        """Place the array stored in ``.npy`` file ``path`` at ``offset`` (C order).
+
+        The data is mapped rather than read when ``offset`` and the data's
+        position in the file agree modulo the page size (a 128-byte header
+        is typical); Fortran-ordered and object arrays are converted.
+        """
+        with open(path, "rb") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            else:
+                shape, fortran, dtype = (), True, np.dtype(object)
+            data_offset = f.tell()
+        if dtype.hasobject or (fortran and len(shape) > 1):
+            self.ddr_write_tensor(offset, np.load(path))
+            return
+        length = int(np.prod(shape)) * dtype.itemsize
+        self.memory.ddr.load_file(offset, path, data_offset, length)
+
+    def ddr_read_tensor(
+        self, offset: int, shape: tuple[int, ...], dtype: npt.DTypeLike
+    ) -> npt.NDArray[Any]:
+        element = np.dtype(dtype)
+        count = int(np.prod(shape))
+        self.memory.ddr.read(offset, count * element.itemsize)  # bounds check
+        data = np.frombuffer(self.memory.ddr.data, element, count, offset)
+        result: npt.NDArray[Any] = data.reshape(shape).copy()
+        return result
+
+    def read_buffer(self, name: str) -> memoryview:
+        """The contents of buffer ``name`` from the last run, as a view."""
+        handle = self.buffers.get(name)
+        if handle is None:
+            raise ExecutionError(f"undefined buffer '{name}'")
+        return handle.level.read(handle.offset, handle.size)
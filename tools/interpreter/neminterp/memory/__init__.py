@@ -0,0 +1,17 @@
+"""Memory model: memory levels, buffer allocation and region views."""
+
+from neminterp.memory.buffer_manager import BufferHandle, BufferManager
+from neminterp.memory.memory_model import Allocation, MemoryLevel, MemorySystem
+from neminterp.memory.region import RegionView, element_dtype, pack_int4, unpack_int4
+
+__all__ = [
+    "Allocation",
+    "BufferHandle",
+    "BufferManager",
+    "MemoryLevel",
+    "MemorySystem",
+    "RegionView",
+    "element_dtype",
+    "pack_int4",
+    "unpack_int4",
+]
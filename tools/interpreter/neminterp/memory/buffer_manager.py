@@ -0,0 +1,60 @@
+"""
+Buffer manager: places a program's buffers in the memory levels.
+
+Buffers are allocated in declaration order, each in its level (``L1[k]`` in
+engine ``k``'s L1), with the sizes and L1 indices evaluated against the
+program constants. Handles are indexed like ``ProgramTemplate.buffers``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from nemlib.core.expressions import ExpressionError, evaluate_int
+from nemlib.parser.ast_nodes import BufferDeclNode
+
+from neminterp.errors import ExecutionError
+from neminterp.memory.memory_model import MemoryLevel, MemorySystem
+
+
+@dataclass(frozen=True, slots=True)
+class BufferHandle:
+    name: str
+    level: MemoryLevel
+    offset: int  # within the level
+    size: int
+
+
+class BufferManager:
+    """Allocates buffers in a :class:`MemorySystem` and tracks them by name."""
+
+    def __init__(self, memory: MemorySystem) -> None:
+        self.memory = memory
+        self.buffers: dict[str, BufferHandle] = {}
+
+    def allocate(
+        self, name: str, level: str, size: int, alignment: int = 1, engine: int = 0
+    ) -> BufferHandle:
+        if name in self.buffers:
+            raise ExecutionError(f"buffer '{name}' is already allocated")
+        memory = self.memory.level(level, engine)
+        handle = BufferHandle(name, memory, memory.allocate(name, size, alignment), size)
+        self.buffers[name] = handle
+        return handle
+
+    def allocate_all(
+        self, buffers: tuple[BufferDeclNode, ...], constants: Mapping[str, int]
+    ) -> list[BufferHandle]:
+        """Allocate the declared ``buffers`` in order."""
+        handles = []
+        for buf in buffers:
+            try:
+                size = evaluate_int(buf.size, constants) if buf.size is not None else 0
+                engine = evaluate_int(buf.l1_index, constants) if buf.l1_index else 0
+            except ExpressionError as e:
+                raise ExecutionError(e.message, e.location) from None
+            if size <= 0:
+                raise ExecutionError(f"buffer '{buf.name}' has no positive size", buf.location)
+            handles.append(self.allocate(buf.name, buf.mem_level, size, buf.align or 1, engine))
+        return handles
@@ -0,0 +1,261 @@
+"""
+Memory model: the DDR, L2 and per-engine L1 levels (interpreter_spec §7.1).
+
+Each level is one zero-initialized buffer. :attr:`MemoryLevel.view` is a
+``memoryview`` over it, and :meth:`MemoryLevel.read` returns slices of that
+view rather than ``bytes``, so reading a window never copies it; transfers
+and region views (:mod:`neminterp.memory.region`) all address the level's
+storage directly.
+
+A *lazy* level is an anonymous ``mmap`` instead of a ``bytearray``: the
+operating system hands out zero pages on first touch, so a large DDR costs
+resident memory only for the bytes a run actually uses. On such a level,
+:meth:`MemoryLevel.load_file` maps the pages of an input file into place
+copy-on-write (``MAP_PRIVATE | MAP_FIXED``) instead of reading them: loading
+is O(1) in the file size, the file's page cache is shared by every
+interpreter mapping it, and writes by the program never reach the file. Only
+the parts of the file that do not fall on whole pages congruent with the
+target offset, or platforms without ``MAP_FIXED``, are read in with
+``readinto``.
+
+Every level also records *write versions*: a counter per
+:data:`VERSION_BLOCK`-byte block, stamped by each write that goes through
+the level (:meth:`MemoryLevel.write`, :meth:`MemoryLevel.load_file`,
+:meth:`MemoryLevel.clear`) or is reported with :meth:`MemoryLevel.touch`.
+:meth:`MemoryLevel.version` tells whether a window changed since some
+earlier point, which is what lets decoded sub-byte regions be cached.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import mmap
+import os
+import stat
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from neminterp.errors import ExecutionError
+
+DEFAULT_DDR_SIZE = 256 * 2**20
+DEFAULT_L2_SIZE = 4 * 2**20
+DEFAULT_L1_SIZE = 2**20
+
+VERSION_BLOCK = 512
+
+BytesLike = bytes | bytearray | memoryview
+
+
+@dataclass(frozen=True, slots=True)
+class Allocation:
+    name: str
+    offset: int
+    size: int
+    align: int
+
+
+class MemoryLevel:
+    """One memory level: its storage and the buffers allocated in it."""
+
+    def __init__(self, name: str, size: int, lazy: bool = False) -> None:
+        self.name = name
+        self.size = size
+        self.data: bytearray | mmap.mmap = _anonymous(size) if lazy else bytearray(size)
+        self.view = memoryview(self.data)
+        self.allocations: list[Allocation] = []
+        self._top = 0
+        self._mapped: list[tuple[int, int]] = []  # file-backed (offset, length) ranges
+        self._versions = np.zeros(-(-size // VERSION_BLOCK), np.int64)
+        self.clock = 1  # exceeds every stamp in _versions
+
+    def __repr__(self) -> str:
+        return f"MemoryLevel({self.name!r}, {self.size})"
+
+    def read(self, offset: int, length: int) -> memoryview:
+        """The bytes ``[offset, offset + length)``, as a view (not a copy)."""
+        self._check(offset, length)
+        return self.view[offset : offset + length]
+
+    def write(self, offset: int, data: BytesLike) -> None:
+        source = memoryview(data).cast("B")
+        self._check(offset, len(source))
+        self.view[offset : offset + len(source)] = source
+        self.touch(offset, len(source))
+
+    def touch(self, offset: int, length: int) -> None:
+        """Record a write to ``[offset, offset + length)``.
+
+        Writes through :meth:`write` are recorded already; whoever writes
+        through :attr:`view` or an array over :attr:`data` calls this.
+        """
+        if length > 0:
+            first, last = offset // VERSION_BLOCK, (offset + length - 1) // VERSION_BLOCK
+            self._versions[first : last + 1] = self.clock
+            self.clock += 1
+
+    def version(self, offset: int, length: int) -> int:
+        """The stamp of the latest write to ``[offset, offset + length)`` (0 if none).
+
+        A window is unchanged since :attr:`clock` was ``c`` iff its version is
+        below ``c``.
+        """
+        if length <= 0:
+            return 0
+        first, last = offset // VERSION_BLOCK, (offset + length - 1) // VERSION_BLOCK
+        return int(self._versions[first : last + 1].max())
+
+    def allocate(self, name: str, size: int, align: int = 1) -> int:
+        """Allocate ``size`` bytes after the previous allocation; returns the offset.
+
+        Allocation is linear in declaration order with alignment padding
+        (interpreter_spec §7.2).
+        """
+        offset = -(-self._top // align) * align
+        if offset + size > self.size:
+            raise ExecutionError(
+                f"buffer '{name}' ({size} bytes) does not fit in {self.name} "
+                f"({self.size - offset if offset < self.size else 0} bytes free)"
+            )
+        self.allocations.append(Allocation(name, offset, size, align))
+        self._top = offset + size
+        return offset
+
+    @property
+    def allocated(self) -> int:
+        return self._top
+
+    def release(self) -> None:
+        """Forget all allocations; the contents are kept."""
+        self.allocations.clear()
+        self._top = 0
+
+    def clear(self) -> None:
+        """Zero the contents in place and forget all allocations."""
+        if isinstance(self.data, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+            # anonymous pages go back to zero-fill-on-demand; file pages are
+            # replaced by anonymous ones
+            for offset, length in self._mapped:
+                if not _map_fixed(self.data, offset, length):
+                    np.frombuffer(self.data, np.uint8, length, offset)[:] = 0
+            self.data.madvise(mmap.MADV_DONTNEED)
+        else:
+            np.frombuffer(self.data, np.uint8)[:] = 0
+        self._mapped.clear()
+        self._versions.fill(self.clock)
+        self.clock += 1
+        self.release()
+
+    def load_file(
+        self, offset: int, path: str | Path, file_offset: int = 0, length: int | None = None
+    ) -> int:
+        """Place ``length`` bytes of ``path`` from ``file_offset`` at ``offset``.
+
+        Returns the number of bytes mapped rather than read (0 for a
+        ``bytearray`` level). The file must not shrink while it is mapped.
+        """
+        with open(path, "rb") as f:
+            info = os.fstat(f.fileno())
+            available = info.st_size - file_offset
+            length = available if length is None else length
+            if length > available:
+                raise ExecutionError(f"'{path}' has {available} bytes after {file_offset}")
+            self._check(offset, length)
+            head = -offset % mmap.PAGESIZE
+            body = (length - head) // mmap.PAGESIZE * mmap.PAGESIZE if length > head else 0
+            mapped = 0
+            if (
+                body
+                and isinstance(self.data, mmap.mmap)
+                and stat.S_ISREG(info.st_mode)
+                and (file_offset + head) % mmap.PAGESIZE == 0
+                and _map_fixed(self.data, offset + head, body, f.fileno(), file_offset + head)
+            ):
+                mapped = body
+                self._mapped.append((offset + head, body))
+            pieces = [(0, head), (head + body, length)] if mapped else [(0, length)]
+            for start, stop in pieces:
+                f.seek(file_offset + start)
+                window = self.view[offset + start : offset + stop]
+                while window:
+                    count = f.readinto(window)
+                    if not count:
+                        raise ExecutionError(f"'{path}' ended while loading it")
+                    window = window[count:]
+        self.touch(offset, length)
+        return mapped
+
+    def _check(self, offset: int, length: int) -> None:
+        if offset < 0 or length < 0 or offset + length > self.size:
+            raise ExecutionError(
+                f"access [{offset}, {offset + length}) is out of bounds of "
+                f"{self.name} ({self.size} bytes)"
+            )
+
+
+class MemorySystem:
+    """DDR and L2, shared by all engines, and one L1 per engine."""
+
+    def __init__(
+        self,
+        ddr_size: int = DEFAULT_DDR_SIZE,
+        l2_size: int = DEFAULT_L2_SIZE,
+        l1_size: int = DEFAULT_L1_SIZE,
+        engines: int = 1,
+        lazy_ddr: bool = True,
+    ) -> None:
+        self.ddr = MemoryLevel("DDR", ddr_size, lazy_ddr)
+        self.l2 = MemoryLevel("L2", l2_size)
+        self.l1 = [MemoryLevel(f"L1[{k}]", l1_size) for k in range(engines)]
+
+    def level(self, name: str, engine: int = 0) -> MemoryLevel:
+        """The level named ``DDR``, ``L2`` or ``L1`` (of ``engine``)."""
+        if name == "DDR":
+            return self.ddr
+        if name == "L2":
+            return self.l2
+        if name == "L1":
+            if not 0 <= engine < len(self.l1):
+                raise ExecutionError(f"engine {engine} does not exist ({len(self.l1)} engines)")
+            return self.l1[engine]
+        raise ExecutionError(f"unknown memory level '{name}'")
+
+    def levels(self) -> list[MemoryLevel]:
+        return [self.ddr, self.l2, *self.l1]
+
+
+def _anonymous(size: int) -> mmap.mmap:
+    """Private anonymous memory (private so that ``MADV_DONTNEED`` zeroes it)."""
+    if hasattr(mmap, "MAP_PRIVATE"):
+        return mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE)
+    return mmap.mmap(-1, size)
+
+
+_MAP_FIXED = 0x10 if sys.platform.startswith(("linux", "darwin")) else None
+
+
+def _map_fixed(
+    target: mmap.mmap, offset: int, length: int, fd: int = -1, file_offset: int = 0
+) -> bool:
+    """Map ``fd`` (anonymous memory for -1) copy-on-write over a page-aligned
+    window ``target[offset : offset + length]``."""
+    if _MAP_FIXED is None:
+        return False
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.mmap.restype = ctypes.c_void_p
+    libc.mmap.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_size_t,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int64,
+    ]
+    anchor = ctypes.c_char.from_buffer(target)
+    address = ctypes.addressof(anchor) + offset
+    del anchor  # release the buffer export
+    flags = mmap.MAP_PRIVATE | _MAP_FIXED | (mmap.MAP_ANONYMOUS if fd < 0 else 0)
+    prot = mmap.PROT_READ | mmap.PROT_WRITE
+    return bool(libc.mmap(address, length, prot, flags, fd, file_offset) == address)
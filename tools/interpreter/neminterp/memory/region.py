@@ -0,0 +1,261 @@
+"""
+Region views: typed, zero-copy windows into a memory level.
+
+A :class:`RegionView` is the runtime form of ``region(buffer, offset,
+extent) elem=..., shape=..., layout=...|strides=...`` for one task instance.
+:meth:`RegionView.array` is a NumPy array over the level's ``bytearray``
+itself: ``np.frombuffer`` on the region's byte window, reshaped for a
+``layout`` (canonical row-major strides) or re-strided with ``as_strided``
+for explicit ``strides`` (in elements, per the spec). Compute backends read
+and write through these arrays in place; :meth:`RegionView.bytes` is the
+same window as a ``memoryview`` for transfers.
+
+``bf16`` has no NumPy dtype and is viewed as its ``uint16`` bit patterns.
+
+``i4`` packs two elements per byte, the lower-indexed one in the low nibble.
+Its regions cannot be viewed in place; :meth:`RegionView.array` returns them
+decoded to ``int8`` by :func:`unpack_int4`, read-only, and
+:meth:`RegionView.write_array` encodes with :func:`pack_int4`. Both work
+with shifts and masks over whole arrays. Decoded arrays are cached per
+level, keyed by the region and validated against the level's write versions
+(:meth:`MemoryLevel.version`), so a region that is read again unchanged,
+such as ``@readonly`` weights used by every iteration of a loop, is decoded
+once. The cache keeps the most recently used arrays up to
+:data:`DECODE_CACHE_BYTES` per level.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from math import prod
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from nemlib.core.elements import ElementType
+from numpy.lib.stride_tricks import as_strided
+
+from neminterp.errors import ExecutionError
+from neminterp.memory.memory_model import BytesLike, MemoryLevel
+
+DTYPES: dict[ElementType, np.dtype[Any]] = {
+    ElementType.I8: np.dtype(np.int8),
+    ElementType.I16: np.dtype("<i2"),
+    ElementType.I32: np.dtype("<i4"),
+    ElementType.U8: np.dtype(np.uint8),
+    ElementType.U16: np.dtype("<u2"),
+    ElementType.U32: np.dtype("<u4"),
+    ElementType.F16: np.dtype("<f2"),
+    ElementType.BF16: np.dtype("<u2"),
+    ElementType.F32: np.dtype("<f4"),
+    ElementType.I4: np.dtype(np.int8),  # decoded
+}
+
+_DTYPES_BY_NAME = {t.value: dtype for t, dtype in DTYPES.items()}
+
+PACKED = {ElementType.I4.value}
+
+DECODE_CACHE_BYTES = 64 * 2**20
+
+Region = tuple[int, int, str, tuple[int, ...] | None, tuple[int, ...] | None]
+
+
+class _DecodeCache:
+    """Decoded packed regions of one level, least recently used first."""
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[Region, tuple[int, npt.NDArray[np.int8], int]] = OrderedDict()
+        self.size = 0  # decoded bytes held
+        self.lock = threading.Lock()  # engines may run in parallel threads
+
+    def get(self, key: Region, level: MemoryLevel, nbytes: int) -> npt.NDArray[np.int8] | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or level.version(key[0], nbytes) >= entry[0]:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Region, stamp: int, array: npt.NDArray[np.int8], size: int) -> None:
+        if size > DECODE_CACHE_BYTES:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[2]
+            self.entries[key] = (stamp, array, size)
+            self.size += size
+            while self.size > DECODE_CACHE_BYTES:
+                _, (_, _, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+
+
+_caches: weakref.WeakKeyDictionary[MemoryLevel, _DecodeCache] = weakref.WeakKeyDictionary()
+
+
+def element_dtype(elem: str) -> np.dtype[Any]:
+    """The NumPy dtype of element type ``elem``."""
+    dtype = _DTYPES_BY_NAME.get(elem)
+    if dtype is None:
+        raise ExecutionError(f"element type '{elem}' has no array view")
+    return dtype
+
+
+def unpack_int4(packed: npt.NDArray[np.uint8], count: int | None = None) -> npt.NDArray[np.int8]:
+    """Decode ``count`` (default ``2 * packed.size``) sign-extended ``i4`` elements."""
+    signed = packed.reshape(-1).view(np.int8)
+    values = np.empty((signed.size, 2), np.int8)
+    np.left_shift(signed, 4, out=values[:, 0])
+    np.right_shift(values[:, 0], 4, out=values[:, 0])  # arithmetic: sign-extends
+    np.right_shift(signed, 4, out=values[:, 1])
+    flat = values.reshape(-1)
+    return flat if count is None or count == flat.size else flat[:count]
+
+
+def pack_int4(values: npt.ArrayLike) -> npt.NDArray[np.uint8]:
+    """Encode ``values`` (wrapped to 4 bits) two per byte; an odd tail is zero-padded."""
+    flat = np.asarray(values).astype(np.int8, casting="unsafe").view(np.uint8).reshape(-1)
+    if flat.size % 2:
+        flat = np.append(flat, np.uint8(0))
+    pairs = flat.reshape(-1, 2)
+    packed = np.bitwise_and(pairs[:, 0], 0x0F)
+    packed |= np.left_shift(pairs[:, 1], 4)
+    return packed
+
+
+class RegionView:
+    """``extent`` bytes at ``offset`` in ``level``, typed by elem/shape/strides."""
+
+    __slots__ = ("level", "offset", "extent", "elem", "shape", "strides", "_array")
+
+    def __init__(
+        self,
+        level: MemoryLevel,
+        offset: int,
+        extent: int,
+        elem: str | None = None,
+        shape: tuple[int, ...] | None = None,
+        strides: tuple[int, ...] | None = None,
+    ) -> None:
+        if offset < 0 or extent < 0 or offset + extent > level.size:
+            raise ExecutionError(
+                f"region [{offset}, {offset + extent}) is out of bounds of {level.name}"
+            )
+        self.level = level
+        self.offset = offset  # within the level
+        self.extent = extent
+        self.elem = elem
+        self.shape = shape
+        self.strides = strides  # in elements; None for the canonical layout
+        self._array: npt.NDArray[Any] | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"RegionView({self.level.name}, {self.offset}, {self.extent}, "
+            f"elem={self.elem}, shape={self.shape})"
+        )
+
+    def bytes(self) -> memoryview:
+        """The region's byte window (a view of the level, not a copy)."""
+        return self.level.view[self.offset : self.offset + self.extent]
+
+    @property
+    def packed(self) -> bool:
+        """Whether the region holds sub-byte elements (no in-place array view)."""
+        return self.elem in PACKED
+
+    def array(self) -> npt.NDArray[Any]:
+        """The region as a writable array sharing the level's storage.
+
+        For packed element types, a read-only decoded copy instead.
+        """
+        if self._array is not None:
+            return self._array
+        if self.elem is None:
+            self._array = np.frombuffer(self.level.data, np.uint8, self.extent, self.offset)
+            return self._array
+        if self.elem in PACKED:
+            return self._decoded()
+        dtype = element_dtype(self.elem)
+        shape = self.shape if self.shape is not None else (self.extent // dtype.itemsize,)
+        span = self._span(shape, dtype.itemsize * 8)
+        base = np.frombuffer(self.level.data, dtype, span, self.offset)
+        if self.strides is None:
+            self._array = base.reshape(shape)
+        else:
+            strides = tuple(s * dtype.itemsize for s in self.strides)
+            self._array = as_strided(base, shape, strides, writeable=True)
+        return self._array
+
+    def read_array(self) -> npt.NDArray[Any]:
+        return self.array()
+
+    def write_array(self, data: npt.ArrayLike) -> None:
+        """Store ``data`` into the region, cast to its element type."""
+        if self.elem not in PACKED:
+            self.array()[...] = data
+            self.level.touch(self.offset, self.extent)
+            return
+        shape = self.shape if self.shape is not None else (self.extent * 2,)
+        span = self._span(shape, 4)
+        # decode the whole byte window so elements the region skips (strides,
+        # an odd tail's high nibble) are written back unchanged
+        window = np.frombuffer(self.level.data, np.uint8, -(-span // 2), self.offset)
+        values = unpack_int4(window)
+        self._shaped(values, shape)[...] = np.asarray(data).astype(np.int8, casting="unsafe")
+        window[...] = pack_int4(values)
+        self.level.touch(self.offset, window.size)
+
+    def read_bytes(self) -> memoryview:
+        return self.bytes()
+
+    def write_bytes(self, data: BytesLike) -> None:
+        self.level.write(self.offset, memoryview(data)[: self.extent])
+
+    def _span(self, shape: tuple[int, ...], bits: int) -> int:
+        """The number of elements from the first to the last one addressed."""
+        if self.strides is None:
+            span = prod(shape)
+            nbytes = -(-span * bits // 8)
+            if nbytes > self.extent:
+                raise ExecutionError(
+                    f"region of shape {list(shape)} ({self.elem}) needs "
+                    f"{nbytes} bytes but its extent is {self.extent}"
+                )
+            return span
+        if len(self.strides) != len(shape):
+            raise ExecutionError(f"strides {list(self.strides)} do not match shape {list(shape)}")
+        if min(self.strides, default=0) < 0:
+            raise ExecutionError(f"negative strides {list(self.strides)} are not supported")
+        span = 1 + sum((n - 1) * s for n, s in zip(shape, self.strides)) if prod(shape) else 0
+        nbytes = -(-span * bits // 8)
+        if nbytes > self.extent:
+            raise ExecutionError(
+                f"strides {list(self.strides)} address {nbytes} bytes "
+                f"but the region's extent is {self.extent}"
+            )
+        return span
+
+    def _shaped(self, values: npt.NDArray[np.int8], shape: tuple[int, ...]) -> npt.NDArray[np.int8]:
+        if self.strides is None:
+            return values[: prod(shape)].reshape(shape)
+        return as_strided(values, shape, self.strides, writeable=True)
+
+    def _decoded(self) -> npt.NDArray[np.int8]:
+        shape = self.shape if self.shape is not None else (self.extent * 2,)
+        span = self._span(shape, 4)
+        nbytes = -(-span // 2)
+        cache = _caches.get(self.level)
+        if cache is None:
+            cache = _caches.setdefault(self.level, _DecodeCache())
+        key: Region = (self.offset, self.extent, str(self.elem), self.shape, self.strides)
+        array = cache.get(key, self.level, nbytes)
+        if array is None:
+            stamp = self.level.clock
+            window = np.frombuffer(self.level.data, np.uint8, nbytes, self.offset)
+            array = self._shaped(unpack_int4(window, span), shape)
+            array.flags.writeable = False
+            cache.put(key, stamp, array, span)
+        return array
@@ -0,0 +1,313 @@
+"""
+Roofline analysis: the unit bounding each loop of a program, from its shapes alone.
+
+Nothing is expanded or run. Every task statement's work over all its
+instances is computed from its operand shapes and its loops' trip counts:
+MACs on the NMU (as in timed mode, see
+:func:`~neminterp.engine.scheduler_timed.task_work`), elements on the other
+compute units, bytes copied on DMA units. Tasks are placed on unit pools as
+in timed mode (:class:`~neminterp.engine.scheduler_timed.TimingModel`), and
+a pool's time is its tasks' work over its throughput, spread over its
+instances::
+
+    NMU     MACs / <precision>_macs    (the device's unit_characteristics)
+    CSTL    elements / eltwise_throughput
+    DMA     bytes / bandwidth
+
+A unit type without the device characteristic (a precision the NMU lists no
+MACs for, or a ``bandwidth``/``eltwise_throughput`` entry on ``DMA``/``CSTL``)
+takes the timing profile's parameter. Latencies are left out: the times are
+lower bounds, which a timed run with the same parameters never beats.
+
+For every loop (all iterations of its body, nested loops included) and for
+the whole program, the report gives the bytes read and written per memory
+level, the arithmetic intensity (MACs per byte copied by DMA), each unit
+type's time (its busiest pool's), and the *bound* unit, the one with the
+longest time, with its share of the unit types' total time: 100% when the
+other units have nothing to do, 50% when one other unit is as busy. Each
+also becomes an ``info`` diagnostic such as ``loop i is DMA-bound at 72%``.
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import asdict, dataclass
+from math import prod
+from typing import Any
+
+from nemlib.core.expressions import (
+    ExpressionError,
+    IntLiteral,
+    compile_int,
+    evaluate_int,
+    fold,
+)
+from nemlib.device.model import DeviceConfig
+from nemlib.diagnostics import DiagnosticCollector, SourceLocation
+from nemlib.parser.ast_nodes import ProgramNode, TaskNode
+from nemlib.validation.program_index import LoopInfo, Scope
+
+from neminterp.engine import TaskGraph, TimingModel, compile_program
+from neminterp.engine.scheduler_timed import task_work
+from neminterp.errors import ExecutionError
+
+LEVELS = ("DDR", "L2", "L1")
+
+# unit_characteristics key of the NMU's MACs per cycle, per operand element type
+MAC_KEYS = {
+    "i4": "int4_macs",
+    "i8": "int8_macs",
+    "u8": "int8_macs",
+    "i16": "int16_macs",
+    "u16": "int16_macs",
+    "f16": "fp16_macs",
+    "bf16": "fp16_macs",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class TaskRoofline:
+    """A task statement over all its instances."""
+
+    name: str  # its token, or its task type
+    task_type: str
+    loop: str | None  # the innermost enclosing loop's variable
+    unit: str  # the unit type running it
+    engine: int | None  # None: any engine's, or a device-level unit
+    instances: int
+    macs: int
+    elements: int
+    dma_bytes: int  # bytes copied
+    bytes: dict[str, int]  # read and written, per memory level
+    intensity: float | None  # MACs (else elements) per byte read and written
+    cycles: float  # on one unit instance
+    location: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class LoopRoofline:
+    """A loop over all its iterations, or the whole program (``loop`` None)."""
+
+    loop: str | None
+    iterations: int
+    macs: int
+    elements: int
+    dma_bytes: int
+    bytes: dict[str, int]
+    intensity: float | None  # MACs per byte copied by DMA (None: nothing copied)
+    unit_cycles: dict[str, float]  # per unit type, its busiest pool's
+    bound: str | None  # the unit type with the longest time
+    share: float  # the bound unit's share of the unit types' time
+    cycles: float  # the bound unit's time: a lower bound of the loop's
+    location: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class RooflineReport:
+    device: str
+    tasks: tuple[TaskRoofline, ...]  # in source order
+    loops: tuple[LoopRoofline, ...]  # in source order
+    program: LoopRoofline
+
+    def as_dict(self) -> dict[str, Any]:
+        """The report as JSON-serializable data."""
+        return asdict(self)
+
+
+def analyze(
+    program: ProgramNode,
+    device: DeviceConfig,
+    diag: DiagnosticCollector | None = None,
+    profile: Mapping[str, Mapping[str, int]] | None = None,
+) -> RooflineReport:
+    """The roofline of ``program`` on ``device``; ``profile`` overrides timed mode's
+    parameters for the characteristics the device lacks.
+
+    Adds an ``info`` diagnostic per loop and for the program to ``diag``.
+    Raises :class:`ExecutionError` when the program does not compile or
+    needs units the device lacks, and :class:`ValueError` for an abstract
+    device.
+    """
+    if device.num_engines is None:
+        raise ValueError(f"device '{device.name}' has no topology")
+    template = compile_program(program)
+    model = TimingModel(
+        TaskGraph(template),
+        device.num_engines,
+        device.per_engine,
+        device.device_units,
+        profile,
+    )
+    constants = template.constants
+    loops = template.index.loops
+    buffers = template.buffers
+    tasks: list[TaskRoofline] = []
+    pools: list[int] = []
+    scopes: list[Scope] = []
+    for k, task in enumerate(template.tasks):
+        node, placement = task.node, model.placements[k]
+        if not isinstance(node, TaskNode) or placement is None:
+            continue
+        unit, pool = placement
+        params = [loops[d].var for d in task.scope]
+        count, iterations = _iterations(loops, task.scope, constants)
+        levels = [buffers[op.buffer].mem_level for op in task.operands]
+        try:
+            extents = [_function(op.extent, params, constants) for op in task.operands]
+            if node.kind == "compute":
+                work, static = task_work(node, unit, task.operands, params, constants)
+            else:
+                work, static = extents[0]  # the source's bytes
+        except ExpressionError as e:
+            raise ExecutionError(e.message, e.location) from None
+        functions = [work, *(f for f, _ in extents)]
+        if static and all(s for _, s in extents):
+            totals = [count * f([0] * len(params)) for f in functions]
+        else:
+            totals = [0] * len(functions)
+            for values in iterations():
+                for j, f in enumerate(functions):
+                    totals[j] += f(values)
+        per_level = dict.fromkeys(LEVELS, 0)
+        for level, moved in zip(levels, totals[1:]):
+            per_level[level] += moved
+        moved = sum(totals[1:])
+        macs = totals[0] if unit == "NMU" else 0
+        elements = totals[0] if node.kind == "compute" and unit != "NMU" else 0
+        copied = totals[0] if node.kind != "compute" else 0
+        throughput = _throughput(device, model, unit, task.operands[0].region.elem)
+        engines = {model.instance_engines[u] for u in model.pools[pool]}
+        tasks.append(
+            TaskRoofline(
+                name=template.tokens[task.token] if task.token >= 0 else node.task_type,
+                task_type=node.task_type,
+                loop=loops[task.scope[-1]].var if task.scope else None,
+                unit=model.pool_units[pool],
+                engine=engines.pop() if len(engines) == 1 else None,
+                instances=count,
+                macs=macs,
+                elements=elements,
+                dma_bytes=copied,
+                bytes=per_level,
+                intensity=(macs or elements) / moved if moved and node.kind == "compute" else None,
+                cycles=totals[0] / throughput,
+                location=_where(node.location),
+            )
+        )
+        pools.append(pool)
+        scopes.append(task.scope)
+
+    summaries = []
+    for d, loop in enumerate(loops):
+        members = [j for j, scope in enumerate(scopes) if d in scope]
+        count, _ = _iterations(loops, (*loop.scope, d), constants)
+        summaries.append(_summarize(loop.var, count, loop.location, members, tasks, pools, model))
+    whole = _summarize(None, 1, None, list(range(len(tasks))), tasks, pools, model)
+    if diag is not None:
+        subjects = [(f"loop {loop.var}", loop.location) for loop in loops]
+        subjects.append((f"program {program.name}" if program.name else "program", None))
+        for (subject, location), summary in zip(subjects, (*summaries, whole)):
+            if summary.bound is not None:
+                diag.info(f"{subject} is {summary.bound}-bound at {summary.share:.0%}", location)
+    return RooflineReport(device.name, tuple(tasks), tuple(summaries), whole)
+
+
+def _summarize(
+    var: str | None,
+    iterations: int,
+    location: SourceLocation | None,
+    members: list[int],
+    tasks: list[TaskRoofline],
+    pools: list[int],
+    model: TimingModel,
+) -> LoopRoofline:
+    per_pool: dict[int, float] = {}
+    per_level = dict.fromkeys(LEVELS, 0)
+    macs = elements = copied = 0
+    for j in members:
+        task = tasks[j]
+        per_pool[pools[j]] = per_pool.get(pools[j], 0.0) + task.cycles
+        for level, moved in task.bytes.items():
+            per_level[level] += moved
+        macs += task.macs
+        elements += task.elements
+        copied += task.dma_bytes
+    unit_cycles: dict[str, float] = {}
+    for pool, cycles in per_pool.items():
+        unit = model.pool_units[pool]
+        unit_cycles[unit] = max(unit_cycles.get(unit, 0.0), cycles / len(model.pools[pool]))
+    bound = max(unit_cycles, key=unit_cycles.__getitem__, default=None)
+    total = sum(unit_cycles.values())
+    longest = unit_cycles[bound] if bound is not None else 0.0
+    return LoopRoofline(
+        loop=var,
+        iterations=iterations,
+        macs=macs,
+        elements=elements,
+        dma_bytes=copied,
+        bytes=per_level,
+        intensity=macs / copied if copied else None,
+        unit_cycles=unit_cycles,
+        bound=bound,
+        share=longest / total if total else 0.0,
+        cycles=longest,
+        location=_where(location),
+    )
+
+
+def _throughput(device: DeviceConfig, model: TimingModel, unit: str, elem: str | None) -> int:
+    """Work per cycle of a ``unit`` instance (the unit type costing the task)."""
+    characteristics: Mapping[str, int] = device.unit_characteristics.get(unit, {})
+    if unit == "NMU":
+        macs = characteristics.get(MAC_KEYS.get(elem or "", ""))
+        return macs if macs else model.parameters(unit, "mac_throughput")[0]
+    name = "eltwise_throughput" if unit in ("CSTL", "VPU") else "bandwidth"
+    return characteristics.get(name) or model.parameters(unit, name)[0]
+
+
+def _iterations(
+    loops: tuple[LoopInfo, ...], scope: Scope, constants: Mapping[str, int]
+) -> tuple[int, Callable[[], Iterator[list[int]]]]:
+    """The number of iterations of the loops ``scope``, and a function enumerating their
+    loop variable values."""
+    ranges: list[range] = []
+    for d in scope:
+        start, end = fold(loops[d].start, constants), fold(loops[d].end, constants)
+        if not isinstance(start, IntLiteral) or not isinstance(end, IntLiteral):
+            break
+        ranges.append(range(start.value, end.value + 1))
+    bounds = ranges if len(ranges) == len(scope) else None
+
+    def enumerate_values() -> Iterator[list[int]]:
+        if bounds is not None:
+            yield from map(list, itertools.product(*bounds))
+            return
+        env = dict(constants)
+
+        def walk(depth: int, values: list[int]) -> Iterator[list[int]]:
+            if depth == len(scope):
+                yield values
+                return
+            loop = loops[scope[depth]]
+            for value in range(evaluate_int(loop.start, env), evaluate_int(loop.end, env) + 1):
+                env[loop.var] = value
+                yield from walk(depth + 1, [*values, value])
+
+        yield from walk(0, [])
+
+    if bounds is not None:
+        return prod(len(r) for r in bounds), enumerate_values
+    return sum(1 for _ in enumerate_values()), enumerate_values
+
+
+def _function(
+    expr: Any, params: list[str], constants: Mapping[str, int]
+) -> tuple[Callable[[list[int]], int], bool]:
+    """``expr`` as a function of the values of ``params``, and whether it is constant."""
+    compiled = compile_int(expr, params, constants)
+    return (lambda values: compiled(*values)), isinstance(fold(expr, constants), IntLiteral)
+
+
+def _where(location: SourceLocation | None) -> str | None:
+    return str(location) if location is not None else None
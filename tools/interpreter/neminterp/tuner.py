@@ -0,0 +1,227 @@
+"""
+Tuning: searching the ``const`` parameters of a program with timed mode's cost model.
+
+A search space maps ``const`` names to the values to try; every combination
+is a candidate program, the declarations replaced by the candidate's values
+(constants derived from them follow). Put knobs such as ``@max_in_flight``
+behind a ``const`` to tune them too.
+
+Each candidate first goes through the memory capacity rule of the
+validator (:func:`nemlib.validation.buffer_validator.check_buffers`): the
+buffers of each L1 and of L2, rounded up to their alignments, must fit the
+target's capacities. Candidates that do not fit, or whose constants do not
+evaluate, are rejected without being run. The others are validated, in a
+worker of a process pool each: a window too wide for the buffers it rotates
+through, say, is a hazard, which rejects the candidate too. The worker then
+schedules the candidate like a dry run (see :meth:`neminterp.NemInterpreter.run`),
+which gives its cycle count without executing anything.
+
+:class:`TuningReport` lists every candidate and the Pareto front of cycles
+against L1 footprint (the largest among engines): the candidates no other one
+beats on one without losing on the other.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+
+from nemlib.core.expressions import ExpressionError, IntLiteral, evaluate_int
+from nemlib.device.model import DeviceConfig, FrozenDict
+from nemlib.diagnostics import DiagnosticCollector, DiagnosticSeverity
+from nemlib.parser.ast_nodes import ConstDeclNode, LoopNode, ProgramNode, StmtNode
+from nemlib.validation import validate
+from nemlib.validation.buffer_validator import check_buffers
+from nemlib.validation.expr_evaluator import evaluate_constants
+from nemlib.validation.program_index import index_program
+
+from neminterp.engine import Executor, TaskGraph, TimingModel, compile_program
+from neminterp.engine.scheduler_timed import DEFAULT_DEVICE_UNITS, DEFAULT_PER_ENGINE
+from neminterp.errors import ExecutionError
+from neminterp.memory.memory_model import DEFAULT_L1_SIZE, DEFAULT_L2_SIZE
+
+# What a worker needs to time a candidate: the program and TimingModel's arguments
+_Job = tuple[
+    ProgramNode,
+    int,
+    Mapping[str, int] | None,
+    Mapping[str, int] | None,
+    Mapping[str, Mapping[str, int]] | None,
+]
+
+
+@dataclass(frozen=True, slots=True)
+class Candidate:
+    params: tuple[tuple[str, int], ...]  # (const, value), in search space order
+    l1_bytes: int  # the largest L1 footprint among engines
+    l2_bytes: int
+    cycles: int | None = None  # None when rejected
+    reason: str | None = None  # why it was rejected
+
+    @property
+    def config(self) -> dict[str, int]:
+        return dict(self.params)
+
+    def describe(self) -> str:
+        return ", ".join(f"{name}={value}" for name, value in self.params)
+
+
+@dataclass(frozen=True, slots=True)
+class TuningReport:
+    candidates: tuple[Candidate, ...]  # every point of the space, in search order
+    pareto: tuple[Candidate, ...]  # fastest first
+
+    @property
+    def rejected(self) -> tuple[Candidate, ...]:
+        return tuple(c for c in self.candidates if c.cycles is None)
+
+    @property
+    def best(self) -> Candidate | None:
+        """The fastest candidate (the smallest L1 footprint among equals)."""
+        return self.pareto[0] if self.pareto else None
+
+    def format(self) -> str:
+        lines = [f"{'parameters':<32} {'cycles':>12} {'L1 bytes':>10} {'L2 bytes':>10}"]
+        for c in self.pareto:
+            lines.append(f"{c.describe():<32} {c.cycles:>12} {c.l1_bytes:>10} {c.l2_bytes:>10}")
+        lines.append(
+            f"{len(self.candidates)} candidates, {len(self.rejected)} rejected, "
+            f"{len(self.pareto)} on the Pareto front"
+        )
+        return "\n".join(lines)
+
+
+def tune(
+    program: ProgramNode,
+    space: Mapping[str, Sequence[int]],
+    engines: int = 1,
+    l1_size: int = DEFAULT_L1_SIZE,
+    l2_size: int = DEFAULT_L2_SIZE,
+    per_engine: Mapping[str, int] | None = None,
+    device_units: Mapping[str, int] | None = None,
+    profile: Mapping[str, Mapping[str, int]] | None = None,
+    workers: int | None = None,
+) -> TuningReport:
+    """Time every combination of the ``space`` values of ``program``'s constants.
+
+    ``engines`` to ``profile`` describe the target as for
+    :class:`~neminterp.engine.scheduler_timed.TimingModel`, with
+    ``l1_size``/``l2_size`` its capacities. ``workers`` processes (default:
+    the CPUs available) time the candidates that fit; with one, or a single
+    candidate to time, they are timed in this process. Raises
+    :class:`ValueError` for a name ``program`` declares no ``const`` for.
+    """
+    declared = {const.name for _, const in index_program(program).consts}
+    unknown = sorted(set(space) - declared)
+    if unknown:
+        raise ValueError(f"no const declaration for {', '.join(map(repr, unknown))}")
+    device = DeviceConfig(
+        name="tuning target",
+        spec_version=None,
+        parent=None,
+        num_engines=engines,
+        per_engine=FrozenDict(DEFAULT_PER_ENGINE if per_engine is None else per_engine),
+        device_units=FrozenDict(DEFAULT_DEVICE_UNITS if device_units is None else device_units),
+        unit_characteristics=FrozenDict(),
+        l1_size_bytes=l1_size,
+        l2_size_bytes=l2_size,
+        mandatory_variants=frozenset(),
+        extended_variants=frozenset(),
+    )
+    names = list(space)
+    candidates: list[Candidate] = []
+    jobs: list[_Job] = []
+    timed: list[int] = []  # index in candidates of each job
+    for values in itertools.product(*(space[name] for name in names)):
+        params = tuple(zip(names, values))
+        bound = _bind(program, dict(params))
+        l1_bytes, l2_bytes, reason = _fit(bound, device)
+        candidates.append(Candidate(params, l1_bytes, l2_bytes, reason=reason))
+        if reason is None:
+            timed.append(len(candidates) - 1)
+            jobs.append((bound, engines, per_engine, device_units, profile))
+
+    if workers is None:
+        workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+            results: Iterable[int | str] = list(pool.map(_time, jobs))
+    else:
+        results = map(_time, jobs)
+    for k, result in zip(timed, results):
+        if isinstance(result, str):
+            candidates[k] = replace(candidates[k], reason=result)
+        else:
+            candidates[k] = replace(candidates[k], cycles=result)
+    return TuningReport(tuple(candidates), _pareto(candidates))
+
+
+def _bind(program: ProgramNode, values: Mapping[str, int]) -> ProgramNode:
+    """``program`` with the ``const`` declarations of ``values`` replaced."""
+
+    def bind(statements: tuple[StmtNode, ...]) -> tuple[StmtNode, ...]:
+        bound: list[StmtNode] = []
+        for stmt in statements:
+            if isinstance(stmt, ConstDeclNode) and stmt.name in values:
+                stmt = replace(stmt, value=IntLiteral(values[stmt.name], stmt.location))
+            elif isinstance(stmt, LoopNode):
+                stmt = replace(stmt, body=bind(stmt.body))
+            bound.append(stmt)
+        return tuple(bound)
+
+    return replace(program, statements=bind(program.statements))
+
+
+def _fit(program: ProgramNode, device: DeviceConfig) -> tuple[int, int, str | None]:
+    """The footprints of ``program``'s L1s (the largest) and L2, and why it does not fit
+    ``device``, if it does not."""
+    index = index_program(program)
+    diag = DiagnosticCollector()
+    constants = evaluate_constants(diag, index.consts, index.buffers, index.regions, index.loops)
+    usage: dict[tuple[str, int], int] = {}
+    if not diag.has_errors():
+        check_buffers(diag, index.buffers, constants, device)
+        for _, buf in index.buffers:
+            try:
+                size = evaluate_int(buf.size, constants) if buf.size is not None else 0
+                engine = evaluate_int(buf.l1_index, constants) if buf.l1_index is not None else 0
+            except ExpressionError:
+                continue  # reported by check_buffers
+            if buf.align:
+                size = -(-size // buf.align) * buf.align
+            usage[buf.mem_level, engine] = usage.get((buf.mem_level, engine), 0) + size
+    l1 = max((used for (level, _), used in usage.items() if level == "L1"), default=0)
+    errors = [d for d in diag.get_all() if d.severity is DiagnosticSeverity.ERROR]
+    return l1, usage.get(("L2", 0), 0), errors[0].message if errors else None
+
+
+def _time(job: _Job) -> int | str:
+    """The cycles a dry run of the job's program takes, or why it cannot run."""
+    program, engines, per_engine, device_units, profile = job
+    diag = DiagnosticCollector()
+    validate(program, None, diag)
+    errors = [d for d in diag.get_all() if d.severity is DiagnosticSeverity.ERROR]
+    if errors:
+        return errors[0].message
+    try:
+        graph = TaskGraph(compile_program(program))
+        model = TimingModel(graph, engines, per_engine, device_units, profile)
+        executor = Executor(graph, model.scheduler())
+        executor.run()
+    except ExecutionError as e:
+        return e.message
+    return executor.time
+
+
+def _pareto(candidates: Sequence[Candidate]) -> tuple[Candidate, ...]:
+    """The timed candidates not dominated in (cycles, L1 footprint), fastest first."""
+    front: list[Candidate] = []
+    for c in sorted(
+        (c for c in candidates if c.cycles is not None), key=lambda c: (c.cycles, c.l1_bytes)
+    ):
+        if not front or c.l1_bytes < front[-1].l1_bytes:
+            front.append(c)
+    return tuple(front)
@@ -0,0 +1,114 @@
+"""Tests for neminterp.compute (the NumPy backend's kernels)."""
+
+from typing import Any
+
+import numpy as np
+import pytest
+
+from neminterp import ExecutionError
+from neminterp.compute import NumpyBackend
+from neminterp.memory import MemoryLevel, RegionView
+
+
+def run(opcode: str, inputs: list[np.ndarray], shape: tuple[int, ...], **attributes: Any) -> Any:
+    dtype = np.dtype(np.float32 if inputs[0].dtype.kind == "f" else np.int32)
+    level = MemoryLevel("L1", int(np.prod(shape)) * 4)
+    y = RegionView(level, 0, level.size, "f32" if dtype.kind == "f" else "i32", shape)
+    NumpyBackend().kernel(opcode)(inputs, [y], attributes)
+    return y.array()
+
+
+def conv_reference(
+    x: np.ndarray,
+    w: np.ndarray,
+    pads: list[int],
+    strides: list[int],
+    dilations: list[int],
+    groups: int,
+) -> np.ndarray:
+    """Zero-padded direct convolution, group by group, in int64 / float64."""
+    top, left, bottom, right = pads
+    wide = np.float64 if x.dtype.kind == "f" else np.int64
+    xp = np.pad(x.astype(wide), ((0, 0), (top, bottom), (left, right), (0, 0)))
+    kh, kw, depth, cout = w.shape
+    out_h = (xp.shape[1] - dilations[0] * (kh - 1) - 1) // strides[0] + 1
+    out_w = (xp.shape[2] - dilations[1] * (kw - 1) - 1) // strides[1] + 1
+    y = np.zeros((x.shape[0], out_h, out_w, cout), wide)
+    per_group = cout // groups
+    for g in range(groups):
+        for i in range(kh):
+            for j in range(kw):
+                top, left = i * dilations[0], j * dilations[1]
+                rows = slice(top, top + (out_h - 1) * strides[0] + 1, strides[0])
+                cols = slice(left, left + (out_w - 1) * strides[1] + 1, strides[1])
+                window = xp[:, rows, cols, g * depth : (g + 1) * depth]
+                outputs = slice(g * per_group, (g + 1) * per_group)
+                y[..., outputs] += window @ w[i, j, :, outputs].astype(wide)
+    return y
+
+
+def test_integer_gemm_is_exact_and_wraps() -> None:
+    rng = np.random.default_rng(0)
+    for a_type, b_type, k in (
+        (np.int8, np.int8, 3000),
+        (np.uint8, np.int8, 700),
+        (np.int16, np.int16, 50),
+    ):
+        a = rng.integers(np.iinfo(a_type).min, np.iinfo(a_type).max, (8, k), endpoint=True)
+        b = rng.integers(np.iinfo(b_type).min, np.iinfo(b_type).max, (k, 6), endpoint=True)
+        a, b = a.astype(a_type), b.astype(b_type)
+        expected = np.matmul(a, b, dtype=np.int32)
+        assert np.array_equal(run("gemm", [a, b], (8, 6), accum_type="i32"), expected)
+    # partial sums beyond float32's 24 bits, and a total wrapping around i32
+    a = np.full((2, 140_000), -128, np.int8)
+    b = np.full((140_000, 3), -128, np.int8)
+    y = run("gemm", [a, b], (2, 3), accum_type="i32")
+    assert np.array_equal(y, np.matmul(a, b, dtype=np.int32))
+    assert y[0, 0] == np.int64(140_000 * 2**14) - 2**32
+
+
+@pytest.mark.parametrize(
+    "opcode, groups, cin, cout, pads, strides, dilations",
+    [
+        ("conv2d", 1, 8, 16, [1, 1, 1, 1], [1, 1], [1, 1]),
+        ("conv2d", 1, 3, 5, [0, 2, 1, 0], [2, 3], [2, 1]),
+        ("conv2d", 4, 8, 12, [1, 1, 1, 1], [2, 2], [1, 1]),
+        ("conv2d", 8, 8, 8, [2, 2, 2, 2], [1, 1], [2, 2]),
+        ("depthwise_conv2d", 6, 6, 12, [1, 0, 1, 0], [1, 2], [1, 1]),
+    ],
+)
+def test_conv2d_matches_direct_convolution(
+    opcode: str,
+    groups: int,
+    cin: int,
+    cout: int,
+    pads: list[int],
+    strides: list[int],
+    dilations: list[int],
+) -> None:
+    rng = np.random.default_rng(1)
+    x = rng.integers(-128, 128, (2, 11, 9, cin), np.int8)
+    w = rng.integers(-128, 128, (3, 3, cin // groups, cout), np.int8)
+    bias = rng.integers(-1000, 1000, cout, np.int32)
+    expected = conv_reference(x, w, pads, strides, dilations, groups) + bias
+    attributes: dict[str, Any] = dict(
+        pads=pads, strides=strides, dilations=dilations, accum_type="i32"
+    )
+    if opcode == "conv2d":
+        attributes["groups"] = groups
+    y = run(opcode, [x, w, bias], expected.shape, **attributes)
+    assert np.array_equal(y, expected)
+
+    xf, wf = x.astype(np.float32) / 64, w.astype(np.float32) / 64
+    expected = conv_reference(xf, wf, pads, strides, dilations, groups)
+    y = run(opcode, [xf, wf], expected.shape, **attributes | {"accum_type": "f32"})
+    np.testing.assert_allclose(y, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_conv2d_checks_shapes() -> None:
+    x = np.zeros((1, 8, 8, 4), np.int8)
+    w = np.zeros((3, 3, 4, 2), np.int8)
+    with pytest.raises(ExecutionError, match=r"does not match \[1, 8, 8, 2\]"):
+        run("conv2d", [x, w], (1, 6, 6, 2), pads=[1, 1, 1, 1], strides=[1, 1], dilations=[1, 1])
+    with pytest.raises(ExecutionError, match="into 3 groups"):
+        run("conv2d", [x, w], (1, 6, 6, 2), pads=[0, 0], strides=[1, 1], groups=3)
@@ -0,0 +1,151 @@
+"""Tests for neminterp.engine (token manager, schedulers, executor)."""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+from nemlib.parser import parse
+
+from neminterp import NemInterpreter
+from neminterp.compute import DispatchTable, NumpyBackend
+from neminterp.engine import (
+    JOIN,
+    Executor,
+    TaskGraph,
+    TimedScheduler,
+    TimingModel,
+    TraceWriter,
+    compile_program,
+    fusion_chains,
+    open_trace,
+)
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def conv2d_relu(trips: int, chunk: int = 1024) -> TaskGraph:
+    source = (EXAMPLES_DIR / "conv2d_relu.nem").read_text()
+    program, _ = parse(re.sub(r"const T = \d+", f"const T = {trips}", source))
+    return TaskGraph(compile_program(program), chunk)
+
+
+def run_order(executor: Executor) -> list[int]:
+    order = []
+    while (node := executor.step()) is not None:
+        order.append(node)
+    return order
+
+
+def test_functional_order_is_topological_and_source_ordered() -> None:
+    g = conv2d_relu(6)
+    ran: list[str] = []
+    order = run_order(Executor(g, run_task=lambda n: ran.append(g.label(n))))
+    assert sorted(order) == list(range(len(g)))
+    position = {node: k for k, node in enumerate(order)}
+    assert all(position[p] < position[n] for n in order for p in g.preds(n).tolist())
+    assert ran[:8] == [
+        "tX (i = 0)", "tW (i = 0)", "wait (i = 0)", "tC (i = 0)",
+        "tR (i = 0)", "tS (i = 0)", "tX (i = 1)", "tW (i = 1)",
+    ]  # fmt: skip
+    assert len(ran) == sum(g.template_ids != JOIN)
+
+
+@pytest.mark.parametrize("lookahead", [1, 5, 100])
+def test_lazy_expansion_does_not_change_the_order(lookahead: int) -> None:
+    reference = conv2d_relu(50)
+    reference.expand()
+    expected = run_order(Executor(reference))
+    g = conv2d_relu(50, chunk=2)
+    executor = Executor(g, lookahead=lookahead)
+    assert run_order(executor) == expected
+    assert executor.executed == len(g)
+
+
+def test_timed_scheduler_starts_earliest_and_serializes_units() -> None:
+    g = conv2d_relu(8)
+    g.expand()
+    templates = g.template_ids.tolist()
+    units = {"transfer": 0, "store": 0, "conv2d": 1, "relu": 2}
+    unit_of, cost_of = [], []
+    for t in templates:
+        opcode = getattr(g.template.tasks[t].node, "opcode", None) if t != JOIN else None
+        unit_of.append(units.get(opcode, -1) if opcode else -1)
+        cost_of.append({0: 10, 1: 40, 2: 5}.get(unit_of[-1], 0))
+    scheduler = TimedScheduler(cost_of.__getitem__, unit_of.__getitem__, [[0], [1], [2]])
+    executor = Executor(g, scheduler)
+    order = run_order(executor)
+
+    finish = [executor.tokens.completion_time(n) for n in range(len(g))]
+    start = [f - c for f, c in zip(finish, cost_of)]
+    for n in range(len(g)):
+        assert all(finish[p] <= start[n] for p in g.preds(n).tolist())
+    for u in range(3):
+        spans = sorted((start[n], finish[n]) for n in order if unit_of[n] == u)
+        assert all(a[1] <= b[0] for a, b in zip(spans, spans[1:]))
+    # the DMA streams tiles of later iterations while the NMU convolves
+    assert executor.time < sum(cost_of)
+    assert executor.time == max(finish)
+    assert [start[n] for n in order] == sorted(start[n] for n in order)
+
+
+def test_trace_rows_chain_to_their_causes(tmp_path: Path) -> None:
+    traces = []
+    for chunk in (3, 1 << 16):
+        g = conv2d_relu(8)
+        model = TimingModel(g)
+        with TraceWriter(tmp_path / f"{chunk}.npy", model, chunk) as writer:
+            executor = Executor(g, model.scheduler(), trace=writer)
+            executor.run()
+        traces.append(open_trace(tmp_path / f"{chunk}.npy").records)
+    records = traces[0]
+    assert np.array_equal(records, traces[1])  # causes resolve across chunks
+    assert sorted(records["node"].tolist()) == list(range(len(g)))
+    assert records["end"].max() == executor.time
+    # every start but the first ones is some row's end: the unit's previous
+    # task's if the row stalled, else the latest of its predecessors'
+    caused = records["cause"] >= 0
+    assert np.array_equal(caused, records["start"] > 0)
+    cause = records[records["cause"][caused]]
+    assert np.array_equal(cause["end"], records["start"][caused])
+    stalled = records["start"][caused] > records["ready"][caused]
+    assert np.array_equal(cause["unit"][stalled], records["unit"][caused][stalled])
+    assert np.all(np.flatnonzero(caused) > records["cause"][caused])
+
+
+ELEMENTWISE = """
+program p:
+buffer X : DDR (size=512, align=64)
+buffer Y : L1 (size=512, align=64)
+buffer Z : L1 (size=1024, align=64)
+loop i in [0..1]:
+  let x = region(X, 0, 512) elem=f16, shape=[16, 16], layout=MN
+  let y = region(Y, 0, 512) elem=f16, shape=[16, 16], layout=MN
+  let z = region(Z, i * 512, 512) elem=f16, shape=[16, 16], layout=MN
+  tA = relu.async in x out y
+  tB = neg.async in y out y deps=[tA]
+  tC = add.async in y, x out z deps=[tB]
+  tD = exp.async in z out z deps=[tC, tA]
+  wait(tD)
+  tE = abs.async in z out z deps=[tD]
+endloop
+"""
+
+
+def test_fusion_chains_follow_in_place_dependencies() -> None:
+    program, _ = parse(ELEMENTWISE)
+    template = compile_program(program)
+    # tB and tC follow tA; tD has two producers and tE a barrier before it
+    assert fusion_chains(template, DispatchTable(NumpyBackend())) == {0: (1, 2)}
+
+    results = []
+    for fuse in (False, True):
+        interp = NemInterpreter(backend=NumpyBackend(fuse=fuse))
+        program = interp.load_string(ELEMENTWISE)
+        x = np.linspace(-4, 4, 256).astype(np.float16)
+        interp.ddr_write_tensor(0, x)
+        interp.run(program)
+        results.append(bytes(interp.read_buffer("Z")))
+    assert results[0] == results[1]
+    z = np.abs(np.exp(-np.maximum(x, 0) + x))
+    assert np.array_equal(np.frombuffer(results[1], np.float16)[256:], z)
@@ -0,0 +1,322 @@
+"""End-to-end tests for neminterp.NemInterpreter."""
+
+import json
+import re
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+import neminterp.memory.region
+from neminterp import ExecutionError, NemInterpreter, RunResult
+from neminterp.compute import Kernel, NumpyBackend
+from neminterp.engine import export_chrome, open_trace, summarize
+from neminterp.memory import RegionView, pack_int4
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def gemm_rmsnorm(tile_m: int = 64, k: int = 256, n: int = 128, trips: int = 4) -> str:
+    """gemm_rmsnorm.nem with its L2 tensors moved to DDR, resized."""
+    source = (EXAMPLES_DIR / "gemm_rmsnorm.nem").read_text()
+    for name, value in (("TiM", tile_m), ("K", k), ("N", n), ("T", trips)):
+        source = re.sub(rf"const {name} = \d+", f"const {name} = {value}", source)
+    return re.sub(r"(buffer [A-Z]_L2) : L2", r"\1 : DDR", source)
+
+
+def test_gemm_rmsnorm_matches_reference() -> None:
+    interp = NemInterpreter(ddr_size=2**20)
+    program = interp.load_string(gemm_rmsnorm())
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((4 * 64, 256)).astype(np.float16)
+    b = (rng.standard_normal((256, 128)) / 16).astype(np.float16)
+    scale = rng.uniform(0.5, 1.5, 128).astype(np.float16)
+    interp.ddr_write_tensor(0, a)
+    interp.ddr_write_tensor(a.nbytes, b)
+    interp.ddr_write_tensor(a.nbytes + b.nbytes, scale)
+
+    assert interp.run(program).tasks == 4 * 6
+    g = (a.astype(np.float32) @ b.astype(np.float32)).astype(np.float16).astype(np.float32)
+    expected = g / np.sqrt(np.mean(g * g, axis=1, keepdims=True) + 1e-5) * scale
+    y = interp.ddr_read_tensor(interp.buffers["Y_L2"].offset, (256, 128), np.float16)
+    np.testing.assert_allclose(y, expected.astype(np.float16), rtol=1e-3, atol=1e-3)
+
+
+def test_int4_gemm_decodes_resident_weights_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    source = "\n".join(
+        [
+            "program gemm_int4:",
+            "const T = 4",
+            "buffer A : DDR (size=T * 256, align=64)",
+            "buffer W : DDR (size=512, align=64)",
+            "buffer Y : DDR (size=T * 256, align=64)",
+            "buffer W1 : L1 (size=512, align=64)",
+            "buffer A1 : L1 (size=256, align=64)",
+            "buffer Y1 : L1 (size=256, align=64)",
+            "let W_l1 = region(W1, 0, 512) elem=i4, shape=[32, 32], layout=KN,"
+            " quant=per_tensor(scale=1.0, zero_point=0) @readonly",
+            "tW = transfer.sync(dst=W_l1, src=region(W, 0, 512) elem=i4, shape=[32, 32],"
+            " layout=KN, quant=per_tensor(scale=1.0, zero_point=0))",
+            "loop i in [0..T-1]:",
+            "  let A_i = region(A1, 0, 256) elem=i8, shape=[8, 32], layout=MK",
+            "  let Y_i = region(Y1, 0, 256) elem=i8, shape=[8, 32], layout=MN",
+            "  tA = transfer.async(dst=A_i, src=region(A, i * 256, 256))",
+            "  tG = gemm.async in A_i, W_l1 out Y_i deps=[tA] accum_type=i32",
+            "  tY = store.async(dst=region(Y, i * 256, 256), src=Y_i, deps=[tG])",
+            "endloop",
+        ]
+    )
+    interp = NemInterpreter(ddr_size=2**16)
+    program = interp.load_string(source)
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 2, (32, 32), np.int8)
+    w = rng.integers(-4, 4, (32, 32), np.int8)
+    interp.ddr_write_tensor(0, a)
+    interp.ddr_write_tensor(4 * 256, pack_int4(w))
+    decodes = []
+    unpack = neminterp.memory.region.unpack_int4
+    monkeypatch.setattr(
+        neminterp.memory.region, "unpack_int4", lambda *args: decodes.append(1) or unpack(*args)
+    )
+    interp.run(program)
+    y = interp.ddr_read_tensor(interp.buffers["Y"].offset, (32, 32), np.int8)
+    assert np.array_equal(y, a.astype(np.int32) @ w)
+    assert len(decodes) == 1
+
+
+def test_transfers_do_not_copy_through_python_objects() -> None:
+    source = "\n".join(
+        [
+            "program copy:",
+            "const S = 1048576",
+            "buffer X : DDR (size=8 * S, align=64)",
+            "buffer Y : L2 (size=2 * S, align=64)",
+            "buffer Z : DDR (size=8 * S, align=64)",
+            "loop i in [0..7] @max_in_flight(2):",
+            "  t0 = transfer.async(dst=region(Y, (i mod 2) * S, S), src=region(X, i * S, S))",
+            "  t1 = store.async(dst=region(Z, i * S, S), src=region(Y, (i mod 2) * S, S),"
+            " deps=[t0])",
+            "endloop",
+        ]
+    )
+    interp = NemInterpreter(ddr_size=16 * 2**20)
+    program = interp.load_string(source)
+    x = np.random.default_rng(0).integers(0, 255, 8 * 2**20, np.uint8)
+    interp.ddr_write_tensor(0, x)
+    tracemalloc.start()
+    interp.run(program)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 2**20 // 4  # 16 MiB moved, not one tile allocated
+    assert np.array_equal(interp.ddr_read_tensor(8 * 2**20, (8 * 2**20,), np.uint8), x)
+
+
+@pytest.mark.parametrize("parallel", [False, True, 2])
+def test_runtime_errors_name_the_instance(parallel: bool | int) -> None:
+    interp = NemInterpreter(ddr_size=2**16, engines=2)
+    source = (
+        "program p:\n"
+        "buffer X : DDR (size=256, align=64)\n"
+        "buffer Y : L1 (size=64, align=64)\n"
+        "loop i in [0..3]:\n"
+        "  t = transfer.async(dst=region(Y, 0, 64), src=region(X, i * 96, 64))\n"
+        "endloop\n"
+    )
+    with pytest.raises(ExecutionError) as error:
+        interp.run(interp.load_string(source), parallel=parallel)
+    assert error.value.message == (
+        "t (i = 3): region [288, 352) is out of bounds of buffer 'X' (256 bytes)"
+    )
+    assert error.value.location is not None and error.value.location.line == 5
+
+
+def multi_engine(engines: int, tile_m: int, k: int, n: int, trips: int) -> str:
+    """``relu(A_tile @ B)`` per tile, the tiles dealt out to the engines' L1s."""
+    a, b, y = 2 * tile_m * k, 2 * k * n, 2 * tile_m * n
+    lines = [
+        "program multi_engine:",
+        f"buffer A : DDR (size={engines * trips * a}, align=64)",
+        f"buffer B : DDR (size={b}, align=64)",
+        f"buffer Y : DDR (size={engines * trips * y}, align=64)",
+    ]
+    for e in range(engines):
+        lines += [
+            f"buffer A{e} : L1[{e}] (size={2 * a}, align=64)",
+            f"buffer B{e} : L1[{e}] (size={b}, align=64)",
+            f"buffer Y{e} : L1[{e}] (size={2 * y}, align=64)",
+            f"let B_{e} = region(B{e}, 0, {b}) elem=f16, shape=[{k}, {n}], layout=KN",
+            f"tB{e} = transfer.sync(dst=B_{e}, src=region(B, 0, {b}))",
+        ]
+    lines.append(f"loop i in [0..{trips - 1}] @max_in_flight(2):")
+    for e in range(engines):
+        tile = f"(i * {engines} + {e})"
+        lines += [
+            f"  let A_{e} = region(A{e}, (i mod 2) * {a}, {a})"
+            f" elem=f16, shape=[{tile_m}, {k}], layout=MK",
+            f"  let Y_{e} = region(Y{e}, (i mod 2) * {y}, {y})"
+            f" elem=f16, shape=[{tile_m}, {n}], layout=MN",
+            f"  tA{e} = transfer.async(dst=A_{e}, src=region(A, {tile} * {a}, {a}))",
+            f"  tG{e} = gemm.async in A_{e}, B_{e} out Y_{e} deps=[tA{e}] accum_type=f32",
+            f"  tR{e} = relu.async in Y_{e} out Y_{e} deps=[tG{e}]",
+            f"  tS{e} = store.async(dst=region(Y, {tile} * {y}, {y}), src=Y_{e}, deps=[tR{e}])",
+        ]
+    lines.append("endloop")
+    return "\n".join(lines)
+
+
+class ThreadRecordingBackend(NumpyBackend):
+    """Records the threads that write each memory level."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: dict[str, set[str]] = {}
+
+    def kernel(self, opcode: str) -> Kernel:
+        kernel = super().kernel(opcode)
+
+        def recorded(inputs: list[Any], outputs: list[RegionView], attributes: Any) -> None:
+            name = threading.current_thread().name
+            self.threads.setdefault(outputs[0].level.name, set()).add(name)
+            kernel(inputs, outputs, attributes)
+
+        return recorded
+
+
+def test_parallel_engines_match_the_serialized_run() -> None:
+    backend = ThreadRecordingBackend()
+    interp = NemInterpreter(ddr_size=2**22, engines=4, backend=backend)
+    program = interp.load_string(multi_engine(4, 16, 64, 32, 6))
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((4 * 6 * 16, 64)).astype(np.float16)
+    interp.ddr_write_tensor(0, a)
+    interp.ddr_write_tensor(a.nbytes, rng.standard_normal((64, 32)).astype(np.float16))
+    serialized = interp.run(program)
+    y = bytes(interp.read_buffer("Y"))
+    assert backend.threads == {f"L1[{e}]": {"MainThread"} for e in range(4)}
+
+    backend.threads.clear()
+    assert interp.run(program, parallel=4) == serialized
+    assert bytes(interp.read_buffer("Y")) == y
+    assert backend.threads == {f"L1[{e}]": {f"engine{e}"} for e in range(4)}
+
+    # two threads: engines 0 and 2 share one, 1 and 3 the other
+    backend.threads.clear()
+    assert interp.run(program, parallel=2) == serialized
+    assert bytes(interp.read_buffer("Y")) == y
+    assert backend.threads == {f"L1[{e}]": {f"engine{e % 2}"} for e in range(4)}
+
+
+def pipeline(decorators: str = "") -> str:
+    """Four independent transfer -> relu -> store iterations of 256 bytes."""
+    return (
+        "program p:\n"
+        "buffer A : DDR (size=1024, align=64)\n"
+        "buffer B : L1 (size=1024, align=64)\n"
+        "buffer C : DDR (size=1024, align=64)\n"
+        "loop i in [0..3] @max_in_flight(4):\n"
+        "  let b = region(B, i * 256, 256) elem=f16, shape=[128], layout=N\n"
+        f"  tA = transfer.async(dst=b, src=region(A, i * 256, 256)) {decorators}\n"
+        "  tR = relu.async in b out b deps=[tA]\n"
+        f"  tS = store.async(dst=region(C, i * 256, 256), src=b, deps=[tR]) {decorators}\n"
+        "endloop\n"
+    )
+
+
+def test_timed_mode_counts_cycles_on_unit_instances() -> None:
+    interp = NemInterpreter(ddr_size=2**16)
+    interp.ddr_write_tensor(0, np.arange(-256, 256).astype(np.float16))
+    program = interp.load_string(pipeline())
+    functional = interp.run(program)
+    assert functional.cycle_count is None
+    c = bytes(interp.read_buffer("C"))
+
+    # copies: ceil(256 / 32) + 4 = 12 cycles, relu: ceil(128 / 256) + 1 = 2;
+    # the 8 copies share the two DMA instances
+    interp.set_mode("timed")
+    assert interp.run(program) == RunResult("completed", functional.tasks, 48)
+    assert bytes(interp.read_buffer("C")) == c
+    assert interp.run(interp.load_string(pipeline("@resource(DMA[1])"))).cycle_count == 96
+    single = NemInterpreter(ddr_size=2**16, per_engine={"NMU": 1, "CSTL": 1, "DMA": 1})
+    single.set_mode("timed")
+    assert single.run(single.load_string(pipeline())).cycle_count == 96
+    interp.set_timing_profile({"DMA": {"bandwidth": 64}})
+    assert interp.run(program).cycle_count == 32
+
+    with pytest.raises(ExecutionError, match=r"tA: @resource\(DMA\[2\]\) needs 3 DMA units"):
+        interp.run(interp.load_string(pipeline("@resource(DMA[2])")))
+
+
+def test_timed_engines_overlap() -> None:
+    source = multi_engine(2, 16, 64, 32, 4)
+    cycles = []
+    for engines in (1, 2):
+        interp = NemInterpreter(ddr_size=2**22, engines=2)
+        interp.set_mode("timed")
+        # one engine's units for all the work: place every L1 buffer on engine 0
+        text = source if engines == 2 else source.replace("L1[1]", "L1[0]")
+        cycles.append(interp.run(interp.load_string(text)).cycle_count)
+    assert cycles[0] is not None and cycles[1] is not None
+    assert cycles[1] < cycles[0]
+
+
+def test_timed_runs_write_traces(tmp_path: Path) -> None:
+    interp = NemInterpreter(ddr_size=2**16)
+    program = interp.load_string(pipeline("@resource(DMA[1])"))
+    with pytest.raises(ValueError, match="only timed runs"):
+        interp.run(program, trace=tmp_path / "run.npy")
+    interp.set_mode("timed")
+    result = interp.run(program, trace=tmp_path / "run.npy")
+    trace = open_trace(tmp_path / "run.npy")
+    assert np.array_equal(np.load(tmp_path / "run.npy"), trace.records)
+    assert list(trace.records["start"]) == sorted(trace.records["start"])
+
+    # every copy is on DMA[1], which the critical path never leaves
+    summary = summarize(tmp_path / "run.npy", chunk=5)
+    assert (summary.cycles, summary.tasks) == (result.cycle_count, result.tasks)
+    dma = next(unit for unit in summary.units if unit.name == "DMA[1]")
+    assert (dma.tasks, dma.busy, dma.utilization) == (8, 96, 1.0)
+    assert dma.stalled > 0
+    path = trace.records[summary.critical_path]
+    assert set(path["unit"].tolist()) == {trace.units.index("DMA[1]")}
+    assert path["start"][0] == 0 and path["end"][-1] == summary.cycles
+    assert np.array_equal(path["start"][1:], path["end"][:-1])
+
+    export_chrome(tmp_path / "run.npy", tmp_path / "run.json", chunk=3)
+    events = json.loads((tmp_path / "run.json").read_text())["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert len(spans) == result.tasks
+    assert {e["name"] for e in spans} == {"tA", "tR", "tS"}
+    assert max(e["ts"] + e["dur"] for e in spans) == result.cycle_count
+
+
+class UnusedBackend(NumpyBackend):
+    def kernel(self, opcode: str) -> Kernel:
+        raise AssertionError(f"'{opcode}' was executed")
+
+
+def test_dry_runs_only_schedule() -> None:
+    source = multi_engine(2, 16, 64, 32, 4)
+    timed = NemInterpreter(ddr_size=2**22, engines=2)
+    timed.set_mode("timed")
+    expected = timed.run(timed.load_string(source))
+    interp = NemInterpreter(ddr_size=2**22, engines=2, backend=UnusedBackend())
+    assert interp.run(interp.load_string(source), dry=True) == expected
+    assert "memory" not in vars(interp)  # no level was ever created
+
+
+def test_npy_inputs_are_mapped_into_ddr(tmp_path: Path) -> None:
+    interp = NemInterpreter(ddr_size=2**24)
+    program = interp.load_string(
+        "program p:\n"
+        "buffer W : DDR (size=65536, align=4096)\n"
+        "buffer V : L2 (size=65536, align=64)\n"
+        "t = transfer.sync(dst=region(V, 0, 65536), src=region(W, 0, 65536))\n"
+    )
+    w = np.random.default_rng(0).standard_normal(16384).astype(np.float32)
+    np.save(tmp_path / "w.npy", w)
+    interp.ddr_load_npy(0, tmp_path / "w.npy")
+    interp.run(program)
+    assert np.array_equal(np.frombuffer(interp.read_buffer("V"), np.float32), w)
@@ -0,0 +1,131 @@
+"""Tests for neminterp.memory (memory levels, buffers, region views)."""
+
+import mmap
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from neminterp import ExecutionError
+from neminterp.memory import (
+    BufferManager,
+    MemoryLevel,
+    MemorySystem,
+    RegionView,
+    pack_int4,
+    unpack_int4,
+)
+
+
+def test_allocation_is_linear_aligned_and_bounded() -> None:
+    memory = MemorySystem(ddr_size=4096, l2_size=1024, l1_size=256, engines=2)
+    manager = BufferManager(memory)
+    a = manager.allocate("A", "L2", 100, 64)
+    b = manager.allocate("B", "L2", 10, 64)
+    c = manager.allocate("C", "L1", 200, 64, engine=1)
+    assert (a.offset, b.offset, c.offset) == (0, 128, 0)
+    assert c.level is memory.l1[1]
+    assert memory.l2.allocated == 138
+    with pytest.raises(ExecutionError, match="does not fit in L1\\[1\\]"):
+        manager.allocate("D", "L1", 64, 64, engine=1)
+    with pytest.raises(ExecutionError, match="engine 2 does not exist"):
+        manager.allocate("E", "L1", 1, engine=2)
+
+
+def test_region_arrays_are_views_of_the_level() -> None:
+    level = MemoryLevel("L1", 1024)
+    view = RegionView(level, 64, 128, "f16", (4, 16))
+    x = view.array()
+    assert np.shares_memory(x, np.frombuffer(level.data, np.uint8))
+    x[...] = np.arange(64).reshape(4, 16)
+    assert np.frombuffer(level.read(64, 128), np.float16).tolist() == list(range(64))
+    view.write_array(np.ones((4, 16)))
+    assert bytes(level.read(64, 2)) == np.float16(1).tobytes()
+    assert view.bytes().obj is level.data
+
+
+def test_strided_regions() -> None:
+    level = MemoryLevel("L1", 256)
+    np.frombuffer(level.data, np.int32)[:] = np.arange(64)
+    # every other column of an 8x8 i32 matrix, transposed
+    view = RegionView(level, 0, 256, "i32", (4, 8), (2, 8))
+    assert view.array().tolist() == np.arange(64).reshape(8, 8)[:, ::2].T.tolist()
+    view.array()[0, 0] = -1
+    assert np.frombuffer(level.data, np.int32)[0] == -1
+    with pytest.raises(ExecutionError, match="address 260 bytes"):
+        RegionView(level, 0, 256, "i32", (5, 8), (2, 8)).array()
+    with pytest.raises(ExecutionError, match="needs 512 bytes"):
+        RegionView(level, 0, 256, "i32", (16, 8)).array()
+    with pytest.raises(ExecutionError, match="out of bounds of L1"):
+        RegionView(level, 200, 64)
+
+
+def test_int4_pack_unpack_sign_extends() -> None:
+    values = np.array([-8, -1, 0, 7, 3, -5, 1], np.int8)
+    packed = pack_int4(values)
+    assert packed.tolist() == [0xF8, 0x70, 0xB3, 0x01]  # low nibble first, odd tail padded
+    assert unpack_int4(packed, 7).tolist() == values.tolist()
+    assert unpack_int4(pack_int4(np.array([8, 17, -9]))).tolist() == [-8, 1, 7, 0]  # wraps
+
+
+def test_int4_regions_are_decoded_and_cached() -> None:
+    level = MemoryLevel("L1", 2048)
+    rng = np.random.default_rng(0)
+    w = rng.integers(-8, 8, (16, 8), np.int8)
+    view = RegionView(level, 1024, 64, "i4", (16, 8))
+    view.write_array(w)
+    assert bytes(level.read(1024, 64)) == pack_int4(w).tobytes()
+    x = view.array()
+    assert x.dtype == np.int8 and not x.flags.writeable
+    assert np.array_equal(x, w)
+    assert RegionView(level, 1024, 64, "i4", (16, 8)).array() is x  # not decoded again
+    level.touch(0, 1024)  # writes next to the region
+    assert view.array() is x
+    level.write(1087, b"\x00")  # a write to the region: decoded again
+    y = view.array()
+    assert y is not x and y[15, 6:].tolist() == [0, 0]
+    assert np.array_equal(y[:15], w[:15])
+    level.clear()
+    assert not view.array().any()
+
+
+def test_int4_strided_and_odd_regions_keep_other_nibbles() -> None:
+    level = MemoryLevel("L1", 64)
+    level.write(0, b"\xff" * 16)  # -1 elements
+    # the 2x3 matrix of elements at 0, 2, 4 and 8, 10, 12
+    strided = RegionView(level, 0, 8, "i4", (2, 3), (8, 2))
+    strided.write_array([[1, 2, 3], [4, 5, 6]])
+    assert unpack_int4(np.frombuffer(level.data, np.uint8, 8)).tolist() == (
+        [1, -1, 2, -1, 3, -1, -1, -1, 4, -1, 5, -1, 6, -1, -1, -1]
+    )
+    assert strided.array().tolist() == [[1, 2, 3], [4, 5, 6]]
+    RegionView(level, 8, 2, "i4", (3,)).write_array([7, 7, 7])
+    assert bytes(level.read(8, 2)) == b"\x77\xf7"
+    with pytest.raises(ExecutionError, match="needs 3 bytes"):
+        RegionView(level, 0, 2, "i4", (5,)).array()
+
+
+def test_lazy_levels_map_files_copy_on_write(tmp_path: Path) -> None:
+    page = mmap.PAGESIZE
+    x = np.arange(4 * page, dtype=np.int32)
+    path = tmp_path / "x.bin"
+    x.tofile(path)
+    level = MemoryLevel("DDR", 64 * page, lazy=True)
+    assert level.load_file(page, path) == x.nbytes
+    assert level.load_file(40 * page + 100, path) == 0  # not page-congruent: read in
+    assert level.load_file(60 * page, path, file_offset=8, length=page) == 0  # partial pages
+    mapped = np.frombuffer(level.data, np.int32, x.size, page)
+    assert np.array_equal(mapped, x)
+    assert np.array_equal(np.frombuffer(level.data, np.int32, x.size, 40 * page + 100), x)
+    assert np.array_equal(
+        np.frombuffer(level.data, np.int32, page // 4, 60 * page), x[2:][: page // 4]
+    )
+    mapped[0] = -1
+    assert np.fromfile(path, np.int32, 1)[0] == 0  # writes stay private
+    level.clear()
+    assert not np.frombuffer(level.data, np.uint8).any()
+    with pytest.raises(ExecutionError, match="out of bounds of DDR"):
+        level.load_file(63 * page, path)
+    eager = MemoryLevel("DDR", 64 * page)
+    assert eager.load_file(page, path) == 0
+    assert np.array_equal(np.frombuffer(eager.data, np.int32, x.size, page), x)
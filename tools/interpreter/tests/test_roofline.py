@@ -0,0 +1,80 @@
+"""Tests for neminterp.roofline."""
+
+import json
+from pathlib import Path
+
+import pytest
+from nemlib.device.loader import load_device, load_device_library
+from nemlib.diagnostics import DiagnosticCollector
+from nemlib.parser import parse
+
+from neminterp import NemInterpreter, analyze
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+NPM_LITE = load_device(str(EXAMPLES_DIR / "npm_lite_.nem"))
+
+
+def test_gemm_bias_relu_is_dma_bound_on_npm_lite() -> None:
+    source = (EXAMPLES_DIR / "gemm_bias_relu.nem").read_text()
+    program, _ = parse(source, "gemm_bias_relu.nem")
+    diag = DiagnosticCollector()
+    report = analyze(program, NPM_LITE, diag)
+
+    gemm = next(t for t in report.tasks if t.name == "tG")
+    assert (gemm.unit, gemm.instances, gemm.macs) == ("NMU", 4, 4 * 64 * 256 * 128)
+    assert gemm.cycles == gemm.macs / 2048  # f16: fp16_macs
+    (loop,) = report.loops
+    assert (loop.loop, loop.iterations) == ("i", 4)
+    # A and B tiles in, Y tiles out, over the two DMA queues at timed mode's bandwidth
+    assert loop.dma_bytes == 4 * (64 * 256 + 256 * 128 + 64 * 128) * 2
+    assert loop.unit_cycles == {"DMA": loop.dma_bytes / 32 / 2, "NMU": 4096.0, "CSTL": 64.0}
+    assert loop.intensity == loop.macs / loop.dma_bytes
+    assert loop.bytes["L1"] == sum(t.bytes["L1"] for t in report.tasks)
+    assert (loop.bound, round(loop.share, 2)) == ("DMA", 0.63)
+    assert (report.program.bound, report.program.cycles) == ("DMA", 7168.0)
+    messages = [d.message for d in diag.get_all()]
+    assert messages == [
+        "loop i is DMA-bound at 63%",
+        "program gemm_bias_relu is DMA-bound at 63%",
+    ]
+    assert json.loads(json.dumps(report.as_dict()))["program"]["bound"] == "DMA"
+
+    # more bandwidth moves the bound to the NMU
+    faster = analyze(program, NPM_LITE, profile={"DMA": {"bandwidth": 128}})
+    assert faster.program.bound == "NMU"
+
+    # a dry timed run never beats the roofline
+    interp = NemInterpreter(per_engine=NPM_LITE.per_engine, device_units=NPM_LITE.device_units)
+    interp.set_timing_profile({"NMU": {"mac_throughput": 2048}})
+    dry = interp.run(interp.load_string(source), dry=True)
+    assert dry.cycle_count >= report.program.cycles
+
+
+def test_dynamic_trip_counts_are_enumerated() -> None:
+    program, _ = parse(
+        "\n".join(
+            [
+                "program triangle:",
+                "buffer A : L2 (size=4096, align=64)",
+                "buffer B : L1 (size=4096, align=64)",
+                "loop i in [0..3]:",
+                "  loop j in [0..i]:",
+                "    transfer.async(dst=region(B, j * 64, 64), src=region(A, j * 64, 64))",
+                "  endloop",
+                "endloop",
+            ]
+        )
+    )
+    report = analyze(program, NPM_LITE)
+    outer, inner = report.loops
+    assert (outer.iterations, inner.iterations) == (4, 10)
+    assert inner.dma_bytes == outer.dma_bytes == 10 * 64
+    assert report.program.bytes == {"DDR": 0, "L2": 640, "L1": 640}
+    assert report.program.intensity == 0
+
+
+def test_abstract_devices_are_rejected() -> None:
+    program, _ = parse("program empty:\n")
+    library = load_device_library(EXAMPLES_DIR / "npm_lite_.nem")
+    with pytest.raises(ValueError, match="has no topology"):
+        analyze(program, library.devices["npm_baseline_1_0"])
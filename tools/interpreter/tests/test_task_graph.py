@@ -0,0 +1,100 @@
+"""Tests for neminterp.engine (task templates and the task graph)."""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+from nemlib.parser import parse
+
+from neminterp import ExecutionError, TaskGraph, compile_program
+from neminterp.engine import JOIN
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+HEADER = """program p:
+const N = 4
+buffer X : L2 (size=N * 64, align=64)
+buffer Y : L1 (size=128, align=64)
+"""
+
+
+def graph(source: str, chunk: int = 1024) -> TaskGraph:
+    program, diagnostics = parse(source, "t.nem")
+    assert not diagnostics, [str(d) for d in diagnostics]
+    g = TaskGraph(compile_program(program), chunk)
+    g.expand()
+    return g
+
+
+def conv2d_relu(trips: int) -> str:
+    source = (EXAMPLES_DIR / "conv2d_relu.nem").read_text()
+    return re.sub(r"const T = \d+", f"const T = {trips}", source)
+
+
+def test_loop_iterations_are_bracketed_and_windowed() -> None:
+    g = graph(conv2d_relu(4))
+    labels = [g.label(n) for n in range(len(g))]
+    assert labels[:8] == [
+        "join", "tX (i = 0)", "tW (i = 0)", "wait (i = 0)",
+        "tC (i = 0)", "tR (i = 0)", "tS (i = 0)", "join",
+    ]  # fmt: skip
+    assert len(g) == 4 * 8 + 1
+    assert g.preds(4).tolist() == [3, 1, 2]  # tC: the wait, then deps=[tX, tW]
+    assert g.preds(8).tolist() == []  # iteration 1 may start right away
+    assert g.preds(16).tolist() == [7]  # iteration 2 waits for iteration 0 to end
+    assert g.preds(32).tolist() == [23, 31]  # the loop ends after its last two iterations
+    tokens = g.token_ids[g.template_ids != JOIN]
+    assert [g.template.tokens[t] if t >= 0 else "-" for t in tokens[:6]] == [
+        "tX", "tW", "-", "tC", "tR", "tS",
+    ]  # fmt: skip
+    # X_pp_i ping-pongs between the two halves of X_L1
+    x_pp = [g.operands(n)[0] for n in range(len(g)) if g.label(n).startswith("tC")]
+    assert x_pp == [(0, 16384), (16384, 16384), (0, 16384), (16384, 16384)]
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 64])
+def test_chunked_instantiation_matches_one_iteration_at_a_time(chunk: int) -> None:
+    reference, chunked = graph(conv2d_relu(100), 1), graph(conv2d_relu(100), chunk)
+    for column in ("template_ids", "values", "dep_ptr", "deps", "op_ptr", "op_offset"):
+        assert np.array_equal(getattr(reference, column), getattr(chunked, column)), column
+
+
+def test_nested_loops_and_carried_dependencies() -> None:
+    body = (
+        "loop i in [0..1]:\n"
+        "  loop j in [0..N-1] @max_in_flight(2):\n"
+        "    t1 = transfer.async(dst=region(Y, (j mod 2) * 64, 64), src=region(X, j * 64, 64),"
+        " deps=[t2])\n"
+        "    t2 = store.async(dst=region(X, j * 64, 64), src=region(Y, (j mod 2) * 64, 64),"
+        " deps=[t1])\n"
+        "  endloop\n"
+        "endloop\n"
+        "t3 = store.sync(dst=region(X, 0, 64), src=region(Y, 0, 64), deps=[t2])\n"
+    )
+    g = graph(HEADER + body)
+    t1 = [n for n in range(len(g)) if g.label(n).startswith("t1")]
+    t2 = [n for n in range(len(g)) if g.label(n).startswith("t2")]
+    assert g.label(t1[5]) == "t1 (i = 1, j = 1)"
+    assert g.values[t1[5]].tolist() == [1, 1]
+    assert t2[0] not in g.preds(t1[0])  # carried, trivially satisfied at first
+    assert t2[0] in g.preds(t1[1]) and t2[3] in g.preds(t1[4])  # across the outer loop too
+    assert t2[-1] in g.preds(len(g) - 1)
+    assert g.operands(t1[5]) == [(64, 64), (64, 64)]
+
+
+def test_expansion_is_lazy() -> None:
+    program, _ = parse(conv2d_relu(100000))
+    g = TaskGraph(compile_program(program), chunk=256)
+    assert not g.expand(1000)
+    assert 1000 <= len(g) < 10 * 256 * 8
+    assert g.expand()
+    assert len(g) == 100000 * 8 + 1
+
+
+def test_expression_errors_surface_as_execution_errors() -> None:
+    store = "t = store.async(dst=region(X, 64 / (2 - i), 64), src=region(Y, 0, 64))"
+    with pytest.raises(ExecutionError, match="division by zero"):
+        graph(HEADER + f"loop i in [0..N-1]:\n  {store}\nendloop\n")
+    with pytest.raises(ExecutionError, match="undefined buffer 'Q'"):
+        graph(HEADER + "t = store.async(dst=region(Q, 0, 64), src=region(Y, 0, 64))\n")
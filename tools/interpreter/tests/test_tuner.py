@@ -0,0 +1,59 @@
+"""Tests for neminterp.tuner."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from neminterp import Candidate, NemInterpreter
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+
+
+def gemm_bias_relu(**values: int) -> str:
+    """gemm_bias_relu.nem over a fixed M = 512, with its window as const F."""
+    source = (EXAMPLES_DIR / "gemm_bias_relu.nem").read_text()
+    source = source.replace("const T = 4", "const M = 512\nconst T = M / TiM\nconst F = 2")
+    source = source.replace("@max_in_flight(2)", "@max_in_flight(F)")
+    for name, value in values.items():
+        source = re.sub(rf"const {name} = \d+", f"const {name} = {value}", source)
+    return source
+
+
+def dominates(a: Candidate, b: Candidate) -> bool:
+    assert a.cycles is not None and b.cycles is not None
+    return a.cycles <= b.cycles and a.l1_bytes <= b.l1_bytes and a != b
+
+
+def test_tuner_times_fits_and_reports_the_pareto_front() -> None:
+    interp = NemInterpreter(l1_size=2**18)
+    space = {"TiM": [16, 32, 64, 128, 256], "F": [1, 2, 3]}
+    report = interp.tune(gemm_bias_relu(), space, workers=2)
+    assert [c.config for c in report.candidates] == [
+        {"TiM": m, "F": f} for m in space["TiM"] for f in space["F"]
+    ]
+    assert interp.tune(gemm_bias_relu(), space, workers=1) == report
+
+    # TiM = 256 needs 2 * 64 KiB (A) + 64 KiB (B) + 2 * 64 KiB (Y) of L1;
+    # a window of 3 overruns the ping-pong buffers
+    reasons = {c.describe(): c.reason for c in report.rejected}
+    assert set(reasons) == {f"TiM=256, F={f}" for f in (1, 2, 3)} | {
+        f"TiM={m}, F=3" for m in (16, 32, 64, 128)
+    }
+    assert "L1[0] buffers need 458752 bytes, exceeding the 262144-byte" in reasons["TiM=256, F=1"]
+    assert (reasons["TiM=16, F=3"] or "").startswith("hazard:")
+
+    timed = [c for c in report.candidates if c.cycles is not None]
+    for c in timed[:2]:
+        dry = interp.run(interp.load_string(gemm_bias_relu(**c.config)), dry=True)
+        assert dry.cycle_count == c.cycles
+    front = list(report.pareto)
+    assert front == sorted(front, key=lambda c: c.cycles or 0)
+    assert report.best is not None and report.best.config == {"TiM": 128, "F": 2}
+    assert not any(dominates(a, b) for a in timed for b in front)
+    assert all(any(dominates(a, b) for a in front) for b in timed if b not in front)
+
+
+def test_tuner_needs_declared_constants() -> None:
+    with pytest.raises(ValueError, match="no const declaration for 'TiN'"):
+        NemInterpreter().tune(gemm_bias_relu(), {"TiM": [32], "TiN": [32]})